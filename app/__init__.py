@@ -3,6 +3,7 @@ Flask application factory.
 Creates and configures the Flask app with all extensions.
 """
 
+import click
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from app.config import config
@@ -54,6 +55,11 @@ def create_app(config_name='development'):
     jwt.init_app(app)
     limiter.init_app(app)
 
+    # Per-request SQL counts and timings (QUERY_PROFILER=true); installed
+    # first so every later request hook is measured too
+    from app.utils.query_profiler import init_query_profiler
+    init_query_profiler(app)
+
     # CORS configuration — use allowed origins from env or defaults
     allowed_origins = os.getenv('CORS_ORIGINS', '').split(',') if os.getenv('CORS_ORIGINS') else [
         'https://inspection-web.onrender.com',
@@ -68,7 +74,7 @@ def create_app(config_name='development'):
          supports_credentials=True,
          allow_headers=["Content-Type", "Authorization", "Accept", "Accept-Language"],
          methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
-         expose_headers=["Content-Type", "Authorization"])
+         expose_headers=["Content-Type", "Authorization", "X-Query-Count", "X-Query-Time-Ms"])
 
     # Handle OPTIONS requests for CORS preflight
     @app.before_request
@@ -282,7 +288,13 @@ def create_app(config_name='development'):
     if socketio:
         try:
             from app.api.notifications_ws import register_socketio_handlers
-            register_socketio_handlers(socketio)
+            from app.services.realtime_service import build_connection_registry
+            from app.services.notification_service import set_socketio
+            register_socketio_handlers(
+                socketio,
+                registry=build_connection_registry(app.config.get('SOCKETIO_MESSAGE_QUEUE', ''))
+            )
+            set_socketio(socketio, batch_window=app.config.get('NOTIFICATION_EMIT_WINDOW_MS', 0) / 1000)
             app.logger.info("WebSocket handlers registered for notifications")
         except ImportError as e:
             app.logger.warning(f"Could not register WebSocket handlers: {e}")
@@ -344,11 +356,11 @@ def create_app(config_name='development'):
 
     @jwt.token_in_blocklist_loader
     def check_token_revoked(jwt_header, jwt_payload):
-        from app.models import TokenBlocklist
-        jti = jwt_payload['jti']
-        return db.session.query(
-            TokenBlocklist.query.filter_by(jti=jti).exists()
-        ).scalar()
+        # In-memory mirror of token_blocklist, synced every few seconds
+        from app.utils.token_revocation import revoked_tokens
+        return revoked_tokens.is_revoked(
+            jwt_payload['jti'], app.config['TOKEN_REVOCATION_SYNC_SECONDS']
+        )
 
     # Public endpoints (no authentication required)
     @app.route('/')
@@ -418,6 +430,24 @@ def create_app(config_name='development'):
         db.session.commit()
         print(f'Admin user created (id={admin.id})')
 
+    @app.cli.command('generate-synthetic-data')
+    @click.option('--scale', default=1.0, show_default=True, help='1.0 = 2000 equipment, 5000 inspections')
+    @click.option('--seed', default=42, show_default=True)
+    def generate_synthetic_data(scale, seed):
+        """Fill the database with a seeded synthetic dataset for profiling."""
+        from app.utils.synthetic_data import generate
+        db.create_all()
+        counts = generate(scale=scale, seed=seed)
+        for table, count in counts.items():
+            print(f'{table:>22}: {count}')
+
+    @app.cli.command('rebuild-job-duration-stats')
+    def rebuild_job_duration_stats():
+        """Recompute job duration statistics from completed job history."""
+        from app.services.job_duration_service import JobDurationService
+        folded = JobDurationService.rebuild()
+        print(f'Job duration stats rebuilt from {folded} completed jobs')
+
     @app.cli.command('reset-data')
     def reset_data():
         """
@@ -96,17 +96,20 @@ def logout():
     """Revoke the current access token."""
     from app.models import TokenBlocklist
     from app.extensions import db, safe_commit
+    from app.utils.token_revocation import revoked_tokens
     from datetime import datetime, timezone
 
     jwt_data = get_jwt()
+    expires_at = datetime.fromtimestamp(jwt_data['exp'], tz=timezone.utc)
     token_blocklist = TokenBlocklist(
         jti=jwt_data['jti'],
         token_type='access',
         user_id=int(get_jwt_identity()),
-        expires_at=datetime.fromtimestamp(jwt_data['exp'], tz=timezone.utc),
+        expires_at=expires_at,
     )
     db.session.add(token_blocklist)
     safe_commit()
+    revoked_tokens.add(jwt_data['jti'], expires_at)
 
     return jsonify({'status': 'success', 'message': 'Logged out'}), 200
 
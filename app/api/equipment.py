@@ -17,6 +17,7 @@ from app.models import (
     EquipmentWatch, EquipmentNote, EquipmentCertification
 )
 from app.services.equipment_notification_service import EquipmentNotificationService
+from app.services.running_hours_snapshot_service import RunningHoursSnapshotService
 from app.extensions import db, safe_commit
 from app.exceptions.api_exceptions import ValidationError, NotFoundError
 from app.utils.decorators import get_current_user, admin_required, get_language
@@ -935,35 +936,36 @@ def get_reading_stats(equipment_id, reading_type):
     Get statistical summary of equipment readings for anomaly detection.
     """
     from app.models.equipment_reading import EquipmentReading
-    import math
+    from app.services.reading_series_service import ReadingSeriesService, summarize
+    from datetime import date, timedelta
 
     equipment = db.session.get(Equipment, equipment_id)
     if not equipment:
         raise NotFoundError(f"Equipment with ID {equipment_id} not found")
 
     days = request.args.get('days', 90, type=int)
-    readings = EquipmentReading.get_reading_history(equipment_id, reading_type, days=days)
-    values = [r.reading_value for r in readings if r.reading_value is not None and not r.is_faulty]
+    series = ReadingSeriesService.load(equipment_id, reading_type, start=date.today() - timedelta(days=days))
 
-    if not values:
+    if not len(series):
         return jsonify({
             'status': 'success',
             'data': {'count': 0, 'avg': None, 'min': None, 'max': None, 'stddev': None, 'last_value': None}
         }), 200
 
-    avg = sum(values) / len(values)
-    variance = sum((v - avg) ** 2 for v in values) / len(values) if len(values) > 1 else 0
-    stddev = math.sqrt(variance)
+    stats = summarize(series.values)
     latest = EquipmentReading.get_latest_reading(equipment_id, reading_type)
 
     return jsonify({
         'status': 'success',
         'data': {
-            'count': len(values),
-            'avg': round(avg, 2),
-            'min': round(min(values), 2),
-            'max': round(max(values), 2),
-            'stddev': round(stddev, 2),
+            'count': stats['count'],
+            'avg': stats['avg'],
+            'min': stats['min'],
+            'max': stats['max'],
+            'stddev': stats['stddev'],
+            'p50': stats['p50'],
+            'p90': stats['p90'],
+            'p95': stats['p95'],
             'last_value': latest.reading_value if latest and not latest.is_faulty else None,
             'reading_type': reading_type,
             'days': days,
@@ -971,6 +973,51 @@ def get_reading_stats(equipment_id, reading_type):
     }), 200
 
 
+@bp.route('/<int:equipment_id>/readings/<reading_type>/series', methods=['GET'])
+@jwt_required()
+def get_reading_series(equipment_id, reading_type):
+    """
+    Chart series for one reading type over an arbitrary range.
+
+    Statistics cover every reading in the range; the points are
+    downsampled so multi-year ranges stay small.
+
+    Query params:
+        - start, end: ISO dates (default: the last `days` days)
+        - days: Range length when start is not given (default 365)
+        - max_points: Upper bound on returned points (default 500, max 5000)
+        - method: lttb (real readings, default) or bucket (time bucket averages)
+        - window: Rolling mean/stddev window in readings (lttb only)
+    """
+    from app.services.reading_series_service import ReadingSeriesService, DEFAULT_MAX_POINTS
+    from datetime import date, timedelta
+
+    equipment = db.session.get(Equipment, equipment_id)
+    if not equipment:
+        raise NotFoundError(f"Equipment with ID {equipment_id} not found")
+
+    try:
+        end = date.fromisoformat(request.args['end']) if request.args.get('end') else None
+        if request.args.get('start'):
+            start = date.fromisoformat(request.args['start'])
+        else:
+            days = request.args.get('days', 365, type=int)
+            start = (end or date.today()) - timedelta(days=days)
+    except ValueError:
+        raise ValidationError("start and end must be ISO dates (YYYY-MM-DD)")
+
+    max_points = min(max(request.args.get('max_points', DEFAULT_MAX_POINTS, type=int), 3), 5000)
+    try:
+        data = ReadingSeriesService.get_series(
+            equipment_id, reading_type, start=start, end=end, max_points=max_points,
+            method=request.args.get('method', 'lttb'), window=request.args.get('window', type=int),
+        )
+    except ValueError as e:
+        raise ValidationError(str(e))
+
+    return jsonify({'status': 'success', 'data': data}), 200
+
+
 def _edit_inspection_answer_reading(equipment_id, answer_id, new_value, edit_reason):
     """
     Admin-only helper: correct a numeric InspectionAnswer.answer_value.
@@ -1009,6 +1056,7 @@ def _edit_inspection_answer_reading(equipment_id, answer_id, new_value, edit_rea
     answer.answer_value = (
         f'{int(new_value)}' if new_value == int(new_value) else f'{new_value}'
     )
+    RunningHoursSnapshotService.refresh([equipment_id])
     db.session.commit()
 
     logger.info(
@@ -1059,6 +1107,7 @@ def _edit_running_hours_reading(equipment_id, reading_id, new_value, edit_reason
     user = get_current_user()
     old_value = reading.hours
     reading.hours = new_value
+    RunningHoursSnapshotService.refresh([equipment_id])
     db.session.commit()
 
     logger.info(
@@ -1224,6 +1273,8 @@ def edit_equipment_reading(equipment_id, reading_id):
     reading.edit_reason = edit_reason[:255]
     reading.edit_count = (reading.edit_count or 0) + 1
 
+    if reading.reading_type == 'rnr':
+        RunningHoursSnapshotService.refresh([equipment_id])
     db.session.commit()
 
     logger.info(
@@ -1246,14 +1297,16 @@ def get_readings_history(equipment_id):
 
     Query params:
         - days: How far back to fetch (default 90)
+        - max_points: Downsample each group's readings to at most this many
+          (LTTB; stats still cover every reading)
     """
     from app.models.equipment_reading import EquipmentReading
     from app.models.running_hours import RunningHoursReading
     from app.models.inspection import Inspection, InspectionAnswer
     from app.models.checklist import ChecklistItem
+    from app.models.file import File
     from datetime import date, timedelta
     from collections import defaultdict
-    import math
 
     equipment = db.session.get(Equipment, equipment_id)
     if not equipment:
@@ -1261,6 +1314,7 @@ def get_readings_history(equipment_id):
 
     language = get_language()
     days = request.args.get('days', 90, type=int)
+    max_points = request.args.get('max_points', type=int)
     cutoff = date.today() - timedelta(days=days)
 
     groups = []
@@ -1275,6 +1329,43 @@ def get_readings_history(equipment_id):
     for r in eq_readings:
         er_by_type[r.reading_type].append(r)
 
+    numeric_answers = db.session.query(
+        InspectionAnswer, ChecklistItem, Inspection
+    ).join(
+        Inspection, InspectionAnswer.inspection_id == Inspection.id
+    ).join(
+        ChecklistItem, InspectionAnswer.checklist_item_id == ChecklistItem.id
+    ).filter(
+        Inspection.equipment_id == equipment_id,
+        ChecklistItem.answer_type == 'numeric',
+        InspectionAnswer.answered_at >= cutoff
+    ).order_by(InspectionAnswer.answered_at.asc()).all()
+
+    rhr_readings = []
+    if 'rnr' not in er_by_type:
+        rhr_readings = RunningHoursReading.query.filter(
+            RunningHoursReading.equipment_id == equipment_id,
+            RunningHoursReading.recorded_at >= cutoff
+        ).order_by(RunningHoursReading.recorded_at.asc()).all()
+
+    # Resolve recorders, editors and photos for every source in one query each
+    user_ids, file_ids = set(), set()
+    for r in eq_readings:
+        user_ids.update((r.recorded_by_id, r.updated_by_id))
+        file_ids.add(r.photo_file_id)
+    for answer, _item, inspection in numeric_answers:
+        user_ids.add(inspection.technician_id)
+        file_ids.add(answer.photo_file_id)
+    user_ids.update(r.recorded_by_id for r in rhr_readings)
+    user_ids.discard(None)
+    file_ids.discard(None)
+    user_names = dict(
+        db.session.query(User.id, User.full_name).filter(User.id.in_(user_ids))
+    ) if user_ids else {}
+    file_paths = dict(
+        db.session.query(File.id, File.file_path).filter(File.id.in_(file_ids))
+    ) if file_ids else {}
+
     type_labels = {
         'rnr': ('Running Hours', 'ساعات التشغيل', 'hours'),
         'twl': ('Twistlock Count', 'عدد التويستلوك', 'count'),
@@ -1285,25 +1376,12 @@ def get_readings_history(equipment_id):
         values = [r.reading_value for r in readings if r.reading_value is not None and not r.is_faulty]
         data_points = []
         for r in readings:
-            recorder = None
-            if r.recorded_by_id:
-                u = db.session.get(User, r.recorded_by_id)
-                recorder = u.full_name if u else None
-            updater_name = None
-            if r.updated_by_id:
-                u2 = db.session.get(User, r.updated_by_id)
-                updater_name = u2.full_name if u2 else None
-            photo_url = None
-            if r.photo_file_id:
-                from app.models.file import File as _File
-                pf = db.session.get(_File, r.photo_file_id)
-                photo_url = pf.file_path if pf else None
             data_points.append({
                 'id': r.id,
                 'value': r.reading_value,
                 'date': r.reading_date.isoformat() if r.reading_date else None,
                 'recorded_at': r.recorded_at.isoformat() if r.recorded_at else None,
-                'recorded_by': recorder,
+                'recorded_by': user_names.get(r.recorded_by_id),
                 'inspection_id': r.inspection_id,
                 'is_faulty': r.is_faulty or False,
                 # Audit trail (for admin edit UI)
@@ -1312,8 +1390,8 @@ def get_readings_history(equipment_id):
                 'edit_count': r.edit_count or 0,
                 'edit_reason': r.edit_reason,
                 'updated_at': r.updated_at.isoformat() if r.updated_at else None,
-                'updated_by_name': updater_name,
-                'photo_url': photo_url,
+                'updated_by_name': user_names.get(r.updated_by_id),
+                'photo_url': file_paths.get(r.photo_file_id),
             })
 
         stats = _compute_stats(values)
@@ -1329,18 +1407,6 @@ def get_readings_history(equipment_id):
         })
 
     # ── Source 2: InspectionAnswer with numeric checklist items ──
-    numeric_answers = db.session.query(
-        InspectionAnswer, ChecklistItem, Inspection
-    ).join(
-        Inspection, InspectionAnswer.inspection_id == Inspection.id
-    ).join(
-        ChecklistItem, InspectionAnswer.checklist_item_id == ChecklistItem.id
-    ).filter(
-        Inspection.equipment_id == equipment_id,
-        ChecklistItem.answer_type == 'numeric',
-        InspectionAnswer.answered_at >= cutoff
-    ).order_by(InspectionAnswer.answered_at.asc()).all()
-
     ans_by_item = defaultdict(list)
     item_info = {}
     for answer, item, inspection in numeric_answers:
@@ -1370,25 +1436,15 @@ def get_readings_history(equipment_id):
             except (TypeError, ValueError):
                 continue
             values.append(val)
-            recorder = None
-            if inspection.technician_id:
-                u = db.session.get(User, inspection.technician_id)
-                recorder = u.full_name if u else None
-            # Fetch the photo URL if the inspector attached one
-            photo_url = None
-            if answer.photo_file_id:
-                from app.models.file import File as _File
-                pf = db.session.get(_File, answer.photo_file_id)
-                photo_url = pf.file_path if pf else None
             data_points.append({
                 'id': answer.id,
                 'value': val,
                 'date': answer.answered_at.strftime('%Y-%m-%d') if answer.answered_at else None,
                 'recorded_at': answer.answered_at.isoformat() if answer.answered_at else None,
-                'recorded_by': recorder,
+                'recorded_by': user_names.get(inspection.technician_id),
                 'inspection_id': inspection.id,
                 'is_faulty': False,
-                'photo_url': photo_url,
+                'photo_url': file_paths.get(answer.photo_file_id),
             })
 
         if not data_points:
@@ -1411,47 +1467,41 @@ def get_readings_history(equipment_id):
         })
 
     # ── Source 3: RunningHoursReading (merge if no EquipmentReading rnr exists) ──
-    if 'rnr' not in er_by_type:
-        rhr_readings = RunningHoursReading.query.filter(
-            RunningHoursReading.equipment_id == equipment_id,
-            RunningHoursReading.recorded_at >= cutoff
-        ).order_by(RunningHoursReading.recorded_at.asc()).all()
+    if rhr_readings:
+        data_points = []
+        values = []
+        for r in rhr_readings:
+            values.append(r.hours)
+            data_points.append({
+                'id': r.id,
+                'value': r.hours,
+                'date': r.recorded_at.strftime('%Y-%m-%d') if r.recorded_at else None,
+                'recorded_at': r.recorded_at.isoformat() if r.recorded_at else None,
+                'recorded_by': user_names.get(r.recorded_by_id),
+                'inspection_id': None,
+                'is_faulty': False,
+            })
 
-        if rhr_readings:
-            data_points = []
-            values = []
-            for r in rhr_readings:
-                values.append(r.hours)
-                recorder = None
-                if r.recorded_by_id:
-                    u = db.session.get(User, r.recorded_by_id)
-                    recorder = u.full_name if u else None
-                data_points.append({
-                    'id': r.id,
-                    'value': r.hours,
-                    'date': r.recorded_at.strftime('%Y-%m-%d') if r.recorded_at else None,
-                    'recorded_at': r.recorded_at.isoformat() if r.recorded_at else None,
-                    'recorded_by': recorder,
-                    'inspection_id': None,
-                    'is_faulty': False,
-                })
+        stats = _compute_stats(values)
+        groups.append({
+            'group_key': 'running_hours',
+            'label': 'Running Hours',
+            'label_ar': 'ساعات التشغيل',
+            'unit': 'hours',
+            'source': 'running_hours',
+            'thresholds': {'min_value': None, 'max_value': None, 'numeric_rule': None},
+            'readings': data_points,
+            'stats': stats,
+        })
 
-            stats = _compute_stats(values)
-            groups.append({
-                'group_key': 'running_hours',
-                'label': 'Running Hours',
-                'label_ar': 'ساعات التشغيل',
-                'unit': 'hours',
-                'source': 'running_hours',
-                'thresholds': {'min_value': None, 'max_value': None, 'numeric_rule': None},
-                'readings': data_points,
-                'stats': stats,
-            })
+    if max_points:
+        for group in groups:
+            _downsample_group(group, max_points)
 
     # Sort by most readings first
-    groups.sort(key=lambda g: len(g['readings']), reverse=True)
+    groups.sort(key=lambda g: g.get('total_count', len(g['readings'])), reverse=True)
 
-    total_readings = sum(len(g['readings']) for g in groups)
+    total_readings = sum(g.get('total_count', len(g['readings'])) for g in groups)
 
     return jsonify({
         'status': 'success',
@@ -1470,29 +1520,24 @@ def get_readings_history(equipment_id):
 
 def _compute_stats(values):
     """Compute basic statistics for a list of numeric values."""
-    if not values:
-        return {'count': 0, 'avg': 0, 'min': 0, 'max': 0, 'latest': 0, 'trend': 'stable'}
-    avg = sum(values) / len(values)
-    # Trend: compare last 3 readings average vs first 3
-    if len(values) >= 6:
-        early = sum(values[:3]) / 3
-        recent = sum(values[-3:]) / 3
-        if recent > early * 1.05:
-            trend = 'increasing'
-        elif recent < early * 0.95:
-            trend = 'decreasing'
-        else:
-            trend = 'stable'
-    else:
-        trend = 'stable'
-    return {
-        'count': len(values),
-        'avg': round(avg, 2),
-        'min': round(min(values), 2),
-        'max': round(max(values), 2),
-        'latest': round(values[-1], 2),
-        'trend': trend,
-    }
+    from app.services.reading_series_service import summarize
+    return summarize(values)
+
+
+def _downsample_group(group, max_points):
+    """Keep at most max_points charted readings of a group, chosen by LTTB."""
+    from app.services.reading_series_service import lttb
+    import numpy as np
+
+    points = [p for p in group['readings'] if p['value'] is not None]
+    if len(points) <= max_points:
+        return
+    stamps = np.array([p['recorded_at'] or p['date'] for p in points], dtype='datetime64[us]')
+    order = np.argsort(stamps, kind='stable')
+    kept = order[lttb(stamps[order].astype(np.int64), np.array([p['value'] for p in points])[order], max_points)]
+    group['total_count'] = len(group['readings'])
+    group['readings'] = [points[i] for i in sorted(kept)]
+    group['downsampled'] = True
 
 
 # ============================================================
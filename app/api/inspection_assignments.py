@@ -416,11 +416,20 @@ def assign_team(assignment_id):
     if auto_count > 0:
         msg += f' (also auto-assigned to {auto_count} other equipment at berth {assignment.berth})'
 
+    # Inspectors whose 7-day workload now puts them at fatigue risk
+    fatigue = getattr(assignment, '_fatigue', {})
+    fatigue_warnings = [
+        {'inspector_id': user_id, **assessment}
+        for user_id, assessment in fatigue.items()
+        if assessment['risk_level'] != 'low'
+    ]
+
     return jsonify({
         'status': 'success',
         'message': msg,
         'data': assignment.to_dict(),
         'auto_assigned': auto_count,
+        'fatigue_warnings': fatigue_warnings,
     }), 200
 
 
@@ -1148,6 +1157,10 @@ def ai_suggest_assignment():
         User.is_active == True
     ).all()
 
+    # 7-day fatigue for everyone, from the workload ledger in one query
+    from app.services.inspector_workload_service import InspectorWorkloadService
+    fatigue = InspectorWorkloadService.fatigue([i.id for i in inspectors])
+
     for inspector in inspectors:
         # Check leave status
         on_leave = Leave.query.filter(
@@ -1185,8 +1198,10 @@ def ai_suggest_assignment():
         # Calculate score (0-100)
         workload_score = max(0, 100 - (active_assignments * 15))
         availability_score = 100 if roster_status == 'available' else 50
+        inspector_fatigue = fatigue[inspector.id]
+        rest_score = 100 - inspector_fatigue['fatigue_score']
 
-        total_score = int((workload_score * 0.7) + (availability_score * 0.3))
+        total_score = int((workload_score * 0.5) + (availability_score * 0.3) + (rest_score * 0.2))
 
         suggestion = {
             'id': inspector.id,
@@ -1196,9 +1211,11 @@ def ai_suggest_assignment():
             'active_assignments': active_assignments,
             'roster_status': roster_status,
             'match_score': total_score,
+            'fatigue_score': inspector_fatigue['fatigue_score'],
             'factors': {
                 'workload': 'low' if active_assignments < 3 else 'medium' if active_assignments < 5 else 'high',
-                'availability': roster_status
+                'availability': roster_status,
+                'fatigue': inspector_fatigue['risk_level']
             }
         }
 
@@ -4,14 +4,15 @@ Enhanced with stats, advanced filters, bulk actions, and AI insights.
 """
 
 import logging
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.services.inspection_service import InspectionService
 from app.models import Inspection, InspectionAssignment, User, Equipment, Defect, InspectionAnswer
 from app.exceptions.api_exceptions import ValidationError, NotFoundError, ForbiddenError
 from app.utils.decorators import get_current_user, admin_required, get_language, role_required
+from app.utils.ttl_cache import TTLCache
 from app.extensions import db
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, and_, or_, case
 from datetime import datetime, date, timedelta
 
 logger = logging.getLogger(__name__)
@@ -479,6 +480,9 @@ def test_ai_connection():
 # STATS & ANALYTICS
 # ============================================
 
+_stats_cache = TTLCache()
+
+
 @bp.route('/stats', methods=['GET'])
 @jwt_required()
 @role_required('admin', 'engineer', 'quality_engineer')
@@ -486,56 +490,81 @@ def get_inspection_stats():
     """
     Get comprehensive inspection statistics for dashboard.
     Returns counts by status, pass/fail rates, trends, and performance metrics.
+
+    All inspection counters come from a single conditional-aggregate scan, and
+    the result is shared between concurrent viewers of the same role for
+    DASHBOARD_CACHE_SECONDS.
     """
-    today = date.today()
-    week_ago = today - timedelta(days=7)
-    month_ago = today - timedelta(days=30)
+    user = get_current_user()
+    data = _stats_cache.get_or_compute(
+        ('inspection_stats', user.role, date.today()),
+        _compute_inspection_stats,
+        ttl=current_app.config.get('DASHBOARD_CACHE_SECONDS', 15),
+    )
+    return jsonify({'status': 'success', 'data': data}), 200
 
-    # Overall counts
-    total = Inspection.query.count()
-    by_status = {
-        'draft': Inspection.query.filter_by(status='draft').count(),
-        'submitted': Inspection.query.filter_by(status='submitted').count(),
-        'reviewed': Inspection.query.filter_by(status='reviewed').count()
-    }
 
-    # Results distribution
-    by_result = {
-        'pass': Inspection.query.filter_by(result='pass').count(),
-        'fail': Inspection.query.filter_by(result='fail').count(),
-        'incomplete': Inspection.query.filter_by(result='incomplete').count()
-    }
+def _count_if(*conditions):
+    """SUM(CASE WHEN ... THEN 1 ELSE 0 END) for conditional aggregation."""
+    return func.sum(case((and_(*conditions), 1), else_=0))
 
-    # Pass rate
-    completed = by_result['pass'] + by_result['fail']
-    pass_rate = round((by_result['pass'] / completed * 100), 1) if completed > 0 else 0
 
-    # Today's inspections
+def _compute_inspection_stats():
+    today = date.today()
+    week_ago = today - timedelta(days=7)
     today_start = datetime.combine(today, datetime.min.time())
-    today_total = Inspection.query.filter(Inspection.started_at >= today_start).count()
-    today_submitted = Inspection.query.filter(
-        Inspection.submitted_at >= today_start
-    ).count()
-
-    # Week stats
     week_start = datetime.combine(week_ago, datetime.min.time())
-    week_total = Inspection.query.filter(Inspection.started_at >= week_start).count()
-    week_submitted = Inspection.query.filter(Inspection.submitted_at >= week_start).count()
-    week_reviewed = Inspection.query.filter(Inspection.reviewed_at >= week_start).count()
 
-    # Pending review count
-    pending_review = Inspection.query.filter_by(status='submitted').count()
+    # One scan of inspections: status, result, today, week and the 7-day trend
+    columns = [
+        func.count(Inspection.id),
+        _count_if(Inspection.status == 'draft'),
+        _count_if(Inspection.status == 'submitted'),
+        _count_if(Inspection.status == 'reviewed'),
+        _count_if(Inspection.result == 'pass'),
+        _count_if(Inspection.result == 'fail'),
+        _count_if(Inspection.result == 'incomplete'),
+        _count_if(Inspection.started_at >= today_start),
+        _count_if(Inspection.submitted_at >= today_start),
+        _count_if(Inspection.started_at >= week_start),
+        _count_if(Inspection.submitted_at >= week_start),
+        _count_if(Inspection.reviewed_at >= week_start),
+    ]
+    trend_days = [today - timedelta(days=i) for i in range(7)]
+    for d in trend_days:
+        day_start = datetime.combine(d, datetime.min.time())
+        day_end = datetime.combine(d + timedelta(days=1), datetime.min.time())
+        columns += [
+            _count_if(Inspection.started_at >= day_start, Inspection.started_at < day_end),
+            _count_if(Inspection.submitted_at >= day_start, Inspection.submitted_at < day_end),
+            _count_if(Inspection.reviewed_at >= day_start, Inspection.reviewed_at < day_end,
+                      Inspection.result == 'pass'),
+            _count_if(Inspection.reviewed_at >= day_start, Inspection.reviewed_at < day_end,
+                      Inspection.result == 'fail'),
+        ]
+    counts = [int(v or 0) for v in db.session.query(*columns).one()]
+    (total, draft, submitted, reviewed, passed, failed, incomplete,
+     today_total, today_submitted, week_total, week_submitted, week_reviewed) = counts[:12]
+
+    by_status = {'draft': draft, 'submitted': submitted, 'reviewed': reviewed}
+    by_result = {'pass': passed, 'fail': failed, 'incomplete': incomplete}
+
+    # Pass rate
+    completed = passed + failed
+    pass_rate = round((passed / completed * 100), 1) if completed > 0 else 0
 
     # Average completion time (from start to submit)
-    completed_inspections = Inspection.query.filter(
+    completed_inspections = db.session.query(
+        Inspection.started_at, Inspection.submitted_at
+    ).filter(
         Inspection.submitted_at.isnot(None),
         Inspection.started_at.isnot(None)
     ).limit(100).all()
 
     if completed_inspections:
         total_minutes = sum(
-            (i.submitted_at - i.started_at).total_seconds() / 60
-            for i in completed_inspections
+            (submitted_at - started_at).total_seconds() / 60
+            for started_at, submitted_at in completed_inspections
         )
         avg_completion_minutes = round(total_minutes / len(completed_inspections), 1)
     else:
@@ -553,11 +582,11 @@ def get_inspection_stats():
     by_equipment_type = [
         {
             'type': eq_type or 'Unknown',
-            'total': total,
-            'failed': failed or 0,
-            'fail_rate': round((failed or 0) / total * 100, 1) if total > 0 else 0
+            'total': eq_total,
+            'failed': eq_failed or 0,
+            'fail_rate': round((eq_failed or 0) / eq_total * 100, 1) if eq_total > 0 else 0
         }
-        for eq_type, total, failed in equipment_stats
+        for eq_type, eq_total, eq_failed in equipment_stats
     ]
 
     # Top performers (inspectors with most completed inspections)
@@ -582,79 +611,48 @@ def get_inspection_stats():
         for id, name, count, rate in top_inspectors
     ]
 
-    # Daily trend (last 7 days)
+    # Daily trend (last 7 days), sliced from the scan above
     daily_trend = []
-    for i in range(7):
-        d = today - timedelta(days=i)
-        day_start = datetime.combine(d, datetime.min.time())
-        day_end = datetime.combine(d + timedelta(days=1), datetime.min.time())
-
-        day_total = Inspection.query.filter(
-            Inspection.started_at >= day_start,
-            Inspection.started_at < day_end
-        ).count()
-
-        day_submitted = Inspection.query.filter(
-            Inspection.submitted_at >= day_start,
-            Inspection.submitted_at < day_end
-        ).count()
-
-        day_passed = Inspection.query.filter(
-            Inspection.reviewed_at >= day_start,
-            Inspection.reviewed_at < day_end,
-            Inspection.result == 'pass'
-        ).count()
-
-        day_failed = Inspection.query.filter(
-            Inspection.reviewed_at >= day_start,
-            Inspection.reviewed_at < day_end,
-            Inspection.result == 'fail'
-        ).count()
-
+    for i, d in enumerate(trend_days):
+        started, day_submitted, day_passed, day_failed = counts[12 + i * 4:16 + i * 4]
         daily_trend.append({
             'date': d.isoformat(),
-            'started': day_total,
+            'started': started,
             'submitted': day_submitted,
             'passed': day_passed,
             'failed': day_failed
         })
 
     # Defect correlation
-    defect_count = Defect.query.filter(
-        Defect.created_at >= week_start
-    ).count()
-
-    inspections_with_defects = db.session.query(
+    defect_count, inspections_with_defects = db.session.query(
+        func.count(Defect.id),
         func.count(func.distinct(Defect.inspection_id))
-    ).filter(Defect.created_at >= week_start).scalar() or 0
+    ).filter(Defect.created_at >= week_start).one()
 
-    return jsonify({
-        'status': 'success',
-        'data': {
-            'total': total,
-            'by_status': by_status,
-            'by_result': by_result,
-            'pass_rate': pass_rate,
-            'today': {
-                'total': today_total,
-                'submitted': today_submitted
-            },
-            'week': {
-                'total': week_total,
-                'submitted': week_submitted,
-                'reviewed': week_reviewed
-            },
-            'pending_review': pending_review,
-            'avg_completion_minutes': avg_completion_minutes,
-            'by_equipment_type': by_equipment_type,
-            'top_performers': top_performers,
-            'daily_trend': daily_trend,
-            'defects': {
-                'total_this_week': defect_count,
-                'inspections_with_defects': inspections_with_defects
-            }
+    return {
+        'total': total,
+        'by_status': by_status,
+        'by_result': by_result,
+        'pass_rate': pass_rate,
+        'today': {
+            'total': today_total,
+            'submitted': today_submitted
+        },
+        'week': {
+            'total': week_total,
+            'submitted': week_submitted,
+            'reviewed': week_reviewed
+        },
+        'pending_review': submitted,
+        'avg_completion_minutes': avg_completion_minutes,
+        'by_equipment_type': by_equipment_type,
+        'top_performers': top_performers,
+        'daily_trend': daily_trend,
+        'defects': {
+            'total_this_week': defect_count or 0,
+            'inspections_with_defects': inspections_with_defects or 0
         }
-    }), 200
+    }
 
 
 # ============================================
@@ -1888,6 +1886,9 @@ def _background_photo_analysis(inspection_id, answer_id, file_record_id, file_pa
                     ai_analysis=ai_analysis,
                 )
                 db.session.add(equipment_reading)
+                if reading_type == 'rnr':
+                    from app.services.running_hours_snapshot_service import RunningHoursSnapshotService
+                    RunningHoursSnapshotService.refresh([inspection.equipment_id])
                 db.session.commit()
                 logger.info(f"Saved {reading_type.upper()} reading: {reading_value} for equipment #{inspection.equipment_id}")
 
@@ -2350,6 +2351,9 @@ def bulk_review():
             inspection.reviewed_at = datetime.utcnow()
             inspection.reviewer_id = int(current_user_id)
 
+            from app.services.equipment_risk_service import EquipmentRiskService
+            EquipmentRiskService.refresh([inspection.equipment_id])
+
             db.session.commit()
 
             results['success'].append({
@@ -2382,17 +2386,22 @@ def bulk_export():
     """
     Export multiple inspection reports as a ZIP file.
 
+    Reports render in parallel on a bounded worker pool. Up to
+    REPORT_EXPORT_SYNC_LIMIT inspections the ZIP is streamed back as the
+    reports finish; larger requests (or "background": true) start a
+    background export and return 202 with its progress record, to be
+    polled at /bulk-export/<id> and fetched from /bulk-export/<id>/download.
+
     Request Body:
         {
-            "inspection_ids": [1, 2, 3]
+            "inspection_ids": [1, 2, 3],
+            "background": false
         }
     """
-    import io
-    import zipfile
-    from flask import send_file
-    from app.services.pdf_report_service import generate_inspection_report
+    from flask import Response, stream_with_context
+    from app.services.report_export_service import ReportExportService
 
-    data = request.get_json()
+    data = request.get_json() or {}
     inspection_ids = data.get('inspection_ids', [])
 
     if not inspection_ids:
@@ -2404,33 +2413,64 @@ def bulk_export():
     current_user = get_current_user()
     lang = get_language(current_user)
 
-    # Create ZIP in memory
-    zip_buffer = io.BytesIO()
+    if data.get('background') or len(inspection_ids) > current_app.config['REPORT_EXPORT_SYNC_LIMIT']:
+        export = ReportExportService.create(current_user.id, inspection_ids, lang)
+        ReportExportService.start(export)
+        return jsonify({'status': 'success', 'data': export.to_dict()}), 202
 
-    with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-        for inspection_id in inspection_ids[:50]:  # Limit to 50
-            try:
-                inspection = db.session.get(Inspection, inspection_id)
-                if not inspection or inspection.status == 'draft':
-                    continue
+    results = ReportExportService.render_reports(
+        ReportExportService.iter_payloads(inspection_ids, lang), lang
+    )
+    return Response(
+        stream_with_context(ReportExportService.stream_zip(results)),
+        mimetype='application/zip',
+        headers={
+            'Content-Disposition': f'attachment; filename=inspection_reports_{date.today().isoformat()}.zip'
+        },
+    )
 
-                inspection_data = inspection.to_dict(include_answers=True, language=lang)
-                pdf_bytes = generate_inspection_report(inspection_data, language=lang)
 
-                code = inspection.inspection_code or f"INS-{inspection.id}"
-                filename = f"inspection_report_{code}.pdf"
+def _get_report_export(export_id):
+    from app.models import ReportExport
 
-                zip_file.writestr(filename, pdf_bytes.getvalue())
-            except Exception:
-                continue
+    export = db.session.get(ReportExport, export_id)
+    if not export:
+        raise NotFoundError(f"Export with ID {export_id} not found")
+    current_user = get_current_user()
+    if export.user_id != current_user.id and current_user.role != 'admin':
+        raise ForbiddenError("You can only access your own exports")
+    return export
+
+
+@bp.route('/bulk-export/<int:export_id>', methods=['GET'])
+@jwt_required()
+@role_required('admin', 'engineer', 'quality_engineer')
+def get_bulk_export(export_id):
+    """Progress of a background bulk export."""
+    return jsonify({'status': 'success', 'data': _get_report_export(export_id).to_dict()}), 200
 
-    zip_buffer.seek(0)
+
+@bp.route('/bulk-export/<int:export_id>/download', methods=['GET'])
+@jwt_required()
+@role_required('admin', 'engineer', 'quality_engineer')
+def download_bulk_export(export_id):
+    """Download the ZIP of a completed background bulk export."""
+    import os
+    from flask import send_file
+
+    export = _get_report_export(export_id)
+    if export.status != 'completed' or not export.file_path or not os.path.exists(export.file_path):
+        return jsonify({
+            'status': 'error',
+            'message': f'Export is not ready (status: {export.status})',
+            'data': export.to_dict(),
+        }), 409
 
     return send_file(
-        zip_buffer,
+        export.file_path,
         mimetype='application/zip',
         as_attachment=True,
-        download_name=f'inspection_reports_{date.today().isoformat()}.zip'
+        download_name=f'inspection_reports_{export.created_at.date().isoformat()}.zip'
     )
 
 
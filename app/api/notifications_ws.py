@@ -4,27 +4,39 @@ Uses Flask-SocketIO for WebSocket support.
 """
 
 import logging
+import threading
 from datetime import datetime
 from flask import request
 from flask_jwt_extended import decode_token
 from flask_jwt_extended.exceptions import JWTDecodeError
+from app.services.realtime_service import ConnectionRegistry
 
 logger = logging.getLogger(__name__)
 
-# Store connected users and their rooms
-connected_users = {}
-user_subscriptions = {}
+# Connected sockets indexed by sid and user (shared across workers when a
+# message queue is configured; see app.services.realtime_service)
+registry = ConnectionRegistry()
 
 
-def register_socketio_handlers(socketio):
+def set_registry(connection_registry):
+    """Set the connection registry used by the handlers and helpers."""
+    global registry
+    registry = connection_registry
+
+
+def register_socketio_handlers(socketio, registry=None):
     """
     Register all WebSocket handlers for the notifications namespace.
 
     Args:
         socketio: Flask-SocketIO instance
+        registry: Connection registry to use (defaults to a per-process one)
     """
     from flask_socketio import emit, join_room, leave_room, disconnect
 
+    if registry is not None:
+        set_registry(registry)
+
     @socketio.on('connect', namespace='/notifications')
     def handle_connect():
         """
@@ -59,11 +71,7 @@ def register_socketio_handlers(socketio):
 
             # Store connection info
             sid = request.sid
-            connected_users[sid] = {
-                'user_id': int(user_id),
-                'connected_at': datetime.utcnow(),
-                'subscriptions': set()
-            }
+            _registry().add(sid, int(user_id))
 
             # Join user's personal room
             user_room = f"user_{user_id}"
@@ -94,8 +102,8 @@ def register_socketio_handlers(socketio):
         """
         sid = request.sid
 
-        if sid in connected_users:
-            user_info = connected_users.pop(sid)
+        user_info = _registry().remove(sid)
+        if user_info is not None:
             user_id = user_info['user_id']
 
             # Leave all rooms
@@ -121,36 +129,15 @@ def register_socketio_handlers(socketio):
             }
         """
         sid = request.sid
-        if sid not in connected_users:
+        user_info = _registry().get(sid)
+        if user_info is None:
             emit('error', {'message': 'Not authenticated'})
             return
 
-        user_info = connected_users[sid]
-        subscriptions = user_info.get('subscriptions', set())
-
-        # Subscribe to notification types
-        if 'types' in data:
-            for notification_type in data['types']:
-                room = f"type_{notification_type}"
-                join_room(room)
-                subscriptions.add(room)
-
-        # Subscribe to priority levels
-        if 'priorities' in data:
-            for priority in data['priorities']:
-                room = f"priority_{priority}"
-                join_room(room)
-                subscriptions.add(room)
-
-        # Subscribe to equipment-specific notifications
-        if 'equipment_ids' in data:
-            for equipment_id in data['equipment_ids']:
-                room = f"equipment_{equipment_id}"
-                join_room(room)
-                subscriptions.add(room)
-
-        user_info['subscriptions'] = subscriptions
-        connected_users[sid] = user_info
+        rooms = _requested_rooms(data)
+        for room in rooms:
+            join_room(room)
+        subscriptions = _registry().add_subscriptions(sid, rooms)
 
         emit('subscribed', {
             'status': 'success',
@@ -173,36 +160,14 @@ def register_socketio_handlers(socketio):
             }
         """
         sid = request.sid
-        if sid not in connected_users:
+        if _registry().get(sid) is None:
             emit('error', {'message': 'Not authenticated'})
             return
 
-        user_info = connected_users[sid]
-        subscriptions = user_info.get('subscriptions', set())
-
-        # Unsubscribe from notification types
-        if 'types' in data:
-            for notification_type in data['types']:
-                room = f"type_{notification_type}"
-                leave_room(room)
-                subscriptions.discard(room)
-
-        # Unsubscribe from priority levels
-        if 'priorities' in data:
-            for priority in data['priorities']:
-                room = f"priority_{priority}"
-                leave_room(room)
-                subscriptions.discard(room)
-
-        # Unsubscribe from equipment-specific notifications
-        if 'equipment_ids' in data:
-            for equipment_id in data['equipment_ids']:
-                room = f"equipment_{equipment_id}"
-                leave_room(room)
-                subscriptions.discard(room)
-
-        user_info['subscriptions'] = subscriptions
-        connected_users[sid] = user_info
+        rooms = _requested_rooms(data)
+        for room in rooms:
+            leave_room(room)
+        subscriptions = _registry().remove_subscriptions(sid, rooms)
 
         emit('unsubscribed', {
             'status': 'success',
@@ -219,11 +184,11 @@ def register_socketio_handlers(socketio):
             data: { "notification_id": 123 } or { "notification_ids": [1, 2, 3] }
         """
         sid = request.sid
-        if sid not in connected_users:
+        user_info = _registry().get(sid)
+        if user_info is None:
             emit('error', {'message': 'Not authenticated'})
             return
 
-        user_info = connected_users[sid]
         user_id = user_info['user_id']
 
         try:
@@ -274,11 +239,11 @@ def register_socketio_handlers(socketio):
             data: { "notification_id": 123 }
         """
         sid = request.sid
-        if sid not in connected_users:
+        user_info = _registry().get(sid)
+        if user_info is None:
             emit('error', {'message': 'Not authenticated'})
             return
 
-        user_info = connected_users[sid]
         user_id = user_info['user_id']
 
         try:
@@ -305,11 +270,11 @@ def register_socketio_handlers(socketio):
         Get current unread count via WebSocket.
         """
         sid = request.sid
-        if sid not in connected_users:
+        user_info = _registry().get(sid)
+        if user_info is None:
             emit('error', {'message': 'Not authenticated'})
             return
 
-        user_info = connected_users[sid]
         user_id = user_info['user_id']
 
         try:
@@ -328,8 +293,9 @@ def register_socketio_handlers(socketio):
     @socketio.on('ping', namespace='/notifications')
     def handle_ping():
         """
-        Handle ping for keep-alive.
+        Handle ping for keep-alive; refreshes the socket's registry entry.
         """
+        _registry().touch(request.sid)
         emit('pong', {'timestamp': datetime.utcnow().isoformat()})
 
 
@@ -337,50 +303,59 @@ def emit_notification(socketio, notification, user_id=None):
     """
     Emit a notification to connected clients.
 
+    The payload is built once and sent in a single emit addressed to every
+    matching room (user, type, priority, equipment), so Socket.IO encodes the
+    packet once and a client in several of those rooms receives it once.
+
     Args:
         socketio: Flask-SocketIO instance
         notification: Notification object or dict
         user_id: Optional specific user ID to target
     """
+    data, rooms = notification_wire_payload(notification)
+    if not rooms:
+        return
+
+    socketio.emit('notification', {
+        'notification': data,
+        'timestamp': datetime.utcnow().isoformat()
+    }, to=rooms, namespace='/notifications')
+
+    logger.debug(f"Emitted notification: type={data.get('type')} user_id={data.get('user_id')}")
+
+
+def notification_wire_payload(notification):
+    """
+    Compact wire form of a notification and the rooms it is delivered to.
+
+    Null fields are dropped from to_dict(); a freshly created notification
+    carries a dozen of them (read_at, snoozed_until, group_id, ...).
+
+    Args:
+        notification: Notification object or dict
+
+    Returns:
+        tuple: (payload dict, list of room names)
+    """
     if hasattr(notification, 'to_dict'):
         notification_data = notification.to_dict()
-        notification_type = notification.type
         priority = notification.priority
-        related_id = notification.related_id
-        target_user_id = notification.user_id
     else:
         notification_data = notification
-        notification_type = notification.get('type')
         priority = notification.get('priority', 'info')
-        related_id = notification.get('related_id')
-        target_user_id = notification.get('user_id')
 
-    payload = {
-        'notification': notification_data,
-        'timestamp': datetime.utcnow().isoformat()
-    }
-
-    # Emit to user's personal room
-    if target_user_id:
-        user_room = f"user_{target_user_id}"
-        socketio.emit('notification', payload, room=user_room, namespace='/notifications')
-
-    # Emit to type-specific room
-    if notification_type:
-        type_room = f"type_{notification_type}"
-        socketio.emit('notification', payload, room=type_room, namespace='/notifications')
+    data = {key: value for key, value in notification_data.items() if value is not None}
 
-    # Emit to priority-specific room
+    rooms = []
+    if data.get('user_id'):
+        rooms.append(f"user_{data['user_id']}")
+    if data.get('type'):
+        rooms.append(f"type_{data['type']}")
     if priority:
-        priority_room = f"priority_{priority}"
-        socketio.emit('notification', payload, room=priority_room, namespace='/notifications')
-
-    # Emit to equipment-specific room if applicable
-    if related_id and notification_data.get('related_type') == 'equipment':
-        equipment_room = f"equipment_{related_id}"
-        socketio.emit('notification', payload, room=equipment_room, namespace='/notifications')
-
-    logger.debug(f"Emitted notification: type={notification_type} user_id={target_user_id}")
+        rooms.append(f"priority_{priority}")
+    if data.get('related_id') and data.get('related_type') == 'equipment':
+        rooms.append(f"equipment_{data['related_id']}")
+    return data, rooms
 
 
 def emit_unread_count_update(socketio, user_id, count):
@@ -403,12 +378,90 @@ def emit_bulk_notification(socketio, notifications):
     """
     Emit multiple notifications at once.
 
+    Each notification is serialized once. Rooms are then grouped by the exact
+    set of notifications they should receive: a room with one notification
+    gets the usual 'notification' event, a room with several gets a single
+    batched 'notifications' event, and rooms with identical content share one
+    emit.
+
     Args:
         socketio: Flask-SocketIO instance
         notifications: List of notification objects or dicts
     """
-    for notification in notifications:
-        emit_notification(socketio, notification)
+    _emit_batched(socketio, [notification_wire_payload(n) for n in notifications])
+
+
+def _emit_batched(socketio, entries):
+    """Emit (payload, rooms) entries coalesced per room."""
+    per_room = {}
+    for index, (_, rooms) in enumerate(entries):
+        for room in rooms:
+            per_room.setdefault(room, []).append(index)
+
+    rooms_by_batch = {}
+    for room, indexes in per_room.items():
+        rooms_by_batch.setdefault(tuple(indexes), []).append(room)
+
+    timestamp = datetime.utcnow().isoformat()
+    for indexes, rooms in rooms_by_batch.items():
+        if len(indexes) == 1:
+            socketio.emit('notification', {
+                'notification': entries[indexes[0]][0],
+                'timestamp': timestamp
+            }, to=rooms, namespace='/notifications')
+        else:
+            socketio.emit('notifications', {
+                'notifications': [entries[i][0] for i in indexes],
+                'count': len(indexes),
+                'timestamp': timestamp
+            }, to=rooms, namespace='/notifications')
+
+    logger.debug(f"Emitted {len(entries)} notifications in {len(rooms_by_batch)} events")
+
+
+class NotificationBatcher:
+    """
+    Coalesces notifications emitted within a short window.
+
+    Bursts (a rule firing for a whole shift, a scheduler job notifying every
+    inspector) are buffered for `window` seconds and flushed through
+    _emit_batched, so each room gets one 'notifications' event instead of
+    one event per notification. With window <= 0 notifications are emitted
+    immediately.
+    """
+
+    def __init__(self, socketio, window=0.05):
+        self.socketio = socketio
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def add(self, notification):
+        # Serialize now: the ORM object may be expired or detached by the
+        # time the background flush runs.
+        entry = notification_wire_payload(notification)
+        if self.window <= 0:
+            _emit_batched(self.socketio, [entry])
+            return
+
+        with self._lock:
+            self._pending.append(entry)
+            schedule = len(self._pending) == 1
+        if schedule:
+            self.socketio.start_background_task(self._flush_later)
+
+    def _flush_later(self):
+        self.socketio.sleep(self.window)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            entries, self._pending = self._pending, []
+        if entries:
+            try:
+                _emit_batched(self.socketio, entries)
+            except Exception as e:
+                logger.error(f"Error emitting notification batch: {e}")
 
 
 def broadcast_system_notification(socketio, message, priority='info'):
@@ -430,6 +483,22 @@ def broadcast_system_notification(socketio, message, priority='info'):
     logger.info(f"Broadcast system notification: {message}")
 
 
+def _registry():
+    return registry
+
+
+def _requested_rooms(data):
+    """Room names for a subscribe/unsubscribe payload."""
+    rooms = set()
+    for notification_type in data.get('types', []):
+        rooms.add(f"type_{notification_type}")
+    for priority in data.get('priorities', []):
+        rooms.add(f"priority_{priority}")
+    for equipment_id in data.get('equipment_ids', []):
+        rooms.add(f"equipment_{equipment_id}")
+    return rooms
+
+
 def get_connected_user_count():
     """
     Get the number of currently connected users.
@@ -437,7 +506,7 @@ def get_connected_user_count():
     Returns:
         int: Number of connected users
     """
-    return len(connected_users)
+    return _registry().connection_count()
 
 
 def get_connected_users():
@@ -447,7 +516,7 @@ def get_connected_users():
     Returns:
         list: List of connected user IDs
     """
-    return list(set(info['user_id'] for info in connected_users.values()))
+    return _registry().connected_user_ids()
 
 
 def is_user_connected(user_id):
@@ -460,4 +529,4 @@ def is_user_connected(user_id):
     Returns:
         bool: True if user is connected
     """
-    return any(info['user_id'] == user_id for info in connected_users.values())
+    return _registry().is_user_connected(user_id)
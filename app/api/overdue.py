@@ -78,7 +78,8 @@ def bulk_reschedule():
             'message': 'entity_type, entity_ids, and new_date are required'
         }), 400
 
-    result = overdue_service.bulk_reschedule(entity_type, entity_ids, new_date)
+    user = get_current_user()
+    result = overdue_service.bulk_reschedule(entity_type, entity_ids, new_date, user_id=user.id if user else None)
     return jsonify({'status': 'success', 'data': result})
 
 
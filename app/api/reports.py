@@ -21,28 +21,28 @@ def dashboard():
     Returns normalized stats: total_inspections, pending_defects, active_jobs,
     completion_rate, total_stars, incomplete_rate, plus role-specific extras.
     """
-    from app.models import Inspection, Defect, SpecialistJob, EngineerJob, InspectionAssignment, InspectionList
+    from app.models import Inspection, Defect, EngineerJob, InspectionAssignment, InspectionList
     from datetime import date as date_type
 
     user = get_current_user()
     today = date_type.today()
 
-    # Base: role-specific raw stats
+    # Base: role-specific raw stats (a minor role can pick the dashboard)
     if user.role == 'admin':
-        raw = AnalyticsService.admin_dashboard()
+        kind, raw = 'admin', AnalyticsService.admin_dashboard()
     elif user.has_role('engineer'):
-        raw = AnalyticsService.engineer_dashboard(user.id)
+        kind, raw = 'engineer', AnalyticsService.engineer_dashboard(user.id)
     elif user.has_role('inspector'):
-        raw = AnalyticsService.inspector_dashboard(user.id)
+        kind, raw = 'inspector', AnalyticsService.inspector_dashboard(user.id)
     elif user.has_role('specialist'):
-        raw = AnalyticsService.specialist_dashboard(user.id)
+        kind, raw = 'specialist', AnalyticsService.specialist_dashboard(user.id)
     elif user.has_role('quality_engineer'):
-        raw = AnalyticsService.qe_dashboard(user.id)
+        kind, raw = 'quality_engineer', AnalyticsService.qe_dashboard(user.id)
     else:
-        raw = AnalyticsService.admin_dashboard()
+        kind, raw = 'admin', AnalyticsService.admin_dashboard()
 
     # Normalize into common dashboard format
-    data = _normalize_dashboard(user, raw, today)
+    data = _normalize_dashboard(user, kind, raw, today)
 
     return jsonify({
         'status': 'success',
@@ -50,15 +50,18 @@ def dashboard():
     }), 200
 
 
-def _normalize_dashboard(user, raw, today):
-    """Normalize role-specific stats into common dashboard keys."""
-    from app.models import Inspection, Defect, SpecialistJob, EngineerJob, InspectionAssignment, InspectionList, WorkPlanJob
+def _normalize_dashboard(user, kind, raw, today):
+    """
+    Normalize role-specific stats into common dashboard keys. `kind` is the
+    dashboard `raw` came from, which follows a minor role and so can differ
+    from user.role.
+    """
+    from app.models import Inspection, Defect, EngineerJob, InspectionAssignment, InspectionList, WorkPlanJob
     from app.models.work_plan_day import WorkPlanDay
 
-    role = user.role
     data = {**raw}  # include all role-specific data too
 
-    if role == 'inspector':
+    if kind == 'inspector':
         # Inspector: count their assignments
         from sqlalchemy import or_
         my_assignments = InspectionAssignment.query.filter(
@@ -86,7 +89,7 @@ def _normalize_dashboard(user, raw, today):
         data['incomplete_rate'] = round((incomplete / total * 100) if total > 0 else 0)
         data['total_stars'] = user.inspector_points or 0
 
-    elif role == 'specialist':
+    elif kind == 'specialist':
         from sqlalchemy import or_
         my_jobs = raw.get('my_jobs', {})
         total = my_jobs.get('total', 0)
@@ -104,7 +107,7 @@ def _normalize_dashboard(user, raw, today):
         data['incomplete_rate'] = round((incomplete / total * 100) if total > 0 else 0) if incomplete > 0 else 0
         data['total_stars'] = user.specialist_points or 0
 
-    elif role == 'engineer':
+    elif kind == 'engineer':
         my_jobs = raw.get('my_jobs', {})
         total = my_jobs.get('total', 0)
         completed = my_jobs.get('completed', 0)
@@ -116,7 +119,7 @@ def _normalize_dashboard(user, raw, today):
         data['incomplete_rate'] = round(((total - completed - my_jobs.get('in_progress', 0)) / total * 100) if total > 0 else 0)
         data['total_stars'] = user.engineer_points if hasattr(user, 'engineer_points') and user.engineer_points else 0
 
-    elif role == 'quality_engineer':
+    elif kind == 'quality_engineer':
         total_reviews = raw.get('pending_reviews', 0) + raw.get('approved', 0) + raw.get('rejected', 0)
         completed_reviews = raw.get('approved', 0) + raw.get('rejected', 0)
 
@@ -128,12 +131,15 @@ def _normalize_dashboard(user, raw, today):
         data['total_stars'] = raw.get('total_points', 0)
 
     else:
-        # Admin fallback
-        data['total_inspections'] = Inspection.query.count()
-        data['pending_defects'] = Defect.query.filter(Defect.status.in_(['open', 'in_progress'])).count()
-        data['active_jobs'] = SpecialistJob.query.filter(SpecialistJob.status.in_(['pending', 'in_progress'])).count()
-        total_insp = Inspection.query.count()
-        completed_insp = Inspection.query.filter_by(status='completed').count()
+        # Admin fallback — reuse the aggregates already in raw
+        inspections = raw.get('inspections', {})
+        defects = raw.get('defects', {})
+        specialist_jobs = raw.get('specialist_jobs', {})
+        data['total_inspections'] = inspections.get('total', 0)
+        data['pending_defects'] = defects.get('open', 0) + defects.get('in_progress', 0)
+        data['active_jobs'] = specialist_jobs.get('pending', 0) + specialist_jobs.get('in_progress', 0)
+        total_insp = inspections.get('total', 0)
+        completed_insp = inspections.get('completed', 0)
         data['completion_rate'] = round((completed_insp / total_insp * 100) if total_insp > 0 else 0)
         data['incomplete_rate'] = 0
         data['total_stars'] = 0
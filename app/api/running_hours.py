@@ -4,15 +4,13 @@ Equipment service tracking: meter readings, service intervals, alerts, dashboard
 """
 from datetime import datetime, timezone
 from flask import Blueprint, request, jsonify
+from sqlalchemy import case, func
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
-from app.models.running_hours import RunningHoursReading, ServiceInterval, RunningHoursAlert
+from app.models.running_hours import RunningHoursReading, ServiceInterval, RunningHoursAlert, RunningHoursSnapshot
 from app.models.equipment import Equipment
-from app.models.equipment_reading import EquipmentReading
-from app.models.inspection import Inspection, InspectionAnswer
-from app.models.checklist import ChecklistItem
 from app.models.user import User
-from app.services.running_hours_detection import is_running_hours_question
+from app.services.running_hours_snapshot_service import RunningHoursSnapshotService
 
 bp = Blueprint('running_hours', __name__)
 
@@ -22,164 +20,11 @@ def get_current_user():
     return db.session.get(User, user_id)
 
 
-def get_service_status(current_hours, service_interval):
-    """Calculate service status based on current hours and interval config."""
-    if not service_interval:
-        return 'ok', None, None, 0
-
-    hours_until = service_interval.next_service_hours - current_hours
-    interval = service_interval.service_interval_hours or 500
-
-    if hours_until <= 0:
-        return 'overdue', hours_until, abs(hours_until), 100
-    elif hours_until <= service_interval.alert_threshold_hours:
-        pct = ((interval - hours_until) / interval) * 100
-        return 'approaching', hours_until, None, min(pct, 100)
-    else:
-        pct = ((interval - hours_until) / interval) * 100
-        return 'ok', hours_until, None, max(pct, 0)
-
-
-def get_running_hours_item_ids():
-    """Return checklist_item IDs that represent running-hours questions.
-
-    Cached at the call-site by passing the result into build_running_hours_data()
-    so list_running_hours()/get_summary()/get_service_due() don't re-query
-    ChecklistItem once per equipment.
-    """
-    items = ChecklistItem.query.filter(ChecklistItem.answer_type == 'numeric').all()
-    return [
-        ci.id for ci in items
-        if is_running_hours_question(ci.question_text, ci.question_text_ar)
-    ]
-
-
-def _latest_inspection_answer_hours(equipment_id, rh_item_ids):
-    """Find the most recent inspector-typed numeric answer for a running-hours question.
-
-    Returns (value, answered_at_dt, answer_row) or None when nothing is found
-    or the most recent value isn't parseable as a float.
-    """
-    if not rh_item_ids:
-        return None
-    row = db.session.query(InspectionAnswer).join(
-        Inspection, InspectionAnswer.inspection_id == Inspection.id
-    ).filter(
-        Inspection.equipment_id == equipment_id,
-        Inspection.status.in_(('submitted', 'reviewed')),
-        InspectionAnswer.checklist_item_id.in_(rh_item_ids),
-        InspectionAnswer.answer_value.isnot(None),
-        InspectionAnswer.answer_value != '',
-    ).order_by(InspectionAnswer.answered_at.desc()).first()
-    if not row:
-        return None
-    try:
-        value = float(str(row.answer_value).replace(',', '').strip())
-    except (TypeError, ValueError):
-        return None
-    return value, row.answered_at, row
-
-
-def build_running_hours_data(equipment, rh_item_ids=None):
-    """Build complete running hours data for an equipment item.
-
-    Merges three sources (pick latest by timestamp):
-      1) EquipmentReading.rnr — written by inspections when AI extraction succeeds
-      2) RunningHoursReading — manual entries via the dashboard
-      3) InspectionAnswer.answer_value — inspector-typed numeric answers for
-         running-hours checklist items (used when AI extraction fails or
-         the question wording wasn't recognized as a meter-reading question)
-    """
-    if rh_item_ids is None:
-        rh_item_ids = get_running_hours_item_ids()
-
-    # Source 1: EquipmentReading (rnr)
-    latest_er = EquipmentReading.query.filter(
-        EquipmentReading.equipment_id == equipment.id,
-        EquipmentReading.reading_type == 'rnr',
-        EquipmentReading.is_faulty.is_(False),
-        EquipmentReading.reading_value.isnot(None),
-    ).order_by(
-        EquipmentReading.reading_date.desc(),
-        EquipmentReading.recorded_at.desc(),
-    ).first()
-
-    # Source 2: RunningHoursReading
-    latest_rhr = RunningHoursReading.query.filter_by(
-        equipment_id=equipment.id
-    ).order_by(RunningHoursReading.recorded_at.desc()).first()
-
-    # Source 3: InspectionAnswer.answer_value
-    latest_ia = _latest_inspection_answer_hours(equipment.id, rh_item_ids)
-
-    # Pick latest across all three sources
-    candidates = []
-    if latest_er:
-        ts = latest_er.recorded_at or (
-            datetime.combine(latest_er.reading_date, datetime.min.time())
-            if latest_er.reading_date else None
-        )
-        candidates.append(('equipment_reading', latest_er.reading_value, ts, latest_er))
-    if latest_rhr:
-        candidates.append(('running_hours_reading', latest_rhr.hours, latest_rhr.recorded_at, latest_rhr))
-    if latest_ia:
-        ia_value, ia_ts, ia_row = latest_ia
-        candidates.append(('inspection_answer', ia_value, ia_ts, ia_row))
-
-    # Drop candidates without a usable timestamp before sorting
-    candidates = [c for c in candidates if c[2] is not None]
-    candidates.sort(key=lambda c: c[2], reverse=True)
-
-    if candidates:
-        source_type, current_hours, latest_ts, latest_obj = candidates[0]
-    else:
-        source_type, current_hours, latest_ts, latest_obj = None, 0, None, None
-
-    # Shape last_reading consistently regardless of which source won
-    last_reading = None
-    if latest_obj is not None:
-        if source_type == 'running_hours_reading':
-            last_reading = latest_obj.to_dict()
-        elif source_type == 'equipment_reading':
-            last_reading = {
-                'id': latest_obj.id,
-                'hours': latest_obj.reading_value,
-                'recorded_at': latest_ts.isoformat() if latest_ts else None,
-                'source': 'equipment_reading',
-                'inspection_id': latest_obj.inspection_id,
-            }
-        elif source_type == 'inspection_answer':
-            last_reading = {
-                'id': latest_obj.id,
-                'hours': current_hours,
-                'recorded_at': latest_ts.isoformat() if latest_ts else None,
-                'source': 'inspection_answer',
-                'inspection_id': latest_obj.inspection_id,
-            }
-
+def build_running_hours_data(equipment):
+    """Running hours data for one equipment item, read from its snapshot."""
+    snapshot = RunningHoursSnapshotService.get(equipment)
     si = ServiceInterval.query.filter_by(equipment_id=equipment.id).first()
-    status, hours_until, hours_overdue, progress = get_service_status(current_hours, si)
-
-    return {
-        'equipment_id': equipment.id,
-        'equipment_name': equipment.name,
-        'equipment_type': equipment.equipment_type,
-        'current_hours': current_hours,
-        'last_reading': last_reading,
-        'service_interval': si.to_dict() if si else None,
-        'service_status': status,
-        'hours_until_service': hours_until,
-        'hours_overdue': hours_overdue,
-        'progress_percent': round(progress, 1),
-        'assigned_engineer_id': equipment.assigned_technician_id,
-        'assigned_engineer': {
-            'id': equipment.assigned_technician.id,
-            'full_name': equipment.assigned_technician.full_name,
-            'email': equipment.assigned_technician.email,
-        } if equipment.assigned_technician else None,
-        'location': equipment.location or '',
-        'berth': equipment.berth,
-    }
+    return RunningHoursSnapshotService.to_payload(equipment, snapshot, si, equipment.assigned_technician)
 
 
 # ============================================
@@ -274,6 +119,7 @@ def create_reading(equipment_id):
                 )
                 db.session.add(alert)
 
+    RunningHoursSnapshotService.refresh([equipment_id])
     db.session.commit()
     return jsonify({'status': 'success', 'data': reading.to_dict()}), 201
 
@@ -333,7 +179,11 @@ def update_service_interval(equipment_id):
     si = ServiceInterval.query.filter_by(equipment_id=equipment_id).first()
 
     if not si:
-        si = ServiceInterval(equipment_id=equipment_id)
+        # Column defaults only apply on flush; the arithmetic below needs them now
+        si = ServiceInterval(
+            equipment_id=equipment_id, service_interval_hours=500, alert_threshold_hours=50,
+            last_service_hours=0, next_service_hours=500,
+        )
         db.session.add(si)
 
     if 'service_interval_hours' in data:
@@ -347,6 +197,7 @@ def update_service_interval(equipment_id):
         si.last_service_hours = data['last_service_hours']
         si.next_service_hours = si.last_service_hours + si.service_interval_hours
 
+    RunningHoursSnapshotService.refresh([equipment_id])
     db.session.commit()
     return jsonify({'status': 'success', 'data': si.to_dict()})
 
@@ -370,6 +221,7 @@ def reset_service(equipment_id):
         RunningHoursAlert.acknowledged_at.is_(None)
     ).update({'acknowledged_at': datetime.now(timezone.utc)}, synchronize_session=False)
 
+    RunningHoursSnapshotService.refresh([equipment_id])
     db.session.commit()
     return jsonify({'status': 'success', 'data': si.to_dict()})
 
@@ -378,6 +230,16 @@ def reset_service(equipment_id):
 # DASHBOARD ENDPOINTS
 # ============================================
 
+# Dashboard views are a single scan over running_hours_snapshots, which every
+# reading/service write keeps current (see RunningHoursSnapshotService).
+
+URGENCY_ORDER = case(
+    (RunningHoursSnapshot.service_status == 'overdue', 0),
+    (RunningHoursSnapshot.service_status == 'approaching', 1),
+    else_=2,
+)
+
+
 @bp.route('/running-hours', methods=['GET'])
 @jwt_required()
 def list_running_hours():
@@ -387,7 +249,8 @@ def list_running_hours():
     search = request.args.get('search')
     sort_by = request.args.get('sort_by', 'name')
 
-    query = Equipment.query.filter(Equipment.is_scrapped.is_(False))
+    RunningHoursSnapshotService.ensure_snapshots()
+    query = RunningHoursSnapshotService.fleet_query()
 
     if search:
         query = query.filter(
@@ -396,34 +259,31 @@ def list_running_hours():
                 Equipment.serial_number.ilike(f'%{search}%'),
             )
         )
-
-    equipment_list = query.all()
-    rh_item_ids = get_running_hours_item_ids()
-    results = []
-
-    for eq in equipment_list:
-        data = build_running_hours_data(eq, rh_item_ids=rh_item_ids)
-        if status_filter and data['service_status'] != status_filter:
-            continue
-        results.append(data)
+    if status_filter:
+        query = query.filter(RunningHoursSnapshot.service_status == status_filter)
 
     # Sort
     if sort_by == 'urgency':
-        order = {'overdue': 0, 'approaching': 1, 'ok': 2}
-        results.sort(key=lambda x: order.get(x['service_status'], 2))
+        query = query.order_by(URGENCY_ORDER, Equipment.name)
     elif sort_by == 'hours':
-        results.sort(key=lambda x: x['current_hours'], reverse=True)
+        query = query.order_by(RunningHoursSnapshot.current_hours.desc(), Equipment.name)
+    elif sort_by == 'due':
+        # Soonest service first; equipment without an interval last
+        query = query.order_by(
+            RunningHoursSnapshot.hours_until_service.is_(None),
+            RunningHoursSnapshot.hours_until_service,
+            Equipment.name,
+        )
     else:
-        results.sort(key=lambda x: x['equipment_name'])
+        query = query.order_by(Equipment.name)
 
     # Paginate
-    total = len(results)
-    start = (page - 1) * per_page
-    paginated = results[start:start + per_page]
+    total = query.order_by(None).count()
+    rows = query.offset((page - 1) * per_page).limit(per_page).all()
 
     return jsonify({
         'status': 'success',
-        'data': paginated,
+        'data': [RunningHoursSnapshotService.to_payload(*row) for row in rows],
         'pagination': {
             'page': page,
             'per_page': per_page,
@@ -436,15 +296,15 @@ def list_running_hours():
 @bp.route('/running-hours/summary', methods=['GET'])
 @jwt_required()
 def get_summary():
-    equipment_list = Equipment.query.filter(Equipment.is_scrapped.is_(False)).all()
-    rh_item_ids = get_running_hours_item_ids()
+    RunningHoursSnapshotService.ensure_snapshots()
+    rows = RunningHoursSnapshotService.fleet_query().order_by(Equipment.id).all()
 
     summary = {'ok': [], 'approaching': [], 'overdue': []}
     total_hours = 0
     count_with_hours = 0
 
-    for eq in equipment_list:
-        data = build_running_hours_data(eq, rh_item_ids=rh_item_ids)
+    for row in rows:
+        data = RunningHoursSnapshotService.to_payload(*row)
         summary[data['service_status']].append(data)
         if data['current_hours'] > 0:
             total_hours += data['current_hours']
@@ -453,7 +313,7 @@ def get_summary():
     return jsonify({
         'status': 'success',
         'data': {
-            'total_equipment': len(equipment_list),
+            'total_equipment': len(rows),
             'with_running_hours': count_with_hours,
             'ok_count': len(summary['ok']),
             'approaching_count': len(summary['approaching']),
@@ -470,33 +330,31 @@ def get_service_due():
     status_filter = request.args.get('status')
     limit = request.args.get('limit', 20, type=int)
 
-    equipment_list = Equipment.query.filter(Equipment.is_scrapped.is_(False)).all()
-    rh_item_ids = get_running_hours_item_ids()
-    due_list = []
+    RunningHoursSnapshotService.ensure_snapshots()
+    query = RunningHoursSnapshotService.fleet_query().filter(RunningHoursSnapshot.service_status != 'ok')
+    if status_filter:
+        query = query.filter(RunningHoursSnapshot.service_status == status_filter)
+    urgency = func.abs(func.coalesce(RunningHoursSnapshot.hours_until_service, 0))
+    rows = query.order_by(urgency.desc(), Equipment.id).limit(limit).all()
 
-    for eq in equipment_list:
-        data = build_running_hours_data(eq, rh_item_ids=rh_item_ids)
-        if data['service_status'] == 'ok':
-            continue
-        if status_filter and data['service_status'] != status_filter:
-            continue
+    due_list = []
+    for eq, snapshot, si, engineer in rows:
         due_list.append({
             'equipment_id': eq.id,
             'equipment_name': eq.name,
             'equipment_type': eq.equipment_type,
             'location': eq.location or '',
             'berth': eq.berth,
-            'current_hours': data['current_hours'],
-            'next_service_hours': data['service_interval']['next_service_hours'] if data['service_interval'] else None,
-            'hours_until_service': data['hours_until_service'],
-            'service_status': data['service_status'],
+            'current_hours': snapshot.current_hours,
+            'next_service_hours': si.next_service_hours if si else None,
+            'hours_until_service': snapshot.hours_until_service,
+            'service_status': snapshot.service_status,
             'assigned_engineer_id': eq.assigned_technician_id,
-            'assigned_engineer_name': eq.assigned_technician.full_name if eq.assigned_technician else None,
-            'urgency_score': abs(data['hours_until_service']) if data['hours_until_service'] else 0,
+            'assigned_engineer_name': engineer.full_name if engineer else None,
+            'urgency_score': abs(snapshot.hours_until_service) if snapshot.hours_until_service else 0,
         })
 
-    due_list.sort(key=lambda x: x['urgency_score'], reverse=True)
-    return jsonify({'status': 'success', 'data': due_list[:limit]})
+    return jsonify({'status': 'success', 'data': due_list})
 
 
 # ============================================
@@ -551,6 +409,7 @@ def bulk_update():
     user = get_current_user()
 
     results = {'updated': 0, 'errors': []}
+    updated_ids = []
 
     for update in updates:
         eq_id = update.get('equipment_id')
@@ -574,6 +433,9 @@ def bulk_update():
         )
         db.session.add(reading)
         results['updated'] += 1
+        updated_ids.append(eq_id)
 
+    if updated_ids:
+        RunningHoursSnapshotService.refresh(updated_ids)
     db.session.commit()
     return jsonify({'status': 'success', 'data': results})
@@ -22,7 +22,7 @@ def get_risk_scores():
     try:
         from app.services.schedule_ai_service import ScheduleAIService
         service = ScheduleAIService()
-        result = service.calculate_equipment_risk_scores()
+        result = service.calculate_equipment_risk_scores(limit=request.args.get('limit', type=int))
         return jsonify({'status': 'success', 'data': result})
     except Exception as e:
         logger.error(f"Error getting risk scores: {e}")
@@ -37,12 +37,8 @@ def get_coverage_gaps():
     try:
         from app.services.schedule_ai_service import ScheduleAIService
         service = ScheduleAIService()
-        result = service.get_coverage_gaps()
-
         # Filter by severity if provided
-        severity = request.args.get('severity')
-        if severity and result:
-            result = [item for item in result if item.get('priority') == severity]
+        result = service.get_coverage_gaps(priority=request.args.get('severity') or None)
 
         return jsonify({'status': 'success', 'data': result})
     except Exception as e:
@@ -4,6 +4,7 @@ Handles the specialist job workflow with planned time requirement,
 pause/resume, incomplete completion, admin timer control, and cleaning.
 """
 
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db, safe_commit
@@ -15,6 +16,8 @@ from app.utils.pagination import paginate
 from datetime import datetime, date, timedelta
 from sqlalchemy import func, and_, or_
 
+logger = logging.getLogger(__name__)
+
 bp = Blueprint('specialist_jobs', __name__)
 
 
@@ -924,6 +927,14 @@ def complete_job(job_id):
 
     safe_commit()
 
+    try:
+        from app.services.achievement_progress_service import AchievementProgressService
+        AchievementProgressService.record(job.specialist_id, jobs=1)
+    except Exception as e:
+        # Achievement progress failure shouldn't block completion
+        db.session.rollback()
+        logger.warning("Achievement progress failed for specialist job %s: %s", job.id, e)
+
     # Auto-translate work notes
     from app.utils.bilingual import auto_translate_and_save
     auto_translate_and_save('specialist_job', job.id, {'work_notes': work_notes})
@@ -4,6 +4,7 @@ Offline sync queue endpoints for mobile clients.
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db, safe_commit
 from app.models import SyncQueue
 from app.utils.decorators import get_current_user
@@ -26,23 +27,32 @@ def submit_sync_item():
     if not data or not data.get('entity_type') or not data.get('entity_data'):
         return jsonify({'status': 'error', 'message': 'entity_type and entity_data are required'}), 400
 
+    key = data.get('idempotency_key')
+    existing = _existing_by_key(user.id, [key]).get(key) if key else None
+    if existing is not None:
+        return _duplicate_response(existing)
+
     item = SyncQueue(
         user_id=user.id,
         entity_type=data['entity_type'],
         entity_data=data['entity_data'],
+        idempotency_key=key,
     )
     db.session.add(item)
-    safe_commit()
+    try:
+        safe_commit()
+    except IntegrityError:
+        # A concurrent resend of the same key was queued first; answer with it
+        existing = _existing_by_key(user.id, [key]).get(key) if key else None
+        if existing is None:
+            raise
+        return _duplicate_response(existing)
 
     logger.info("Sync item submitted: user=%d type=%s", user.id, data['entity_type'])
 
     return jsonify({
         'status': 'success',
-        'data': {
-            'id': item.id,
-            'entity_type': item.entity_type,
-            'created_at': item.created_at.isoformat() if item.created_at else None
-        }
+        'data': _item_summary(item)
     }), 201
 
 
@@ -57,26 +67,20 @@ def submit_batch():
     if not items_data:
         return jsonify({'status': 'error', 'message': 'items array is required'}), 400
 
-    created = []
-    for item_data in items_data:
-        if not item_data.get('entity_type') or not item_data.get('entity_data'):
-            continue
-        item = SyncQueue(
-            user_id=user.id,
-            entity_type=item_data['entity_type'],
-            entity_data=item_data['entity_data'],
-        )
-        db.session.add(item)
-        created.append(item)
-
-    safe_commit()
-    logger.info("Batch sync: user=%d count=%d", user.id, len(created))
+    try:
+        created, duplicates = _queue_batch(user.id, items_data)
+    except IntegrityError:
+        # A concurrent request queued some of the same keys after we looked;
+        # look again, so those are answered as duplicates
+        created, duplicates = _queue_batch(user.id, items_data)
+    logger.info("Batch sync: user=%d count=%d duplicates=%d", user.id, len(created), len(duplicates))
 
     return jsonify({
         'status': 'success',
         'data': {
             'submitted': len(created),
-            'ids': [i.id for i in created]
+            'ids': [i.id for i in created],
+            'duplicates': [_item_summary(i) for i in duplicates]
         }
     }), 201
 
@@ -86,9 +90,9 @@ def submit_batch():
 def get_pending():
     """Get unsynced items for the current user."""
     user = get_current_user()
-    items = SyncQueue.query.filter_by(
-        user_id=user.id,
-        synced_at=None
+    items = SyncQueue.query.filter(
+        SyncQueue.user_id == user.id,
+        SyncQueue.status.in_(['pending', 'processing'])
     ).order_by(SyncQueue.created_at.asc()).all()
 
     return jsonify({
@@ -97,7 +101,138 @@ def get_pending():
             'id': i.id,
             'entity_type': i.entity_type,
             'entity_data': i.entity_data,
+            'idempotency_key': i.idempotency_key,
+            'status': i.status,
             'created_at': i.created_at.isoformat() if i.created_at else None,
             'sync_error': i.sync_error
         } for i in items]
     }), 200
+
+
+@bp.route('/process', methods=['POST'])
+@jwt_required()
+def process_mine():
+    """
+    Replay the current user's pending items now instead of waiting for the
+    background processor. Returns one outcome per processed item.
+    """
+    from app.services.sync_replay_service import SyncReplayService
+
+    user = get_current_user()
+    summary = SyncReplayService.process_pending(user_id=user.id)
+    items = SyncQueue.query.filter(SyncQueue.id.in_(summary['item_ids'])).order_by(SyncQueue.id).all()
+
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'applied': summary['applied'],
+            'conflict': summary['conflict'],
+            'failed': summary['failed'],
+            'items': [_item_outcome(i) for i in items]
+        }
+    }), 200
+
+
+@bp.route('/outcomes', methods=['GET'])
+@jwt_required()
+def get_outcomes():
+    """
+    Get replay outcomes for the current user's items.
+
+    Query params:
+        ids: comma-separated queue item ids
+        since_id: all items after this id
+    """
+    user = get_current_user()
+    query = SyncQueue.query.filter(SyncQueue.user_id == user.id)
+
+    ids = request.args.get('ids')
+    if ids:
+        try:
+            query = query.filter(SyncQueue.id.in_([int(i) for i in ids.split(',') if i.strip()]))
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'ids must be comma-separated integers'}), 400
+    else:
+        query = query.filter(SyncQueue.id > request.args.get('since_id', 0, type=int))
+
+    items = query.order_by(SyncQueue.id).limit(1000).all()
+    return jsonify({
+        'status': 'success',
+        'data': [_item_outcome(i) for i in items]
+    }), 200
+
+
+def _queue_batch(user_id, items_data):
+    """
+    Queue a batch and commit it. Resends of already queued keys (and
+    repeats within this batch) are answered with the existing item instead
+    of being queued again.
+
+    Returns:
+        (created items, duplicate items) - one duplicate per skipped item,
+        pointing at the first item queued with its key
+    """
+    seen = _existing_by_key(user_id, [i.get('idempotency_key') for i in items_data if i.get('idempotency_key')])
+    duplicates = []
+
+    created = []
+    for item_data in items_data:
+        if not item_data.get('entity_type') or not item_data.get('entity_data'):
+            continue
+        key = item_data.get('idempotency_key')
+        if key and key in seen:
+            duplicates.append(seen[key])
+            continue
+        item = SyncQueue(
+            user_id=user_id,
+            entity_type=item_data['entity_type'],
+            entity_data=item_data['entity_data'],
+            idempotency_key=key,
+        )
+        db.session.add(item)
+        created.append(item)
+        if key:
+            seen[key] = item
+
+    safe_commit()
+    return created, duplicates
+
+
+def _duplicate_response(existing):
+    return jsonify({
+        'status': 'success',
+        'data': {**_item_summary(existing), 'duplicate': True}
+    }), 200
+
+
+def _existing_by_key(user_id, keys):
+    """Queued items of this user keyed by idempotency_key."""
+    if not keys:
+        return {}
+    items = SyncQueue.query.filter(
+        SyncQueue.user_id == user_id,
+        SyncQueue.idempotency_key.in_(set(keys))
+    ).all()
+    return {i.idempotency_key: i for i in items}
+
+
+def _item_summary(item):
+    return {
+        'id': item.id,
+        'entity_type': item.entity_type,
+        'idempotency_key': item.idempotency_key,
+        'status': item.status,
+        'created_at': item.created_at.isoformat() if item.created_at else None
+    }
+
+
+def _item_outcome(item):
+    return {
+        'id': item.id,
+        'entity_type': item.entity_type,
+        'idempotency_key': item.idempotency_key,
+        'status': item.status,
+        'result': item.result,
+        'sync_error': item.sync_error,
+        'synced_at': item.synced_at.isoformat() if item.synced_at else None
+    }
@@ -6,6 +6,7 @@ ratings, carry-overs, and performance reporting.
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
+from sqlalchemy.orm import joinedload
 from app.extensions import db
 from app.utils.decorators import get_current_user
 from app.exceptions.api_exceptions import (
@@ -22,8 +23,10 @@ from app.models.work_plan_daily_review import WorkPlanDailyReview
 from app.models.work_plan_carry_over import WorkPlanCarryOver
 from app.models.work_plan_performance import WorkPlanPerformance
 from app.services.notification_service import NotificationService
+from app.services.daily_review_service import DailyReviewService
+from app.services.job_duration_service import JobDurationService
+from app.services.performance_rollup_service import PerformanceRollupService, PERIOD_TYPES, period_bounds
 from datetime import datetime, date, timedelta
-from decimal import Decimal
 import logging
 
 logger = logging.getLogger(__name__)
@@ -151,6 +154,7 @@ def start_job(job_id):
     tracking.shift_type = 'night' if (hour >= 19 or hour < 7) else 'day'
 
     create_log_entry(job_id, user.id, 'started')
+    DailyReviewService.refresh_counts([job_id])
     db.session.commit()
 
     logger.info("Job %s started by user %s", job_id, user.id)
@@ -196,8 +200,8 @@ def ai_estimate_time():
     """AI-powered planned-time estimate for a work-plan job, tuned per job type.
 
     Defect jobs learn from completed SpecialistJob history (where the actual-time
-    data lives); PM jobs match by template+equipment; SAP by order type+equipment.
-    Statistical average of similar past jobs, mirroring the specialist estimator.
+    data lives); other jobs read the running duration statistics of completed
+    work-plan jobs on the same equipment, equipment type or job type.
     """
     from app.models.specialist_job import SpecialistJob
     from app.models.defect import Defect
@@ -216,6 +220,7 @@ def ai_estimate_time():
     difficulty = job.difficulty
     match_key = None
     times = []
+    stat = None
 
     if job.job_type == 'defect':
         # Primary source: completed SpecialistJob history (real durations live here)
@@ -234,55 +239,46 @@ def ai_estimate_time():
         rows = q.order_by(SpecialistJob.completed_at.desc()).limit(20).all()
         times = [float(j.actual_time_hours) for j in rows]
     else:
-        # PM / SAP / other: learn from completed work-plan jobs of the same kind.
-        # Query tracking rows joined to their job (single query, no N+1).
-        q = WorkPlanJobTracking.query.join(
-            WorkPlanJob,
-            WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id,
-        ).filter(
-            WorkPlanJobTracking.status == 'completed',
-            WorkPlanJobTracking.actual_hours.isnot(None),
-            WorkPlanJobTracking.actual_hours > 0,
-            WorkPlanJob.id != job.id,
-        )
-        if job.job_type == 'pm' and job.pm_template_id:
-            match_key = 'pm:template+equipment'
-            q = q.filter(WorkPlanJob.pm_template_id == job.pm_template_id)
-        elif job.sap_order_type:
-            match_key = 'sap:order_type+equipment'
-            q = q.filter(WorkPlanJob.sap_order_type == job.sap_order_type)
-        else:
-            match_key = 'type+equipment'
-            q = q.filter(WorkPlanJob.job_type == job.job_type)
-        if equipment_type:
-            q = q.filter(WorkPlanJob.equipment.has(equipment_type=equipment_type))
-        rows = q.order_by(WorkPlanJobTracking.completed_at.desc()).limit(20).all()
-        times = [float(t.actual_hours) for t in rows if t.actual_hours]
+        # PM / SAP / other: running statistics of completed work-plan jobs,
+        # for this equipment, else its type, else the job type
+        stat, scope = JobDurationService.lookup(job.job_type, job.equipment_id, equipment_type)
+        if stat is not None:
+            match_key = {
+                'equipment': 'type+equipment',
+                'equipment_type': 'type+equipment_type',
+                'job_type': 'type',
+            }[scope]
+
+    if stat is not None:
+        sample_size, mean, std_dev = stat.count, stat.mean_hours, stat.std_dev
+        # Middle 80% of past durations
+        min_time, max_time = stat.p10_hours, stat.p90_hours
+    elif times:
+        sample_size, mean = len(times), sum(times) / len(times)
+        std_dev = (sum((t - mean) ** 2 for t in times) / len(times)) ** 0.5 if len(times) > 1 else None
+        min_time, max_time = min(times), max(times)
+    else:
+        sample_size = 0
 
-    if not times:
+    if not sample_size:
         # Fallback: difficulty defaults, then the engineer's own estimate
         default_estimates = {'major': 4.0, 'minor': 2.0}
         estimated_hours = default_estimates.get(difficulty) or float(job.estimated_hours or 3.0)
         confidence = 'low'
-        sample_size = 0
         min_time = round(estimated_hours * 0.5, 1)
         max_time = round(estimated_hours * 1.5, 1)
     else:
-        estimated_hours = round(sum(times) / len(times), 1)
-        sample_size = len(times)
+        estimated_hours = round(mean, 1)
         if sample_size >= 10:
             confidence = 'high'
         elif sample_size >= 5:
             confidence = 'medium'
         else:
             confidence = 'low'
-        if sample_size > 1:
-            variance = sum((t - estimated_hours) ** 2 for t in times) / len(times)
-            std_dev = variance ** 0.5
-            if std_dev > estimated_hours * 0.5 and confidence == 'medium':
-                confidence = 'low'
-        min_time = round(min(times), 1)
-        max_time = round(max(times), 1)
+        if std_dev is not None and std_dev > estimated_hours * 0.5 and confidence == 'medium':
+            confidence = 'low'
+        min_time = round(min_time, 1)
+        max_time = round(max_time, 1)
 
     return jsonify({
         'status': 'success',
@@ -355,6 +351,7 @@ def pause_job(job_id):
         priority='urgent'
     )
 
+    DailyReviewService.refresh_counts([job_id])
     db.session.commit()
 
     return jsonify({
@@ -442,6 +439,7 @@ def complete_job(job_id):
 
     # Calculate actual hours
     tracking.actual_hours = tracking.calculate_actual_hours()
+    JobDurationService.record(job, tracking.actual_hours)
 
     create_log_entry(job_id, user.id, 'completed', {
         'actual_hours': float(tracking.actual_hours) if tracking.actual_hours else None,
@@ -455,6 +453,7 @@ def complete_job(job_id):
         job.defect.resolution_notes = 'Auto-resolved: work plan job %s completed' % job_id
         logger.info("Auto-resolved defect %s via job %s completion", job.defect_id, job_id)
 
+    DailyReviewService.refresh_counts([job_id])
     db.session.commit()
 
     logger.info("Job %s completed by user %s. Actual hours: %s", job_id, user.id, tracking.actual_hours)
@@ -487,13 +486,17 @@ def admin_complete_job(job_id):
     data = request.get_json() or {}
 
     # If never started, set started_at so hours calc works
-    if not tracking.started_at:
+    was_started = tracking.started_at is not None
+    if not was_started:
         tracking.started_at = now
 
     tracking.status = 'completed'
     tracking.completed_at = now
     tracking.work_notes = data.get('notes')
     tracking.actual_hours = tracking.calculate_actual_hours() or job.estimated_hours
+    # Only timed work counts as duration history, not the estimate stand-in
+    if was_started:
+        JobDurationService.record(job, tracking.actual_hours)
 
     create_log_entry(job_id, user.id, 'admin_completed', {
         'actual_hours': float(tracking.actual_hours) if tracking.actual_hours else None,
@@ -507,6 +510,7 @@ def admin_complete_job(job_id):
         job.defect.resolution_notes = data.get('notes') or ('Completed via work plan job %s' % job_id)
         logger.info("Auto-resolved defect %s via admin-complete job %s", job.defect_id, job_id)
 
+    DailyReviewService.refresh_counts([job_id])
     db.session.commit()
 
     logger.info("Job %s admin-completed by user %s", job_id, user.id)
@@ -565,6 +569,7 @@ def mark_incomplete(job_id):
         'actual_hours': float(tracking.actual_hours) if tracking.actual_hours else None
     })
 
+    DailyReviewService.refresh_counts([job_id])
     db.session.commit()
 
     return jsonify({
@@ -753,6 +758,7 @@ def approve_pause(request_id):
         'pause_request_id': request_id
     })
 
+    DailyReviewService.refresh_counts([pause_req.work_plan_job_id])
     db.session.commit()
 
     return jsonify({
@@ -787,6 +793,7 @@ def reject_pause(request_id):
         'reason': data.get('notes')
     })
 
+    DailyReviewService.refresh_counts([pause_req.work_plan_job_id])
     db.session.commit()
 
     return jsonify({
@@ -814,92 +821,47 @@ def get_daily_review():
     else:
         target_date = date.today()
 
-    # Get or create the review
+    jobs_data, counts = DailyReviewService.load_jobs(target_date, user)
+
     review = WorkPlanDailyReview.query.filter_by(
         engineer_id=user.id,
         date=target_date,
         shift_type=shift_type
     ).first()
 
+    # Created on first open; afterwards counters are kept current by the
+    # endpoints that change tracking and pause requests, so this only reads
     if not review:
         review = WorkPlanDailyReview(
             engineer_id=user.id,
             date=target_date,
             shift_type=shift_type,
             status='open',
-            opened_at=datetime.utcnow()
+            opened_at=datetime.utcnow(),
+            **counts
         )
         db.session.add(review)
-        db.session.flush()
-
-    # Get all jobs for this date from plans created by this engineer (or all if admin)
-    jobs_query = db.session.query(WorkPlanJob).join(
-        WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
-    ).join(
-        WorkPlan, WorkPlanDay.work_plan_id == WorkPlan.id
-    ).filter(
-        WorkPlanDay.date == target_date
-    )
-
-    if user.role != 'admin':
-        jobs_query = jobs_query.filter(WorkPlan.created_by_id == user.id)
-
-    jobs = jobs_query.all()
-
-    # Build job data with tracking info
-    jobs_data = []
-    completed_count = 0
-    incomplete_count = 0
-    not_started_count = 0
-
-    for job in jobs:
-        tracking = WorkPlanJobTracking.query.filter_by(work_plan_job_id=job.id).first()
-        ratings = WorkPlanJobRating.query.filter_by(work_plan_job_id=job.id).all()
-        pause_requests = WorkPlanPauseRequest.query.filter_by(
-            work_plan_job_id=job.id
-        ).all()
-
-        # Count by status
-        if tracking:
-            if tracking.status == 'completed':
-                completed_count += 1
-            elif tracking.status == 'incomplete':
-                incomplete_count += 1
-            elif tracking.status in ('pending', 'not_started'):
-                not_started_count += 1
-
-        job_dict = job.to_dict()
-        job_dict['tracking'] = tracking.to_dict() if tracking else None
-        job_dict['ratings'] = [r.to_dict() for r in ratings]
-        job_dict['pause_requests'] = [pr.to_dict() for pr in pause_requests]
-        job_dict['materials'] = [m.to_dict() for m in job.materials] if hasattr(job, 'materials') else []
-        jobs_data.append(job_dict)
-
-    # Update review counts
-    review.total_jobs = len(jobs)
-    review.approved_jobs = completed_count
-    review.incomplete_jobs = incomplete_count
-    review.not_started_jobs = not_started_count
-
-    # Count pending pause requests
-    pending_pauses = sum(
-        1 for j in jobs_data
-        for pr in j.get('pause_requests', [])
-        if pr.get('status') == 'pending'
-    )
-    total_pauses = sum(len(j.get('pause_requests', [])) for j in jobs_data)
-    review.total_pause_requests = total_pauses
-    review.resolved_pause_requests = total_pauses - pending_pauses
-
-    db.session.commit()
+        db.session.commit()
 
     return jsonify({
         'status': 'success',
-        'review': review.to_dict(),
+        'review': {**review.to_dict(), **_review_counts(counts)},
         'jobs': jobs_data,
     }), 200
 
 
+def _review_counts(counts):
+    """Review counters as serialized by WorkPlanDailyReview.to_dict."""
+    unresolved = counts['resolved_pause_requests'] < counts['total_pause_requests']
+    return {
+        **counts,
+        'has_unresolved_pauses': unresolved,
+        'can_submit': not unresolved,
+        'completion_rate': round(counts['approved_jobs'] / counts['total_jobs'] * 100, 1)
+        if counts['total_jobs'] else 0,
+    }
+
+
 @bp.route('/daily-review/<int:review_id>/rate-job', methods=['POST'])
 @jwt_required()
 def rate_job(review_id):
@@ -1186,6 +1148,7 @@ def create_carry_over(review_id):
         'carry_over_count': carry_over_count
     })
 
+    DailyReviewService.refresh_counts([original_job_id, new_job.id])
     db.session.commit()
 
     return jsonify({
@@ -1209,6 +1172,9 @@ def submit_review(review_id):
     if review.status == 'submitted':
         raise BusinessError("Review already submitted")
 
+    # Recount so jobs added to the plan since the last update are included
+    DailyReviewService.refresh_counts(dates=[review.date])
+
     if not review.can_submit:
         raise BusinessError("Cannot submit: unresolved pause requests exist. Review all pause requests first.")
 
@@ -1543,6 +1509,8 @@ def compute_performance():
     data = request.get_json() or {}
     target_date = data.get('date')
     period = data.get('period', 'daily')
+    if period not in PERIOD_TYPES:
+        raise ValidationError(f"period must be one of: {', '.join(PERIOD_TYPES)}")
 
     if target_date:
         try:
@@ -1552,11 +1520,16 @@ def compute_performance():
     else:
         target_date = date.today()
 
-    computed = _compute_daily_performance(target_date)
+    # Daily recomputes the day (and its week and month); weekly/monthly
+    # rebuild that period from the daily rows already stored
+    if period == 'daily':
+        computed = PerformanceRollupService.compute_daily(target_date)
+    else:
+        computed = PerformanceRollupService.rollup(period, target_date)
 
     return jsonify({
         'status': 'success',
-        'message': f'Performance computed for {target_date.isoformat()}',
+        'message': f'{period.capitalize()} performance computed for {target_date.isoformat()}',
         'records_computed': computed
     }), 200
 
@@ -1580,7 +1553,9 @@ def get_performance_comparison():
     except ValueError:
         raise ValidationError("Invalid date format")
 
-    performances = WorkPlanPerformance.query.filter(
+    performances = WorkPlanPerformance.query.options(
+        joinedload(WorkPlanPerformance.user)
+    ).filter(
         WorkPlanPerformance.period_type == period_type,
         WorkPlanPerformance.period_start >= start,
         WorkPlanPerformance.period_end <= end
@@ -1631,35 +1606,62 @@ def get_performance_comparison():
 @bp.route('/performance/heat-map', methods=['GET'])
 @jwt_required()
 def get_heat_map():
-    """Weekly heat map of worker performance (green/yellow/red per day)."""
+    """
+    Heat map of worker performance (green/yellow/red per cell).
+
+    By default one week of daily cells (week_start, default this week's
+    Monday). With start_date/end_date and period=weekly or monthly, longer
+    ranges such as a quarter read one precomputed row per worker per week
+    or month.
+    """
     user = engineer_or_admin_required()
 
+    period_type = request.args.get('period', 'daily')
+    if period_type not in PERIOD_TYPES:
+        raise ValidationError(f"period must be one of: {', '.join(PERIOD_TYPES)}")
+
+    start_date = request.args.get('start_date')
     week_start = request.args.get('week_start')
-    if not week_start:
-        # Default to current week Monday
-        today = date.today()
-        week_start = today - timedelta(days=today.weekday())
-    else:
-        try:
-            week_start = date.fromisoformat(week_start)
-        except ValueError:
-            raise ValidationError("Invalid week_start format")
+    try:
+        if start_date:
+            range_start = date.fromisoformat(start_date)
+            range_end = date.fromisoformat(request.args.get('end_date') or start_date)
+        else:
+            if week_start:
+                week_start = date.fromisoformat(week_start)
+            else:
+                # Default to current week Monday
+                today = date.today()
+                week_start = today - timedelta(days=today.weekday())
+            range_start, range_end = week_start, week_start + timedelta(days=6)
+    except ValueError:
+        raise ValidationError("Invalid date format")
+    if range_end < range_start:
+        raise ValidationError("end_date must not be before start_date")
 
-    week_end = week_start + timedelta(days=6)
+    # Whole periods overlapping the range
+    range_start = period_bounds(period_type, range_start)[0]
+    range_end = period_bounds(period_type, range_end)[1]
 
-    performances = WorkPlanPerformance.query.filter(
-        WorkPlanPerformance.period_type == 'daily',
-        WorkPlanPerformance.period_start >= week_start,
-        WorkPlanPerformance.period_end <= week_end
-    ).all()
+    performances = WorkPlanPerformance.query.options(
+        joinedload(WorkPlanPerformance.user)
+    ).filter(
+        WorkPlanPerformance.period_type == period_type,
+        WorkPlanPerformance.period_start >= range_start,
+        WorkPlanPerformance.period_end <= range_end
+    ).order_by(WorkPlanPerformance.period_start).all()
 
-    # Build heat map: user -> day -> color
+    # Build heat map: user -> period start -> color
     heat_map = {}
     for p in performances:
         uid = p.user_id
         if uid not in heat_map:
             heat_map[uid] = {
-                'user': p.to_dict()['user'],
+                'user': {
+                    'id': p.user.id,
+                    'full_name': p.user.full_name,
+                    'role': p.user.role,
+                } if p.user else None,
                 'days': {}
             }
 
@@ -1685,8 +1687,12 @@ def get_heat_map():
     return jsonify({
         'status': 'success',
         'heat_map': list(heat_map.values()),
-        'week_start': week_start.isoformat(),
-        'week_end': week_end.isoformat()
+        'period': period_type,
+        'start_date': range_start.isoformat(),
+        'end_date': range_end.isoformat(),
+        # Kept for clients of the original weekly view
+        'week_start': range_start.isoformat(),
+        'week_end': range_end.isoformat()
     }), 200
 
 
@@ -1794,6 +1800,7 @@ def _auto_flag_jobs(target_date, shift_type):
             flagged += 1
 
     if flagged > 0:
+        DailyReviewService.refresh_counts([job.id for job in jobs])
         db.session.commit()
 
         # Notify engineers
@@ -1815,152 +1822,3 @@ def _auto_flag_jobs(target_date, shift_type):
 
     logger.info("Auto-flagged %d jobs for %s (%s shift)", flagged, target_date, shift_type)
     return flagged
-
-
-def _compute_daily_performance(target_date):
-    """Compute daily performance aggregates for all workers."""
-    # Get all assignments for this date
-    assignments = db.session.query(
-        WorkPlanAssignment.user_id,
-        WorkPlanJob.id.label('job_id'),
-        WorkPlanJob.estimated_hours,
-        WorkPlanAssignment.is_lead
-    ).join(
-        WorkPlanJob, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
-    ).join(
-        WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
-    ).filter(
-        WorkPlanDay.date == target_date
-    ).all()
-
-    # Group by user
-    user_jobs = {}
-    for a in assignments:
-        if a.user_id not in user_jobs:
-            user_jobs[a.user_id] = []
-        user_jobs[a.user_id].append(a)
-
-    computed = 0
-    for user_id, jobs in user_jobs.items():
-        total_assigned = len(jobs)
-        total_completed = 0
-        total_incomplete = 0
-        total_not_started = 0
-        total_carried_over = 0
-        total_estimated = Decimal('0')
-        total_actual = Decimal('0')
-        time_ratings = []
-        qc_ratings = []
-        cleaning_ratings = []
-        total_points = 0
-        total_pauses = 0
-        total_pause_minutes = 0
-
-        for job_info in jobs:
-            tracking = WorkPlanJobTracking.query.filter_by(work_plan_job_id=job_info.job_id).first()
-            rating = WorkPlanJobRating.query.filter_by(
-                work_plan_job_id=job_info.job_id,
-                user_id=user_id
-            ).first()
-
-            if tracking:
-                if tracking.status == 'completed':
-                    total_completed += 1
-                elif tracking.status == 'incomplete':
-                    total_incomplete += 1
-                elif tracking.status in ('not_started', 'pending'):
-                    total_not_started += 1
-
-                if tracking.is_carry_over:
-                    total_carried_over += 1
-                if tracking.actual_hours:
-                    total_actual += Decimal(str(tracking.actual_hours))
-                total_pause_minutes += tracking.total_paused_minutes or 0
-
-            if job_info.estimated_hours:
-                total_estimated += Decimal(str(job_info.estimated_hours))
-
-            if rating:
-                total_points += rating.points_earned or 0
-                if rating.effective_time_rating:
-                    time_ratings.append(float(rating.effective_time_rating))
-                if rating.qc_rating:
-                    qc_ratings.append(float(rating.qc_rating))
-                if rating.cleaning_rating is not None:
-                    cleaning_ratings.append(rating.cleaning_rating)
-
-            # Count pauses
-            pause_count = WorkPlanPauseRequest.query.filter_by(
-                work_plan_job_id=job_info.job_id,
-                requested_by_id=user_id
-            ).count()
-            total_pauses += pause_count
-
-        completion_rate = (total_completed / total_assigned * 100) if total_assigned > 0 else 0
-
-        # Get previous streak
-        prev_perf = WorkPlanPerformance.query.filter_by(
-            user_id=user_id,
-            period_type='daily'
-        ).filter(
-            WorkPlanPerformance.period_start < target_date
-        ).order_by(WorkPlanPerformance.period_start.desc()).first()
-
-        prev_streak = prev_perf.current_streak_days if prev_perf else 0
-        prev_max = prev_perf.max_streak_days if prev_perf else 0
-
-        # Update streak: 100% completion = streak continues
-        if completion_rate >= 100 and total_assigned > 0:
-            current_streak = prev_streak + 1
-        else:
-            current_streak = 0
-
-        max_streak = max(prev_max, current_streak)
-
-        # Check for streak milestone notification
-        if current_streak in (5, 10, 20, 30, 50, 100):
-            NotificationService.create_notification(
-                user_id=user_id,
-                type='streak_milestone',
-                title=f'{current_streak}-Day Streak!',
-                message=f'Great work! You have completed all assigned jobs for {current_streak} consecutive days.',
-                priority='info'
-            )
-
-        # Upsert performance record
-        perf = WorkPlanPerformance.query.filter_by(
-            user_id=user_id,
-            period_type='daily',
-            period_start=target_date
-        ).first()
-
-        if not perf:
-            perf = WorkPlanPerformance(
-                user_id=user_id,
-                period_type='daily',
-                period_start=target_date,
-                period_end=target_date
-            )
-            db.session.add(perf)
-
-        perf.total_jobs_assigned = total_assigned
-        perf.total_jobs_completed = total_completed
-        perf.total_jobs_incomplete = total_incomplete
-        perf.total_jobs_not_started = total_not_started
-        perf.total_jobs_carried_over = total_carried_over
-        perf.total_estimated_hours = total_estimated
-        perf.total_actual_hours = total_actual
-        perf.avg_time_rating = round(sum(time_ratings) / len(time_ratings), 1) if time_ratings else None
-        perf.avg_qc_rating = round(sum(qc_ratings) / len(qc_ratings), 1) if qc_ratings else None
-        perf.avg_cleaning_rating = round(sum(cleaning_ratings) / len(cleaning_ratings), 1) if cleaning_ratings else None
-        perf.completion_rate = round(Decimal(str(completion_rate)), 2)
-        perf.total_points_earned = total_points
-        perf.current_streak_days = current_streak
-        perf.max_streak_days = max_streak
-        perf.total_pauses = total_pauses
-        perf.total_pause_minutes = total_pause_minutes
-
-        computed += 1
-
-    db.session.commit()
-    return computed
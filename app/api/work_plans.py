@@ -2134,15 +2134,16 @@ def revise_plan(plan_id):
 def get_my_plan():
     """
     Get the current user's assigned jobs for a week.
-    Optimized to include tracking data and use eager loading.
+
+    Loads only the caller's jobs (starting from WorkPlanAssignment.user_id)
+    plus their co-assignees, never the whole plan. Responses carry an ETag
+    derived from the plan and the caller's jobs; a matching If-None-Match
+    returns 304 after two aggregate queries and no ORM loading.
 
     Query params:
         - week_start: Week to get (YYYY-MM-DD), defaults to current week
     """
-    from sqlalchemy.orm import joinedload
-
-    user = get_current_user()
-    language = user.language or 'en'
+    user_id = int(get_jwt_identity())
 
     week_start = request.args.get('week_start')
     if week_start:
@@ -2156,28 +2157,16 @@ def get_my_plan():
     # Plans can start on any day of the week (e.g., Sunday from the web
     # planner), so match the published plan whose date range contains the
     # requested date instead of requiring an exact Monday week_start.
-    # Optimized query with eager loading to prevent N+1 issues
-    plan = WorkPlan.query.options(
-        joinedload(WorkPlan.days)
-        .joinedload(WorkPlanDay.jobs)
-        .joinedload(WorkPlanJob.assignments),
-        joinedload(WorkPlan.days)
-        .joinedload(WorkPlanDay.jobs)
-        .joinedload(WorkPlanJob.equipment),
-        joinedload(WorkPlan.days)
-        .joinedload(WorkPlanDay.jobs)
-        .joinedload(WorkPlanJob.defect),
-        joinedload(WorkPlan.days)
-        .joinedload(WorkPlanDay.jobs)
-        .joinedload(WorkPlanJob.tracking),
-        joinedload(WorkPlan.pdf_file),
+    plan_row = db.session.query(
+        WorkPlan.id, WorkPlan.week_start, WorkPlan.week_end,
+        WorkPlan.status, WorkPlan.pdf_file_id, WorkPlan.updated_at,
     ).filter(
         WorkPlan.week_start <= week_date,
         WorkPlan.week_end >= week_date,
         WorkPlan.status == 'published',
     ).order_by(WorkPlan.week_start.desc()).first()
 
-    if not plan:
+    if not plan_row:
         return jsonify({
             'status': 'success',
             'message': 'No published plan for this week',
@@ -2186,93 +2175,159 @@ def get_my_plan():
             'total_jobs': 0
         }), 200
 
-    # Get user's assigned jobs with minimal data + tracking
+    my_job_ids = db.session.query(WorkPlanAssignment.work_plan_job_id).join(
+        WorkPlanJob, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
+    ).join(
+        WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+    ).filter(
+        WorkPlanAssignment.user_id == user_id,
+        WorkPlanDay.work_plan_id == plan_row.id,
+    )
+
+    etag = _my_plan_etag(plan_row, user_id, my_job_ids)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    jobs = WorkPlanJob.query.options(
+        joinedload(WorkPlanJob.day),
+        joinedload(WorkPlanJob.equipment),
+        joinedload(WorkPlanJob.defect),
+        joinedload(WorkPlanJob.tracking),
+        selectinload(WorkPlanJob.assignments).joinedload(WorkPlanAssignment.user),
+    ).join(
+        WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+    ).filter(
+        WorkPlanJob.id.in_(my_job_ids)
+    ).order_by(WorkPlanDay.date, WorkPlanJob.position, WorkPlanJob.id).all()
+
     my_jobs = []
-    for day in plan.days:
-        day_jobs = []
-        for job in day.jobs:
-            for assignment in job.assignments:
-                if assignment.user_id == user.id:
-                    # Build compact job dict with only essential data
-                    job_dict = {
-                        'id': job.id,
-                        'job_type': job.job_type,
-                        'berth': job.berth,
-                        'equipment_id': job.equipment_id,
-                        'equipment': {
-                            'id': job.equipment.id,
-                            'name': job.equipment.name,
-                            'serial_number': job.equipment.serial_number
-                        } if job.equipment else None,
-                        'defect_id': job.defect_id,
-                        'defect': {
-                            'id': job.defect.id,
-                            'description': job.defect.description,
-                            'status': job.defect.status
-                        } if job.defect else None,
-                        'sap_order_number': job.sap_order_number,
-                        'description': job.description,
-                        'estimated_hours': job.estimated_hours,
-                        'planned_time_hours': float(job.planned_time_hours) if job.planned_time_hours is not None else None,
-                        'has_planned_time': job.has_planned_time(),
-                        'priority': job.priority,
-                        'notes': job.notes,
-                        'checklist_required': job.checklist_required,
-                        'checklist_completed': job.checklist_completed,
-                        'completion_photo_required': job.completion_photo_required,
-                        'is_lead': assignment.is_lead,
-                        'day_date': day.date.isoformat(),
-                        'day_name': day.date.strftime('%A'),
-                        'assignments': [
-                            {
-                                'id': a.id,
-                                'user_id': a.user_id,
-                                'user_name': a.user.full_name if a.user else None,
-                                'is_lead': a.is_lead
-                            } for a in job.assignments
-                        ],
-                    }
-
-                    # Add tracking info if exists
-                    if job.tracking:
-                        t = job.tracking
-                        job_dict['tracking'] = {
-                            'id': t.id,
-                            'status': t.status,
-                            'started_at': (t.started_at.isoformat() + 'Z') if t.started_at else None,
-                            'paused_at': (t.paused_at.isoformat() + 'Z') if t.paused_at else None,
-                            'completed_at': (t.completed_at.isoformat() + 'Z') if t.completed_at else None,
-                            'total_paused_minutes': t.total_paused_minutes or 0,
-                            'actual_hours': float(t.actual_hours) if t.actual_hours else None,
-                            'is_running': t.is_running(),
-                            'is_paused': t.is_paused(),
-                            'work_notes': t.work_notes,
-                        }
-                    else:
-                        job_dict['tracking'] = None
+    for job in jobs:
+        day = job.day
+        mine = next(a for a in job.assignments if a.user_id == user_id)
+        # Build compact job dict with only essential data
+        job_dict = {
+            'id': job.id,
+            'job_type': job.job_type,
+            'berth': job.berth,
+            'equipment_id': job.equipment_id,
+            'equipment': {
+                'id': job.equipment.id,
+                'name': job.equipment.name,
+                'serial_number': job.equipment.serial_number
+            } if job.equipment else None,
+            'defect_id': job.defect_id,
+            'defect': {
+                'id': job.defect.id,
+                'description': job.defect.description,
+                'status': job.defect.status
+            } if job.defect else None,
+            'sap_order_number': job.sap_order_number,
+            'description': job.description,
+            'estimated_hours': job.estimated_hours,
+            'planned_time_hours': float(job.planned_time_hours) if job.planned_time_hours is not None else None,
+            'has_planned_time': job.has_planned_time(),
+            'priority': job.priority,
+            'notes': job.notes,
+            'checklist_required': job.checklist_required,
+            'checklist_completed': job.checklist_completed,
+            'completion_photo_required': job.completion_photo_required,
+            'is_lead': mine.is_lead,
+            'day_date': day.date.isoformat(),
+            'day_name': day.date.strftime('%A'),
+            'assignments': [
+                {
+                    'id': a.id,
+                    'user_id': a.user_id,
+                    'user_name': a.user.full_name if a.user else None,
+                    'is_lead': a.is_lead
+                } for a in job.assignments
+            ],
+        }
 
-                    day_jobs.append(job_dict)
-                    break
+        # Add tracking info if exists
+        if job.tracking:
+            t = job.tracking
+            job_dict['tracking'] = {
+                'id': t.id,
+                'status': t.status,
+                'started_at': (t.started_at.isoformat() + 'Z') if t.started_at else None,
+                'paused_at': (t.paused_at.isoformat() + 'Z') if t.paused_at else None,
+                'completed_at': (t.completed_at.isoformat() + 'Z') if t.completed_at else None,
+                'total_paused_minutes': t.total_paused_minutes or 0,
+                'actual_hours': float(t.actual_hours) if t.actual_hours else None,
+                'is_running': t.is_running(),
+                'is_paused': t.is_paused(),
+                'work_notes': t.work_notes,
+            }
+        else:
+            job_dict['tracking'] = None
 
-        if day_jobs:
+        if not my_jobs or my_jobs[-1]['date'] != job_dict['day_date']:
             my_jobs.append({
-                'date': day.date.isoformat(),
-                'day_name': day.date.strftime('%A'),
-                'jobs': day_jobs
+                'date': job_dict['day_date'],
+                'day_name': job_dict['day_name'],
+                'jobs': []
             })
+        my_jobs[-1]['jobs'].append(job_dict)
 
-    return jsonify({
+    from app.models.file import File
+    pdf_file = db.session.get(File, plan_row.pdf_file_id) if plan_row.pdf_file_id else None
+
+    response = jsonify({
         'status': 'success',
         'work_plan': {
-            'id': plan.id,
-            'week_start': plan.week_start.isoformat(),
-            'week_end': plan.week_end.isoformat(),
-            'status': plan.status,
-            'pdf_url': plan.pdf_file.get_url() if plan.pdf_file else None
+            'id': plan_row.id,
+            'week_start': plan_row.week_start.isoformat(),
+            'week_end': plan_row.week_end.isoformat(),
+            'status': plan_row.status,
+            'pdf_url': pdf_file.get_url() if pdf_file else None
         },
         'my_jobs': my_jobs,
-        'total_jobs': sum(len(d['jobs']) for d in my_jobs)
-    }), 200
+        'total_jobs': len(jobs)
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response, 200
+
+
+def _my_plan_etag(plan_row, user_id, my_job_ids):
+    """
+    Version tag for one user's view of a published plan.
+
+    Covers the plan row itself and everything the my-plan payload shows for
+    the user's jobs: the jobs, their equipment, their assignments (lead flag
+    and co-assignee names included), tracking and linked defects. Computed
+    with one aggregate query.
+    """
+    import hashlib
+
+    version = db.session.query(
+        db.func.count(WorkPlanAssignment.id),
+        db.func.max(WorkPlanAssignment.id),
+        db.func.max(WorkPlanAssignment.updated_at),
+        db.func.max(User.updated_at),
+        db.func.max(WorkPlanJob.updated_at),
+        db.func.max(Equipment.updated_at),
+        db.func.max(WorkPlanJobTracking.updated_at),
+        db.func.max(Defect.updated_at),
+    ).select_from(WorkPlanJob).join(
+        WorkPlanAssignment, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
+    ).join(
+        User, User.id == WorkPlanAssignment.user_id
+    ).outerjoin(
+        Equipment, Equipment.id == WorkPlanJob.equipment_id
+    ).outerjoin(
+        WorkPlanJobTracking, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
+    ).outerjoin(
+        Defect, Defect.id == WorkPlanJob.defect_id
+    ).filter(WorkPlanJob.id.in_(my_job_ids)).one()
+
+    raw = '|'.join(str(v) for v in (
+        plan_row.id, plan_row.updated_at, plan_row.pdf_file_id, user_id, *version
+    ))
+    return hashlib.sha1(raw.encode()).hexdigest()
 
 
 # ==================== MOVE JOB (Drag & Drop) ====================
@@ -37,6 +37,40 @@ class Config:
     RATELIMIT_STORAGE_URI = os.getenv('RATELIMIT_STORAGE_URI', 'memory://')
     RATELIMIT_DEFAULT = '200 per minute'
 
+    # WebSocket fan-out between gunicorn workers. Empty = single process;
+    # 'redis://...' relays emits through Redis; 'memory://' is in-process.
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', '')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'inspection-socketio')
+    # Notifications emitted within this window are coalesced per room
+    NOTIFICATION_EMIT_WINDOW_MS = int(os.getenv('NOTIFICATION_EMIT_WINDOW_MS', '50'))
+
+    # Only the holder of the DB leader lease runs scheduled jobs; a dead
+    # leader is replaced after this many seconds
+    SCHEDULER_LEADER_LEASE_SECONDS = int(os.getenv('SCHEDULER_LEADER_LEASE_SECONDS', '90'))
+
+    # Dashboard aggregates are shared between concurrent viewers for this long
+    DASHBOARD_CACHE_SECONDS = int(os.getenv('DASHBOARD_CACHE_SECONDS', '15'))
+
+    # Each process mirrors the token blocklist in memory; a logout made in
+    # another worker is picked up within this many seconds
+    TOKEN_REVOCATION_SYNC_SECONDS = int(os.getenv('TOKEN_REVOCATION_SYNC_SECONDS', '5'))
+
+    # Per-request SQL profiling: X-Query-Count / X-Query-Time-Ms /
+    # Server-Timing headers, and a warning log for requests over either limit
+    QUERY_PROFILER = os.getenv('QUERY_PROFILER', 'false').lower() == 'true'
+    QUERY_PROFILER_WARN_COUNT = int(os.getenv('QUERY_PROFILER_WARN_COUNT', '50'))
+    QUERY_PROFILER_WARN_MS = int(os.getenv('QUERY_PROFILER_WARN_MS', '500'))
+
+    # Bulk inspection report export: PDFs render in a pool of this many
+    # workers (0 = one per CPU, capped at 4); 'process' uses all cores,
+    # 'thread' avoids extra processes on small instances. Exports larger than
+    # the sync limit run in the background with progress polling.
+    REPORT_EXPORT_WORKERS = int(os.getenv('REPORT_EXPORT_WORKERS', '0'))
+    REPORT_EXPORT_POOL = os.getenv('REPORT_EXPORT_POOL', 'process')
+    REPORT_EXPORT_SYNC_LIMIT = int(os.getenv('REPORT_EXPORT_SYNC_LIMIT', '50'))
+    # Background exports still pending/running after this long died with their worker
+    REPORT_EXPORT_TIMEOUT_MINUTES = int(os.getenv('REPORT_EXPORT_TIMEOUT_MINUTES', '120'))
+
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', os.path.join(basedir, 'instance', 'logs', 'app.log'))
@@ -93,6 +127,12 @@ class TestingConfig(Config):
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     LOG_LEVEL = 'WARNING'
     RATELIMIT_ENABLED = False
+    DASHBOARD_CACHE_SECONDS = 0
+    NOTIFICATION_EMIT_WINDOW_MS = 0
+    REPORT_EXPORT_POOL = 'thread'
+    # Sync once per process; tests force a sync when they need one, and a
+    # timed sync would add a query to whichever request it lands on
+    TOKEN_REVOCATION_SYNC_SECONDS = 3600
 
 
 config = {
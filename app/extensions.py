@@ -22,18 +22,32 @@ socketio = None
 
 
 def init_socketio(app):
-    """Initialize Flask-SocketIO for WebSocket support."""
+    """
+    Initialize Flask-SocketIO for WebSocket support.
+
+    When SOCKETIO_MESSAGE_QUEUE is set, emits are relayed through that queue
+    so clients connected to any gunicorn worker receive them.
+    """
     global socketio
     try:
         from flask_socketio import SocketIO
+        from app.services.realtime_service import socketio_queue_options
+        queue_options = socketio_queue_options(
+            app.config.get('SOCKETIO_MESSAGE_QUEUE', ''),
+            app.config.get('SOCKETIO_CHANNEL', 'inspection-socketio'),
+        )
         socketio = SocketIO(
             app,
             cors_allowed_origins="*",
             async_mode='threading',
             logger=False,
-            engineio_logger=False
+            engineio_logger=False,
+            **queue_options
+        )
+        logger.info(
+            "Flask-SocketIO initialized successfully (%s)",
+            'message queue' if queue_options else 'single process'
         )
-        logger.info("Flask-SocketIO initialized successfully")
         return socketio
     except ImportError:
         logger.warning("Flask-SocketIO not installed, WebSocket features disabled")
@@ -9,6 +9,8 @@ from app.models.equipment import Equipment
 from app.models.checklist import ChecklistTemplate, ChecklistItem, ChecklistItemEquipmentType
 from app.models.inspection import Inspection, InspectionAnswer
 from app.models.sap_sync_file import SapSyncFile
+from app.models.scheduler_lease import SchedulerLease, SchedulerJobRun
+from app.models.report_export import ReportExport
 from app.models.defect import Defect
 from app.models.defect_occurrence import DefectOccurrence
 from app.models.schedule import InspectionSchedule, InspectionRoutine, WeeklyCompletion
@@ -38,6 +40,7 @@ from app.models.final_assessment import FinalAssessment
 # Inspection workflow
 from app.models.inspection_list import InspectionList
 from app.models.inspection_assignment import InspectionAssignment
+from app.models.inspector_workload import InspectorWorkload
 from app.models.assignment_template import AssignmentTemplate, AssignmentTemplateItem
 
 # Leave Management System (Enhanced)
@@ -122,16 +125,19 @@ from app.models.work_plan_job_rating import WorkPlanJobRating
 from app.models.work_plan_daily_review import WorkPlanDailyReview
 from app.models.work_plan_carry_over import WorkPlanCarryOver
 from app.models.work_plan_performance import WorkPlanPerformance
+from app.models.job_duration_stat import JobDurationStat
 
 # Equipment Advanced Features
 from app.models.equipment_watch import EquipmentWatch
 from app.models.equipment_note import EquipmentNote
 from app.models.equipment_certification import EquipmentCertification
+from app.models.equipment_risk_snapshot import EquipmentRiskSnapshot
 from app.models.equipment_reading import EquipmentReading
 
 # Gamification & Leaderboard
 from app.models.achievement import Achievement
 from app.models.user_achievement import UserAchievement
+from app.models.achievement_counter import AchievementCounter
 from app.models.user_streak import UserStreak
 from app.models.challenge import Challenge
 from app.models.user_challenge import UserChallenge
@@ -153,7 +159,7 @@ from app.models.message_read_receipt import MessageReadReceipt
 from app.models.toolkit_preference import ToolkitPreference
 
 # Running Hours & Service Tracking
-from app.models.running_hours import RunningHoursReading, ServiceInterval, RunningHoursAlert
+from app.models.running_hours import RunningHoursReading, ServiceInterval, RunningHoursAlert, RunningHoursSnapshot
 
 # Answer Templates
 from app.models.answer_template import AnswerTemplate
@@ -205,6 +211,7 @@ __all__ = [
     'FinalAssessment',
     'InspectionList',
     'InspectionAssignment',
+    'InspectorWorkload',
     'AssignmentTemplate',
     'AssignmentTemplateItem',
     # Leave Management System
@@ -262,6 +269,7 @@ __all__ = [
     'WorkPlanDailyReview',
     'WorkPlanCarryOver',
     'WorkPlanPerformance',
+    'JobDurationStat',
     # Enhanced Work Planning
     'JobTemplate',
     'JobTemplateMaterial',
@@ -278,10 +286,12 @@ __all__ = [
     'EquipmentWatch',
     'EquipmentNote',
     'EquipmentCertification',
+    'EquipmentRiskSnapshot',
     'EquipmentReading',
     # Gamification & Leaderboard
     'Achievement',
     'UserAchievement',
+    'AchievementCounter',
     'UserStreak',
     'Challenge',
     'UserChallenge',
@@ -302,6 +312,7 @@ __all__ = [
     'RunningHoursReading',
     'ServiceInterval',
     'RunningHoursAlert',
+    'RunningHoursSnapshot',
     # Answer Templates
     'AnswerTemplate',
     # Job Show Up & Challenges
@@ -319,4 +330,9 @@ __all__ = [
     'EPISnapshot',
     # SAP file sync (Windows courier)
     'SapSyncFile',
+    # Scheduler coordination
+    'SchedulerLease',
+    'SchedulerJobRun',
+    # Bulk report exports
+    'ReportExport',
 ]
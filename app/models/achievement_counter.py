@@ -0,0 +1,42 @@
+"""
+AchievementCounter model — materialized per-user progress counters.
+
+Count-based achievements ('inspections', 'jobs', 'defects') used to be
+checked by counting the user's whole history. These counters are bumped
+when the underlying event happens and repaired by a periodic
+reconciliation, so an unlock check is a single comparison.
+"""
+
+from app.extensions import db
+from datetime import datetime
+
+
+class AchievementCounter(db.Model):
+    """One row per user holding the running totals achievements are measured on"""
+    __tablename__ = 'achievement_counters'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, unique=True)
+
+    inspections = db.Column(db.Integer, default=0, nullable=False)  # submitted inspections
+    jobs = db.Column(db.Integer, default=0, nullable=False)  # completed specialist + engineer jobs
+    defects = db.Column(db.Integer, default=0, nullable=False)  # defects on the user's inspections
+
+    reconciled_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    FIELDS = ('inspections', 'jobs', 'defects')
+
+    def to_dict(self):
+        """Convert achievement counter to dictionary."""
+        return {
+            'user_id': self.user_id,
+            'inspections': self.inspections,
+            'jobs': self.jobs,
+            'defects': self.defects,
+            'reconciled_at': self.reconciled_at.isoformat() if self.reconciled_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<AchievementCounter user={self.user_id}>'
@@ -0,0 +1,67 @@
+"""
+EquipmentRiskSnapshot model — per-equipment inspection risk and coverage.
+
+The scheduling AI used to score every active equipment per request with a
+handful of queries each. These rows hold the inputs (last reviewed
+inspection, 90-day defect and inspection counts, this week's scheduling)
+and the resulting risk score and coverage gap, refreshed by
+EquipmentRiskService when inspections are submitted or reviewed and by an
+hourly job, so dashboards sort and count them in the database.
+"""
+
+from datetime import datetime
+from app.extensions import db
+
+
+class EquipmentRiskSnapshot(db.Model):
+    """Inspection risk and coverage state of one equipment"""
+    __tablename__ = 'equipment_risk_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    equipment_id = db.Column(db.Integer, db.ForeignKey('equipment.id', ondelete='CASCADE'), nullable=False, unique=True, index=True)
+
+    last_inspection_at = db.Column(db.DateTime, nullable=True)  # latest reviewed inspection
+    days_since_inspection = db.Column(db.Integer, nullable=True)  # None if never inspected
+    defects_90d = db.Column(db.Integer, nullable=False, default=0)
+    inspections_90d = db.Column(db.Integer, nullable=False, default=0)
+    failed_inspections_90d = db.Column(db.Integer, nullable=False, default=0)
+    criticality = db.Column(db.String(20), nullable=False, default='medium')
+
+    risk_score = db.Column(db.Float, nullable=False, default=0)
+    risk_level = db.Column(db.String(20), nullable=False, default='low')  # low, medium, high, critical
+    factors = db.Column(db.JSON, nullable=True)
+
+    recommended_days = db.Column(db.Integer, nullable=False, default=14)
+    scheduled_this_week = db.Column(db.Boolean, nullable=False, default=False)
+    coverage_priority = db.Column(db.String(20), nullable=True)  # None when covered; low..critical otherwise
+
+    refreshed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    equipment = db.relationship('Equipment', backref=db.backref('risk_snapshot', uselist=False, passive_deletes=True))
+
+    __table_args__ = (
+        db.Index('ix_equipment_risk_snapshots_score', 'risk_score'),
+        db.Index('ix_equipment_risk_snapshots_coverage', 'coverage_priority'),
+    )
+
+    def to_dict(self):
+        """Convert risk snapshot to dictionary."""
+        return {
+            'equipment_id': self.equipment_id,
+            'last_inspection_at': self.last_inspection_at.isoformat() if self.last_inspection_at else None,
+            'days_since_inspection': self.days_since_inspection,
+            'defects_90d': self.defects_90d,
+            'inspections_90d': self.inspections_90d,
+            'failed_inspections_90d': self.failed_inspections_90d,
+            'criticality': self.criticality,
+            'risk_score': self.risk_score,
+            'risk_level': self.risk_level,
+            'factors': self.factors,
+            'recommended_days': self.recommended_days,
+            'scheduled_this_week': self.scheduled_this_week,
+            'coverage_priority': self.coverage_priority,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
+
+    def __repr__(self):
+        return f'<EquipmentRiskSnapshot equipment={self.equipment_id} risk={self.risk_score}>'
@@ -0,0 +1,49 @@
+"""
+InspectorWorkload model — per-inspector daily workload ledger.
+
+One row per inspector per day on which they were assigned inspections
+(the UTC date of assigned_at), counting their assignments, the ones whose
+part they completed and the estimated hours. Assignment, unassignment and
+completion recount the affected inspectors' recent days, so fatigue is a
+sliding-window SUM over these rows instead of a scan of a week of
+assignments per inspector.
+"""
+
+from datetime import datetime
+from app.extensions import db
+
+
+class InspectorWorkload(db.Model):
+    """One inspector's inspection workload on one day"""
+    __tablename__ = 'inspector_workloads'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    assignments = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    estimated_hours = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'day', name='uq_inspector_workload_user_day'),
+        db.Index('ix_inspector_workloads_day', 'day'),
+    )
+
+    @property
+    def worked(self):
+        return self.assignments > 0
+
+    def to_dict(self):
+        """Convert workload ledger row to dictionary."""
+        return {
+            'user_id': self.user_id,
+            'day': self.day.isoformat() if self.day else None,
+            'assignments': self.assignments,
+            'completed': self.completed,
+            'estimated_hours': self.estimated_hours,
+            'worked': self.worked,
+        }
+
+    def __repr__(self):
+        return f'<InspectorWorkload user={self.user_id} {self.day} n={self.assignments}>'
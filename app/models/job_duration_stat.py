@@ -0,0 +1,131 @@
+"""
+JobDurationStat model — running statistics of completed job durations.
+
+Duration estimates used to scan recent completed jobs on every call. These
+rows are updated once per completed job with Welford's method (count, mean
+and sum of squared deviations) plus a fixed-width histogram for quantiles,
+so an estimate is a single row lookup.
+
+Each completed job updates three scopes: its equipment, its equipment
+type, and its job type alone. The wider scopes use equipment_id 0 and
+equipment_type '' so the unique key never contains NULLs.
+"""
+
+from app.extensions import db
+from datetime import datetime
+
+ANY_EQUIPMENT_ID = 0
+ANY_EQUIPMENT_TYPE = ''
+
+# Histogram buckets: HISTOGRAM_STEP hours wide, the last one open-ended
+HISTOGRAM_STEP = 0.5
+HISTOGRAM_BUCKETS = 48
+
+
+class JobDurationStat(db.Model):
+    """Running duration statistics for one (job type, equipment type, equipment) scope"""
+    __tablename__ = 'job_duration_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(20), nullable=False)
+    equipment_type = db.Column(db.String(50), nullable=False, default=ANY_EQUIPMENT_TYPE)
+    equipment_id = db.Column(db.Integer, nullable=False, default=ANY_EQUIPMENT_ID)
+
+    count = db.Column(db.Integer, default=0, nullable=False)
+    mean_hours = db.Column(db.Float, default=0, nullable=False)
+    m2 = db.Column(db.Float, default=0, nullable=False)  # sum of squared deviations from the mean
+    min_hours = db.Column(db.Float, nullable=True)
+    max_hours = db.Column(db.Float, nullable=True)
+
+    # Mean relative error of the planner's estimate, over jobs that had one
+    estimate_count = db.Column(db.Integer, default=0, nullable=False)
+    estimate_error_sum = db.Column(db.Float, default=0, nullable=False)
+
+    histogram = db.Column(db.JSON, nullable=False, default=list)
+    p10_hours = db.Column(db.Float, nullable=True)
+    p50_hours = db.Column(db.Float, nullable=True)
+    p90_hours = db.Column(db.Float, nullable=True)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('job_type', 'equipment_type', 'equipment_id', name='uq_job_duration_stat_scope'),
+    )
+
+    @property
+    def variance(self):
+        """Sample variance of the durations (None below two samples)."""
+        if self.count < 2:
+            return None
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std_dev(self):
+        variance = self.variance
+        return variance ** 0.5 if variance is not None else None
+
+    @property
+    def estimate_error(self):
+        """Mean |actual - estimate| / estimate, or None without estimates."""
+        if not self.estimate_count:
+            return None
+        return self.estimate_error_sum / self.estimate_count
+
+    def add(self, hours, estimated_hours=None):
+        """Fold one completed job's duration into the statistics."""
+        hours = float(hours)
+        self.count = (self.count or 0) + 1
+        mean = self.mean_hours or 0.0
+        delta = hours - mean
+        mean += delta / self.count
+        self.m2 = (self.m2 or 0.0) + delta * (hours - mean)
+        self.mean_hours = mean
+        self.min_hours = hours if self.min_hours is None else min(self.min_hours, hours)
+        self.max_hours = hours if self.max_hours is None else max(self.max_hours, hours)
+
+        if estimated_hours:
+            self.estimate_count = (self.estimate_count or 0) + 1
+            self.estimate_error_sum = (self.estimate_error_sum or 0.0) + abs(hours - estimated_hours) / estimated_hours
+
+        # Reassigned (not mutated) so the JSON column is marked dirty
+        histogram = list(self.histogram or [0] * HISTOGRAM_BUCKETS)
+        histogram[min(int(hours / HISTOGRAM_STEP), HISTOGRAM_BUCKETS - 1)] += 1
+        self.histogram = histogram
+        self.p10_hours, self.p50_hours, self.p90_hours = (
+            self.quantile(q) for q in (0.1, 0.5, 0.9)
+        )
+
+    def quantile(self, q):
+        """Duration below which a fraction q of jobs finished, interpolated within its bucket."""
+        if not self.count or not self.histogram:
+            return None
+        target = q * self.count
+        seen = 0
+        for bucket, n in enumerate(self.histogram):
+            if n and seen + n >= target:
+                low = bucket * HISTOGRAM_STEP
+                value = low + HISTOGRAM_STEP * (target - seen) / n
+                # Keep within the observed range (and the open last bucket sane)
+                return round(min(max(value, self.min_hours), self.max_hours), 2)
+            seen += n
+        return self.max_hours
+
+    def to_dict(self):
+        """Convert duration statistics to dictionary."""
+        return {
+            'job_type': self.job_type,
+            'equipment_type': self.equipment_type or None,
+            'equipment_id': self.equipment_id or None,
+            'count': self.count,
+            'mean_hours': round(self.mean_hours, 2) if self.count else None,
+            'std_dev_hours': round(self.std_dev, 2) if self.std_dev is not None else None,
+            'min_hours': self.min_hours,
+            'max_hours': self.max_hours,
+            'p10_hours': self.p10_hours,
+            'p50_hours': self.p50_hours,
+            'p90_hours': self.p90_hours,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+    def __repr__(self):
+        return f'<JobDurationStat {self.job_type}/{self.equipment_type or "*"}/{self.equipment_id or "*"} n={self.count}>'
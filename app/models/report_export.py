@@ -0,0 +1,54 @@
+"""
+Bulk inspection report exports.
+
+Large exports run in the background: the PDFs are rendered by a worker pool
+and written into a ZIP file on disk, and the row tracks progress so the
+client can poll it and download the file when it is done.
+"""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class ReportExport(db.Model):
+    __tablename__ = 'report_exports'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+
+    # pending | running | completed | failed
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    language = db.Column(db.String(5), nullable=False, default='en')
+    inspection_ids = db.Column(db.JSON, nullable=False)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Integer, nullable=False, default=0)
+    file_path = db.Column(db.String(500), nullable=True)
+    file_size = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    user = db.relationship('User')
+
+    def to_dict(self):
+        done = self.completed + self.failed
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'failed': self.failed,
+            'progress_percent': round(done / self.total * 100, 1) if self.total else 100.0,
+            'file_size': self.file_size,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+    def __repr__(self):
+        return f'<ReportExport {self.id} {self.status} {self.completed}/{self.total}>'
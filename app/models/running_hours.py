@@ -122,3 +122,50 @@ class RunningHoursAlert(db.Model):
             'acknowledged_at': self.acknowledged_at.isoformat() if self.acknowledged_at else None,
             'acknowledged_by_id': self.acknowledged_by_id,
         }
+
+
+class RunningHoursSnapshot(db.Model):
+    """
+    Per-equipment running hours state, maintained on write.
+
+    Holds the winning latest reading across the three reading sources and
+    the service status it implies, so fleet views read one row per
+    equipment instead of merging sources per request. Refreshed in the same
+    transaction as every reading/service write
+    (RunningHoursSnapshotService.refresh).
+    """
+    __tablename__ = 'running_hours_snapshots'
+
+    id = db.Column(db.Integer, primary_key=True)
+    equipment_id = db.Column(db.Integer, db.ForeignKey('equipment.id', ondelete='CASCADE'), nullable=False, unique=True, index=True)
+    current_hours = db.Column(db.Float, nullable=False, default=0)
+    reading_source = db.Column(db.String(30), nullable=True)  # equipment_reading, running_hours_reading, inspection_answer
+    reading_at = db.Column(db.DateTime, nullable=True)
+    last_reading = db.Column(db.JSON, nullable=True)
+    next_service_hours = db.Column(db.Float, nullable=True)
+    hours_until_service = db.Column(db.Float, nullable=True)
+    hours_overdue = db.Column(db.Float, nullable=True)
+    service_status = db.Column(db.String(20), nullable=False, default='ok')  # ok, approaching, overdue
+    progress_percent = db.Column(db.Float, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    equipment = db.relationship('Equipment', backref=db.backref('running_hours_snapshot', uselist=False))
+
+    __table_args__ = (
+        db.Index('ix_rh_snapshots_status_due', 'service_status', 'hours_until_service'),
+    )
+
+    def to_dict(self):
+        return {
+            'equipment_id': self.equipment_id,
+            'current_hours': self.current_hours,
+            'reading_source': self.reading_source,
+            'reading_at': self.reading_at.isoformat() if self.reading_at else None,
+            'last_reading': self.last_reading,
+            'next_service_hours': self.next_service_hours,
+            'hours_until_service': self.hours_until_service,
+            'hours_overdue': self.hours_overdue,
+            'service_status': self.service_status,
+            'progress_percent': self.progress_percent,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None,
+        }
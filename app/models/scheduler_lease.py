@@ -0,0 +1,65 @@
+"""
+Scheduler coordination — lease rows and per-run history.
+
+Every process that boots the app starts APScheduler. SchedulerLease rows let
+exactly one of them act: the 'leader' lease decides which process runs jobs
+at all, and a 'job:<id>' lease stops a slow run from being started again on
+top of itself. A lease is taken with a conditional UPDATE, so it works the
+same on SQLite and Postgres.
+
+SchedulerJobRun keeps one row per run (and per overlap skip) with duration
+and the number of rows the job reported touching.
+"""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class SchedulerLease(db.Model):
+    __tablename__ = 'scheduler_leases'
+
+    name = db.Column(db.String(100), primary_key=True)
+    owner = db.Column(db.String(100), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    acquired_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'owner': self.owner,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'acquired_at': self.acquired_at.isoformat() if self.acquired_at else None,
+        }
+
+
+class SchedulerJobRun(db.Model):
+    __tablename__ = 'scheduler_job_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.String(100), nullable=False, index=True)
+    owner = db.Column(db.String(100), nullable=False)
+
+    # success | failed | skipped (previous run of the same job still holds its lease)
+    status = db.Column(db.String(20), nullable=False)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    duration_ms = db.Column(db.Integer, nullable=True)
+    row_count = db.Column(db.Integer, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_id': self.job_id,
+            'owner': self.owner,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'duration_ms': self.duration_ms,
+            'row_count': self.row_count,
+            'error': self.error,
+        }
+
+    def __repr__(self):
+        return f'<SchedulerJobRun {self.job_id} {self.status}>'
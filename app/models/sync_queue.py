@@ -22,7 +22,16 @@ class SyncQueue(db.Model):
     entity_type = db.Column(db.String(50), nullable=False)  # 'inspection', 'job', etc.
     entity_data = db.Column(db.JSON, nullable=False)  # Full data to sync
     
+    # Client-supplied key; a resend with the same key is not queued twice
+    idempotency_key = db.Column(db.String(100))
+
     # Sync Status
+    # pending -> processing -> applied | conflict | failed
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    claim_token = db.Column(db.String(32), index=True)
+    claimed_at = db.Column(db.DateTime)
+    result = db.Column(db.JSON)  # Per-item outcome details (ids written, conflict info)
     synced_at = db.Column(db.DateTime)
     sync_error = db.Column(db.Text)
     
@@ -31,6 +40,10 @@ class SyncQueue(db.Model):
     
     # Relationships
     user = db.relationship('User', backref='sync_queue_items')
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'idempotency_key', name='uq_sync_queue_user_idempotency_key'),
+    )
     
     def is_synced(self):
         """Check if item has been synced"""
@@ -38,11 +51,13 @@ class SyncQueue(db.Model):
     
     def mark_as_synced(self):
         """Mark item as successfully synced"""
+        self.status = 'applied'
         self.synced_at = datetime.utcnow()
         self.sync_error = None
     
     def mark_sync_error(self, error_message):
         """Mark item as failed to sync"""
+        self.status = 'failed'
         self.sync_error = error_message
     
     def to_dict(self):
@@ -52,6 +67,10 @@ class SyncQueue(db.Model):
             'user_id': self.user_id,
             'entity_type': self.entity_type,
             'entity_data': self.entity_data,
+            'idempotency_key': self.idempotency_key,
+            'status': self.status,
+            'attempts': self.attempts,
+            'result': self.result,
             'is_synced': self.is_synced(),
             'synced_at': self.synced_at.isoformat() if self.synced_at else None,
             'sync_error': self.sync_error,
@@ -59,4 +78,4 @@ class SyncQueue(db.Model):
         }
     
     def __repr__(self):
-        return f'<SyncQueue {self.entity_type} - {"synced" if self.is_synced() else "pending"}>'
\ No newline at end of file
+        return f'<SyncQueue {self.entity_type} - {self.status}>'
\ No newline at end of file
@@ -21,7 +21,12 @@ class UserStreak(db.Model):
     user = db.relationship('User', backref=db.backref('streak_info', uselist=False))
 
     def update_streak(self, activity_date=None):
-        """Update streak based on activity date."""
+        """
+        Update streak based on activity date.
+
+        Returns:
+            bool: True if this was a new active day (the streak changed)
+        """
         if activity_date is None:
             activity_date = date.today()
 
@@ -31,7 +36,7 @@ class UserStreak(db.Model):
             self.streak_start_date = activity_date
         elif activity_date == self.last_activity_date:
             # Same day, no change
-            return
+            return False
         elif (activity_date - self.last_activity_date).days == 1:
             # Consecutive day
             self.current_streak += 1
@@ -46,6 +51,7 @@ class UserStreak(db.Model):
         # Update longest streak if needed
         if self.current_streak > self.longest_streak:
             self.longest_streak = self.current_streak
+        return True
 
     def to_dict(self):
         """Convert user streak to dictionary."""
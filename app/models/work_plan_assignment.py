@@ -27,6 +27,7 @@ class WorkPlanAssignment(db.Model):
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     job = db.relationship('WorkPlanJob', back_populates='assignments')
@@ -52,6 +53,7 @@ class WorkPlanAssignment(db.Model):
             } if self.user else None,
             'is_lead': self.is_lead,
             'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
         }
 
     def __repr__(self):
@@ -2,47 +2,62 @@
 Services module - contains all business logic.
 """
 
-from app.services.leave_ai_service import LeaveAIService
-from app.services.work_plan_ai_service import WorkPlanAIService
-from app.services.work_plan_service import WorkPlanService
+import importlib
 
-# AI Base Service (reusable patterns)
-from app.services.ai_base_service import (
-    RiskScorer,
-    AnomalyDetector,
-    Predictor,
-    RecommendationEngine,
-    TrendAnalyzer,
-    NLPQueryParser,
-    AIServiceWrapper,
-    ScoringUtils,
-)
+# Exported name -> defining module. Resolved on first attribute access
+# (PEP 562) so that importing any one service does not pull in every AI
+# provider SDK; app start-up only pays for what it actually uses.
+_LAZY_EXPORTS = {
+    'LeaveAIService': 'app.services.leave_ai_service',
+    'WorkPlanAIService': 'app.services.work_plan_ai_service',
+    'WorkPlanService': 'app.services.work_plan_service',
 
-# Unified AI Services (use base classes - no duplication)
-from app.services.unified_ai_services import (
-    ApprovalAIService,
-    QualityReviewAIService,
-    InspectionRoutineAIService,
-)
+    # AI Base Service (reusable patterns)
+    'RiskScorer': 'app.services.ai_base_service',
+    'AnomalyDetector': 'app.services.ai_base_service',
+    'Predictor': 'app.services.ai_base_service',
+    'RecommendationEngine': 'app.services.ai_base_service',
+    'TrendAnalyzer': 'app.services.ai_base_service',
+    'NLPQueryParser': 'app.services.ai_base_service',
+    'AIServiceWrapper': 'app.services.ai_base_service',
+    'ScoringUtils': 'app.services.ai_base_service',
 
-# Enhanced AI Services (5 new modules)
-from app.services.defect_ai_service import DefectAIService
-from app.services.overdue_ai_service import OverdueAIService
-from app.services.daily_review_ai_service import DailyReviewAIService
-from app.services.performance_ai_service import PerformanceAIService
-from app.services.reports_ai_service import ReportsAIService
+    # Unified AI Services (use base classes - no duplication)
+    'ApprovalAIService': 'app.services.unified_ai_services',
+    'QualityReviewAIService': 'app.services.unified_ai_services',
+    'InspectionRoutineAIService': 'app.services.unified_ai_services',
+
+    # Enhanced AI Services (5 new modules)
+    'DefectAIService': 'app.services.defect_ai_service',
+    'OverdueAIService': 'app.services.overdue_ai_service',
+    'DailyReviewAIService': 'app.services.daily_review_ai_service',
+    'PerformanceAIService': 'app.services.performance_ai_service',
+    'ReportsAIService': 'app.services.reports_ai_service',
+
+    # Shared Services
+    'NotificationPatterns': 'app.services.shared',
+    'EscalationEngine': 'app.services.shared',
+    'EscalationRule': 'app.services.shared',
+    'PointCalculator': 'app.services.shared',
+    'PointRule': 'app.services.shared',
+    'PointAction': 'app.services.shared',
+    'SLATracker': 'app.services.shared',
+    'SLAConfig': 'app.services.shared',
+}
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
-# Shared Services
-from app.services.shared import (
-    NotificationPatterns,
-    EscalationEngine,
-    EscalationRule,
-    PointCalculator,
-    PointRule,
-    PointAction,
-    SLATracker,
-    SLAConfig,
-)
 
 __all__ = [
     # Existing services
@@ -0,0 +1,329 @@
+"""
+Event-driven progress for count and streak achievements.
+
+Domain code reports events as they happen (inspection submitted, defect
+found, job completed). Each event bumps the user's AchievementCounter with
+one UPDATE and compares the new value against the handful of achievements
+measured on that field, so unlocking no longer recounts the user's history.
+The first event of a day also extends the user's UserStreak and checks
+streak achievements against its new length.
+
+Counters are seeded from history the first time a user is seen, and the
+update_achievement_progress job reconciles them against grouped counts to
+repair drift (events lost to a crash, data fixed by hand, ...), and earns
+streak achievements whose target a user's longest streak already reached.
+"""
+
+import logging
+from datetime import date, datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Inspection, EngineerJob, SpecialistJob, Defect
+from app.models.achievement import Achievement
+from app.models.achievement_counter import AchievementCounter
+from app.models.user_achievement import UserAchievement
+from app.models.user_streak import UserStreak
+
+logger = logging.getLogger(__name__)
+
+# Inspection statuses that count as a completed inspection
+COMPLETED_INSPECTION_STATUSES = ('submitted', 'reviewed')
+
+
+class AchievementProgressService:
+    """Maintains achievement counters and unlocks achievements from them."""
+
+    @staticmethod
+    def record(user_id, **amounts):
+        """
+        Count events towards the user's achievements, e.g.
+        record(user_id, inspections=1, defects=2).
+
+        Call after the events themselves are committed, so that seeding a
+        new counter from history already includes them. Every event also
+        counts as activity for the user's streak.
+
+        Args:
+            user_id: The user the events belong to
+            **amounts: How much to add per counter ('inspections', 'jobs',
+                'defects')
+
+        Returns:
+            List of newly earned Achievement objects
+        """
+        unknown = set(amounts) - set(AchievementCounter.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown achievement counters: {', '.join(sorted(unknown))}")
+        amounts = {field: n for field, n in amounts.items() if n}
+        if not amounts:
+            return []
+
+        columns = [getattr(AchievementCounter, field) for field in amounts]
+        values = {column: column + n for column, n in zip(columns, amounts.values())}
+        values[AchievementCounter.updated_at] = datetime.utcnow()
+        row = db.session.execute(
+            update(AchievementCounter)
+            .where(AchievementCounter.user_id == user_id)
+            .values(values)
+            .returning(*columns)
+        ).first()
+        if row is None:
+            counter = AchievementProgressService._seed(user_id)
+            row = [getattr(counter, field) for field in amounts]
+        db.session.commit()
+
+        newly_earned = []
+        for field, value in zip(amounts, row):
+            newly_earned.extend(AchievementProgressService.check(user_id, field, value))
+        newly_earned.extend(AchievementProgressService.record_activity(user_id))
+        return newly_earned
+
+    @staticmethod
+    def record_activity(user_id, activity_date=None):
+        """
+        Count a day of activity towards the user's streak.
+
+        Only the first activity of a day changes the streak, and only then
+        are streak achievements checked.
+
+        Returns:
+            List of newly earned Achievement objects
+        """
+        streak = UserStreak.query.filter_by(user_id=user_id).with_for_update().first()
+        if streak is None:
+            streak = UserStreak(user_id=user_id, current_streak=0, longest_streak=0, total_active_days=0)
+            try:
+                with db.session.begin_nested():
+                    db.session.add(streak)
+            except IntegrityError:
+                # Created concurrently by another request
+                streak = UserStreak.query.filter_by(user_id=user_id).with_for_update().one()
+        extended = streak.update_streak(activity_date or date.today())
+        db.session.commit()
+        if not extended:
+            return []
+        return AchievementProgressService.check(user_id, 'streak', streak.current_streak)
+
+    @staticmethod
+    def check(user_id, field, value):
+        """
+        Compare a progress value against the achievements measured on it.
+
+        Earns achievements whose target is reached and updates progress on
+        ones already being tracked. 'streak' checks streak achievements;
+        any other field checks count achievements on that field.
+
+        Returns:
+            List of newly earned Achievement objects
+        """
+        query = Achievement.query.filter(Achievement.is_active == True)
+        if field == 'streak':
+            query = query.filter(Achievement.criteria_type == 'streak')
+        else:
+            query = query.filter(Achievement.criteria_type == 'count', Achievement.criteria_field == field)
+        achievements = query.all()
+        if not achievements:
+            return []
+
+        tracked = {
+            ua.achievement_id: ua
+            for ua in UserAchievement.query.filter(
+                UserAchievement.user_id == user_id,
+                UserAchievement.achievement_id.in_([a.id for a in achievements]),
+            )
+        }
+
+        now = datetime.utcnow()
+        newly_earned = []
+        for achievement in achievements:
+            ua = tracked.get(achievement.id)
+            if ua is not None and ua.earned_at is not None:
+                continue
+            target = achievement.criteria_target or 0
+            if value >= target:
+                if ua is None:
+                    ua = UserAchievement(user_id=user_id, achievement_id=achievement.id)
+                    db.session.add(ua)
+                ua.earned_at = now
+                ua.progress = target
+                newly_earned.append(achievement)
+            elif ua is not None and ua.progress != value:
+                ua.progress = value
+
+        db.session.commit()
+        if newly_earned:
+            AchievementProgressService._reward(user_id, newly_earned)
+        return newly_earned
+
+    @staticmethod
+    def get_counts(user_id):
+        """Current counter values for a user, seeding them on first use."""
+        counter = AchievementCounter.query.filter_by(user_id=user_id).first()
+        if counter is None:
+            counter = AchievementProgressService._seed(user_id)
+            db.session.commit()
+        return {field: getattr(counter, field) for field in AchievementCounter.FIELDS}
+
+    @staticmethod
+    def reconcile(user_ids=None):
+        """
+        Repair counters that drifted from history.
+
+        Recounts with one grouped query per source table, rewrites only the
+        counters that differ (creating missing ones) and re-checks
+        achievements for the fields that changed. Streaks have no history
+        to recount, so users whose longest streak reached a streak
+        achievement they have not earned are re-checked instead.
+
+        Args:
+            user_ids: Limit to these users (default: everyone with history
+                or a counter)
+
+        Returns:
+            int: number of counters created or repaired plus streak
+                achievements re-checked
+        """
+        now = datetime.utcnow()
+        history = AchievementProgressService._history_counts(user_ids)
+
+        query = AchievementCounter.query
+        if user_ids is not None:
+            query = query.filter(AchievementCounter.user_id.in_(user_ids))
+        counters = {c.user_id: c for c in query}
+
+        zero = dict.fromkeys(AchievementCounter.FIELDS, 0)
+        created, repaired, changed = [], [], []
+        for user_id in set(history) | set(counters):
+            actual = history.get(user_id, zero)
+            counter = counters.get(user_id)
+            if counter is None:
+                created.append({'user_id': user_id, **actual, 'reconciled_at': now, 'updated_at': now})
+                changed.extend((user_id, f, v) for f, v in actual.items() if v)
+                continue
+            drift = {f: v for f, v in actual.items() if getattr(counter, f) != v}
+            if drift:
+                repaired.append({'id': counter.id, **drift, 'reconciled_at': now, 'updated_at': now})
+                changed.extend((user_id, f, v) for f, v in drift.items())
+
+        if created:
+            db.session.execute(AchievementCounter.__table__.insert(), created)
+        if repaired:
+            db.session.execute(update(AchievementCounter), repaired)
+        stamp = update(AchievementCounter).values(reconciled_at=now)
+        if user_ids is not None:
+            stamp = stamp.where(AchievementCounter.user_id.in_(user_ids))
+        db.session.execute(stamp.execution_options(synchronize_session=False))
+        db.session.commit()
+
+        for user_id, field, value in changed:
+            AchievementProgressService.check(user_id, field, value)
+
+        missed_streaks = AchievementProgressService._missed_streaks(user_ids)
+        for user_id, longest in missed_streaks:
+            AchievementProgressService.check(user_id, 'streak', longest)
+
+        logger.info("Achievement counters reconciled: %d created, %d repaired, %d streaks re-checked",
+                    len(created), len(repaired), len(missed_streaks))
+        return len(created) + len(repaired) + len(missed_streaks)
+
+    @staticmethod
+    def _missed_streaks(user_ids=None):
+        """[(user_id, longest_streak)] for users owed a streak achievement."""
+        targets = dict(db.session.query(Achievement.id, Achievement.criteria_target).filter(
+            Achievement.is_active == True, Achievement.criteria_type == 'streak',
+        ))
+        if not targets:
+            return []
+        query = db.session.query(UserStreak.user_id, UserStreak.longest_streak).filter(
+            UserStreak.longest_streak >= min(t or 0 for t in targets.values()))
+        if user_ids is not None:
+            query = query.filter(UserStreak.user_id.in_(user_ids))
+        streaks = query.all()
+        if not streaks:
+            return []
+        earned = set(db.session.query(UserAchievement.user_id, UserAchievement.achievement_id).filter(
+            UserAchievement.user_id.in_([user_id for user_id, _ in streaks]),
+            UserAchievement.achievement_id.in_(targets),
+            UserAchievement.earned_at.isnot(None),
+        ))
+        return [
+            (user_id, longest) for user_id, longest in streaks
+            if any(longest >= (target or 0) and (user_id, achievement_id) not in earned
+                   for achievement_id, target in targets.items())
+        ]
+
+    @staticmethod
+    def _seed(user_id):
+        """Create a user's counter from history (flushed, not committed)."""
+        counts = AchievementProgressService._history_counts([user_id]).get(
+            user_id, dict.fromkeys(AchievementCounter.FIELDS, 0))
+        counter = AchievementCounter(user_id=user_id, reconciled_at=datetime.utcnow(), **counts)
+        try:
+            with db.session.begin_nested():
+                db.session.add(counter)
+        except IntegrityError:
+            # Seeded concurrently by another request; theirs already counts history
+            counter = AchievementCounter.query.filter_by(user_id=user_id).one()
+        return counter
+
+    @staticmethod
+    def _history_counts(user_ids=None):
+        """{user_id: {field: count}} recounted from the source tables."""
+        def grouped(user_column, query):
+            if user_ids is not None:
+                query = query.filter(user_column.in_(user_ids))
+            return query.group_by(user_column).all()
+
+        counts = {}
+
+        def add(rows, field):
+            for user_id, n in rows:
+                if user_id is not None:
+                    counts.setdefault(user_id, dict.fromkeys(AchievementCounter.FIELDS, 0))[field] += n
+
+        add(grouped(Inspection.technician_id, db.session.query(
+            Inspection.technician_id, func.count(Inspection.id)
+        ).filter(Inspection.status.in_(COMPLETED_INSPECTION_STATUSES))), 'inspections')
+        add(grouped(SpecialistJob.specialist_id, db.session.query(
+            SpecialistJob.specialist_id, func.count(SpecialistJob.id)
+        ).filter(SpecialistJob.completed_at.isnot(None), SpecialistJob.status != 'cancelled')), 'jobs')
+        add(grouped(EngineerJob.engineer_id, db.session.query(
+            EngineerJob.engineer_id, func.count(EngineerJob.id)
+        ).filter(EngineerJob.completed_at.isnot(None))), 'jobs')
+        add(grouped(Inspection.technician_id, db.session.query(
+            Inspection.technician_id, func.count(Defect.id)
+        ).join(Inspection, Defect.inspection_id == Inspection.id)), 'defects')
+        return counts
+
+    @staticmethod
+    def _reward(user_id, achievements):
+        """Award points for and notify about newly earned achievements."""
+        from app.services.leaderboard_ai_service import LeaderboardAIService
+        from app.services.notification_service import NotificationService
+
+        leaderboard_service = LeaderboardAIService()
+        for achievement in achievements:
+            logger.info(f"User {user_id} earned achievement: {achievement.code}")
+            if achievement.points_reward and achievement.points_reward > 0:
+                leaderboard_service.award_points(
+                    user_id=user_id,
+                    points=achievement.points_reward,
+                    reason=f'Achievement: {achievement.name}',
+                    source_type='achievement',
+                    source_id=achievement.id
+                )
+            try:
+                NotificationService.create_notification(
+                    user_id=user_id,
+                    type='achievement_earned',
+                    title='Achievement Unlocked!',
+                    message=f'You earned the "{achievement.name}" achievement! (+{achievement.points_reward or 0} points)',
+                    related_type='achievement',
+                    related_id=achievement.id,
+                    priority='info'
+                )
+            except Exception as e:
+                logger.warning(f"Failed to send achievement notification: {e}")
@@ -10,7 +10,31 @@ from app.models import (
 )
 from app.extensions import db
 from datetime import datetime, date, timedelta
+from flask import current_app
 from sqlalchemy import func, case
+from app.utils.ttl_cache import TTLCache
+
+_dashboard_cache = TTLCache()
+
+
+def _aggregate(id_column, query=None, **conditions):
+    """
+    Count rows and several conditional subsets of one table in a single scan.
+
+    Returns {'total': COUNT(*), <name>: SUM(CASE WHEN cond THEN 1 ELSE 0)}.
+    """
+    names = list(conditions)
+    q = db.session.query(
+        func.count(id_column),
+        *[func.sum(case((conditions[name], 1), else_=0)) for name in names]
+    )
+    if query is not None:
+        q = query(q)
+    row = q.one()
+    result = {'total': int(row[0] or 0)}
+    for name, value in zip(names, row[1:]):
+        result[name] = int(value or 0)
+    return result
 
 
 class AnalyticsService:
@@ -18,68 +42,89 @@ class AnalyticsService:
 
     @staticmethod
     def admin_dashboard():
-        """Comprehensive admin dashboard stats."""
+        """
+        Comprehensive admin dashboard stats.
+
+        Each table is scanned once with conditional aggregation, and the result
+        is shared between concurrent admin viewers for DASHBOARD_CACHE_SECONDS.
+        """
+        return _dashboard_cache.get_or_compute(
+            ('admin_dashboard', date.today()),
+            AnalyticsService._compute_admin_dashboard,
+            ttl=current_app.config.get('DASHBOARD_CACHE_SECONDS', 15),
+        )
+
+    @staticmethod
+    def _compute_admin_dashboard():
         today = date.today()
+        open_statuses = ['open', 'in_progress']
+
+        inspections = _aggregate(
+            Inspection.id,
+            passed=Inspection.result == 'pass',
+            failed=Inspection.result == 'fail',
+            in_progress=Inspection.status == 'draft',
+            completed=Inspection.status == 'completed',
+        )
+        defects = _aggregate(
+            Defect.id,
+            open=Defect.status == 'open',
+            in_progress=Defect.status == 'in_progress',
+            resolved=Defect.status == 'resolved',
+            critical_open=db.and_(Defect.severity == 'critical', Defect.status.in_(open_statuses)),
+            overdue=db.and_(Defect.due_date < today, Defect.status.in_(open_statuses)),
+        )
+        equipment = _aggregate(
+            Equipment.id,
+            active=Equipment.status == 'active',
+            under_maintenance=Equipment.status == 'under_maintenance',
+            stopped=Equipment.status == 'stopped',
+            out_of_service=Equipment.status == 'out_of_service',
+        )
+        specialist_jobs = _aggregate(
+            SpecialistJob.id,
+            pending=SpecialistJob.status == 'pending',
+            in_progress=SpecialistJob.status == 'in_progress',
+            paused=SpecialistJob.status == 'paused',
+            completed=SpecialistJob.status == 'completed',
+        )
+        engineer_jobs = _aggregate(
+            EngineerJob.id,
+            in_progress=EngineerJob.status == 'in_progress',
+            completed=EngineerJob.status == 'completed',
+        )
+        workforce = _aggregate(
+            User.id,
+            total_users=User.is_active == True,
+            on_leave=User.is_on_leave == True,
+            inspectors=db.and_(
+                User.is_active == True,
+                db.or_(User.role == 'inspector', User.minor_role == 'inspector')
+            ),
+            specialists=db.and_(
+                User.is_active == True,
+                db.or_(User.role == 'specialist', User.minor_role == 'specialist')
+            ),
+        )
+        workforce.pop('total')
+        assignments = _aggregate(
+            InspectionAssignment.id,
+            completed_assignments=InspectionAssignment.status == 'completed',
+            query=lambda q: q.join(
+                InspectionList, InspectionAssignment.inspection_list_id == InspectionList.id
+            ).filter(InspectionList.target_date == today),
+        )
 
         return {
-            'inspections': {
-                'total': Inspection.query.count(),
-                'passed': Inspection.query.filter_by(result='pass').count(),
-                'failed': Inspection.query.filter_by(result='fail').count(),
-                'in_progress': Inspection.query.filter_by(status='draft').count(),
-            },
-            'defects': {
-                'total': Defect.query.count(),
-                'open': Defect.query.filter_by(status='open').count(),
-                'in_progress': Defect.query.filter_by(status='in_progress').count(),
-                'resolved': Defect.query.filter_by(status='resolved').count(),
-                'critical_open': Defect.query.filter(
-                    Defect.severity == 'critical',
-                    Defect.status.in_(['open', 'in_progress'])
-                ).count(),
-                'overdue': Defect.query.filter(
-                    Defect.due_date < today,
-                    Defect.status.in_(['open', 'in_progress'])
-                ).count(),
-            },
-            'equipment': {
-                'total': Equipment.query.count(),
-                'active': Equipment.query.filter_by(status='active').count(),
-                'under_maintenance': Equipment.query.filter_by(status='under_maintenance').count(),
-                'stopped': Equipment.query.filter_by(status='stopped').count(),
-                'out_of_service': Equipment.query.filter_by(status='out_of_service').count(),
-            },
-            'specialist_jobs': {
-                'total': SpecialistJob.query.count(),
-                'in_progress': SpecialistJob.query.filter_by(status='in_progress').count(),
-                'paused': SpecialistJob.query.filter_by(status='paused').count(),
-                'completed': SpecialistJob.query.filter_by(status='completed').count(),
-            },
-            'engineer_jobs': {
-                'total': EngineerJob.query.count(),
-                'in_progress': EngineerJob.query.filter_by(status='in_progress').count(),
-                'completed': EngineerJob.query.filter_by(status='completed').count(),
-            },
-            'workforce': {
-                'total_users': User.query.filter_by(is_active=True).count(),
-                'on_leave': User.query.filter_by(is_on_leave=True).count(),
-                'inspectors': User.query.filter(
-                    User.is_active == True,
-                    db.or_(User.role == 'inspector', User.minor_role == 'inspector')
-                ).count(),
-                'specialists': User.query.filter(
-                    User.is_active == True,
-                    db.or_(User.role == 'specialist', User.minor_role == 'specialist')
-                ).count(),
-            },
+            'inspections': inspections,
+            'defects': defects,
+            'equipment': equipment,
+            'specialist_jobs': specialist_jobs,
+            'engineer_jobs': engineer_jobs,
+            'workforce': workforce,
             'today': {
-                'assignments': InspectionAssignment.query.join(InspectionList).filter(
-                    InspectionList.target_date == today
-                ).count(),
-                'completed_assignments': InspectionAssignment.query.join(InspectionList).filter(
-                    InspectionList.target_date == today,
-                    InspectionAssignment.status == 'completed'
-                ).count(),
+                'assignments': assignments['total'],
+                'completed_assignments': assignments['completed_assignments'],
             }
         }
 
@@ -0,0 +1,192 @@
+"""
+Engineer daily review assembly and counters.
+
+A review covers the day's jobs from the plans the engineer created (all
+plans for an admin). The review screen is built from one eager-loaded job
+query plus one IN-query each for ratings and pause requests, whatever the
+number of jobs.
+
+The counters stored on WorkPlanDailyReview (jobs completed, incomplete, not
+started; pause requests raised and resolved) are kept current by the
+endpoints that change job tracking or pause requests: they call
+refresh_counts() for the jobs they touched, which recounts the reviews of
+those days with two grouped queries. Opening the review only reads.
+"""
+
+import logging
+from collections import defaultdict
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.extensions import db
+from app.models import WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, WorkPlanMaterial, User
+from app.models.work_plan_daily_review import WorkPlanDailyReview
+from app.models.work_plan_job_rating import WorkPlanJobRating
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+from app.models.work_plan_pause_request import WorkPlanPauseRequest
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ('total_jobs', 'approved_jobs', 'incomplete_jobs', 'not_started_jobs',
+                  'total_pause_requests', 'resolved_pause_requests')
+
+
+def _empty_counts():
+    return dict.fromkeys(COUNTER_FIELDS, 0)
+
+
+class DailyReviewService:
+    """Builds the daily review screen and maintains review counters."""
+
+    @staticmethod
+    def load_jobs(target_date, engineer):
+        """
+        The review's jobs with tracking, ratings, pause requests and
+        materials, in a fixed number of queries.
+
+        Returns:
+            (jobs_data, counts): serialized jobs, and the review counters
+            tallied from them
+        """
+        query = WorkPlanJob.query.join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).join(
+            WorkPlan, WorkPlanDay.work_plan_id == WorkPlan.id
+        ).filter(
+            WorkPlanDay.date == target_date
+        ).options(
+            joinedload(WorkPlanJob.equipment),
+            joinedload(WorkPlanJob.defect),
+            joinedload(WorkPlanJob.inspection_assignment),
+            joinedload(WorkPlanJob.cycle),
+            joinedload(WorkPlanJob.pm_template),
+            joinedload(WorkPlanJob.template),
+            joinedload(WorkPlanJob.engineer),
+            joinedload(WorkPlanJob.tracking).options(
+                joinedload(WorkPlanJobTracking.completion_photo),
+                joinedload(WorkPlanJobTracking.handover_voice_file),
+                joinedload(WorkPlanJobTracking.engineer_handover_voice_file),
+            ),
+            selectinload(WorkPlanJob.assignments).joinedload(WorkPlanAssignment.user),
+            selectinload(WorkPlanJob.materials).joinedload(WorkPlanMaterial.material),
+        )
+        if engineer.role != 'admin':
+            query = query.filter(WorkPlan.created_by_id == engineer.id)
+        jobs = query.order_by(WorkPlanJob.id).all()
+
+        job_ids = [job.id for job in jobs]
+        ratings, pauses = defaultdict(list), defaultdict(list)
+        if job_ids:
+            for rating in WorkPlanJobRating.query.options(
+                joinedload(WorkPlanJobRating.user), joinedload(WorkPlanJobRating.qc_voice_file)
+            ).filter(WorkPlanJobRating.work_plan_job_id.in_(job_ids)).order_by(WorkPlanJobRating.id):
+                ratings[rating.work_plan_job_id].append(rating)
+            for pause in WorkPlanPauseRequest.query.options(
+                joinedload(WorkPlanPauseRequest.requester), joinedload(WorkPlanPauseRequest.reviewer)
+            ).filter(WorkPlanPauseRequest.work_plan_job_id.in_(job_ids)).order_by(WorkPlanPauseRequest.id):
+                pauses[pause.work_plan_job_id].append(pause)
+
+        counts = _empty_counts()
+        jobs_data = []
+        for job in jobs:
+            tracking = job.tracking
+            DailyReviewService._tally(counts, tracking.status if tracking else None, 1)
+            job_pauses = pauses[job.id]
+            counts['total_pause_requests'] += len(job_pauses)
+            counts['resolved_pause_requests'] += sum(1 for p in job_pauses if p.status != 'pending')
+
+            job_dict = job.to_dict()
+            job_dict['tracking'] = tracking.to_dict() if tracking else None
+            job_dict['ratings'] = [r.to_dict() for r in ratings[job.id]]
+            job_dict['pause_requests'] = [p.to_dict() for p in job_pauses]
+            job_dict['materials'] = [m.to_dict() for m in job.materials]
+            jobs_data.append(job_dict)
+        return jobs_data, counts
+
+    @staticmethod
+    def refresh_counts(job_ids=None, dates=None):
+        """
+        Recount the reviews whose day includes any of job_ids, or the
+        reviews of dates. Flushed with the caller's transaction, not
+        committed.
+
+        Returns:
+            int: number of reviews updated
+        """
+        if job_ids:
+            dates = select(WorkPlanDay.date).join(
+                WorkPlanJob, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+            ).where(WorkPlanJob.id.in_(job_ids)).scalar_subquery()
+        elif not dates:
+            return 0
+        reviews = db.session.query(
+            WorkPlanDailyReview.id, WorkPlanDailyReview.date, WorkPlanDailyReview.engineer_id, User.role
+        ).join(User, User.id == WorkPlanDailyReview.engineer_id).filter(
+            WorkPlanDailyReview.date.in_(dates)
+        ).all()
+        if not reviews:
+            return 0
+
+        # Counters per (day, plan creator); an admin's review sums the day
+        by_creator = defaultdict(_empty_counts)
+        review_dates = {r.date for r in reviews}
+        jobs = db.session.query(
+            WorkPlanDay.date, WorkPlan.created_by_id, WorkPlanJobTracking.status, func.count(WorkPlanJob.id)
+        ).select_from(WorkPlanJob).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).join(
+            WorkPlan, WorkPlanDay.work_plan_id == WorkPlan.id
+        ).outerjoin(
+            WorkPlanJobTracking, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
+        ).filter(
+            WorkPlanDay.date.in_(review_dates)
+        ).group_by(WorkPlanDay.date, WorkPlan.created_by_id, WorkPlanJobTracking.status)
+        for day, creator, status, count in jobs:
+            DailyReviewService._tally(by_creator[(day, creator)], status, count)
+
+        pauses = db.session.query(
+            WorkPlanDay.date, WorkPlan.created_by_id, func.count(WorkPlanPauseRequest.id),
+            func.sum(case((WorkPlanPauseRequest.status != 'pending', 1), else_=0)),
+        ).select_from(WorkPlanPauseRequest).join(
+            WorkPlanJob, WorkPlanPauseRequest.work_plan_job_id == WorkPlanJob.id
+        ).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).join(
+            WorkPlan, WorkPlanDay.work_plan_id == WorkPlan.id
+        ).filter(
+            WorkPlanDay.date.in_(review_dates)
+        ).group_by(WorkPlanDay.date, WorkPlan.created_by_id)
+        for day, creator, total, resolved in pauses:
+            by_creator[(day, creator)]['total_pause_requests'] += total
+            by_creator[(day, creator)]['resolved_pause_requests'] += resolved or 0
+
+        rows = []
+        for review in reviews:
+            if review.role == 'admin':
+                counts = _empty_counts()
+                for (day, _), creator_counts in by_creator.items():
+                    if day == review.date:
+                        for field in COUNTER_FIELDS:
+                            counts[field] += creator_counts[field]
+            else:
+                counts = by_creator.get((review.date, review.engineer_id), _empty_counts())
+            rows.append({'id': review.id, **counts})
+        db.session.execute(update(WorkPlanDailyReview), rows)
+
+        # Reviews already loaded in this session re-read their counters
+        updated = {row['id'] for row in rows}
+        for obj in list(db.session.identity_map.values()):
+            if isinstance(obj, WorkPlanDailyReview) and obj.id in updated:
+                db.session.expire(obj, list(COUNTER_FIELDS))
+        return len(rows)
+
+    @staticmethod
+    def _tally(counts, status, count):
+        counts['total_jobs'] += count
+        if status == 'completed':
+            counts['approved_jobs'] += count
+        elif status == 'incomplete':
+            counts['incomplete_jobs'] += count
+        elif status in ('pending', 'not_started'):
+            counts['not_started_jobs'] += count
@@ -157,6 +157,13 @@ class EngineerJobService:
         db.session.commit()
         logger.info("Engineer job completed: job_id=%s engineer_id=%s actual_hours=%s time_rating=%s", job_id, engineer_id, job.actual_time_hours, job.time_rating)
 
+        try:
+            from app.services.achievement_progress_service import AchievementProgressService
+            AchievementProgressService.record(engineer_id, jobs=1)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Achievement progress failed for engineer job %s: %s", job_id, e)
+
         # Auto-create quality review
         from app.services.quality_service import QualityService
         qes = User.query.filter(
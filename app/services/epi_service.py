@@ -11,10 +11,15 @@ Components:
   5. Safety Record (0-20): deductions for critical misses
 
 Calculated over rolling 30 days. Weekly snapshots stored for history.
+
+All scores are computed set-based: each component is one grouped query over
+every user of a role, so a single user's EPI and the weekly snapshot for the
+whole workforce go through the same code path and cost the same few queries.
 """
 
+from collections import defaultdict
 from datetime import date, datetime, timedelta
-from sqlalchemy import func, and_, or_
+from sqlalchemy import func, case, and_, or_, union_all, select
 from app.extensions import db
 import logging
 
@@ -24,6 +29,8 @@ logger = logging.getLogger(__name__)
 class EPIService:
     """Calculate Employee Performance Index for all roles."""
 
+    ROLES = ('inspector', 'specialist', 'engineer')
+
     # Deduction amounts for safety component
     SAFETY_DEDUCTIONS = {
         'missed_critical': 5,     # Inspector missed a critical defect
@@ -45,231 +52,318 @@ class EPIService:
                 'total_epi': float (0-100),
             }
         """
+        if role not in self.ROLES:
+            return self._empty_epi()
+        return self.calculate_role_epi(role, [user_id], days=days)[user_id]
+
+    def calculate_role_epi(self, role: str, user_ids, days: int = 30) -> dict:
+        """
+        Calculate EPI for many users of the same role in one pass.
+
+        Args:
+            role: inspector, specialist or engineer
+            user_ids: iterable of user IDs holding that role
+            days: rolling window length
+
+        Returns:
+            {user_id: epi_dict} with an entry for every requested user.
+        """
+        user_ids = list(user_ids)
+        if not user_ids or role not in self.ROLES:
+            return {uid: self._empty_epi() for uid in user_ids}
+
         start_date = date.today() - timedelta(days=days)
+        start_dt = datetime.combine(start_date, datetime.min.time())
 
         if role == 'inspector':
-            return self._calc_inspector_epi(user_id, start_date)
+            return self._batch_inspector_epi(user_ids, start_date, start_dt)
         elif role == 'specialist':
-            return self._calc_specialist_epi(user_id, start_date)
-        elif role == 'engineer':
-            return self._calc_engineer_epi(user_id, start_date)
-        else:
-            return self._empty_epi()
+            return self._batch_specialist_epi(user_ids, start_dt)
+        return self._batch_engineer_epi(user_ids, start_date, start_dt)
 
-    def _calc_inspector_epi(self, user_id: int, start_date: date) -> dict:
-        """Calculate EPI for an inspector."""
+    def _batch_inspector_epi(self, user_ids: list, start_date: date, start_dt: datetime) -> dict:
+        """Calculate EPI for a set of inspectors."""
         from app.models import Inspection, InspectionAssignment, Defect, FinalAssessment
         from app.models.inspection_list import InspectionList
-        from app.models.star_history import StarHistory
 
-        start_dt = datetime.combine(start_date, datetime.min.time())
+        in_window = InspectionAssignment.inspection_list_id.in_(
+            select(InspectionList.id).where(InspectionList.target_date >= start_date)
+        )
+
+        # Completion: % of assigned inspections completed. An inspector listed
+        # on both sides of one assignment still counts it once.
+        slots = union_all(
+            select(
+                InspectionAssignment.id.label('assignment_id'),
+                InspectionAssignment.mechanical_inspector_id.label('user_id'),
+                InspectionAssignment.status.label('status'),
+            ).where(in_window, InspectionAssignment.mechanical_inspector_id.in_(user_ids)),
+            select(
+                InspectionAssignment.id.label('assignment_id'),
+                InspectionAssignment.electrical_inspector_id.label('user_id'),
+                InspectionAssignment.status.label('status'),
+            ).where(in_window, InspectionAssignment.electrical_inspector_id.in_(user_ids)),
+        ).subquery()
+        completion_rows = db.session.query(
+            slots.c.user_id,
+            func.count(func.distinct(slots.c.assignment_id)),
+            func.count(func.distinct(case(
+                (slots.c.status.in_(('completed', 'both_complete')), slots.c.assignment_id),
+            ))),
+        ).group_by(slots.c.user_id).all()
+        completion = {
+            uid: (done / total * 20) if total else 0
+            for uid, total, done in completion_rows
+        }
 
-        # Completion: % of assigned inspections completed
-        lists = InspectionList.query.filter(InspectionList.target_date >= start_date).all()
-        list_ids = [il.id for il in lists]
-
-        total_assigned = 0
-        total_completed = 0
-        if list_ids:
-            assignments = InspectionAssignment.query.filter(
-                InspectionAssignment.inspection_list_id.in_(list_ids),
-                or_(
-                    InspectionAssignment.mechanical_inspector_id == user_id,
-                    InspectionAssignment.electrical_inspector_id == user_id
-                )
-            ).all()
-            total_assigned = len(assignments)
-            total_completed = sum(1 for a in assignments
-                                  if a.status in ('completed', 'both_complete'))
-
-        completion = (total_completed / total_assigned * 20) if total_assigned > 0 else 0
-
-        # Quality: avg star rating scaled to 20
-        avg_stars = db.session.query(
-            func.avg(StarHistory.total_stars)
-        ).filter(
-            StarHistory.user_id == user_id,
-            StarHistory.role == 'inspector',
-            StarHistory.created_at >= start_dt
-        ).scalar() or 0
-        quality = min(20, (float(avg_stars) / 5.0) * 20)
+        quality = self._batch_quality('inspector', user_ids, start_dt)
 
         # Timeliness: % of inspections in 15-20 min window
-        inspections = Inspection.query.filter(
-            Inspection.technician_id == user_id,
+        timed = defaultdict(int)
+        timely = defaultdict(int)
+        durations = db.session.query(
+            Inspection.technician_id, Inspection.started_at, Inspection.submitted_at
+        ).filter(
+            Inspection.technician_id.in_(user_ids),
             Inspection.submitted_at >= start_dt,
             Inspection.started_at.isnot(None),
             Inspection.submitted_at.isnot(None)
         ).all()
-
-        timely = 0
-        timed = 0
-        for i in inspections:
-            if i.started_at and i.submitted_at:
-                dur = (i.submitted_at - i.started_at).total_seconds() / 60
-                timed += 1
-                if 15 <= dur <= 20:
-                    timely += 1
-        timeliness = (timely / timed * 20) if timed > 0 else 0
-
-        # Contribution: defects found + safety hazards
-        defect_count = Defect.query.join(Inspection).filter(
-            Inspection.technician_id == user_id,
+        for uid, started_at, submitted_at in durations:
+            dur = (submitted_at - started_at).total_seconds() / 60
+            timed[uid] += 1
+            if 15 <= dur <= 20:
+                timely[uid] += 1
+        timeliness = {uid: timely[uid] / timed[uid] * 20 for uid in timed}
+
+        # Contribution: defects found (each defect = 2 points, max 10 defects)
+        defect_counts = dict(db.session.query(
+            Inspection.technician_id, func.count(Defect.id)
+        ).join(Inspection, Defect.inspection_id == Inspection.id).filter(
+            Inspection.technician_id.in_(user_ids),
             Defect.created_at >= start_dt
-        ).count()
-        # Cap contribution at 20 (scale: each defect = 2 points, max 10 defects)
-        contribution = min(20, defect_count * 2)
-
-        # Safety: 20 minus deductions for missed critical defects
-        # A "miss" = inspector verdict softer than system verdict on a critical item
-        safety = 20.0
-        if list_ids:
-            for a in (assignments if total_assigned > 0 else []):
-                assessment = FinalAssessment.query.filter_by(
-                    inspection_assignment_id=a.id
-                ).first()
-                if not assessment:
-                    continue
-                sys_strict = self._verdict_level(assessment.system_verdict)
-                if a.mechanical_inspector_id == user_id:
-                    user_strict = self._verdict_level(assessment.mech_verdict)
-                elif a.electrical_inspector_id == user_id:
-                    user_strict = self._verdict_level(assessment.elec_verdict)
-                else:
-                    continue
-
-                if sys_strict >= 3 and user_strict < sys_strict:  # Missed critical
-                    safety -= self.SAFETY_DEDUCTIONS['missed_critical']
-
-        safety = max(0, safety)
-
-        total = completion + quality + timeliness + contribution + safety
-        return self._build_result(completion, quality, timeliness, contribution, safety)
-
-    def _calc_specialist_epi(self, user_id: int, start_date: date) -> dict:
-        """Calculate EPI for a specialist."""
-        from app.models import SpecialistJob, QualityReview
-        from app.models.star_history import StarHistory
+        ).group_by(Inspection.technician_id).all())
+        contribution = {uid: min(20, n * 2) for uid, n in defect_counts.items()}
+
+        # Safety: 20 minus deductions for missed critical defects.
+        # A "miss" = inspector verdict softer than system verdict on a critical
+        # item, judged against the first final assessment of each assignment.
+        first_assessment = db.session.query(
+            func.min(FinalAssessment.id)
+        ).group_by(FinalAssessment.inspection_assignment_id)
+        assessed = db.session.query(
+            InspectionAssignment.mechanical_inspector_id,
+            InspectionAssignment.electrical_inspector_id,
+            FinalAssessment.system_verdict,
+            FinalAssessment.mech_verdict,
+            FinalAssessment.elec_verdict,
+        ).join(
+            FinalAssessment, FinalAssessment.inspection_assignment_id == InspectionAssignment.id
+        ).filter(
+            in_window,
+            FinalAssessment.id.in_(first_assessment),
+            or_(
+                InspectionAssignment.mechanical_inspector_id.in_(user_ids),
+                InspectionAssignment.electrical_inspector_id.in_(user_ids),
+            )
+        ).all()
+        wanted = set(user_ids)
+        misses = defaultdict(int)
+        for mech_id, elec_id, sys_verdict, mech_verdict, elec_verdict in assessed:
+            sys_strict = self._verdict_level(sys_verdict)
+            if sys_strict < 3:
+                continue
+            if mech_id in wanted and self._verdict_level(mech_verdict) < sys_strict:
+                misses[mech_id] += 1
+            if (elec_id in wanted and elec_id != mech_id
+                    and self._verdict_level(elec_verdict) < sys_strict):
+                misses[elec_id] += 1
 
-        start_dt = datetime.combine(start_date, datetime.min.time())
+        return {
+            uid: self._build_result(
+                completion.get(uid, 0),
+                quality.get(uid, 0),
+                timeliness.get(uid, 0),
+                contribution.get(uid, 0),
+                20.0 - misses[uid] * self.SAFETY_DEDUCTIONS['missed_critical'],
+            )
+            for uid in user_ids
+        }
 
-        # Completion: % of assigned jobs completed
-        jobs = SpecialistJob.query.filter(
-            SpecialistJob.specialist_id == user_id,
+    def _batch_specialist_epi(self, user_ids: list, start_dt: datetime) -> dict:
+        """Calculate EPI for a set of specialists."""
+        from app.models import SpecialistJob, QualityReview, Defect
+
+        # Completion + timeliness: one scan of the window's jobs
+        timed = and_(
+            SpecialistJob.actual_time_hours.isnot(None),
+            SpecialistJob.actual_time_hours != 0,
+            SpecialistJob.planned_time_hours.isnot(None),
+            SpecialistJob.planned_time_hours != 0,
+        )
+        job_rows = db.session.query(
+            SpecialistJob.specialist_id,
+            func.count(SpecialistJob.id),
+            func.sum(case((SpecialistJob.status.in_(('completed', 'qc_approved')), 1), else_=0)),
+            func.sum(case((timed, 1), else_=0)),
+            func.sum(case(
+                (and_(timed, SpecialistJob.actual_time_hours <= SpecialistJob.planned_time_hours), 1),
+                else_=0
+            )),
+        ).filter(
+            SpecialistJob.specialist_id.in_(user_ids),
             SpecialistJob.created_at >= start_dt
-        ).all()
-        total_jobs = len(jobs)
-        completed_jobs = sum(1 for j in jobs if j.status in ('completed', 'qc_approved'))
-        completion = (completed_jobs / total_jobs * 20) if total_jobs > 0 else 0
+        ).group_by(SpecialistJob.specialist_id).all()
 
-        # Quality: avg star rating
-        avg_stars = db.session.query(
-            func.avg(StarHistory.total_stars)
+        completion = {}
+        timeliness = {}
+        for uid, total, done, timed_count, under_time in job_rows:
+            completion[uid] = (done / total * 20) if total else 0
+            timeliness[uid] = (under_time / timed_count * 20) if timed_count else 0
+
+        quality = self._batch_quality('specialist', user_ids, start_dt)
+
+        # Contribution: additional findings (each finding = 4 pts, max 5 findings)
+        findings = dict(db.session.query(
+            Defect.found_during_repair_by, func.count(Defect.id)
         ).filter(
-            StarHistory.user_id == user_id,
-            StarHistory.role == 'specialist',
-            StarHistory.created_at >= start_dt
-        ).scalar() or 0
-        quality = min(20, (float(avg_stars) / 5.0) * 20)
-
-        # Timeliness: % of jobs under estimated time
-        timed_jobs = [j for j in jobs if j.actual_time_hours and j.planned_time_hours]
-        under_time = sum(1 for j in timed_jobs
-                         if float(j.actual_time_hours) <= float(j.planned_time_hours))
-        timeliness = (under_time / len(timed_jobs) * 20) if timed_jobs else 0
-
-        # Contribution: additional findings + discovery points
-        from app.models import Defect
-        findings = Defect.query.filter(
-            Defect.found_during_repair_by == user_id,
+            Defect.found_during_repair_by.in_(user_ids),
             Defect.created_at >= start_dt
-        ).count()
-        contribution = min(20, findings * 4)  # Each finding = 4 pts, max 5 findings
-
-        # Safety: 20 minus QE rejections
-        safety = 20.0
-        for j in jobs:
-            qe = QualityReview.query.filter_by(
-                job_id=j.id, job_type='specialist', status='rejected'
-            ).first()
-            if qe and qe.admin_validation != 'wrong':  # Real rejection
-                safety -= self.SAFETY_DEDUCTIONS['qe_rejection']
-        safety = max(0, safety)
-
-        return self._build_result(completion, quality, timeliness, contribution, safety)
-
-    def _calc_engineer_epi(self, user_id: int, start_date: date) -> dict:
-        """Calculate EPI for an engineer."""
+        ).group_by(Defect.found_during_repair_by).all())
+        contribution = {uid: min(20, n * 4) for uid, n in findings.items()}
+
+        # Safety: 20 minus QE rejections. Each job counts its first rejection,
+        # unless an admin later validated that rejection as wrong.
+        first_rejection = db.session.query(
+            func.min(QualityReview.id)
+        ).filter(
+            QualityReview.job_type == 'specialist',
+            QualityReview.status == 'rejected'
+        ).group_by(QualityReview.job_id)
+        rejections = dict(db.session.query(
+            SpecialistJob.specialist_id, func.count(QualityReview.id)
+        ).join(
+            QualityReview, QualityReview.job_id == SpecialistJob.id
+        ).filter(
+            SpecialistJob.specialist_id.in_(user_ids),
+            SpecialistJob.created_at >= start_dt,
+            QualityReview.id.in_(first_rejection),
+            or_(QualityReview.admin_validation.is_(None), QualityReview.admin_validation != 'wrong')
+        ).group_by(SpecialistJob.specialist_id).all())
+
+        return {
+            uid: self._build_result(
+                completion.get(uid, 0),
+                quality.get(uid, 0),
+                timeliness.get(uid, 0),
+                contribution.get(uid, 0),
+                20.0 - rejections.get(uid, 0) * self.SAFETY_DEDUCTIONS['qe_rejection'],
+            )
+            for uid in user_ids
+        }
+
+    def _batch_engineer_epi(self, user_ids: list, start_date: date, start_dt: datetime) -> dict:
+        """Calculate EPI for a set of engineers."""
         from app.models import WorkPlanJob, FinalAssessment
+        from app.models.work_plan import WorkPlan
         from app.models.work_plan_day import WorkPlanDay
         from app.models.work_plan_daily_review import WorkPlanDailyReview
-        from app.models.star_history import StarHistory
-
-        start_dt = datetime.combine(start_date, datetime.min.time())
+        from app.models.work_plan_job_tracking import WorkPlanJobTracking
 
         # Completion: % of work plan jobs completed
-        days = WorkPlanDay.query.filter(WorkPlanDay.plan_date >= start_date).all()
-        day_ids = [d.id for d in days]
-
-        total_jobs = 0
-        completed_jobs = 0
-        equipment_ids = set()
-        if day_ids:
-            jobs = WorkPlanJob.query.filter(
-                WorkPlanJob.day_id.in_(day_ids),
-                WorkPlanJob.engineer_id == user_id
-            ).all()
-            total_jobs = len(jobs)
-            completed_jobs = sum(1 for j in jobs if j.status in ('completed', 'verified'))
-            equipment_ids = set(j.equipment_id for j in jobs if j.equipment_id)
-
-        completion = (completed_jobs / total_jobs * 20) if total_jobs > 0 else 0
-
-        # Quality: avg star rating
-        avg_stars = db.session.query(
-            func.avg(StarHistory.total_stars)
+        job_rows = db.session.query(
+            WorkPlanJob.engineer_id,
+            func.count(WorkPlanJob.id),
+            func.sum(case((WorkPlanJobTracking.status == 'completed', 1), else_=0)),
+        ).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).outerjoin(
+            WorkPlanJobTracking, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
         ).filter(
-            StarHistory.user_id == user_id,
-            StarHistory.role == 'engineer',
-            StarHistory.created_at >= start_dt
-        ).scalar() or 0
-        quality = min(20, (float(avg_stars) / 5.0) * 20)
+            WorkPlanJob.engineer_id.in_(user_ids),
+            WorkPlanDay.date >= start_date
+        ).group_by(WorkPlanJob.engineer_id).all()
+        completion = {
+            uid: (done / total * 20) if total else 0
+            for uid, total, done in job_rows
+        }
+
+        quality = self._batch_quality('engineer', user_ids, start_dt)
 
         # Timeliness: % of reviews done same-day
-        reviews = WorkPlanDailyReview.query.filter(
-            WorkPlanDailyReview.reviewer_id == user_id,
+        reviewed = defaultdict(int)
+        same_day = defaultdict(int)
+        reviews = db.session.query(
+            WorkPlanDailyReview.engineer_id,
+            WorkPlanDailyReview.created_at,
+            WorkPlanDailyReview.date,
+        ).filter(
+            WorkPlanDailyReview.engineer_id.in_(user_ids),
             WorkPlanDailyReview.created_at >= start_dt
         ).all()
-        same_day = sum(1 for r in reviews
-                       if r.created_at and r.review_date
-                       and r.created_at.date() == r.review_date)
-        timeliness = (same_day / len(reviews) * 20) if reviews else 0
-
-        # Contribution: plans published + escalations resolved
-        from app.models.work_plan import WorkPlan
-        plans_published = WorkPlan.query.filter(
-            WorkPlan.created_by_id == user_id,
+        for uid, created_at, review_date in reviews:
+            reviewed[uid] += 1
+            if created_at and review_date and created_at.date() == review_date:
+                same_day[uid] += 1
+        timeliness = {uid: same_day[uid] / reviewed[uid] * 20 for uid in reviewed}
+
+        # Contribution: plans published (each plan = 5 pts)
+        plans = dict(db.session.query(
+            WorkPlan.created_by_id, func.count(WorkPlan.id)
+        ).filter(
+            WorkPlan.created_by_id.in_(user_ids),
             WorkPlan.status == 'published',
             WorkPlan.created_at >= start_dt
-        ).count()
-        contribution = min(20, plans_published * 5)  # Each plan = 5 pts
-
-        # Safety: 20 minus stop machines
-        safety = 20.0
-        if equipment_ids:
-            stop_count = FinalAssessment.query.filter(
-                FinalAssessment.equipment_id.in_(list(equipment_ids)),
-                FinalAssessment.created_at >= start_dt,
-                or_(
-                    FinalAssessment.system_verdict == 'stop',
-                    FinalAssessment.mech_verdict == 'stop',
-                    FinalAssessment.elec_verdict == 'stop',
-                )
-            ).count()
-            safety -= stop_count * self.SAFETY_DEDUCTIONS['stop_machine']
-        safety = max(0, safety)
-
-        return self._build_result(completion, quality, timeliness, contribution, safety)
+        ).group_by(WorkPlan.created_by_id).all())
+        contribution = {uid: min(20, n * 5) for uid, n in plans.items()}
+
+        # Safety: 20 minus stop machines on the engineer's equipment
+        engineer_equipment = db.session.query(
+            WorkPlanJob.engineer_id.label('engineer_id'),
+            WorkPlanJob.equipment_id.label('equipment_id'),
+        ).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).filter(
+            WorkPlanJob.engineer_id.in_(user_ids),
+            WorkPlanJob.equipment_id.isnot(None),
+            WorkPlanDay.date >= start_date
+        ).distinct().subquery()
+        stops = dict(db.session.query(
+            engineer_equipment.c.engineer_id, func.count(FinalAssessment.id)
+        ).join(
+            FinalAssessment, FinalAssessment.equipment_id == engineer_equipment.c.equipment_id
+        ).filter(
+            FinalAssessment.created_at >= start_dt,
+            or_(
+                FinalAssessment.system_verdict == 'stop',
+                FinalAssessment.mech_verdict == 'stop',
+                FinalAssessment.elec_verdict == 'stop',
+            )
+        ).group_by(engineer_equipment.c.engineer_id).all())
+
+        return {
+            uid: self._build_result(
+                completion.get(uid, 0),
+                quality.get(uid, 0),
+                timeliness.get(uid, 0),
+                contribution.get(uid, 0),
+                20.0 - stops.get(uid, 0) * self.SAFETY_DEDUCTIONS['stop_machine'],
+            )
+            for uid in user_ids
+        }
+
+    def _batch_quality(self, role: str, user_ids: list, start_dt: datetime) -> dict:
+        """Quality component: avg star rating scaled to 20, per user."""
+        from app.models.star_history import StarHistory
+
+        rows = db.session.query(
+            StarHistory.user_id, func.avg(StarHistory.total_stars)
+        ).filter(
+            StarHistory.user_id.in_(user_ids),
+            StarHistory.role == role,
+            StarHistory.created_at >= start_dt
+        ).group_by(StarHistory.user_id).all()
+        return {uid: min(20, (float(avg or 0) / 5.0) * 20) for uid, avg in rows}
 
     # ───────────────────────── Snapshots ─────────────────────────
 
@@ -285,45 +379,48 @@ class EPIService:
         week_start = today - timedelta(days=today.weekday())  # Monday
         week_end = week_start + timedelta(days=6)  # Sunday
 
-        users = User.query.filter_by(is_active=True).all()
-        count = 0
-
-        for user in users:
-            role = user.role
-            if role not in ('inspector', 'specialist', 'engineer'):
-                continue
+        # Skip users that already have a snapshot for this week
+        existing = select(EPISnapshot.user_id).where(EPISnapshot.week_start == week_start)
+        users = db.session.query(User.id, User.role).filter(
+            User.is_active.is_(True),
+            User.role.in_(self.ROLES),
+            User.id.notin_(existing)
+        ).all()
 
-            # Skip if snapshot already exists for this week
-            existing = EPISnapshot.query.filter_by(
-                user_id=user.id,
-                week_start=week_start
-            ).first()
-            if existing:
-                continue
+        by_role = defaultdict(list)
+        for user_id, role in users:
+            by_role[role].append(user_id)
 
+        now = datetime.utcnow()
+        rows = []
+        for role, user_ids in by_role.items():
             try:
-                epi = self.calculate_epi(user.id, role, days=7)
-
-                snapshot = EPISnapshot(
-                    user_id=user.id,
-                    role=role,
-                    week_start=week_start,
-                    week_end=week_end,
-                    completion_score=epi['completion'],
-                    quality_score=epi['quality'],
-                    timeliness_score=epi['timeliness'],
-                    contribution_score=epi['contribution'],
-                    safety_score=epi['safety'],
-                    total_epi=epi['total_epi'],
-                    created_at=datetime.utcnow()
-                )
-                db.session.add(snapshot)
-                count += 1
+                scores = self.calculate_role_epi(role, user_ids, days=7)
             except Exception as e:
-                logger.warning(f"EPI snapshot failed for user {user.id}: {e}")
+                logger.warning(f"EPI snapshot failed for role {role}: {e}")
+                db.session.rollback()
+                continue
 
+            for user_id in user_ids:
+                epi = scores[user_id]
+                rows.append({
+                    'user_id': user_id,
+                    'role': role,
+                    'week_start': week_start,
+                    'week_end': week_end,
+                    'completion_score': epi['completion'],
+                    'quality_score': epi['quality'],
+                    'timeliness_score': epi['timeliness'],
+                    'contribution_score': epi['contribution'],
+                    'safety_score': epi['safety'],
+                    'total_epi': epi['total_epi'],
+                    'created_at': now,
+                })
+
+        if rows:
+            db.session.execute(EPISnapshot.__table__.insert(), rows)
         db.session.commit()
-        return count
+        return len(rows)
 
     # ───────────────────────── Helpers ─────────────────────────
 
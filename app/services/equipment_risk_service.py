@@ -0,0 +1,268 @@
+"""
+Equipment inspection risk snapshots.
+
+Risk (days since the last reviewed inspection, 90-day defects, criticality,
+90-day fail rate) and coverage gaps (overdue for the criticality's
+recommended frequency, or not scheduled this week) used to be scored per
+equipment on every scheduling AI request. refresh() computes them for any
+number of equipment with one grouped query per input and stores one
+EquipmentRiskSnapshot row each. Inspection submission and review refresh
+the equipment they touched; an hourly job refreshes everything so the
+day counts advance. Readers sort, limit and count the rows in SQL.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func
+
+from app.extensions import db
+from app.models.defect import Defect
+from app.models.equipment import Equipment
+from app.models.equipment_risk_snapshot import EquipmentRiskSnapshot
+from app.models.inspection import Inspection
+from app.models.inspection_assignment import InspectionAssignment
+from app.models.inspection_list import InspectionList
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ('active', 'under_maintenance')
+WINDOW_DAYS = 90
+# Risk assumes this many days for equipment never inspected; coverage reports 999
+NEVER_INSPECTED_RISK_DAYS = 365
+NEVER_INSPECTED_COVERAGE_DAYS = 999
+
+CRITICALITY_SCORES = {'critical': 100, 'high': 75, 'medium': 50, 'low': 25}
+RECOMMENDED_DAYS = {'critical': 3, 'high': 7, 'medium': 14, 'low': 30}
+PRIORITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+def score_risk(days_since, defect_count, criticality, inspections, failed):
+    """
+    Weighted risk score (0-100), its level and the factor breakdown.
+
+    days_since is None for equipment never inspected; without inspections
+    in the window the fail rate is taken as 50%.
+    """
+    days = NEVER_INSPECTED_RISK_DAYS if days_since is None else days_since
+    fail_rate = failed / inspections * 100 if inspections else 50
+    factors = [
+        ('days_since_inspection', 0.35, min(100, days / 30 * 100), f'{days} days since last inspection'),
+        ('defect_history', 0.25, min(100, defect_count * 20), f'{defect_count} defects in last {WINDOW_DAYS} days'),
+        ('criticality', 0.25, CRITICALITY_SCORES.get(criticality, 50), f'Criticality level: {criticality}'),
+        ('fail_rate', 0.15, fail_rate, f'{fail_rate:.0f}% failure rate'),
+    ]
+    total = sum(weight * score for _, weight, score, _ in factors)
+    if total >= 75:
+        level = 'critical'
+    elif total >= 50:
+        level = 'high'
+    elif total >= 25:
+        level = 'medium'
+    else:
+        level = 'low'
+    return round(total, 1), level, [
+        {
+            'name': name,
+            'description': description,
+            'weight': weight,
+            'score': round(score, 1),
+            'weighted_score': round(score * weight, 1),
+        }
+        for name, weight, score, description in factors
+    ]
+
+
+def coverage_priority(days_since, criticality, scheduled_this_week):
+    """Gap priority for the equipment, or None when its coverage is fine."""
+    days = NEVER_INSPECTED_COVERAGE_DAYS if days_since is None else days_since
+    recommended = RECOMMENDED_DAYS.get(criticality, 14)
+    if days > recommended * 2:
+        return 'critical'
+    if days > recommended:
+        return 'high'
+    if not scheduled_this_week and days > 7:
+        return 'medium'
+    return None
+
+
+class EquipmentRiskService:
+    """Maintains EquipmentRiskSnapshot rows and serves the scheduling AI views."""
+
+    @staticmethod
+    def refresh(equipment_ids=None, now=None):
+        """
+        Recompute risk and coverage from inspections, defects and this
+        week's inspection lists. Flushed with the caller's transaction, not
+        committed.
+
+        Args:
+            equipment_ids: Equipment to refresh (default: all not scrapped)
+            now: Reference time (default: utcnow)
+
+        Returns:
+            int: number of snapshots written
+        """
+        now = now or datetime.utcnow()
+        equipment = db.session.query(Equipment.id, Equipment.criticality_level).filter(
+            Equipment.is_scrapped.is_(False))
+        if equipment_ids is not None:
+            ids = list(set(equipment_ids))
+            if not ids:
+                return 0
+            equipment = equipment.filter(Equipment.id.in_(ids))
+        equipment = equipment.all()
+        if not equipment:
+            return 0
+        scope = [eq_id for eq_id, _ in equipment] if equipment_ids is not None else None
+
+        def scoped(query, column):
+            return query.filter(column.in_(scope)) if scope is not None else query
+
+        window_start = now - timedelta(days=WINDOW_DAYS)
+        in_window = Inspection.submitted_at >= window_start
+        inspections = {
+            row.equipment_id: row
+            for row in scoped(db.session.query(
+                Inspection.equipment_id,
+                func.max(Inspection.submitted_at).label('last_at'),
+                func.coalesce(func.sum(case((in_window, 1), else_=0)), 0).label('recent'),
+                func.coalesce(func.sum(case(((in_window & (Inspection.result == 'fail')), 1), else_=0)), 0).label('failed'),
+            ).filter(Inspection.status == 'reviewed'), Inspection.equipment_id).group_by(Inspection.equipment_id)
+        }
+        defects = dict(scoped(db.session.query(
+            Inspection.equipment_id, func.count(Defect.id)
+        ).join(Inspection, Defect.inspection_id == Inspection.id).filter(
+            Defect.created_at >= window_start
+        ), Inspection.equipment_id).group_by(Inspection.equipment_id).all())
+
+        today = now.date()
+        week_start = today - timedelta(days=today.weekday())
+        scheduled = {
+            eq_id for eq_id, in scoped(db.session.query(InspectionAssignment.equipment_id).join(
+                InspectionList, InspectionAssignment.inspection_list_id == InspectionList.id
+            ).filter(
+                InspectionList.target_date >= week_start,
+                InspectionList.target_date <= week_start + timedelta(days=6),
+            ), InspectionAssignment.equipment_id).distinct()
+        }
+
+        existing = {s.equipment_id: s for s in scoped(EquipmentRiskSnapshot.query, EquipmentRiskSnapshot.equipment_id)}
+        for eq_id, criticality in equipment:
+            criticality = criticality or 'medium'
+            row = inspections.get(eq_id)
+            last_at = row.last_at if row else None
+            days_since = (now - last_at).days if last_at else None
+            recent, failed = (row.recent, row.failed) if row else (0, 0)
+            defect_count = defects.get(eq_id, 0)
+            score, level, factors = score_risk(days_since, defect_count, criticality, recent, failed)
+
+            snapshot = existing.get(eq_id)
+            if snapshot is None:
+                snapshot = EquipmentRiskSnapshot(equipment_id=eq_id)
+                db.session.add(snapshot)
+            snapshot.last_inspection_at = last_at
+            snapshot.days_since_inspection = days_since
+            snapshot.defects_90d = defect_count
+            snapshot.inspections_90d = recent
+            snapshot.failed_inspections_90d = failed
+            snapshot.criticality = criticality
+            snapshot.risk_score = score
+            snapshot.risk_level = level
+            snapshot.factors = factors
+            snapshot.recommended_days = RECOMMENDED_DAYS.get(criticality, 14)
+            snapshot.scheduled_this_week = eq_id in scheduled
+            snapshot.coverage_priority = coverage_priority(days_since, criticality, eq_id in scheduled)
+            snapshot.refreshed_at = now
+
+        db.session.flush()
+        return len(equipment)
+
+    @staticmethod
+    def ensure_snapshots():
+        """Create snapshots for equipment that has none yet (commits if any)."""
+        missing = [
+            eq_id for eq_id, in db.session.query(Equipment.id).outerjoin(
+                EquipmentRiskSnapshot, EquipmentRiskSnapshot.equipment_id == Equipment.id
+            ).filter(Equipment.is_scrapped.is_(False), EquipmentRiskSnapshot.id.is_(None))
+        ]
+        if missing:
+            EquipmentRiskService.refresh(missing)
+            db.session.commit()
+        return len(missing)
+
+    @staticmethod
+    def _active_query():
+        return db.session.query(Equipment, EquipmentRiskSnapshot).join(
+            EquipmentRiskSnapshot, EquipmentRiskSnapshot.equipment_id == Equipment.id
+        ).filter(Equipment.status.in_(ACTIVE_STATUSES), Equipment.is_scrapped.is_(False))
+
+    @staticmethod
+    def risk_scores(limit=None):
+        """Active equipment by risk score, highest first."""
+        query = EquipmentRiskService._active_query().order_by(
+            EquipmentRiskSnapshot.risk_score.desc(), Equipment.id)
+        if limit:
+            query = query.limit(limit)
+        return [EquipmentRiskService.risk_payload(eq, snap) for eq, snap in query]
+
+    @staticmethod
+    def _gaps_query(priority=None):
+        query = EquipmentRiskService._active_query().filter(EquipmentRiskSnapshot.coverage_priority.isnot(None))
+        if priority:
+            query = query.filter(EquipmentRiskSnapshot.coverage_priority == priority)
+        return query
+
+    @staticmethod
+    def coverage_gaps(limit=None, priority=None):
+        """Active equipment with a coverage gap, most urgent and longest uncovered first."""
+        rank = case(PRIORITY_ORDER, value=EquipmentRiskSnapshot.coverage_priority, else_=len(PRIORITY_ORDER))
+        days = func.coalesce(EquipmentRiskSnapshot.days_since_inspection, NEVER_INSPECTED_COVERAGE_DAYS)
+        query = EquipmentRiskService._gaps_query(priority).order_by(rank, days.desc(), Equipment.id)
+        if limit:
+            query = query.limit(limit)
+        return [EquipmentRiskService.coverage_payload(eq, snap) for eq, snap in query]
+
+    @staticmethod
+    def count_coverage_gaps(priority=None):
+        return EquipmentRiskService._gaps_query(priority).with_entities(
+            func.count(EquipmentRiskSnapshot.id)).scalar()
+
+    @staticmethod
+    def risk_payload(equipment, snapshot):
+        """Shape a snapshot like calculate_equipment_risk_scores has always returned it."""
+        days = snapshot.days_since_inspection
+        return {
+            'equipment_id': equipment.id,
+            'equipment_name': equipment.name,
+            'serial_number': equipment.serial_number,
+            'equipment_type': equipment.equipment_type,
+            'berth': equipment.berth,
+            'risk_score': snapshot.risk_score,
+            'risk_level': snapshot.risk_level,
+            'factors': snapshot.factors or [],
+            'days_since_inspection': NEVER_INSPECTED_RISK_DAYS if days is None else days,
+            'defect_count_90d': snapshot.defects_90d,
+            'calculated_at': snapshot.refreshed_at.isoformat() if snapshot.refreshed_at else None,
+        }
+
+    @staticmethod
+    def coverage_payload(equipment, snapshot):
+        """Shape a snapshot like get_coverage_gaps has always returned it."""
+        days = snapshot.days_since_inspection
+        days = NEVER_INSPECTED_COVERAGE_DAYS if days is None else days
+        return {
+            'equipment_id': equipment.id,
+            'equipment_name': equipment.name,
+            'serial_number': equipment.serial_number,
+            'equipment_type': equipment.equipment_type,
+            'berth': equipment.berth,
+            'days_uncovered': days,
+            'recommended_frequency_days': snapshot.recommended_days,
+            'is_scheduled_this_week': snapshot.scheduled_this_week,
+            'is_overdue': days > snapshot.recommended_days,
+            'priority': snapshot.coverage_priority,
+            'criticality': snapshot.criticality,
+            'last_inspection_date': snapshot.last_inspection_at.isoformat() if snapshot.last_inspection_at else None,
+            'reason': 'Never inspected' if days >= NEVER_INSPECTED_COVERAGE_DAYS else f'{days} days since last inspection',
+        }
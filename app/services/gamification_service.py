@@ -6,7 +6,7 @@ Provides gamification mechanics for the inspection system.
 from datetime import datetime, timedelta, date
 from sqlalchemy import func, and_, or_
 from app.extensions import db
-from app.models import User, Inspection, EngineerJob, SpecialistJob, Defect
+from app.models import User
 from app.models.achievement import Achievement
 from app.models.user_achievement import UserAchievement
 from app.models.challenge import Challenge
@@ -14,6 +14,7 @@ from app.models.user_challenge import UserChallenge
 from app.models.user_streak import UserStreak
 from app.models.user_level import UserLevel
 from app.models.point_history import PointHistory
+from app.services.achievement_progress_service import AchievementProgressService
 import logging
 import random
 import string
@@ -66,24 +67,14 @@ class GamificationService:
         user_level = UserLevel.query.filter_by(user_id=user_id).first()
         user_streak = UserStreak.query.filter_by(user_id=user_id).first()
 
-        # Count totals
-        inspection_count = Inspection.query.filter_by(
-            technician_id=user_id, status='completed'
-        ).count()
-
-        job_count = SpecialistJob.query.filter_by(
-            specialist_id=user_id, status='completed'
-        ).count() + EngineerJob.query.filter_by(
-            engineer_id=user_id, status='completed'
-        ).count()
-
-        defect_count = Defect.query.join(Inspection).filter(Inspection.technician_id == user_id).count()
+        # Running totals (maintained by AchievementProgressService)
+        counts = AchievementProgressService.get_counts(user_id)
 
         # Build current stats dict
         stats = {
-            'inspections': inspection_count,
-            'jobs': job_count,
-            'defects': defect_count,
+            'inspections': counts['inspections'],
+            'jobs': counts['jobs'],
+            'defects': counts['defects'],
             'streak': user_streak.current_streak if user_streak else 0,
             'level': user_level.level if user_level else 1,
             'points': user.total_points or 0,
@@ -186,22 +177,12 @@ class GamificationService:
         user_level = UserLevel.query.filter_by(user_id=user_id).first()
         user_streak = UserStreak.query.filter_by(user_id=user_id).first()
 
-        inspection_count = Inspection.query.filter_by(
-            technician_id=user_id, status='completed'
-        ).count()
-
-        job_count = SpecialistJob.query.filter_by(
-            specialist_id=user_id, status='completed'
-        ).count() + EngineerJob.query.filter_by(
-            engineer_id=user_id, status='completed'
-        ).count()
-
-        defect_count = Defect.query.join(Inspection).filter(Inspection.technician_id == user_id).count()
+        counts = AchievementProgressService.get_counts(user_id)
 
         stats = {
-            'inspections': inspection_count,
-            'jobs': job_count,
-            'defects': defect_count,
+            'inspections': counts['inspections'],
+            'jobs': counts['jobs'],
+            'defects': counts['defects'],
             'streak': user_streak.current_streak if user_streak else 0,
             'level': user_level.level if user_level else 1,
             'points': user.total_points or 0,
@@ -643,52 +624,11 @@ class GamificationService:
 
     def update_achievement_progress(self):
         """
-        Update progress for all users on count-based achievements.
-        Called by scheduler periodically.
+        Reconcile achievement counters with history and update progress.
+        Called by scheduler periodically; day to day, progress is driven by
+        events through AchievementProgressService.
         """
-        # Get all active count-based achievements
-        achievements = Achievement.query.filter(
-            Achievement.is_active == True,
-            Achievement.criteria_type == 'count'
-        ).all()
-
-        updated_count = 0
-
-        for achievement in achievements:
-            # Get all user achievements that track this
-            user_achievements = UserAchievement.query.filter(
-                UserAchievement.achievement_id == achievement.id,
-                UserAchievement.earned_at.is_(None)  # Not yet fully earned
-            ).all()
-
-            for ua in user_achievements:
-                # Calculate current progress based on criteria_field
-                current = 0
-                if achievement.criteria_field == 'inspections':
-                    current = Inspection.query.filter_by(
-                        technician_id=ua.user_id, status='completed'
-                    ).count()
-                elif achievement.criteria_field == 'jobs':
-                    current = SpecialistJob.query.filter_by(
-                        specialist_id=ua.user_id, status='completed'
-                    ).count() + EngineerJob.query.filter_by(
-                        engineer_id=ua.user_id, status='completed'
-                    ).count()
-                elif achievement.criteria_field == 'defects':
-                    current = Defect.query.join(Inspection).filter(Inspection.technician_id == ua.user_id).count()
-
-                if current != ua.progress:
-                    ua.progress = current
-                    updated_count += 1
-
-                    # Check if now complete
-                    if current >= (achievement.criteria_target or 0):
-                        ua.earned_at = datetime.utcnow()
-
-        db.session.commit()
-        logger.info(f"Updated progress for {updated_count} user achievements")
-
-        return updated_count
+        return AchievementProgressService.reconcile()
 
     def get_challenge_leaderboard(self, challenge_id: int) -> list:
         """
@@ -244,6 +244,10 @@ class InspectionListService:
         shift_start = datetime.combine(assignment.inspection_list.target_date, datetime.min.time().replace(hour=start_hour))
         deadline = shift_start + timedelta(hours=30)
 
+        # Workload ledger recounts the previous team too, on reassignment
+        touched = {assignment.mechanical_inspector_id, assignment.electrical_inspector_id,
+                   mechanical_inspector_id, electrical_inspector_id}
+
         # Assign
         assignment.mechanical_inspector_id = mechanical_inspector_id
         assignment.electrical_inspector_id = electrical_inspector_id
@@ -294,6 +298,9 @@ class InspectionListService:
         else:
             il.status = 'partially_assigned'
 
+        from app.services.inspector_workload_service import InspectorWorkloadService
+        InspectorWorkloadService.refresh(touched)
+
         db.session.commit()
 
         # Send notifications
@@ -319,8 +326,9 @@ class InspectionListService:
             import logging
             logging.getLogger(__name__).warning(f'Work plan auto-sync failed: {e}')
 
-        # Attach auto-assigned count for API response (not persisted)
+        # Attach auto-assigned count and the team's fatigue for API response (not persisted)
         assignment._auto_assigned_count = len(auto_assigned)
+        assignment._fatigue = InspectorWorkloadService.fatigue([mechanical_inspector_id, electrical_inspector_id])
         return assignment
 
     @staticmethod
@@ -343,6 +351,8 @@ class InspectionListService:
         if existing_inspection and existing_inspection.status in ('submitted', 'reviewed'):
             raise ValidationError("Cannot unassign — inspection already submitted")
 
+        touched = {assignment.mechanical_inspector_id, assignment.electrical_inspector_id}
+
         # Reset assignment fields
         assignment.mechanical_inspector_id = None
         assignment.electrical_inspector_id = None
@@ -365,6 +375,9 @@ class InspectionListService:
         else:
             il.status = 'partially_assigned'
 
+        from app.services.inspector_workload_service import InspectorWorkloadService
+        InspectorWorkloadService.refresh(touched)
+
         db.session.commit()
         return assignment
 
@@ -511,5 +524,8 @@ class InspectionListService:
         elif assignment.elec_completed_at:
             assignment.status = 'elec_complete'
 
+        from app.services.inspector_workload_service import InspectorWorkloadService
+        InspectorWorkloadService.refresh([inspector_id])
+
         db.session.commit()
         return assignment
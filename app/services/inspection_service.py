@@ -420,13 +420,17 @@ class InspectionService:
         inspector_category = InspectionService._get_inspector_category(inspection)
         failed_answers = InspectionService._get_failed_answers(inspection_id, inspector_category)
         
+        new_defects = 0
         for answer in failed_answers:
             # Auto-create defect for each failure
-            DefectService.create_defect_from_failure(
+            defect = DefectService.create_defect_from_failure(
                 inspection_id=inspection_id,
                 checklist_item_id=answer.checklist_item_id,
                 technician_id=inspection.technician_id
             )
+            # Recurring failures return the existing defect from an earlier inspection
+            if defect is not None and defect.inspection_id == inspection_id:
+                new_defects += 1
         
         # Update inspection status
         inspection.status = 'submitted'
@@ -444,11 +448,27 @@ class InspectionService:
             except Exception as e:
                 logger.warning("Could not update assignment status: %s", e)
 
+        # Submitted running-hours answers become readings
+        from app.services.running_hours_snapshot_service import RunningHoursSnapshotService
+        RunningHoursSnapshotService.refresh([inspection.equipment_id])
+
+        # New defects change the equipment's scheduling risk
+        from app.services.equipment_risk_service import EquipmentRiskService
+        EquipmentRiskService.refresh([inspection.equipment_id])
+
         db.session.commit()
         
         # Update weekly completion tracking
         from app.services.schedule_service import ScheduleService
         ScheduleService.update_completion(inspection.id)
+
+        # Achievement progress
+        try:
+            from app.services.achievement_progress_service import AchievementProgressService
+            AchievementProgressService.record(inspection.technician_id, inspections=1, defects=new_defects)
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Achievement progress failed for inspection %s: %s", inspection.id, e)
         
         # Create notification for admin (NEW - ADD THIS)
         from app.services.notification_service import NotificationService
@@ -668,6 +688,9 @@ class InspectionService:
         inspection.reviewed_by_id = int(reviewer_id)
         if notes:
             inspection.notes = notes
+
+        from app.services.equipment_risk_service import EquipmentRiskService
+        EquipmentRiskService.refresh([inspection.equipment_id])
         
         db.session.commit()
         logger.info("Inspection reviewed: inspection_id=%s reviewer_id=%s", inspection.id, reviewer_id)
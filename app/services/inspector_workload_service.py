@@ -0,0 +1,171 @@
+"""
+Inspector workload ledger and fatigue scores.
+
+InspectorWorkload rows (see the model) are recounted for the inspectors an
+assignment change touches: assigning or reassigning a team, unassigning it,
+and an inspector completing their part. Each recount reads those
+inspectors' assignments of the last LEDGER_DAYS days with one query, so
+the ledger stays correct whatever the change was. A nightly job recounts
+everyone and prunes old rows.
+
+Fatigue over the last WINDOW_DAYS days is one grouped SUM over the ledger,
+cheap enough to check on every assignment decision.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, or_
+
+from app.extensions import db
+from app.models.inspection_assignment import InspectionAssignment
+from app.models.inspector_workload import InspectorWorkload
+
+logger = logging.getLogger(__name__)
+
+# Estimated hours per inspection assignment
+HOURS_PER_ASSIGNMENT = 2.0
+WINDOW_DAYS = 7
+# Days recounted on every change; must cover the fatigue window
+LEDGER_DAYS = 14
+RETENTION_DAYS = 90
+# Fatigue scores from this value on are reported
+REPORT_THRESHOLD = 50
+
+
+def fatigue_score(assignments, hours, worked_days):
+    """
+    Fatigue score (0-100) from a window's workload: 40 hours give 50
+    points, 7 worked days 30 and 10 assignments 20.
+    """
+    hours_factor = min(50, hours / 40 * 50)
+    days_factor = min(30, worked_days / 7 * 30)
+    intensity_factor = min(20, assignments / 10 * 20)
+    return hours_factor + days_factor + intensity_factor
+
+
+def risk_level(score):
+    if score >= 80:
+        return 'critical'
+    if score >= 65:
+        return 'high'
+    if score >= REPORT_THRESHOLD:
+        return 'medium'
+    return 'low'
+
+
+class InspectorWorkloadService:
+    """Maintains the workload ledger and reads fatigue from it."""
+
+    @staticmethod
+    def refresh(user_ids=None, today=None):
+        """
+        Recount the ledger's last LEDGER_DAYS days from assignments.
+        Flushed with the caller's transaction, not committed.
+
+        Args:
+            user_ids: Inspectors to recount (default: everyone)
+            today: Last ledger day (default: today, UTC)
+
+        Returns:
+            int: number of ledger rows written
+        """
+        if user_ids is not None:
+            user_ids = {u for u in user_ids if u}
+            if not user_ids:
+                return 0
+        start = (today or datetime.utcnow().date()) - timedelta(days=LEDGER_DAYS - 1)
+        start_at = datetime.combine(start, datetime.min.time())
+
+        query = db.session.query(
+            InspectionAssignment.mechanical_inspector_id, InspectionAssignment.electrical_inspector_id,
+            InspectionAssignment.assigned_at, InspectionAssignment.mech_completed_at,
+            InspectionAssignment.elec_completed_at,
+        ).filter(InspectionAssignment.assigned_at >= start_at)
+        if user_ids is not None:
+            query = query.filter(or_(
+                InspectionAssignment.mechanical_inspector_id.in_(user_ids),
+                InspectionAssignment.electrical_inspector_id.in_(user_ids),
+            ))
+
+        counts = defaultdict(lambda: [0, 0])
+        for mech_id, elec_id, assigned_at, mech_done, elec_done in query:
+            parts = ((mech_id, mech_done or elec_done),) if mech_id == elec_id else (
+                (mech_id, mech_done), (elec_id, elec_done))
+            for user_id, done in parts:
+                if user_id and (user_ids is None or user_id in user_ids):
+                    entry = counts[(user_id, assigned_at.date())]
+                    entry[0] += 1
+                    entry[1] += 1 if done else 0
+
+        existing = InspectorWorkload.query.filter(InspectorWorkload.day >= start)
+        if user_ids is not None:
+            existing = existing.filter(InspectorWorkload.user_id.in_(user_ids))
+        existing = {(row.user_id, row.day): row for row in existing}
+
+        for key, row in existing.items():
+            if key not in counts:
+                db.session.delete(row)
+        for (user_id, day), (assignments, completed) in counts.items():
+            row = existing.get((user_id, day))
+            if row is None:
+                row = InspectorWorkload(user_id=user_id, day=day)
+                db.session.add(row)
+            row.assignments = assignments
+            row.completed = completed
+            row.estimated_hours = assignments * HOURS_PER_ASSIGNMENT
+
+        db.session.flush()
+        return len(counts)
+
+    @staticmethod
+    def prune(keep_days=RETENTION_DAYS):
+        """Delete ledger rows older than keep_days (not committed)."""
+        cutoff = datetime.utcnow().date() - timedelta(days=keep_days)
+        return InspectorWorkload.query.filter(InspectorWorkload.day < cutoff).delete(synchronize_session=False)
+
+    @staticmethod
+    def window_query(today=None):
+        """(user_id, assignments, completed, hours, worked_days) over the fatigue window."""
+        start = (today or datetime.utcnow().date()) - timedelta(days=WINDOW_DAYS - 1)
+        W = InspectorWorkload
+        return db.session.query(
+            W.user_id,
+            func.sum(W.assignments).label('assignments'),
+            func.sum(W.completed).label('completed'),
+            func.sum(W.estimated_hours).label('hours'),
+            func.sum(case((W.assignments > 0, 1), else_=0)).label('worked_days'),
+        ).filter(W.day >= start).group_by(W.user_id)
+
+    @staticmethod
+    def fatigue(user_ids, today=None):
+        """
+        Fatigue of the given inspectors over the last WINDOW_DAYS days, in
+        one query.
+
+        Returns:
+            {user_id: {'fatigue_score', 'risk_level', 'metrics'}}; inspectors
+            without assignments in the window score 0
+        """
+        user_ids = [u for u in set(user_ids) if u]
+        result = {u: InspectorWorkloadService.assessment(0, 0, 0) for u in user_ids}
+        if not user_ids:
+            return result
+        rows = InspectorWorkloadService.window_query(today).filter(InspectorWorkload.user_id.in_(user_ids))
+        for row in rows:
+            result[row.user_id] = InspectorWorkloadService.assessment(row.assignments, row.hours, row.worked_days)
+        return result
+
+    @staticmethod
+    def assessment(assignments, hours, worked_days):
+        score = fatigue_score(assignments, hours, worked_days)
+        return {
+            'fatigue_score': round(score, 1),
+            'risk_level': risk_level(score),
+            'metrics': {
+                'assignments_7d': int(assignments),
+                'estimated_hours_7d': float(hours),
+                'consecutive_work_days': int(worked_days),
+            },
+        }
@@ -0,0 +1,140 @@
+"""
+Job duration statistics.
+
+Completed work plan jobs feed JobDurationStat rows (see the model) as they
+complete, and duration estimates read the most specific scope that has
+history: the equipment itself, then its equipment type, then the job type.
+rebuild() recomputes every row from tracking history, for the initial
+backfill or after bulk corrections.
+"""
+
+import logging
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.equipment import Equipment
+from app.models.job_duration_stat import JobDurationStat, ANY_EQUIPMENT_ID, ANY_EQUIPMENT_TYPE
+from app.models.work_plan_job import WorkPlanJob
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+
+logger = logging.getLogger(__name__)
+
+
+def _scopes(job_type, equipment_id=None, equipment_type=None):
+    """Stat keys from most to least specific."""
+    scopes = []
+    if equipment_id and equipment_type:
+        scopes.append((job_type, equipment_type, equipment_id))
+    if equipment_type:
+        scopes.append((job_type, equipment_type, ANY_EQUIPMENT_ID))
+    scopes.append((job_type, ANY_EQUIPMENT_TYPE, ANY_EQUIPMENT_ID))
+    return scopes
+
+
+def _scope_filter(scopes):
+    return or_(*(
+        (JobDurationStat.job_type == job_type)
+        & (JobDurationStat.equipment_type == equipment_type)
+        & (JobDurationStat.equipment_id == equipment_id)
+        for job_type, equipment_type, equipment_id in scopes
+    ))
+
+
+class JobDurationService:
+    """Maintains and reads JobDurationStat rows."""
+
+    @staticmethod
+    def record(job, actual_hours):
+        """
+        Add a completed job's duration to its scopes. Flushed with the
+        caller's transaction, not committed.
+        """
+        if not actual_hours or float(actual_hours) <= 0:
+            return
+        equipment = job.equipment
+        scopes = _scopes(job.job_type, job.equipment_id, equipment.equipment_type if equipment else None)
+        rows = JobDurationService._locked_rows(scopes)
+        missing = [key for key in scopes if key not in rows]
+        if missing:
+            # FOR UPDATE locks nothing for a scope without a row, so two first
+            # completions can both insert it; the loser reuses the winner's row
+            for key in missing:
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(JobDurationStat(job_type=key[0], equipment_type=key[1], equipment_id=key[2]))
+                except IntegrityError:
+                    logger.debug("Duration scope %s created concurrently", key)
+            rows = JobDurationService._locked_rows(scopes)
+
+        estimated = float(job.estimated_hours) if job.estimated_hours else None
+        for key in scopes:
+            rows[key].add(actual_hours, estimated)
+
+    @staticmethod
+    def _locked_rows(scopes):
+        return {
+            (s.job_type, s.equipment_type, s.equipment_id): s
+            for s in JobDurationStat.query.filter(_scope_filter(scopes)).with_for_update()
+        }
+
+    @staticmethod
+    def lookup(job_type, equipment_id=None, equipment_type=None):
+        """
+        The most specific statistics with history for a job, in one query.
+
+        Returns:
+            (stat, scope): scope is 'equipment', 'equipment_type' or
+            'job_type'; (None, None) without any history
+        """
+        if equipment_id and not equipment_type:
+            equipment_type = db.session.query(Equipment.equipment_type).filter(
+                Equipment.id == equipment_id).scalar()
+        scopes = _scopes(job_type, equipment_id, equipment_type)
+        rows = {
+            (s.job_type, s.equipment_type, s.equipment_id): s
+            for s in JobDurationStat.query.filter(_scope_filter(scopes), JobDurationStat.count > 0)
+        }
+        for key in scopes:
+            if key in rows:
+                if key[2] != ANY_EQUIPMENT_ID:
+                    return rows[key], 'equipment'
+                return rows[key], 'equipment_type' if key[1] != ANY_EQUIPMENT_TYPE else 'job_type'
+        return None, None
+
+    @staticmethod
+    def rebuild(batch_size=1000):
+        """
+        Recompute all statistics from completed tracking rows.
+
+        Returns:
+            int: number of completed jobs folded in
+        """
+        stats = {}
+        rows = db.session.query(
+            WorkPlanJob.job_type, WorkPlanJob.equipment_id, Equipment.equipment_type,
+            WorkPlanJob.estimated_hours, WorkPlanJobTracking.actual_hours,
+        ).join(
+            WorkPlanJob, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
+        ).outerjoin(
+            Equipment, Equipment.id == WorkPlanJob.equipment_id
+        ).filter(
+            WorkPlanJobTracking.status == 'completed',
+            WorkPlanJobTracking.actual_hours > 0,
+        ).order_by(WorkPlanJobTracking.completed_at).execution_options(yield_per=batch_size)
+
+        folded = 0
+        for job_type, equipment_id, equipment_type, estimated, actual in rows:
+            for key in _scopes(job_type, equipment_id, equipment_type):
+                stat = stats.get(key)
+                if stat is None:
+                    stat = stats[key] = JobDurationStat(job_type=key[0], equipment_type=key[1], equipment_id=key[2])
+                stat.add(actual, float(estimated) if estimated else None)
+            folded += 1
+
+        JobDurationStat.query.delete(synchronize_session=False)
+        db.session.add_all(stats.values())
+        db.session.commit()
+        logger.info("Rebuilt %d job duration stats from %d completed jobs", len(stats), folded)
+        return folded
@@ -30,14 +30,23 @@ _scheduled_notifications = {}
 _archived_notifications = set()
 _acknowledged_notifications = set()
 
-# SocketIO instance (set during app initialization)
+# SocketIO instance and emit batcher (set during app initialization)
 _socketio = None
+_batcher = None
 
 
-def set_socketio(socketio):
-    """Set the SocketIO instance for emitting events."""
-    global _socketio
+def set_socketio(socketio, batch_window=0):
+    """
+    Set the SocketIO instance for emitting events.
+
+    Args:
+        socketio: Flask-SocketIO instance
+        batch_window: Seconds to coalesce notification bursts per room (0 = emit immediately)
+    """
+    global _socketio, _batcher
+    from app.api.notifications_ws import NotificationBatcher
     _socketio = socketio
+    _batcher = NotificationBatcher(socketio, window=batch_window)
 
 
 def _send_expo_push_notification(token, title, body, data=None):
@@ -289,8 +298,8 @@ class NotificationService:
         logger.info("Bulk notifications sent: type=%s recipient_count=%s", type, len(notifications))
 
         # Emit WebSocket events and send Expo push notifications
+        NotificationService._emit_notifications(notifications)
         for n in notifications:
-            NotificationService._emit_notification(n)
             # Send Expo push notification (non-blocking)
             try:
                 push_data = {
@@ -305,6 +314,122 @@ class NotificationService:
 
         return notifications
 
+    @staticmethod
+    def create_notifications(entries):
+        """
+        Create many notifications, each with its own recipient and text, in
+        one INSERT.
+
+        Meant for scheduled sweeps (morning briefings, red zone alerts) that
+        used to call create_notification once per recipient. Preferences,
+        DND and rules are applied per entry as in create_notification; each
+        distinct title/message is translated once; emits and push tokens
+        are batched.
+
+        Args:
+            entries: list of dicts with create_notification's keyword
+                arguments (user_id, type, title, message, related_type,
+                related_id, priority, is_persistent, action_url, title_ar,
+                message_ar)
+
+        Returns:
+            List of created Notification objects
+        """
+        from sqlalchemy import insert
+
+        translations = {}
+
+        def translated(text, known):
+            if known or not text:
+                return text, known
+            if text not in translations:
+                english, arabic = text, None
+                try:
+                    from app.services.translation_service import TranslationService, is_arabic
+                    if is_arabic(text):
+                        english, arabic = TranslationService.translate_to_english(text) or text, text
+                    else:
+                        arabic = TranslationService.translate_to_arabic(text)
+                except Exception:
+                    pass  # Translation failure shouldn't block notification
+                translations[text] = (english, arabic)
+            return translations[text]
+
+        rows = []
+        escalate = set()
+        for entry in entries:
+            user_id = entry['user_id']
+            notification_type = entry['type']
+            if not NotificationService._should_send_notification(user_id, notification_type, 'push'):
+                continue
+            if NotificationService._is_dnd_active(user_id):
+                NotificationService._queue_notification(
+                    user_id, notification_type, entry['title'], entry['message'],
+                    entry.get('related_type'), entry.get('related_id'), entry.get('priority', 'info'),
+                    entry.get('is_persistent', False), entry.get('action_url'),
+                    entry.get('title_ar'), entry.get('message_ar'))
+                continue
+
+            priority, should_escalate = NotificationService._apply_rules(
+                notification_type, entry.get('priority', 'info'))
+            title, title_ar = translated(entry['title'], entry.get('title_ar'))
+            message, message_ar = translated(entry['message'], entry.get('message_ar'))
+            rows.append({
+                'user_id': user_id,
+                'type': notification_type,
+                'title': title,
+                'message': message,
+                'title_ar': title_ar,
+                'message_ar': message_ar,
+                'related_type': entry.get('related_type'),
+                'related_id': entry.get('related_id'),
+                'priority': priority,
+                'is_persistent': entry.get('is_persistent', False),
+                'action_url': entry.get('action_url'),
+                'created_at': datetime.utcnow(),
+            })
+            if should_escalate:
+                escalate.add((user_id, notification_type, entry.get('related_id')))
+
+        if not rows:
+            return []
+
+        # RETURNING without parameter order keeps this a single multi-row
+        # INSERT on SQLite as well as Postgres
+        ids = list(db.session.scalars(insert(Notification).returning(Notification.id), rows))
+        db.session.commit()
+        # One SELECT brings the rows back, rather than a refresh per object
+        notifications = Notification.query.filter(Notification.id.in_(ids)).order_by(Notification.id).all()
+        logger.info("Notifications created in bulk: count=%s", len(notifications))
+
+        for notification in notifications:
+            NotificationService._track_notification_created(notification.user_id, notification)
+        NotificationService._emit_notifications(notifications)
+
+        tokens = dict(db.session.query(User.id, User.expo_push_token).filter(
+            User.id.in_({n.user_id for n in notifications}),
+            User.expo_push_token.isnot(None)
+        ))
+        for notification in notifications:
+            token = tokens.get(notification.user_id)
+            if not token:
+                continue
+            try:
+                _send_expo_push_notification(token, notification.title, notification.message, {
+                    'notification_id': notification.id,
+                    'type': notification.type,
+                    'related_type': notification.related_type,
+                    'related_id': notification.related_id,
+                })
+            except Exception as e:
+                logger.error("Failed to trigger Expo push for user %s: %s", notification.user_id, str(e))
+
+        for notification in notifications:
+            if (notification.user_id, notification.type, notification.related_id) in escalate:
+                NotificationService._auto_escalate(notification)
+
+        return notifications
+
     @staticmethod
     def get_user_notifications(user_id, unread_only=False, priority=None):
         """
@@ -1355,11 +1480,22 @@ class NotificationService:
             return
 
         try:
-            from app.api.notifications_ws import emit_notification
-            emit_notification(_socketio, notification)
+            _batcher.add(notification)
         except Exception as e:
             logger.error(f"Error emitting notification: {e}")
 
+    @staticmethod
+    def _emit_notifications(notifications):
+        """Emit WebSocket events for a batch of new notifications."""
+        if _socketio is None or not notifications:
+            return
+
+        try:
+            from app.api.notifications_ws import emit_bulk_notification
+            emit_bulk_notification(_socketio, notifications)
+        except Exception as e:
+            logger.error(f"Error emitting notifications: {e}")
+
     @staticmethod
     def _emit_unread_count_update(user_id):
         """Emit unread count update via WebSocket."""
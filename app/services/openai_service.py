@@ -9,18 +9,22 @@ import json
 import logging
 import base64
 import requests
-from typing import Optional, List, Dict, Any
-from openai import OpenAI
+from typing import TYPE_CHECKING, Optional, List, Dict, Any
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 logger = logging.getLogger(__name__)
 
 
-def _get_openai_client() -> Optional[OpenAI]:
+def _get_openai_client() -> Optional['OpenAI']:
     """Get OpenAI client if API key is configured."""
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
         logger.warning("OPENAI_API_KEY not configured")
         return None
+    # The SDK is large; only import it once a key is configured and a call needs it
+    from openai import OpenAI
     return OpenAI(api_key=api_key)
 
 
@@ -8,9 +8,13 @@ from datetime import datetime, date, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from enum import Enum
 import logging
-import statistics
+
+from flask import current_app
+from sqlalchemy import Integer, case, cast, func, insert, literal, select, union, update
+from sqlalchemy.orm import aliased
 
 from app.extensions import db
+from app.utils.ttl_cache import TTLCache
 from app.services.ai_base_service import (
     AIServiceWrapper, RiskScorer, Predictor, RecommendationEngine,
     RiskFactor, RiskResult, RiskLevel, Prediction, PredictionResult,
@@ -23,6 +27,28 @@ from app.services.shared import (
 
 logger = logging.getLogger(__name__)
 
+CLOSED_ASSIGNMENT_STATUSES = ('completed', 'both_complete')
+OPEN_DEFECT_STATUSES = ('open', 'in_progress')
+# IDs per UPDATE ... WHERE id IN (...) in bulk_reschedule
+BULK_RESCHEDULE_CHUNK = 500
+
+# Overdue lists, calendar and aging buckets are shared between the overdue
+# page's concurrent requests for DASHBOARD_CACHE_SECONDS
+_overdue_cache = TTLCache()
+
+
+def _cached(key, compute):
+    return _overdue_cache.get_or_compute(
+        key, compute, ttl=current_app.config.get('DASHBOARD_CACHE_SECONDS', 15))
+
+
+def _age_days(column, now: datetime):
+    """SQL expression: whole days from a timestamp column to now."""
+    if db.engine.dialect.name == 'postgresql':
+        return func.floor(func.extract('epoch', literal(now) - column) / 86400)
+    # SQLite: CAST truncates, which is floor for the non-negative ages used here
+    return cast(func.julianday(literal(now)) - func.julianday(column), Integer)
+
 
 # ============================================================================
 # DATA CLASSES
@@ -517,12 +543,9 @@ class OverdueAIService(AIServiceWrapper):
         defects = self.get_overdue_defects()
         reviews = self.get_overdue_reviews()
 
-        # Calculate oldest days for each category
+        # Lists are sorted most overdue first
         def get_oldest_days(items: List[Dict]) -> int:
-            if not items:
-                return 0
-            days_list = [item.get('days_overdue', 0) for item in items]
-            return max(days_list) if days_list else 0
+            return items[0]['days_overdue'] if items else 0
 
         return {
             'inspections': {
@@ -544,6 +567,47 @@ class OverdueAIService(AIServiceWrapper):
             'generated_at': datetime.utcnow().isoformat()
         }
 
+    @staticmethod
+    def _inspection_overdue(now: datetime):
+        """SQL condition: assignment past its deadline (or a day old without one) and not completed."""
+        from app.models import InspectionAssignment as A
+
+        return db.and_(
+            A.status.notin_(CLOSED_ASSIGNMENT_STATUSES),
+            db.or_(
+                A.deadline < now,
+                db.and_(A.deadline.is_(None), A.created_at < now - timedelta(days=1))
+            )
+        )
+
+    def _sla_breached(self, kind: str, created_at, severity, now: datetime):
+        """SQL condition: created before the severity's SLA hours ran out (plain-hour trackers only)."""
+        tracker = self.sla_trackers[kind]
+        if isinstance(severity, str):
+            return created_at < now - timedelta(hours=tracker.get_sla_hours(severity))
+        deadline = case(
+            {sev: now - timedelta(hours=hours) for sev, hours in tracker.config.severity_sla_hours.items()},
+            value=severity,
+            else_=now - timedelta(hours=tracker.get_sla_hours(None)),
+        )
+        return created_at < deadline
+
+    @staticmethod
+    def _open_workload():
+        """Subquery: open assignments per inspector, counting a one-person team once."""
+        from app.models import InspectionAssignment as A
+
+        is_open = A.status.notin_(CLOSED_ASSIGNMENT_STATUSES)
+        pairs = union(
+            select(A.mechanical_inspector_id.label('user_id'), A.id).where(
+                is_open, A.mechanical_inspector_id.isnot(None)),
+            select(A.electrical_inspector_id.label('user_id'), A.id).where(
+                is_open, A.electrical_inspector_id.isnot(None)),
+        ).subquery()
+        return select(
+            pairs.c.user_id, func.count().label('open_count')
+        ).group_by(pairs.c.user_id).subquery()
+
     def get_overdue_inspections(self) -> List[Dict[str, Any]]:
         """
         Get overdue inspection assignments from database.
@@ -552,68 +616,60 @@ class OverdueAIService(AIServiceWrapper):
         Returns:
             List of overdue inspection dicts with details
         """
-        from app.models import InspectionAssignment, User, Equipment
+        return _cached(('overdue', 'inspections'), self._compute_overdue_inspections)
 
-        today = date.today()
-        now = datetime.utcnow()
+    def _compute_overdue_inspections(self) -> List[Dict[str, Any]]:
+        from app.models import InspectionAssignment as A, User, Equipment
 
-        # Query inspection assignments where deadline has passed and not completed
-        overdue_assignments = InspectionAssignment.query.filter(
-            InspectionAssignment.status.notin_(['completed', 'both_complete']),
-            db.or_(
-                InspectionAssignment.deadline < now,
-                db.and_(
-                    InspectionAssignment.deadline.is_(None),
-                    InspectionAssignment.created_at < now - timedelta(days=1)
-                )
-            )
-        ).order_by(InspectionAssignment.deadline.asc()).all()
+        now = datetime.utcnow()
+        mech, elec = aliased(User), aliased(User)
+        workload = self._open_workload()
+
+        # One query: names joined in, each row's inspector workload from the grouped subquery
+        rows = db.session.query(
+            A.id, A.equipment_id, Equipment.name.label('equipment_name'),
+            A.mechanical_inspector_id, mech.full_name.label('mechanical_inspector'),
+            A.electrical_inspector_id, elec.full_name.label('electrical_inspector'),
+            A.status, A.deadline, A.created_at,
+            func.coalesce(workload.c.open_count, 0).label('workload'),
+        ).outerjoin(Equipment, Equipment.id == A.equipment_id).outerjoin(
+            mech, mech.id == A.mechanical_inspector_id
+        ).outerjoin(
+            elec, elec.id == A.electrical_inspector_id
+        ).outerjoin(
+            workload, workload.c.user_id == func.coalesce(A.mechanical_inspector_id, A.electrical_inspector_id)
+        ).filter(self._inspection_overdue(now)).order_by(A.deadline.asc(), A.id)
 
         results = []
-        for assignment in overdue_assignments:
+        for row in rows:
             # Calculate days overdue
-            if assignment.deadline:
-                days_overdue = max(0, (now - assignment.deadline).days)
+            if row.deadline:
+                days_overdue = max(0, (now - row.deadline).days)
             else:
-                days_overdue = max(0, (now - assignment.created_at).days - 1)
+                days_overdue = max(0, (now - row.created_at).days - 1)
 
-            # Get risk assessment using shared scorer
-            risk_context = {
+            risk_result = overdue_risk_scorer.calculate({
                 'days_overdue': days_overdue,
                 'severity': 'normal',
-                'current_workload': 0,
+                'current_workload': row.workload,
                 'completion_rate': 100
-            }
-
-            # Check inspector workload
-            inspector_id = assignment.mechanical_inspector_id or assignment.electrical_inspector_id
-            if inspector_id:
-                workload = InspectionAssignment.query.filter(
-                    db.or_(
-                        InspectionAssignment.mechanical_inspector_id == inspector_id,
-                        InspectionAssignment.electrical_inspector_id == inspector_id
-                    ),
-                    InspectionAssignment.status.notin_(['completed', 'both_complete'])
-                ).count()
-                risk_context['current_workload'] = workload
-
-            risk_result = overdue_risk_scorer.calculate(risk_context)
+            })
 
             results.append({
-                'id': assignment.id,
+                'id': row.id,
                 'type': 'inspection_assignment',
-                'equipment_id': assignment.equipment_id,
-                'equipment_name': assignment.equipment.name if assignment.equipment else None,
-                'mechanical_inspector_id': assignment.mechanical_inspector_id,
-                'mechanical_inspector': assignment.mechanical_inspector.full_name if assignment.mechanical_inspector else None,
-                'electrical_inspector_id': assignment.electrical_inspector_id,
-                'electrical_inspector': assignment.electrical_inspector.full_name if assignment.electrical_inspector else None,
-                'status': assignment.status,
-                'deadline': assignment.deadline.isoformat() if assignment.deadline else None,
+                'equipment_id': row.equipment_id,
+                'equipment_name': row.equipment_name,
+                'mechanical_inspector_id': row.mechanical_inspector_id,
+                'mechanical_inspector': row.mechanical_inspector,
+                'electrical_inspector_id': row.electrical_inspector_id,
+                'electrical_inspector': row.electrical_inspector,
+                'status': row.status,
+                'deadline': row.deadline.isoformat() if row.deadline else None,
                 'days_overdue': days_overdue,
                 'risk_score': risk_result.total_score,
                 'risk_level': risk_result.level.value,
-                'created_at': assignment.created_at.isoformat() if assignment.created_at else None
+                'created_at': row.created_at.isoformat() if row.created_at else None
             })
 
         # Sort by days overdue descending
@@ -628,55 +684,55 @@ class OverdueAIService(AIServiceWrapper):
         Returns:
             List of overdue defect dicts with SLA details
         """
-        from app.models import Defect
+        return _cached(('overdue', 'defects'), self._compute_overdue_defects)
 
-        # Query open/in_progress defects
-        open_defects = Defect.query.filter(
-            Defect.status.in_(['open', 'in_progress'])
-        ).all()
+    def _compute_overdue_defects(self) -> List[Dict[str, Any]]:
+        from app.models import Defect, User
+
+        now = datetime.utcnow()
+        severity = func.coalesce(Defect.severity, 'medium')
+        # Only breached defects are loaded, oldest (most overdue) first
+        rows = db.session.query(Defect, User.full_name).outerjoin(
+            User, User.id == Defect.assigned_to_id
+        ).filter(
+            Defect.status.in_(OPEN_DEFECT_STATUSES),
+            self._sla_breached('defect', Defect.created_at, severity, now),
+        ).order_by(Defect.created_at.asc(), Defect.id)
 
         results = []
-        for defect in open_defects:
-            # Check SLA status using the tracker
+        for defect, assignee in rows:
             sla_status = self.sla_trackers['defect'].get_status(
                 created_at=defect.created_at,
                 severity=defect.severity or 'medium',
                 completed_at=None
             )
+            days_overdue = int(sla_status['elapsed_hours'] / 24)
 
-            # Only include if SLA is breached
-            if sla_status['is_breached']:
-                days_overdue = int(sla_status['elapsed_hours'] / 24)
+            risk_result = overdue_risk_scorer.calculate({
+                'days_overdue': days_overdue,
+                'severity': defect.severity or 'medium',
+                'current_workload': 0,
+                'completion_rate': 100
+            })
 
-                # Get risk assessment
-                risk_context = {
-                    'days_overdue': days_overdue,
-                    'severity': defect.severity or 'medium',
-                    'current_workload': 0,
-                    'completion_rate': 100
-                }
-                risk_result = overdue_risk_scorer.calculate(risk_context)
-
-                results.append({
-                    'id': defect.id,
-                    'type': 'defect',
-                    'description': defect.description[:100] + '...' if len(defect.description) > 100 else defect.description,
-                    'severity': defect.severity,
-                    'priority': defect.priority,
-                    'status': defect.status,
-                    'assigned_to_id': defect.assigned_to_id,
-                    'assigned_to': defect.assigned_to.full_name if defect.assigned_to else None,
-                    'due_date': defect.due_date.isoformat() if defect.due_date else None,
-                    'days_overdue': days_overdue,
-                    'sla_percentage': sla_status['percentage'],
-                    'sla_status': sla_status['status'],
-                    'risk_score': risk_result.total_score,
-                    'risk_level': risk_result.level.value,
-                    'created_at': defect.created_at.isoformat() if defect.created_at else None
-                })
+            results.append({
+                'id': defect.id,
+                'type': 'defect',
+                'description': defect.description[:100] + '...' if len(defect.description) > 100 else defect.description,
+                'severity': defect.severity,
+                'priority': defect.priority,
+                'status': defect.status,
+                'assigned_to_id': defect.assigned_to_id,
+                'assigned_to': assignee,
+                'due_date': defect.due_date.isoformat() if defect.due_date else None,
+                'days_overdue': days_overdue,
+                'sla_percentage': sla_status['percentage'],
+                'sla_status': sla_status['status'],
+                'risk_score': risk_result.total_score,
+                'risk_level': risk_result.level.value,
+                'created_at': defect.created_at.isoformat() if defect.created_at else None
+            })
 
-        # Sort by days overdue descending
-        results.sort(key=lambda x: x['days_overdue'], reverse=True)
         return results
 
     def get_overdue_reviews(self) -> List[Dict[str, Any]]:
@@ -687,64 +743,70 @@ class OverdueAIService(AIServiceWrapper):
         Returns:
             List of overdue review dicts with SLA details
         """
-        from app.models import QualityReview
+        return _cached(('overdue', 'reviews'), self._compute_overdue_reviews)
 
-        # Query pending reviews
-        pending_reviews = QualityReview.query.filter(
-            QualityReview.status == 'pending'
-        ).all()
+    def _compute_overdue_reviews(self) -> List[Dict[str, Any]]:
+        from app.models import QualityReview, User
+
+        now = datetime.utcnow()
+        rows = db.session.query(
+            QualityReview.id, QualityReview.job_type, QualityReview.job_id, QualityReview.qe_id,
+            User.full_name.label('quality_engineer'), QualityReview.status, QualityReview.sla_deadline,
+            QualityReview.created_at,
+        ).outerjoin(User, User.id == QualityReview.qe_id).filter(
+            QualityReview.status == 'pending',
+            self._sla_breached('review', QualityReview.created_at, 'normal', now),
+        ).order_by(QualityReview.created_at.asc(), QualityReview.id)
 
         results = []
-        for review in pending_reviews:
-            # Check SLA status using the tracker
+        for review in rows:
             sla_status = self.sla_trackers['review'].get_status(
                 created_at=review.created_at,
                 severity='normal',
                 completed_at=None
             )
+            results.append({
+                'id': review.id,
+                'type': 'quality_review',
+                'job_type': review.job_type,
+                'job_id': review.job_id,
+                'qe_id': review.qe_id,
+                'quality_engineer': review.quality_engineer,
+                'status': review.status,
+                'sla_deadline': review.sla_deadline.isoformat() if review.sla_deadline else sla_status.get('deadline'),
+                'days_overdue': int(sla_status['elapsed_hours'] / 24),
+                'sla_percentage': sla_status['percentage'],
+                'sla_status': sla_status['status'],
+                'created_at': review.created_at.isoformat() if review.created_at else None
+            })
 
-            # Only include if SLA is breached
-            if sla_status['is_breached']:
-                days_overdue = int(sla_status['elapsed_hours'] / 24)
-
-                results.append({
-                    'id': review.id,
-                    'type': 'quality_review',
-                    'job_type': review.job_type,
-                    'job_id': review.job_id,
-                    'qe_id': review.qe_id,
-                    'quality_engineer': review.quality_engineer.full_name if review.quality_engineer else None,
-                    'status': review.status,
-                    'sla_deadline': review.sla_deadline.isoformat() if review.sla_deadline else sla_status.get('deadline'),
-                    'days_overdue': days_overdue,
-                    'sla_percentage': sla_status['percentage'],
-                    'sla_status': sla_status['status'],
-                    'created_at': review.created_at.isoformat() if review.created_at else None
-                })
-
-        # Sort by days overdue descending
-        results.sort(key=lambda x: x['days_overdue'], reverse=True)
         return results
 
     def bulk_reschedule(
         self,
         entity_type: str,
         entity_ids: List[int],
-        new_date: str
+        new_date: str,
+        user_id: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Reschedule multiple overdue items to a new date.
 
+        Rows are updated with one UPDATE ... RETURNING per chunk of
+        BULK_RESCHEDULE_CHUNK ids and committed together; IDs not returned
+        are reported as not found. The audit rows are one INSERT and each
+        affected owner gets one notification after the commit.
+
         Args:
             entity_type: Type of entity ('inspection', 'defect', 'review')
             entity_ids: List of entity IDs to reschedule
             new_date: New due date in ISO format (YYYY-MM-DD)
+            user_id: User doing the reschedule, for the audit trail
 
         Returns:
             Dict with success count, failed items, and details
         """
-        from app.models import InspectionAssignment, Defect, QualityReview
-        from app.extensions import db
+        from app.models import AdminActivityLog
 
         # Parse new date
         try:
@@ -762,46 +824,43 @@ class OverdueAIService(AIServiceWrapper):
                 'failed': entity_ids
             }
 
-        updated = []
-        failed = []
-
-        for entity_id in entity_ids:
-            try:
-                if entity_type == 'inspection':
-                    entity = InspectionAssignment.query.get(entity_id)
-                    if entity:
-                        entity.deadline = new_date_parsed
-                        entity.backlog_triggered = False
-                        entity.backlog_triggered_at = None
-                        updated.append(entity_id)
-                    else:
-                        failed.append({'id': entity_id, 'reason': 'Not found'})
-
-                elif entity_type == 'defect':
-                    entity = Defect.query.get(entity_id)
-                    if entity:
-                        entity.due_date = new_date_parsed.date() if isinstance(new_date_parsed, datetime) else new_date_parsed
-                        updated.append(entity_id)
-                    else:
-                        failed.append({'id': entity_id, 'reason': 'Not found'})
-
-                elif entity_type == 'review':
-                    entity = QualityReview.query.get(entity_id)
-                    if entity:
-                        entity.sla_deadline = new_date_parsed
-                        updated.append(entity_id)
-                    else:
-                        failed.append({'id': entity_id, 'reason': 'Not found'})
-                else:
-                    failed.append({'id': entity_id, 'reason': f'Unknown entity type: {entity_type}'})
-
-            except Exception as e:
-                logger.error(f"Failed to reschedule {entity_type} {entity_id}: {e}")
-                failed.append({'id': entity_id, 'reason': str(e)})
+        new_date_str = new_date_parsed.isoformat() if isinstance(new_date_parsed, datetime) else str(new_date_parsed)
+        target = self._reschedule_target(entity_type, new_date_parsed)
+        if target is None:
+            return {
+                'success': True,
+                'entity_type': entity_type,
+                'new_date': new_date_str,
+                'updated': 0,
+                'updated_ids': [],
+                'failed': len(entity_ids),
+                'failed_items': [{'id': eid, 'reason': f'Unknown entity type: {entity_type}'} for eid in entity_ids]
+            }
+        model, values, owner_columns, audit_type = target
 
-        # Commit all changes
+        ids = list(dict.fromkeys(entity_ids))
+        owners = {}
         try:
+            for start in range(0, len(ids), BULK_RESCHEDULE_CHUNK):
+                chunk = ids[start:start + BULK_RESCHEDULE_CHUNK]
+                rows = db.session.execute(
+                    update(model).where(model.id.in_(chunk)).values(values).returning(model.id, *owner_columns)
+                )
+                for row_id, *row_owners in rows:
+                    owners[row_id] = {owner for owner in row_owners if owner}
+
+            if user_id and owners:
+                now = datetime.utcnow()
+                db.session.execute(insert(AdminActivityLog), [{
+                    'user_id': user_id,
+                    'action': 'reschedule',
+                    'entity_type': audit_type,
+                    'entity_id': row_id,
+                    'details': {'new_date': new_date_str, 'source': 'overdue_bulk_reschedule'},
+                    'created_at': now,
+                } for row_id in owners])
             db.session.commit()
+            _overdue_cache.invalidate()
         except Exception as e:
             db.session.rollback()
             logger.error(f"Failed to commit bulk reschedule: {e}")
@@ -812,16 +871,62 @@ class OverdueAIService(AIServiceWrapper):
                 'failed': [{'id': eid, 'reason': 'Rollback'} for eid in entity_ids]
             }
 
+        updated = [eid for eid in ids if eid in owners]
+        failed = [{'id': eid, 'reason': 'Not found'} for eid in ids if eid not in owners]
+        self._notify_rescheduled(entity_type, owners, new_date_parsed)
+
         return {
             'success': True,
             'entity_type': entity_type,
-            'new_date': new_date_parsed.isoformat() if isinstance(new_date_parsed, datetime) else str(new_date_parsed),
+            'new_date': new_date_str,
             'updated': len(updated),
             'updated_ids': updated,
             'failed': len(failed),
             'failed_items': failed
         }
 
+    @staticmethod
+    def _reschedule_target(entity_type: str, new_date: datetime):
+        """(model, new values, owner columns, audit entity type) for a reschedule, or None."""
+        from app.models import InspectionAssignment, Defect, QualityReview
+
+        if entity_type == 'inspection':
+            return InspectionAssignment, {
+                'deadline': new_date,
+                'backlog_triggered': False,
+                'backlog_triggered_at': None,
+            }, (InspectionAssignment.mechanical_inspector_id,
+                InspectionAssignment.electrical_inspector_id), 'inspection_assignment'
+        if entity_type == 'defect':
+            due_date = new_date.date() if isinstance(new_date, datetime) else new_date
+            return Defect, {'due_date': due_date}, (Defect.assigned_to_id,), 'defect'
+        if entity_type == 'review':
+            return QualityReview, {'sla_deadline': new_date}, (QualityReview.qe_id,), 'quality_review'
+        return None
+
+    @staticmethod
+    def _notify_rescheduled(entity_type: str, owners: Dict[int, set], new_date: datetime) -> None:
+        """One notification per owner, counting their rescheduled items."""
+        from collections import Counter
+        from app.services.notification_service import NotificationService
+
+        counts = Counter(owner for row_owners in owners.values() for owner in row_owners)
+        if not counts:
+            return
+        label = {'inspection': 'inspection', 'defect': 'defect', 'review': 'quality review'}[entity_type]
+        day = new_date.date() if isinstance(new_date, datetime) else new_date
+        try:
+            NotificationService.create_notifications([{
+                'user_id': owner,
+                'type': 'overdue_rescheduled',
+                'title': 'Overdue items rescheduled',
+                'message': f'{count} overdue {label}{"s" if count > 1 else ""} rescheduled to {day.isoformat()}',
+                'related_type': entity_type,
+                'priority': 'info',
+            } for owner, count in counts.items()])
+        except Exception as e:
+            logger.error(f"Failed to notify owners of bulk reschedule: {e}")
+
     def get_calendar_data(
         self,
         start_date: Optional[str],
@@ -837,9 +942,6 @@ class OverdueAIService(AIServiceWrapper):
         Returns:
             List of calendar entries with date and items
         """
-        from app.models import InspectionAssignment, Defect, QualityReview
-        from collections import defaultdict
-
         # Parse dates
         today = date.today()
         if start_date:
@@ -858,59 +960,73 @@ class OverdueAIService(AIServiceWrapper):
         else:
             end = today
 
-        # Group items by original due date
-        calendar_data = defaultdict(lambda: {'inspections': [], 'defects': [], 'reviews': []})
+        return _cached(('overdue', 'calendar', start, end), lambda: self._compute_calendar(start, end))
 
-        # Get overdue inspections
-        overdue_assignments = InspectionAssignment.query.filter(
-            InspectionAssignment.status.notin_(['completed', 'both_complete']),
-            InspectionAssignment.deadline.isnot(None)
-        ).all()
+    def _compute_calendar(self, start: date, end: date) -> List[Dict[str, Any]]:
+        from app.models import InspectionAssignment, Defect, QualityReview, Equipment
+        from collections import defaultdict
 
-        for assignment in overdue_assignments:
-            due_date = assignment.deadline.date()
-            if start <= due_date <= end and assignment.deadline < datetime.utcnow():
-                days_overdue = (datetime.utcnow() - assignment.deadline).days
-                calendar_data[due_date.isoformat()]['inspections'].append({
-                    'id': assignment.id,
-                    'equipment_name': assignment.equipment.name if assignment.equipment else f'Equipment #{assignment.equipment_id}',
-                    'days_overdue': days_overdue,
-                    'status': assignment.status
-                })
+        today = date.today()
+        now = datetime.utcnow()
+        range_start = datetime.combine(start, datetime.min.time())
+        range_end = datetime.combine(end + timedelta(days=1), datetime.min.time())
 
-        # Get overdue defects
-        open_defects = Defect.query.filter(
-            Defect.status.in_(['open', 'in_progress']),
-            Defect.due_date.isnot(None)
-        ).all()
+        # Group items by original due date
+        calendar_data = defaultdict(lambda: {'inspections': [], 'defects': [], 'reviews': []})
 
-        for defect in open_defects:
-            if start <= defect.due_date <= end and defect.due_date < today:
-                days_overdue = (today - defect.due_date).days
-                calendar_data[defect.due_date.isoformat()]['defects'].append({
-                    'id': defect.id,
-                    'description': defect.description[:50] + '...' if len(defect.description) > 50 else defect.description,
-                    'severity': defect.severity,
-                    'days_overdue': days_overdue,
-                    'status': defect.status
-                })
+        # Overdue inspections due within the range
+        assignments = db.session.query(
+            InspectionAssignment.id, InspectionAssignment.equipment_id, InspectionAssignment.deadline,
+            InspectionAssignment.status, Equipment.name,
+        ).outerjoin(Equipment, Equipment.id == InspectionAssignment.equipment_id).filter(
+            InspectionAssignment.status.notin_(CLOSED_ASSIGNMENT_STATUSES),
+            InspectionAssignment.deadline >= range_start,
+            InspectionAssignment.deadline < range_end,
+            InspectionAssignment.deadline < now,
+        ).order_by(InspectionAssignment.deadline, InspectionAssignment.id)
+
+        for assignment_id, equipment_id, deadline, status, equipment_name in assignments:
+            calendar_data[deadline.date().isoformat()]['inspections'].append({
+                'id': assignment_id,
+                'equipment_name': equipment_name or f'Equipment #{equipment_id}',
+                'days_overdue': (now - deadline).days,
+                'status': status
+            })
 
-        # Get overdue reviews
-        pending_reviews = QualityReview.query.filter(
-            QualityReview.status == 'pending',
-            QualityReview.sla_deadline.isnot(None)
-        ).all()
+        # Overdue defects due within the range
+        defects = Defect.query.filter(
+            Defect.status.in_(OPEN_DEFECT_STATUSES),
+            Defect.due_date >= start,
+            Defect.due_date <= end,
+            Defect.due_date < today,
+        ).order_by(Defect.due_date, Defect.id)
+
+        for defect in defects:
+            calendar_data[defect.due_date.isoformat()]['defects'].append({
+                'id': defect.id,
+                'description': defect.description[:50] + '...' if len(defect.description) > 50 else defect.description,
+                'severity': defect.severity,
+                'days_overdue': (today - defect.due_date).days,
+                'status': defect.status
+            })
 
-        for review in pending_reviews:
-            due_date = review.sla_deadline.date()
-            if start <= due_date <= end and review.sla_deadline < datetime.utcnow():
-                days_overdue = (datetime.utcnow() - review.sla_deadline).days
-                calendar_data[due_date.isoformat()]['reviews'].append({
-                    'id': review.id,
-                    'job_type': review.job_type,
-                    'job_id': review.job_id,
-                    'days_overdue': days_overdue
-                })
+        # Overdue reviews due within the range
+        reviews = db.session.query(
+            QualityReview.id, QualityReview.job_type, QualityReview.job_id, QualityReview.sla_deadline,
+        ).filter(
+            QualityReview.status == 'pending',
+            QualityReview.sla_deadline >= range_start,
+            QualityReview.sla_deadline < range_end,
+            QualityReview.sla_deadline < now,
+        ).order_by(QualityReview.sla_deadline, QualityReview.id)
+
+        for review_id, job_type, job_id, sla_deadline in reviews:
+            calendar_data[sla_deadline.date().isoformat()]['reviews'].append({
+                'id': review_id,
+                'job_type': job_type,
+                'job_id': job_id,
+                'days_overdue': (now - sla_deadline).days
+            })
 
         # Convert to list format
         result = []
@@ -1297,15 +1413,22 @@ class OverdueAIService(AIServiceWrapper):
         """
         Get aging bucket analysis for overdue items.
 
+        Items are overdue by the same rules as the overdue lists. Each
+        category is bucketed with one grouped query, so only the bucket
+        counts (not the items) are returned.
+
         Args:
             item_type: 'inspections', 'defects', 'reviews', or 'all'
 
         Returns:
             AgingBuckets analysis
         """
+        return _cached(('overdue', 'aging', item_type), lambda: self._compute_aging_buckets(item_type))
+
+    def _compute_aging_buckets(self, item_type: str) -> AgingBuckets:
         from app.models import InspectionAssignment, Defect, QualityReview
 
-        today = date.today()
+        now = datetime.utcnow()
         buckets = [
             AgingBucket(name='1_3_days', label='1-3 Days', min_days=1, max_days=3, color='#FFC107'),
             AgingBucket(name='4_7_days', label='4-7 Days', min_days=4, max_days=7, color='#FF9800'),
@@ -1313,75 +1436,59 @@ class OverdueAIService(AIServiceWrapper):
             AgingBucket(name='15_plus_days', label='15+ Days', min_days=15, max_days=None, color='#F44336'),
         ]
 
-        all_overdue_days = []
-
-        # Process inspections
+        # (age in whole days, overdue condition) per category
+        sources = []
         if item_type in ['inspections', 'all']:
-            overdue_assignments = InspectionAssignment.query.filter(
-                InspectionAssignment.status.in_(['pending', 'in_progress']),
-                InspectionAssignment.scheduled_date < today
-            ).all()
-
-            for a in overdue_assignments:
-                days_overdue = (today - a.scheduled_date).days
-                all_overdue_days.append(days_overdue)
-                self._add_to_bucket(buckets, days_overdue, {
-                    'id': a.id,
-                    'type': 'inspection',
-                    'days_overdue': days_overdue,
-                })
-
-        # Process defects
+            sources.append((
+                case(
+                    (InspectionAssignment.deadline.isnot(None), _age_days(InspectionAssignment.deadline, now)),
+                    else_=_age_days(InspectionAssignment.created_at, now) - 1,
+                ),
+                self._inspection_overdue(now),
+            ))
         if item_type in ['defects', 'all']:
-            # Defects overdue based on due_date or creation + severity SLA
-            overdue_defects = Defect.query.filter(
-                Defect.status.in_(['open', 'in_progress'])
-            ).all()
-
-            for d in overdue_defects:
-                sla_status = self.sla_trackers['defect'].get_status(
-                    created_at=d.created_at,
-                    severity=d.severity or 'medium',
-                    completed_at=None
-                )
-                if sla_status['is_breached']:
-                    days_overdue = int(sla_status['elapsed_hours'] / 24)
-                    all_overdue_days.append(days_overdue)
-                    self._add_to_bucket(buckets, days_overdue, {
-                        'id': d.id,
-                        'type': 'defect',
-                        'days_overdue': days_overdue,
-                    })
-
-        # Process reviews
+            sources.append((
+                _age_days(Defect.created_at, now),
+                db.and_(
+                    Defect.status.in_(OPEN_DEFECT_STATUSES),
+                    self._sla_breached('defect', Defect.created_at, func.coalesce(Defect.severity, 'medium'), now),
+                ),
+            ))
         if item_type in ['reviews', 'all']:
-            pending_reviews = QualityReview.query.filter(
-                QualityReview.status == 'pending'
-            ).all()
-
-            for r in pending_reviews:
-                sla_status = self.sla_trackers['review'].get_status(
-                    created_at=r.created_at,
-                    severity='normal',
-                    completed_at=None
-                )
-                if sla_status['is_breached']:
-                    days_overdue = int(sla_status['elapsed_hours'] / 24)
-                    all_overdue_days.append(days_overdue)
-                    self._add_to_bucket(buckets, days_overdue, {
-                        'id': r.id,
-                        'type': 'review',
-                        'days_overdue': days_overdue,
-                    })
+            sources.append((
+                _age_days(QualityReview.created_at, now),
+                db.and_(
+                    QualityReview.status == 'pending',
+                    self._sla_breached('review', QualityReview.created_at, 'normal', now),
+                ),
+            ))
+
+        by_name = {b.name: b for b in buckets}
+        total_overdue = 0
+        total_days = 0
+        oldest = 0
+        for age, condition in sources:
+            # Newest bucket first; ages below the first bucket are counted but unbucketed
+            aged = db.session.query(
+                age.label('age'),
+                case(*[(age >= b.min_days, b.name) for b in reversed(buckets)], else_=None).label('bucket'),
+            ).filter(condition).subquery()
+            rows = db.session.query(
+                aged.c.bucket, func.count(), func.sum(aged.c.age), func.max(aged.c.age)
+            ).group_by(aged.c.bucket)
+            for name, count, days, max_days in rows:
+                total_overdue += count
+                total_days += int(days or 0)
+                oldest = max(oldest, int(max_days or 0))
+                if name:
+                    by_name[name].count += count
 
         # Calculate totals and percentages
-        total_overdue = len(all_overdue_days)
         for bucket in buckets:
             if total_overdue > 0:
                 bucket.percentage = (bucket.count / total_overdue) * 100
 
-        avg_days = statistics.mean(all_overdue_days) if all_overdue_days else 0
-        oldest = max(all_overdue_days) if all_overdue_days else 0
+        avg_days = total_days / total_overdue if total_overdue else 0
 
         # Determine trend (would need historical data for real trend)
         trend = 'stable'
@@ -1398,20 +1505,6 @@ class OverdueAIService(AIServiceWrapper):
             trend=trend,
         )
 
-    def _add_to_bucket(
-        self,
-        buckets: List[AgingBucket],
-        days_overdue: int,
-        item: Dict[str, Any]
-    ) -> None:
-        """Add an item to the appropriate aging bucket."""
-        for bucket in buckets:
-            if days_overdue >= bucket.min_days:
-                if bucket.max_days is None or days_overdue <= bucket.max_days:
-                    bucket.count += 1
-                    bucket.items.append(item)
-                    return
-
     def send_overdue_notifications(self, item_type: str, item_id: int) -> bool:
         """
         Send overdue notifications using the shared NotificationPatterns.
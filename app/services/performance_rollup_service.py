@@ -0,0 +1,267 @@
+"""
+Work plan performance rollups.
+
+Daily WorkPlanPerformance rows are computed for all workers at once: one
+grouped query joins each assignment of the day to its job tracking, the
+worker's rating and their pause count, one more reads everyone's previous
+streak, and the rows are inserted or updated in bulk.
+
+Weekly (Monday to Sunday) and monthly rows are then derived from the daily
+rows of the period rather than from the raw tables, so rebuilding the week
+and month of a day after recomputing it costs one grouped query each, and
+dashboards spanning months read a handful of precomputed rows per worker.
+"""
+
+import logging
+from calendar import monthrange
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import and_, case, func, select, update
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models.work_plan_assignment import WorkPlanAssignment
+from app.models.work_plan_day import WorkPlanDay
+from app.models.work_plan_job import WorkPlanJob
+from app.models.work_plan_job_rating import WorkPlanJobRating
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+from app.models.work_plan_pause_request import WorkPlanPauseRequest
+from app.models.work_plan_performance import WorkPlanPerformance
+
+logger = logging.getLogger(__name__)
+
+STREAK_MILESTONES = (5, 10, 20, 30, 50, 100)
+PERIOD_TYPES = ('daily', 'weekly', 'monthly')
+
+
+def period_bounds(period_type, day):
+    """First and last date of the daily, weekly or monthly period containing day."""
+    if period_type == 'weekly':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period_type == 'monthly':
+        return day.replace(day=1), day.replace(day=monthrange(day.year, day.month)[1])
+    return day, day
+
+
+def _average(value):
+    return round(float(value), 1) if value is not None else None
+
+
+def _completion_rate(completed, assigned):
+    rate = completed / assigned * 100 if assigned else 0
+    return round(Decimal(str(rate)), 2)
+
+
+class PerformanceRollupService:
+    """Computes daily performance rows and the weekly/monthly rows built from them."""
+
+    @staticmethod
+    def compute_daily(target_date, rollup=True):
+        """
+        Compute every assigned worker's daily row for target_date and, unless
+        rollup is False, rebuild the week and month containing it.
+
+        Returns:
+            int: number of daily rows written
+        """
+        P = WorkPlanPerformance
+        T = WorkPlanJobTracking
+        R = WorkPlanJobRating
+
+        day_jobs = select(WorkPlanJob.id).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).where(WorkPlanDay.date == target_date)
+        pauses = select(
+            WorkPlanPauseRequest.work_plan_job_id.label('job_id'),
+            WorkPlanPauseRequest.requested_by_id.label('user_id'),
+            func.count().label('count'),
+        ).where(
+            WorkPlanPauseRequest.work_plan_job_id.in_(day_jobs)
+        ).group_by(WorkPlanPauseRequest.work_plan_job_id, WorkPlanPauseRequest.requested_by_id).subquery()
+
+        def count_if(condition):
+            return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+        # Approved overrides replace the time rating; zero ratings are not averaged
+        time_rating = case(
+            (and_(R.time_rating_override.isnot(None), R.time_rating_override_approved.is_(True)),
+             R.time_rating_override),
+            else_=R.time_rating,
+        )
+        rows = db.session.query(
+            WorkPlanAssignment.user_id,
+            func.count(WorkPlanAssignment.id).label('assigned'),
+            count_if(T.status == 'completed').label('completed'),
+            count_if(T.status == 'incomplete').label('incomplete'),
+            count_if(T.status.in_(('not_started', 'pending'))).label('not_started'),
+            count_if(T.is_carry_over.is_(True)).label('carried_over'),
+            func.coalesce(func.sum(WorkPlanJob.estimated_hours), 0).label('estimated_hours'),
+            func.coalesce(func.sum(T.actual_hours), 0).label('actual_hours'),
+            func.avg(func.nullif(time_rating, 0)).label('time_rating'),
+            func.avg(func.nullif(R.qc_rating, 0)).label('qc_rating'),
+            func.avg(R.cleaning_rating).label('cleaning_rating'),
+            func.coalesce(func.sum(R.points_earned), 0).label('points'),
+            func.coalesce(func.sum(pauses.c.count), 0).label('pauses'),
+            func.coalesce(func.sum(T.total_paused_minutes), 0).label('pause_minutes'),
+        ).join(
+            WorkPlanJob, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
+        ).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).outerjoin(
+            T, T.work_plan_job_id == WorkPlanJob.id
+        ).outerjoin(
+            R, and_(R.work_plan_job_id == WorkPlanJob.id, R.user_id == WorkPlanAssignment.user_id)
+        ).outerjoin(
+            pauses, and_(pauses.c.job_id == WorkPlanJob.id, pauses.c.user_id == WorkPlanAssignment.user_id)
+        ).filter(
+            WorkPlanDay.date == target_date
+        ).group_by(WorkPlanAssignment.user_id).all()
+
+        if not rows:
+            return 0
+        user_ids = [r.user_id for r in rows]
+
+        # Streak carried over from each worker's latest earlier daily row
+        latest = db.session.query(
+            P.user_id, func.max(P.period_start).label('day')
+        ).filter(
+            P.period_type == 'daily', P.period_start < target_date, P.user_id.in_(user_ids)
+        ).group_by(P.user_id).subquery()
+        previous = {
+            user_id: (current, best)
+            for user_id, current, best in db.session.query(
+                P.user_id, P.current_streak_days, P.max_streak_days
+            ).join(
+                latest, and_(P.user_id == latest.c.user_id, P.period_start == latest.c.day)
+            ).filter(P.period_type == 'daily')
+        }
+
+        values, milestones = {}, []
+        for r in rows:
+            prev_streak, prev_max = previous.get(r.user_id, (0, 0))
+            # 100% completion keeps the streak going
+            streak = prev_streak + 1 if r.completed >= r.assigned else 0
+            if streak in STREAK_MILESTONES:
+                milestones.append({
+                    'user_id': r.user_id,
+                    'type': 'streak_milestone',
+                    'title': f'{streak}-Day Streak!',
+                    'message': f'Great work! You have completed all assigned jobs for {streak} consecutive days.',
+                    'priority': 'info',
+                })
+            values[r.user_id] = {
+                'total_jobs_assigned': r.assigned,
+                'total_jobs_completed': r.completed,
+                'total_jobs_incomplete': r.incomplete,
+                'total_jobs_not_started': r.not_started,
+                'total_jobs_carried_over': r.carried_over,
+                'total_estimated_hours': Decimal(str(r.estimated_hours)),
+                'total_actual_hours': Decimal(str(r.actual_hours)),
+                'avg_time_rating': _average(r.time_rating),
+                'avg_qc_rating': _average(r.qc_rating),
+                'avg_cleaning_rating': _average(r.cleaning_rating),
+                'completion_rate': _completion_rate(r.completed, r.assigned),
+                'total_points_earned': r.points,
+                'current_streak_days': streak,
+                'max_streak_days': max(prev_max, streak),
+                'total_pauses': r.pauses,
+                'total_pause_minutes': r.pause_minutes,
+            }
+
+        PerformanceRollupService._upsert('daily', target_date, target_date, values)
+        db.session.commit()
+
+        if milestones:
+            from app.services.notification_service import NotificationService
+            NotificationService.create_notifications(milestones)
+
+        if rollup:
+            for period_type in ('weekly', 'monthly'):
+                PerformanceRollupService.rollup(period_type, target_date, user_ids)
+        return len(values)
+
+    @staticmethod
+    def rollup(period_type, day, user_ids=None):
+        """
+        Rebuild the weekly or monthly rows of the period containing day from
+        its daily rows.
+
+        Counts, hours, points and pauses are summed; ratings are the mean of
+        the daily averages; the current streak is the one on the period's
+        last computed day.
+
+        Args:
+            period_type: 'weekly' or 'monthly'
+            day: Any date in the period
+            user_ids: Workers to rebuild (default: everyone with daily rows)
+
+        Returns:
+            int: number of rows written
+        """
+        P = WorkPlanPerformance
+        start, end = period_bounds(period_type, day)
+        in_period = [P.period_type == 'daily', P.period_start >= start, P.period_start <= end]
+        if user_ids is not None:
+            in_period.append(P.user_id.in_(user_ids))
+
+        summed = ('total_jobs_assigned', 'total_jobs_completed', 'total_jobs_incomplete',
+                  'total_jobs_not_started', 'total_jobs_carried_over', 'total_estimated_hours',
+                  'total_actual_hours', 'total_points_earned', 'total_pauses', 'total_pause_minutes',
+                  'late_starts', 'materials_planned', 'materials_consumed')
+        averaged = ('avg_time_rating', 'avg_qc_rating', 'avg_cleaning_rating')
+        totals = db.session.query(
+            P.user_id.label('user_id'),
+            func.max(P.period_start).label('last_day'),
+            func.max(P.max_streak_days).label('max_streak_days'),
+            *(func.coalesce(func.sum(getattr(P, name)), 0).label(name) for name in summed),
+            *(func.avg(getattr(P, name)).label(name) for name in averaged),
+        ).filter(*in_period).group_by(P.user_id).subquery()
+        last = aliased(P)
+        rows = db.session.query(totals, last.current_streak_days).join(
+            last, and_(last.user_id == totals.c.user_id, last.period_start == totals.c.last_day,
+                       last.period_type == 'daily')
+        ).all()
+
+        values = {}
+        for r in rows:
+            values[r.user_id] = {
+                **{name: getattr(r, name) for name in summed},
+                **{name: _average(getattr(r, name)) for name in averaged},
+                'total_estimated_hours': Decimal(str(r.total_estimated_hours)),
+                'total_actual_hours': Decimal(str(r.total_actual_hours)),
+                'completion_rate': _completion_rate(r.total_jobs_completed, r.total_jobs_assigned),
+                'current_streak_days': r.current_streak_days,
+                'max_streak_days': r.max_streak_days,
+            }
+
+        PerformanceRollupService._upsert(period_type, start, end, values)
+        db.session.commit()
+        return len(values)
+
+    @staticmethod
+    def _upsert(period_type, start, end, values):
+        """Insert or update one period's rows; values maps user_id to columns."""
+        if not values:
+            return
+        P = WorkPlanPerformance
+        existing = dict(db.session.query(P.user_id, P.id).filter(
+            P.period_type == period_type, P.period_start == start, P.user_id.in_(list(values))
+        ))
+        now = datetime.utcnow()
+        created, changed = [], []
+        for user_id, columns in values.items():
+            if user_id in existing:
+                changed.append({'id': existing[user_id], **columns, 'period_end': end, 'updated_at': now})
+            else:
+                created.append({
+                    'user_id': user_id, 'period_type': period_type, 'period_start': start,
+                    'period_end': end, **columns, 'created_at': now, 'updated_at': now,
+                })
+        if created:
+            db.session.execute(P.__table__.insert(), created)
+        if changed:
+            db.session.execute(update(P), changed)
+        logger.info("%s performance %s: %d created, %d updated", period_type.capitalize(), start,
+                    len(created), len(changed))
@@ -0,0 +1,226 @@
+"""
+Equipment reading time series.
+
+Readings are loaded with one column query into NumPy arrays (timestamps as
+datetime64 seconds, values as float64), so statistics and chart series are
+computed with vectorised operations instead of per-row Python loops. Long
+ranges are downsampled to a bounded number of points, either with
+Largest-Triangle-Three-Buckets (keeps the visual shape, returns real
+readings) or with equal-width time bucket averages.
+"""
+
+import logging
+from datetime import date, datetime, time
+
+import numpy as np
+
+from app.extensions import db
+from app.models.equipment_reading import EquipmentReading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_POINTS = 500
+DOWNSAMPLE_METHODS = ('lttb', 'bucket')
+PERCENTILES = (50, 90, 95)
+
+
+def summarize(values):
+    """
+    Summary statistics for a series of values, oldest first.
+
+    Trend compares the mean of the last 3 readings with the first 3
+    (needs at least 6): more than 5% up is 'increasing', more than 5%
+    down is 'decreasing'.
+    """
+    y = np.asarray(values, dtype=np.float64)
+    if y.size == 0:
+        return {'count': 0, 'avg': 0, 'min': 0, 'max': 0, 'latest': 0, 'stddev': 0,
+                'p50': 0, 'p90': 0, 'p95': 0, 'trend': 'stable'}
+
+    trend = 'stable'
+    if y.size >= 6:
+        early, recent = y[:3].mean(), y[-3:].mean()
+        if recent > early * 1.05:
+            trend = 'increasing'
+        elif recent < early * 0.95:
+            trend = 'decreasing'
+
+    percentiles = np.percentile(y, PERCENTILES)
+    stats = {
+        'count': int(y.size),
+        'avg': round(float(y.mean()), 2),
+        'min': round(float(y.min()), 2),
+        'max': round(float(y.max()), 2),
+        'latest': round(float(y[-1]), 2),
+        'stddev': round(float(y.std()), 2),
+        'trend': trend,
+    }
+    for p, value in zip(PERCENTILES, percentiles):
+        stats[f'p{p}'] = round(float(value), 2)
+    return stats
+
+
+def rolling(values, window):
+    """Trailing rolling mean and standard deviation (partial windows at the start)."""
+    y = np.asarray(values, dtype=np.float64)
+    if y.size == 0:
+        return y, y
+    window = max(1, int(window))
+    cs = np.concatenate(([0.0], np.cumsum(y)))
+    cs2 = np.concatenate(([0.0], np.cumsum(y * y)))
+    end = np.arange(1, y.size + 1)
+    start = np.maximum(end - window, 0)
+    n = end - start
+    mean = (cs[end] - cs[start]) / n
+    var = np.maximum((cs2[end] - cs2[start]) / n - mean * mean, 0.0)
+    return mean, np.sqrt(var)
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    Always keeps the first and last point; every bucket in between
+    contributes the point forming the largest triangle with the previously
+    kept point and the mean of the next bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo, next_hi = edges[i + 1], edges[i + 2] if i + 2 < edges.size else n
+        avg_x, avg_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def bucket_average(x, y, buckets):
+    """Mean timestamp and value per equal-width time bucket (empty buckets dropped)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.size <= buckets:
+        return x, y
+    edges = np.linspace(x[0], x[-1], buckets + 1)
+    which = np.clip(np.searchsorted(edges, x, side='right') - 1, 0, buckets - 1)
+    counts = np.bincount(which, minlength=buckets)
+    filled = counts > 0
+    mean_x = np.bincount(which, weights=x, minlength=buckets)[filled] / counts[filled]
+    mean_y = np.bincount(which, weights=y, minlength=buckets)[filled] / counts[filled]
+    return mean_x, mean_y
+
+
+class ReadingSeries:
+    """One equipment's readings of one type as parallel arrays, oldest first."""
+
+    def __init__(self, ids, timestamps, values):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        self.values = np.asarray(values, dtype=np.float64)
+
+    def __len__(self):
+        return int(self.values.size)
+
+    @property
+    def seconds(self):
+        return self.timestamps.astype(np.int64).astype(np.float64)
+
+
+class ReadingSeriesService:
+    """Loads equipment reading series and serves statistics and chart data."""
+
+    @staticmethod
+    def load(equipment_id, reading_type, start=None, end=None):
+        """
+        Non-faulty readings of one type in [start, end] (dates, inclusive).
+
+        A reading's timestamp is its recorded_at, or midnight of its
+        reading_date when that is missing.
+        """
+        query = db.session.query(
+            EquipmentReading.id, EquipmentReading.reading_value,
+            EquipmentReading.reading_date, EquipmentReading.recorded_at,
+        ).filter(
+            EquipmentReading.equipment_id == equipment_id,
+            EquipmentReading.reading_type == reading_type,
+            EquipmentReading.is_faulty.is_(False),
+            EquipmentReading.reading_value.isnot(None),
+        )
+        if start is not None:
+            query = query.filter(EquipmentReading.reading_date >= start)
+        if end is not None:
+            query = query.filter(EquipmentReading.reading_date <= end)
+        rows = query.order_by(EquipmentReading.reading_date, EquipmentReading.recorded_at).all()
+
+        series = ReadingSeries(
+            [r.id for r in rows],
+            [r.recorded_at or datetime.combine(r.reading_date, time.min) for r in rows],
+            [r.reading_value for r in rows],
+        )
+        order = np.argsort(series.timestamps, kind='stable')
+        return ReadingSeries(series.ids[order], series.timestamps[order], series.values[order])
+
+    @staticmethod
+    def get_series(equipment_id, reading_type, start=None, end=None,
+                   max_points=DEFAULT_MAX_POINTS, method='lttb', window=None):
+        """
+        Chart data for a reading type: stats over the whole range plus at
+        most max_points points.
+
+        Args:
+            method: 'lttb' returns a subset of the actual readings;
+                'bucket' returns per-bucket averages (no reading ids)
+            window: When set (lttb only), adds trailing rolling mean/stddev
+                over this many readings, sampled at the returned points
+
+        Returns:
+            dict with count, stats, points, downsampled and method
+        """
+        if method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"method must be one of: {', '.join(DOWNSAMPLE_METHODS)}")
+        series = ReadingSeriesService.load(equipment_id, reading_type, start, end)
+        downsampled = len(series) > max_points
+
+        if method == 'bucket' and downsampled:
+            seconds, values = bucket_average(series.seconds, series.values, max_points)
+            stamps = seconds.round().astype(np.int64).astype('datetime64[s]')
+            points = [
+                {'t': t, 'value': round(float(v), 2)}
+                for t, v in zip(np.datetime_as_string(stamps, unit='s'), values)
+            ]
+            kept = None
+        else:
+            kept = lttb(series.seconds, series.values, max_points)
+            points = [
+                {'id': int(i), 't': t, 'value': float(v)}
+                for i, t, v in zip(series.ids[kept],
+                                   np.datetime_as_string(series.timestamps[kept], unit='s'),
+                                   series.values[kept])
+            ]
+
+        if window and kept is not None:
+            mean, std = rolling(series.values, window)
+            for point, m, s in zip(points, mean[kept], std[kept]):
+                point['rolling_mean'] = round(float(m), 2)
+                point['rolling_stddev'] = round(float(s), 2)
+
+        return {
+            'equipment_id': equipment_id,
+            'reading_type': reading_type,
+            'start': start.isoformat() if isinstance(start, date) else None,
+            'end': end.isoformat() if isinstance(end, date) else None,
+            'count': len(series),
+            'stats': summarize(series.values),
+            'points': points,
+            'downsampled': downsampled,
+            'method': method,
+        }
@@ -0,0 +1,352 @@
+"""
+Realtime (Socket.IO) plumbing shared by every web worker.
+
+Two pieces make WebSocket delivery work when gunicorn runs more than one
+worker process:
+
+- a pub/sub client manager, so an emit from any worker (request handler,
+  scheduler job or background thread) reaches sockets held by every worker;
+- a connection registry indexed by sid and by user, so "is this user
+  connected?" is answered from shared state instead of a per-process dict.
+
+Backends are chosen from SOCKETIO_MESSAGE_QUEUE:
+  ''              single process, no queue (previous behaviour)
+  'memory://'     in-process bus; lets tests run several servers side by side
+  'redis://...'   Redis pub/sub + Redis-backed registry (needs the redis package)
+  other URLs      passed to Flask-SocketIO (kombu/kafka/zmq managers)
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+def _build_local_manager_class():
+    import socketio
+
+    class LocalPubSubManager(socketio.PubSubManager):
+        """
+        In-process stand-in for a message queue.
+
+        Every manager created in this process on the same channel shares one
+        bus, so two SocketIO servers in a test behave like two workers
+        attached to Redis.
+        """
+        name = 'local'
+        _buses = {}
+        _buses_lock = threading.Lock()
+
+        def __init__(self, channel='socketio', write_only=False, logger=None):
+            super().__init__(channel=channel, write_only=write_only, logger=logger)
+            self._inbox = queue.Queue()
+
+        def initialize(self):
+            # Join the bus only once this server starts listening, so a
+            # worker without sockets does not accumulate undelivered messages.
+            if not self.write_only:
+                with self._buses_lock:
+                    self._buses.setdefault(self.channel, []).append(self._inbox)
+            super().initialize()
+
+        def _publish(self, data):
+            with self._buses_lock:
+                inboxes = list(self._buses.get(self.channel, []))
+            for inbox in inboxes:
+                inbox.put(data)
+
+        def _listen(self):
+            while True:
+                yield self._inbox.get()
+
+    return LocalPubSubManager
+
+
+_local_manager_class = None
+
+
+def local_pubsub_manager(channel='socketio', write_only=False):
+    """Create an in-process pub/sub client manager on the given channel."""
+    global _local_manager_class
+    if _local_manager_class is None:
+        _local_manager_class = _build_local_manager_class()
+    return _local_manager_class(channel=channel, write_only=write_only)
+
+
+def socketio_queue_options(url, channel):
+    """
+    Translate SOCKETIO_MESSAGE_QUEUE into Flask-SocketIO keyword arguments.
+
+    Returns {} when no queue is configured or the backend's client library
+    is missing, so the server falls back to single-process delivery.
+    """
+    if not url:
+        return {}
+    if url.startswith('memory://'):
+        return {'client_manager': local_pubsub_manager(channel=channel)}
+    if url.startswith(('redis://', 'rediss://')):
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            logger.warning("SOCKETIO_MESSAGE_QUEUE is Redis but the redis package is not installed; "
+                           "WebSocket delivery stays per-process")
+            return {}
+    return {'message_queue': url, 'channel': channel}
+
+
+# ───────────────────────── Connection registry ─────────────────────────
+
+class ConnectionRegistry:
+    """
+    Socket connection state indexed by sid and by user_id (single process).
+
+    All lookups are O(1); `is_user_connected` no longer scans every socket.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_sid = {}
+        self._by_user = {}
+
+    def add(self, sid, user_id):
+        with self._lock:
+            self._by_sid[sid] = {
+                'user_id': user_id,
+                'connected_at': datetime.utcnow(),
+                'subscriptions': set(),
+            }
+            self._by_user.setdefault(user_id, set()).add(sid)
+
+    def remove(self, sid):
+        """Forget a connection; returns its info dict, or None if unknown."""
+        with self._lock:
+            info = self._by_sid.pop(sid, None)
+            if info is None:
+                return None
+            sids = self._by_user.get(info['user_id'])
+            if sids is not None:
+                sids.discard(sid)
+                if not sids:
+                    del self._by_user[info['user_id']]
+            return info
+
+    def get(self, sid):
+        info = self._by_sid.get(sid)
+        if info is None:
+            return None
+        return {**info, 'subscriptions': set(info['subscriptions'])}
+
+    def add_subscriptions(self, sid, rooms):
+        with self._lock:
+            info = self._by_sid.get(sid)
+            if info is None:
+                return set()
+            info['subscriptions'].update(rooms)
+            return set(info['subscriptions'])
+
+    def remove_subscriptions(self, sid, rooms):
+        with self._lock:
+            info = self._by_sid.get(sid)
+            if info is None:
+                return set()
+            info['subscriptions'].difference_update(rooms)
+            return set(info['subscriptions'])
+
+    def touch(self, sid):
+        """Note that a socket is alive; True if it is registered."""
+        return sid in self._by_sid
+
+    def is_user_connected(self, user_id):
+        return user_id in self._by_user
+
+    def connected_user_ids(self):
+        return list(self._by_user)
+
+    def connection_count(self):
+        return len(self._by_sid)
+
+
+class RedisConnectionRegistry:
+    """
+    Connection registry kept in Redis so every worker sees every socket.
+
+    Keys (all under `prefix`):
+      sid:<sid>      hash {user_id, connected_at}
+      subs:<sid>     set of subscribed rooms
+      user:<uid>     set of the user's live sids
+      users          sorted set of user ids, scored by their last heartbeat
+      sids           sorted set of all live sids, scored by their last heartbeat
+
+    Entries expire after `ttl` seconds so sockets of a crashed worker drop
+    out within minutes. Each worker refreshes the sockets it holds from a
+    heartbeat thread every ttl/3 seconds; connect, subscribe and client
+    pings refresh a socket too. The per-sid and per-user keys expire in
+    Redis; the two global sorted sets cannot, so reads only count members
+    seen within `ttl` and writes prune the rest.
+    """
+
+    def __init__(self, url=None, prefix='socketio:registry', ttl=5 * 60, client=None, heartbeat=True):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self._redis = client
+        self._prefix = prefix
+        self._ttl = ttl
+        # sid -> user_id for the sockets this process holds
+        self._held = {}
+        self._held_lock = threading.Lock()
+        self._heartbeat_enabled = heartbeat
+        self._heartbeat_pid = None
+        # users/sids used to be plain sets, which the sorted-set commands reject
+        for key in (self._key('users'), self._key('sids')):
+            if self._redis.type(key) == 'set':
+                self._redis.delete(key)
+
+    def _key(self, *parts):
+        return ':'.join((self._prefix,) + tuple(str(p) for p in parts))
+
+    def _live_since(self):
+        return time.time() - self._ttl
+
+    def _heartbeat(self, pipe, sid, user_id, prune=True):
+        """Refresh the sid's and user's expiry and drop members that went stale."""
+        now = time.time()
+        for key in (self._key('sid', sid), self._key('subs', sid), self._key('user', user_id)):
+            pipe.expire(key, self._ttl)
+        pipe.zadd(self._key('users'), {user_id: now})
+        pipe.zadd(self._key('sids'), {sid: now})
+        if prune:
+            self._prune(pipe, now)
+
+    def _prune(self, pipe, now):
+        pipe.zremrangebyscore(self._key('users'), '-inf', now - self._ttl)
+        pipe.zremrangebyscore(self._key('sids'), '-inf', now - self._ttl)
+
+    def _start_heartbeat(self):
+        """
+        Start this process's heartbeat thread on its first socket. Lazy, so a
+        registry built before gunicorn forks still beats in every worker.
+        """
+        pid = os.getpid()
+        if not self._heartbeat_enabled or self._heartbeat_pid == pid:
+            return
+        with self._held_lock:
+            if self._heartbeat_pid == pid:
+                return
+            self._heartbeat_pid = pid
+        threading.Thread(target=self._beat, name='socketio-registry-heartbeat', daemon=True).start()
+
+    def _beat(self):
+        while True:
+            time.sleep(self._ttl / 3)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Connection registry heartbeat failed: %s", e)
+
+    def refresh(self):
+        """Refresh the expiry of every socket this process holds; returns how many."""
+        with self._held_lock:
+            held = dict(self._held)
+        if not held:
+            return 0
+        pipe = self._redis.pipeline()
+        for sid, user_id in held.items():
+            self._heartbeat(pipe, sid, user_id, prune=False)
+        self._prune(pipe, time.time())
+        pipe.execute()
+        return len(held)
+
+    def add(self, sid, user_id):
+        pipe = self._redis.pipeline()
+        pipe.hset(self._key('sid', sid), mapping={
+            'user_id': user_id,
+            'connected_at': datetime.utcnow().isoformat(),
+        })
+        pipe.sadd(self._key('user', user_id), sid)
+        self._heartbeat(pipe, sid, user_id)
+        pipe.execute()
+        with self._held_lock:
+            self._held[sid] = user_id
+        self._start_heartbeat()
+
+    def remove(self, sid):
+        with self._held_lock:
+            self._held.pop(sid, None)
+        info = self.get(sid)
+        if info is None:
+            self._redis.zrem(self._key('sids'), sid)
+            return None
+        user_id = info['user_id']
+        pipe = self._redis.pipeline()
+        pipe.delete(self._key('sid', sid), self._key('subs', sid))
+        pipe.srem(self._key('user', user_id), sid)
+        pipe.zrem(self._key('sids'), sid)
+        pipe.scard(self._key('user', user_id))
+        remaining = pipe.execute()[-1]
+        if not remaining:
+            self._redis.zrem(self._key('users'), user_id)
+        return info
+
+    def get(self, sid):
+        data = self._redis.hgetall(self._key('sid', sid))
+        if not data:
+            return None
+        return {
+            'user_id': int(data['user_id']),
+            'connected_at': datetime.fromisoformat(data['connected_at']),
+            'subscriptions': self._redis.smembers(self._key('subs', sid)),
+        }
+
+    def add_subscriptions(self, sid, rooms):
+        key = self._key('subs', sid)
+        user_id = self._redis.hget(self._key('sid', sid), 'user_id')
+        pipe = self._redis.pipeline()
+        if rooms:
+            pipe.sadd(key, *rooms)
+        if user_id is not None:
+            self._heartbeat(pipe, sid, user_id)
+        else:
+            pipe.expire(key, self._ttl)
+        pipe.smembers(key)
+        return set(pipe.execute()[-1])
+
+    def remove_subscriptions(self, sid, rooms):
+        key = self._key('subs', sid)
+        if rooms:
+            self._redis.srem(key, *rooms)
+        return set(self._redis.smembers(key))
+
+    def touch(self, sid):
+        """Refresh a socket's expiry (client keep-alive); True if it is registered."""
+        user_id = self._redis.hget(self._key('sid', sid), 'user_id')
+        if user_id is None:
+            return False
+        pipe = self._redis.pipeline()
+        self._heartbeat(pipe, sid, user_id)
+        pipe.execute()
+        return True
+
+    def is_user_connected(self, user_id):
+        # user:<uid> expires with the user's sockets, unlike the global index
+        return bool(self._redis.exists(self._key('user', user_id)))
+
+    def connected_user_ids(self):
+        return [int(u) for u in self._redis.zrangebyscore(self._key('users'), self._live_since(), '+inf')]
+
+    def connection_count(self):
+        return self._redis.zcount(self._key('sids'), self._live_since(), '+inf')
+
+
+def build_connection_registry(url):
+    """Pick the registry that matches the configured message queue."""
+    if url and url.startswith(('redis://', 'rediss://')):
+        try:
+            return RedisConnectionRegistry(url)
+        except ImportError:
+            logger.warning("redis package not installed; connection registry is per-process")
+    return ConnectionRegistry()
@@ -0,0 +1,291 @@
+"""
+Bulk inspection report export.
+
+PDF rendering is CPU-bound (plus photo downloads), so reports are rendered
+by a bounded worker pool while the request thread keeps loading inspection
+data and writing finished PDFs into the ZIP. At most twice the pool size
+of reports is in flight at any time, so memory stays flat however many
+inspections are exported:
+
+- small exports stream the ZIP straight into the response
+  (stream_zip(render_reports(...)))
+- large exports become a ReportExport job that a background thread writes
+  to disk, updating its progress as reports finish
+
+Each web worker process keeps one pool and shares it between exports, so
+concurrent exports queue for the same workers instead of each spawning its
+own. A background export dies with its worker process; prune() marks exports
+stuck in 'pending' or 'running' past REPORT_EXPORT_TIMEOUT_MINUTES as failed.
+"""
+
+import atexit
+import logging
+import multiprocessing
+import os
+import threading
+import uuid
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import Inspection, ReportExport
+
+logger = logging.getLogger(__name__)
+
+# Inspections loaded (and serialized) per query
+LOAD_CHUNK = 50
+MAX_DEFAULT_WORKERS = 4
+
+# (pool kind, workers, pid) -> executor shared by this process's exports
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+@atexit.register
+def _shutdown_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _render_report(filename, inspection_data, language):
+    """Worker: render one report. Module level so process pools can pickle it."""
+    from app.services.pdf_report_service import generate_inspection_report
+    try:
+        return filename, generate_inspection_report(inspection_data, language=language).getvalue(), None
+    except Exception as e:
+        return filename, None, str(e)
+
+
+class _ZipSink:
+    """Write-only file object whose contents are drained after each entry."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ReportExportService:
+    """Renders inspection reports in parallel and packages them as ZIPs."""
+
+    @staticmethod
+    def iter_payloads(inspection_ids, language):
+        """(filename, inspection_data) for each exportable inspection, loaded in chunks."""
+        for start in range(0, len(inspection_ids), LOAD_CHUNK):
+            chunk = inspection_ids[start:start + LOAD_CHUNK]
+            inspections = {
+                i.id: i for i in Inspection.query.filter(
+                    Inspection.id.in_(chunk), Inspection.status != 'draft'
+                )
+            }
+            for inspection_id in chunk:
+                inspection = inspections.get(inspection_id)
+                if inspection is None:
+                    continue
+                code = inspection.inspection_code or f"INS-{inspection.id}"
+                yield (f"inspection_report_{code}.pdf",
+                       inspection.to_dict(include_answers=True, language=language))
+            # Serialized data is all the workers need; drop the ORM objects
+            db.session.expire_all()
+
+    @staticmethod
+    def render_reports(payloads, language, workers=None):
+        """
+        Render reports on a worker pool, yielding (filename, pdf_bytes, error)
+        in completion order.
+
+        Submission is throttled so that at most 2 x workers reports are
+        queued or rendered at once.
+        """
+        workers = workers or ReportExportService.worker_count()
+        pool = ReportExportService._executor(workers)
+        pending = set()
+        try:
+            for filename, data in payloads:
+                pending.add(pool.submit(_render_report, filename, data, language))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        except BrokenExecutor:
+            # A worker process died; the next export gets a fresh pool
+            ReportExportService._discard_executor(pool)
+            raise
+        finally:
+            # Stopped early (client went away): don't render what nobody will read
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def stream_zip(results):
+        """Yield ZIP bytes entry by entry; failed renders are left out."""
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for filename, pdf_bytes, error in results:
+                if pdf_bytes is None:
+                    logger.warning("Report %s failed to render: %s", filename, error)
+                    continue
+                zip_file.writestr(filename, pdf_bytes)
+                yield sink.drain()
+        yield sink.drain()
+
+    @staticmethod
+    def create(user_id, inspection_ids, language):
+        """Queue a background export (committed, not started)."""
+        export = ReportExport(user_id=user_id, inspection_ids=list(inspection_ids),
+                              language=language, total=len(inspection_ids))
+        db.session.add(export)
+        db.session.commit()
+        return export
+
+    @staticmethod
+    def start(export):
+        """Run an export on a daemon thread."""
+        app = current_app._get_current_object()
+
+        def _run(export_id):
+            with app.app_context():
+                try:
+                    ReportExportService.run(export_id)
+                finally:
+                    db.session.remove()
+
+        threading.Thread(target=_run, args=(export.id,), daemon=True).start()
+
+    @staticmethod
+    def run(export_id):
+        """Render an export's reports into its ZIP file, recording progress."""
+        export = db.session.get(ReportExport, export_id)
+        if export is None or export.status != 'pending':
+            return export
+
+        folder = os.path.join(current_app.config['UPLOAD_FOLDER'], 'exports')
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f'inspection_reports_{export.id}_{uuid.uuid4().hex[:8]}.zip')
+        export.status = 'running'
+        export.started_at = datetime.utcnow()
+        export.file_path = path
+        db.session.commit()
+
+        try:
+            payloads = ReportExportService.iter_payloads(export.inspection_ids, export.language)
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+                for filename, pdf_bytes, error in ReportExportService.render_reports(payloads, export.language):
+                    if pdf_bytes is None:
+                        logger.warning("Export %s: %s failed to render: %s", export_id, filename, error)
+                        export.failed += 1
+                    else:
+                        zip_file.writestr(filename, pdf_bytes)
+                        export.completed += 1
+                    db.session.commit()
+            # Inspections that were missing or still drafts count as skipped
+            export.failed = export.total - export.completed
+            export.status = 'completed'
+            export.file_size = os.path.getsize(path)
+        except Exception as e:
+            db.session.rollback()
+            logger.error("Report export %s failed: %s", export_id, e)
+            export = db.session.get(ReportExport, export_id)
+            export.status = 'failed'
+            export.error = str(e)
+        export.finished_at = datetime.utcnow()
+        db.session.commit()
+        return export
+
+    @staticmethod
+    def fail_stale(timeout_minutes=None):
+        """
+        Mark exports still pending or running after the timeout as failed.
+        Their thread died with a restarted worker, so nothing will finish them.
+
+        Returns:
+            int: number of exports marked failed
+        """
+        if timeout_minutes is None:
+            timeout_minutes = current_app.config.get('REPORT_EXPORT_TIMEOUT_MINUTES', 120)
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=timeout_minutes)
+        stale = ReportExport.query.filter(
+            ReportExport.status.in_(('pending', 'running')),
+            db.func.coalesce(ReportExport.started_at, ReportExport.created_at) < cutoff,
+        ).all()
+        for export in stale:
+            logger.warning("Report export %s was %s for over %d minutes; marking failed",
+                           export.id, export.status, timeout_minutes)
+            export.status = 'failed'
+            export.error = 'Export was interrupted (worker restarted); please request it again'
+            export.finished_at = now
+        db.session.commit()
+        return len(stale)
+
+    @staticmethod
+    def prune(keep_days=7):
+        """
+        Fail interrupted exports, then delete finished exports (and their
+        files) older than keep_days.
+        """
+        ReportExportService.fail_stale()
+        cutoff = datetime.utcnow() - timedelta(days=keep_days)
+        old = ReportExport.query.filter(
+            ReportExport.status.in_(('completed', 'failed')),
+            ReportExport.finished_at < cutoff,
+        ).all()
+        for export in old:
+            if export.file_path and os.path.exists(export.file_path):
+                try:
+                    os.remove(export.file_path)
+                except OSError as e:
+                    logger.warning("Could not remove export file %s: %s", export.file_path, e)
+            db.session.delete(export)
+        db.session.commit()
+        return len(old)
+
+    @staticmethod
+    def worker_count():
+        configured = current_app.config.get('REPORT_EXPORT_WORKERS', 0)
+        return configured or min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS)
+
+    @staticmethod
+    def _executor(workers):
+        """This process's shared pool of the configured kind and size."""
+        kind = current_app.config.get('REPORT_EXPORT_POOL', 'process')
+        # The pid keeps a pool created before a fork from leaking into the child
+        key = (kind, workers, os.getpid())
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                if kind == 'thread':
+                    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-export')
+                else:
+                    # spawn: forking a multi-threaded gunicorn worker can deadlock the child
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                _pools[key] = pool
+            return pool
+
+    @staticmethod
+    def _discard_executor(pool):
+        with _pools_lock:
+            for key, cached in list(_pools.items()):
+                if cached is pool:
+                    del _pools[key]
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,313 @@
+"""
+Running hours snapshots.
+
+An equipment's current hours come from whichever of three sources has the
+latest reading:
+  1) EquipmentReading.rnr — written by inspections when AI extraction succeeds
+  2) RunningHoursReading — manual entries via the dashboard
+  3) InspectionAnswer.answer_value — inspector-typed numeric answers for
+     running-hours checklist items
+
+Merging them per equipment on every dashboard request costs several queries
+per equipment. Instead each write path calls refresh() for the equipment it
+touched, in the same transaction, and the fleet views read one
+RunningHoursSnapshot row per equipment.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.running_hours import RunningHoursReading, ServiceInterval, RunningHoursSnapshot
+from app.models.equipment import Equipment
+from app.models.equipment_reading import EquipmentReading
+from app.models.inspection import Inspection, InspectionAnswer
+from app.models.checklist import ChecklistItem
+from app.models.user import User
+from app.services.running_hours_detection import is_running_hours_question
+
+logger = logging.getLogger(__name__)
+
+# Inspection statuses whose answers count as readings
+READING_INSPECTION_STATUSES = ('submitted', 'reviewed')
+
+
+def get_service_status(current_hours, service_interval):
+    """Calculate service status based on current hours and interval config."""
+    if not service_interval:
+        return 'ok', None, None, 0
+
+    hours_until = service_interval.next_service_hours - current_hours
+    interval = service_interval.service_interval_hours or 500
+
+    if hours_until <= 0:
+        return 'overdue', hours_until, abs(hours_until), 100
+    elif hours_until <= service_interval.alert_threshold_hours:
+        pct = ((interval - hours_until) / interval) * 100
+        return 'approaching', hours_until, None, min(pct, 100)
+    else:
+        pct = ((interval - hours_until) / interval) * 100
+        return 'ok', hours_until, None, max(pct, 0)
+
+
+def get_running_hours_item_ids():
+    """Return checklist_item IDs that represent running-hours questions."""
+    items = ChecklistItem.query.filter(ChecklistItem.answer_type == 'numeric').all()
+    return [
+        ci.id for ci in items
+        if is_running_hours_question(ci.question_text, ci.question_text_ar)
+    ]
+
+
+class RunningHoursSnapshotService:
+    """Maintains RunningHoursSnapshot rows and shapes them for the API."""
+
+    @staticmethod
+    def refresh(equipment_ids=None, rh_item_ids=None):
+        """
+        Recompute snapshots from the reading sources and service intervals.
+
+        Each source is read with one windowed query (latest row per
+        equipment), so the cost does not depend on how many equipment are
+        refreshed. Changes are flushed with the caller's transaction, not
+        committed.
+
+        Args:
+            equipment_ids: Equipment to refresh (default: all not scrapped)
+            rh_item_ids: Running-hours checklist item IDs, if already known
+
+        Returns:
+            int: number of snapshots written
+        """
+        if equipment_ids is None:
+            ids = [eq_id for eq_id, in db.session.query(Equipment.id).filter(Equipment.is_scrapped.is_(False))]
+        else:
+            ids = list(set(equipment_ids))
+        if not ids:
+            return 0
+        if rh_item_ids is None:
+            rh_item_ids = get_running_hours_item_ids()
+        scope = ids if equipment_ids is not None else None
+
+        candidates = {}
+
+        def consider(eq_id, source, hours, ts, last_reading):
+            # Ties keep the earlier source, as the merged sort always did
+            if ts is None:
+                return
+            current = candidates.get(eq_id)
+            if current is None or ts > current[2]:
+                candidates[eq_id] = (source, hours, ts, last_reading)
+
+        for row in RunningHoursSnapshotService._latest_equipment_readings(scope):
+            ts = row.recorded_at or (
+                datetime.combine(row.reading_date, datetime.min.time()) if row.reading_date else None
+            )
+            consider(row.equipment_id, 'equipment_reading', row.reading_value, ts, {
+                'id': row.id,
+                'hours': row.reading_value,
+                'recorded_at': ts.isoformat() if ts else None,
+                'source': 'equipment_reading',
+                'inspection_id': row.inspection_id,
+            })
+
+        for latest, prev in RunningHoursSnapshotService._latest_manual_readings(scope):
+            consider(latest.equipment_id, 'running_hours_reading', latest.hours, latest.recorded_at,
+                     RunningHoursSnapshotService._manual_reading_dict(latest, prev))
+
+        for row in RunningHoursSnapshotService._latest_inspection_answers(scope, rh_item_ids):
+            try:
+                value = float(str(row.answer_value).replace(',', '').strip())
+            except (TypeError, ValueError):
+                continue
+            consider(row.equipment_id, 'inspection_answer', value, row.answered_at, {
+                'id': row.id,
+                'hours': value,
+                'recorded_at': row.answered_at.isoformat() if row.answered_at else None,
+                'source': 'inspection_answer',
+                'inspection_id': row.inspection_id,
+            })
+
+        intervals = ServiceInterval.query
+        existing = RunningHoursSnapshot.query
+        if scope is not None:
+            intervals = intervals.filter(ServiceInterval.equipment_id.in_(scope))
+            existing = existing.filter(RunningHoursSnapshot.equipment_id.in_(scope))
+        intervals = {si.equipment_id: si for si in intervals}
+        existing = {s.equipment_id: s for s in existing}
+
+        now = datetime.utcnow()
+        for eq_id in ids:
+            source, hours, ts, last_reading = candidates.get(eq_id, (None, 0, None, None))
+            si = intervals.get(eq_id)
+            status, hours_until, hours_overdue, progress = get_service_status(hours, si)
+
+            snapshot = existing.get(eq_id)
+            if snapshot is None:
+                snapshot = RunningHoursSnapshot(equipment_id=eq_id)
+                db.session.add(snapshot)
+            snapshot.current_hours = hours
+            snapshot.reading_source = source
+            snapshot.reading_at = ts
+            snapshot.last_reading = last_reading
+            snapshot.next_service_hours = si.next_service_hours if si else None
+            snapshot.hours_until_service = hours_until
+            snapshot.hours_overdue = hours_overdue
+            snapshot.service_status = status
+            snapshot.progress_percent = round(progress, 1)
+            snapshot.refreshed_at = now
+
+        db.session.flush()
+        return len(ids)
+
+    @staticmethod
+    def ensure_snapshots():
+        """Create snapshots for equipment that has none yet (commits if any)."""
+        missing = [
+            eq_id for eq_id, in db.session.query(Equipment.id).outerjoin(
+                RunningHoursSnapshot, RunningHoursSnapshot.equipment_id == Equipment.id
+            ).filter(Equipment.is_scrapped.is_(False), RunningHoursSnapshot.id.is_(None))
+        ]
+        if missing:
+            RunningHoursSnapshotService.refresh(missing)
+            db.session.commit()
+        return len(missing)
+
+    @staticmethod
+    def get(equipment):
+        """The equipment's snapshot, created on first use."""
+        snapshot = RunningHoursSnapshot.query.filter_by(equipment_id=equipment.id).first()
+        if snapshot is None:
+            RunningHoursSnapshotService.refresh([equipment.id])
+            db.session.commit()
+            snapshot = RunningHoursSnapshot.query.filter_by(equipment_id=equipment.id).first()
+        return snapshot
+
+    @staticmethod
+    def fleet_query():
+        """(Equipment, snapshot, ServiceInterval, engineer) rows for the fleet views."""
+        return db.session.query(Equipment, RunningHoursSnapshot, ServiceInterval, User).join(
+            RunningHoursSnapshot, RunningHoursSnapshot.equipment_id == Equipment.id
+        ).outerjoin(
+            ServiceInterval, ServiceInterval.equipment_id == Equipment.id
+        ).outerjoin(
+            User, User.id == Equipment.assigned_technician_id
+        ).filter(Equipment.is_scrapped.is_(False))
+
+    @staticmethod
+    def to_payload(equipment, snapshot, service_interval, engineer):
+        """Shape a snapshot like the running hours API has always returned it."""
+        return {
+            'equipment_id': equipment.id,
+            'equipment_name': equipment.name,
+            'equipment_type': equipment.equipment_type,
+            'current_hours': snapshot.current_hours,
+            'last_reading': snapshot.last_reading,
+            'service_interval': service_interval.to_dict() if service_interval else None,
+            'service_status': snapshot.service_status,
+            'hours_until_service': snapshot.hours_until_service,
+            'hours_overdue': snapshot.hours_overdue,
+            'progress_percent': snapshot.progress_percent,
+            'assigned_engineer_id': equipment.assigned_technician_id,
+            'assigned_engineer': {
+                'id': engineer.id,
+                'full_name': engineer.full_name,
+                'email': engineer.email,
+            } if engineer else None,
+            'location': equipment.location or '',
+            'berth': equipment.berth,
+        }
+
+    @staticmethod
+    def _latest_equipment_readings(equipment_ids):
+        rn = func.row_number().over(
+            partition_by=EquipmentReading.equipment_id,
+            order_by=(EquipmentReading.reading_date.desc(), EquipmentReading.recorded_at.desc()),
+        ).label('rn')
+        query = db.session.query(
+            EquipmentReading.id, EquipmentReading.equipment_id, EquipmentReading.reading_value,
+            EquipmentReading.reading_date, EquipmentReading.recorded_at, EquipmentReading.inspection_id, rn,
+        ).filter(
+            EquipmentReading.reading_type == 'rnr',
+            EquipmentReading.is_faulty.is_(False),
+            EquipmentReading.reading_value.isnot(None),
+        )
+        if equipment_ids is not None:
+            query = query.filter(EquipmentReading.equipment_id.in_(equipment_ids))
+        sub = query.subquery()
+        return db.session.query(sub).filter(sub.c.rn == 1).all()
+
+    @staticmethod
+    def _latest_manual_readings(equipment_ids):
+        """(latest, previous) RunningHoursReading rows per equipment."""
+        rn = func.row_number().over(
+            partition_by=RunningHoursReading.equipment_id,
+            order_by=RunningHoursReading.recorded_at.desc(),
+        ).label('rn')
+        query = db.session.query(
+            RunningHoursReading.id, RunningHoursReading.equipment_id, RunningHoursReading.hours,
+            RunningHoursReading.recorded_at, RunningHoursReading.recorded_by_id,
+            RunningHoursReading.notes, RunningHoursReading.source, rn,
+        )
+        if equipment_ids is not None:
+            query = query.filter(RunningHoursReading.equipment_id.in_(equipment_ids))
+        sub = query.subquery()
+        rows = db.session.query(sub, User.id.label('user_id'), User.full_name, User.role_id).outerjoin(
+            User, User.id == sub.c.recorded_by_id
+        ).filter(sub.c.rn <= 2).order_by(sub.c.equipment_id, sub.c.rn).all()
+
+        pairs = {}
+        for row in rows:
+            if row.rn == 1:
+                pairs[row.equipment_id] = [row, None]
+            elif row.equipment_id in pairs:
+                pairs[row.equipment_id][1] = row
+        return pairs.values()
+
+    @staticmethod
+    def _manual_reading_dict(row, prev):
+        """Same shape as RunningHoursReading.to_dict(), without its per-row query."""
+        if prev is not None and not prev.recorded_at < row.recorded_at:
+            prev = None
+        return {
+            'id': row.id,
+            'equipment_id': row.equipment_id,
+            'hours': row.hours,
+            'recorded_at': row.recorded_at.isoformat() if row.recorded_at else None,
+            'recorded_by_id': row.recorded_by_id,
+            'recorded_by': {
+                'id': row.recorded_by_id,
+                'full_name': row.full_name,
+                'role_id': row.role_id,
+            } if row.user_id is not None else None,
+            'notes': row.notes,
+            'source': row.source,
+            'hours_since_last': round(row.hours - prev.hours, 2) if prev else None,
+            'days_since_last': (row.recorded_at - prev.recorded_at).days if prev else None,
+        }
+
+    @staticmethod
+    def _latest_inspection_answers(equipment_ids, rh_item_ids):
+        if not rh_item_ids:
+            return []
+        rn = func.row_number().over(
+            partition_by=Inspection.equipment_id,
+            order_by=InspectionAnswer.answered_at.desc(),
+        ).label('rn')
+        query = db.session.query(
+            InspectionAnswer.id, InspectionAnswer.inspection_id, InspectionAnswer.answer_value,
+            InspectionAnswer.answered_at, Inspection.equipment_id, rn,
+        ).join(
+            Inspection, InspectionAnswer.inspection_id == Inspection.id
+        ).filter(
+            Inspection.status.in_(READING_INSPECTION_STATUSES),
+            InspectionAnswer.checklist_item_id.in_(rh_item_ids),
+            InspectionAnswer.answer_value.isnot(None),
+            InspectionAnswer.answer_value != '',
+        )
+        if equipment_ids is not None:
+            query = query.filter(Inspection.equipment_id.in_(equipment_ids))
+        sub = query.subquery()
+        return db.session.query(sub).filter(sub.c.rn == 1).all()
@@ -17,7 +17,7 @@ from app.services.shared import (
     RecommendationType, Urgency
 )
 from app.services.shared.recommendation_engine import RecommendationEngine as SharedRecommendationEngine
-from app.services.shared.risk_scorer import RiskScorer as SharedRiskScorer, RiskFactor as SharedRiskFactor
+from app.services.shared.risk_scorer import RiskScorer as SharedRiskScorer
 from app.extensions import db
 from sqlalchemy import func, and_, or_
 import logging
@@ -66,7 +66,7 @@ class ScheduleAIService(AIServiceWrapper):
     # RISK-BASED SCHEDULING
     # =========================================================================
 
-    def calculate_equipment_risk_scores(self) -> List[Dict[str, Any]]:
+    def calculate_equipment_risk_scores(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Calculate risk score for all equipment based on:
         - Days since last inspection
@@ -74,218 +74,38 @@ class ScheduleAIService(AIServiceWrapper):
         - Equipment criticality
         - Recent inspection results
 
+        Scores are read from EquipmentRiskSnapshot rows (see
+        EquipmentRiskService), sorted and limited in the database.
+
+        Args:
+            limit: Return only the highest-risk N equipment
+
         Returns:
             Sorted list by risk (highest first)
         """
-        from app.models import Equipment, Inspection, Defect, InspectionAssignment
-
-        equipment_list = Equipment.query.filter(
-            Equipment.status.in_(['active', 'under_maintenance']),
-            Equipment.is_scrapped == False
-        ).all()
-
-        results = []
-
-        for eq in equipment_list:
-            factors = []
-
-            # Factor 1: Days since last inspection
-            last_inspection = Inspection.query.filter(
-                Inspection.equipment_id == eq.id,
-                Inspection.status == 'reviewed'
-            ).order_by(Inspection.submitted_at.desc()).first()
-
-            if last_inspection and last_inspection.submitted_at:
-                days_since = (datetime.utcnow() - last_inspection.submitted_at).days
-            else:
-                days_since = 365  # Assume never inspected
-
-            # Score: 0 if inspected today, 100 if 30+ days
-            days_score = min(100, (days_since / 30) * 100)
-            factors.append(SharedRiskFactor(
-                name='days_since_inspection',
-                weight=0.35,
-                score_fn=lambda ctx, s=days_score: s,
-                description=f'{days_since} days since last inspection'
-            ))
-
-            # Factor 2: Historical defect count (last 90 days)
-            ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-            defect_count = Defect.query.join(Inspection).filter(
-                Inspection.equipment_id == eq.id,
-                Defect.created_at >= ninety_days_ago
-            ).count()
-
-            # Score: 0-5 defects = 0-50, 5+ = 50-100
-            defect_score = min(100, defect_count * 20)
-            factors.append(SharedRiskFactor(
-                name='defect_history',
-                weight=0.25,
-                score_fn=lambda ctx, s=defect_score: s,
-                description=f'{defect_count} defects in last 90 days'
-            ))
-
-            # Factor 3: Equipment criticality
-            criticality_scores = {'critical': 100, 'high': 75, 'medium': 50, 'low': 25}
-            criticality = eq.criticality_level or 'medium'
-            criticality_score = criticality_scores.get(criticality, 50)
-            factors.append(SharedRiskFactor(
-                name='criticality',
-                weight=0.25,
-                score_fn=lambda ctx, s=criticality_score: s,
-                description=f'Criticality level: {criticality}'
-            ))
-
-            # Factor 4: Recent inspection results (fail rate)
-            recent_inspections = Inspection.query.filter(
-                Inspection.equipment_id == eq.id,
-                Inspection.status == 'reviewed',
-                Inspection.submitted_at >= ninety_days_ago
-            ).all()
-
-            if recent_inspections:
-                fail_count = sum(1 for i in recent_inspections if i.result == 'fail')
-                fail_rate = (fail_count / len(recent_inspections)) * 100
-            else:
-                fail_rate = 50  # Unknown, assume medium risk
-
-            factors.append(SharedRiskFactor(
-                name='fail_rate',
-                weight=0.15,
-                score_fn=lambda ctx, s=fail_rate: s,
-                description=f'{fail_rate:.0f}% failure rate'
-            ))
-
-            # Calculate total weighted score
-            total_score = sum(
-                f.score_fn({}) * f.weight for f in factors
-            )
-
-            # Determine risk level
-            if total_score >= 75:
-                risk_level = 'critical'
-            elif total_score >= 50:
-                risk_level = 'high'
-            elif total_score >= 25:
-                risk_level = 'medium'
-            else:
-                risk_level = 'low'
-
-            results.append({
-                'equipment_id': eq.id,
-                'equipment_name': eq.name,
-                'serial_number': eq.serial_number,
-                'equipment_type': eq.equipment_type,
-                'berth': eq.berth,
-                'risk_score': round(total_score, 1),
-                'risk_level': risk_level,
-                'factors': [
-                    {
-                        'name': f.name,
-                        'description': f.description,
-                        'weight': f.weight,
-                        'score': round(f.score_fn({}), 1),
-                        'weighted_score': round(f.score_fn({}) * f.weight, 1)
-                    }
-                    for f in factors
-                ],
-                'days_since_inspection': days_since,
-                'defect_count_90d': defect_count,
-                'calculated_at': datetime.utcnow().isoformat()
-            })
+        from app.services.equipment_risk_service import EquipmentRiskService
+        EquipmentRiskService.ensure_snapshots()
+        return EquipmentRiskService.risk_scores(limit)
 
-        # Sort by risk score descending
-        results.sort(key=lambda x: x['risk_score'], reverse=True)
-
-        return results
-
-    def get_coverage_gaps(self) -> List[Dict[str, Any]]:
+    def get_coverage_gaps(self, limit: Optional[int] = None, priority: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Find equipment with insufficient inspection coverage:
         - Not scheduled this week
         - Overdue for inspection
         - Below recommended frequency
 
+        Read from EquipmentRiskSnapshot rows like the risk scores.
+
+        Args:
+            limit: Return only the N most urgent gaps
+            priority: Only gaps of this priority
+
         Returns:
             List with equipment_id, days_uncovered, priority
         """
-        from app.models import Equipment, InspectionSchedule, InspectionAssignment, InspectionList, Inspection
-
-        today = date.today()
-        week_start = today - timedelta(days=today.weekday())
-        week_end = week_start + timedelta(days=6)
-
-        # Get all active equipment
-        equipment_list = Equipment.query.filter(
-            Equipment.status.in_(['active', 'under_maintenance']),
-            Equipment.is_scrapped == False
-        ).all()
-
-        gaps = []
-
-        for eq in equipment_list:
-            # Check if scheduled this week
-            this_week_assignment = InspectionAssignment.query.join(InspectionList).filter(
-                InspectionAssignment.equipment_id == eq.id,
-                InspectionList.target_date >= week_start,
-                InspectionList.target_date <= week_end
-            ).first()
-
-            # Get last completed inspection
-            last_inspection = Inspection.query.filter(
-                Inspection.equipment_id == eq.id,
-                Inspection.status == 'reviewed'
-            ).order_by(Inspection.submitted_at.desc()).first()
-
-            if last_inspection and last_inspection.submitted_at:
-                days_since = (datetime.utcnow() - last_inspection.submitted_at).days
-            else:
-                days_since = 999  # Never inspected
-
-            # Determine recommended frequency based on criticality
-            criticality = eq.criticality_level or 'medium'
-            recommended_days = {
-                'critical': 3,
-                'high': 7,
-                'medium': 14,
-                'low': 30
-            }.get(criticality, 14)
-
-            is_overdue = days_since > recommended_days
-            is_not_scheduled = this_week_assignment is None
-
-            if is_overdue or (is_not_scheduled and days_since > 7):
-                # Determine priority
-                if days_since > recommended_days * 2:
-                    priority = 'critical'
-                elif days_since > recommended_days:
-                    priority = 'high'
-                elif is_not_scheduled:
-                    priority = 'medium'
-                else:
-                    priority = 'low'
-
-                gaps.append({
-                    'equipment_id': eq.id,
-                    'equipment_name': eq.name,
-                    'serial_number': eq.serial_number,
-                    'equipment_type': eq.equipment_type,
-                    'berth': eq.berth,
-                    'days_uncovered': days_since,
-                    'recommended_frequency_days': recommended_days,
-                    'is_scheduled_this_week': this_week_assignment is not None,
-                    'is_overdue': is_overdue,
-                    'priority': priority,
-                    'criticality': criticality,
-                    'last_inspection_date': last_inspection.submitted_at.isoformat() if last_inspection and last_inspection.submitted_at else None,
-                    'reason': 'Never inspected' if days_since >= 999 else f'{days_since} days since last inspection'
-                })
-
-        # Sort by priority and days uncovered
-        priority_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        gaps.sort(key=lambda x: (priority_order.get(x['priority'], 4), -x['days_uncovered']))
-
-        return gaps
+        from app.services.equipment_risk_service import EquipmentRiskService
+        EquipmentRiskService.ensure_snapshots()
+        return EquipmentRiskService.coverage_gaps(limit, priority)
 
     def suggest_optimal_frequency(self, equipment_id: int) -> Dict[str, Any]:
         """
@@ -609,15 +429,17 @@ class ScheduleAIService(AIServiceWrapper):
         - Consecutive shifts
         - Workload intensity
 
+        Read with one sliding-window aggregate over the InspectorWorkload
+        ledger (see InspectorWorkloadService).
+
         Returns:
             List of inspectors with fatigue risk assessment
         """
-        from app.models import User, InspectionAssignment
+        from app.models import User
+        from app.services.inspector_workload_service import InspectorWorkloadService, REPORT_THRESHOLD
 
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-
-        # Get all active inspectors
-        inspectors = User.query.filter(
+        window = InspectorWorkloadService.window_query().subquery()
+        rows = db.session.query(User, window).join(window, window.c.user_id == User.id).filter(
             or_(User.role == 'inspector', User.minor_role == 'inspector'),
             User.is_active == True,
             User.is_on_leave == False
@@ -625,56 +447,19 @@ class ScheduleAIService(AIServiceWrapper):
 
         results = []
 
-        for inspector in inspectors:
-            # Get assignments in last 7 days
-            assignments = InspectionAssignment.query.filter(
-                or_(
-                    InspectionAssignment.mechanical_inspector_id == inspector.id,
-                    InspectionAssignment.electrical_inspector_id == inspector.id
-                ),
-                InspectionAssignment.assigned_at >= seven_days_ago
-            ).all()
-
-            if not assignments:
-                continue
-
-            # Calculate workload
-            total_assignments = len(assignments)
-
-            # Group by date to find consecutive days
-            work_days = set()
-            for a in assignments:
-                if a.assigned_at:
-                    work_days.add(a.assigned_at.date())
-
-            consecutive_days = len(work_days)
-
-            # Estimate hours worked (assume 2 hours per assignment average)
-            estimated_hours = total_assignments * 2
-
-            # Calculate fatigue risk score (0-100)
-            hours_factor = min(50, estimated_hours / 40 * 50)  # 40 hours = 50 points
-            consecutive_factor = min(30, consecutive_days / 7 * 30)  # 7 days = 30 points
-            intensity_factor = min(20, total_assignments / 10 * 20)  # 10 assignments = 20 points
-
-            fatigue_score = hours_factor + consecutive_factor + intensity_factor
-
-            if fatigue_score >= 50:  # Only report those with significant fatigue risk
+        for row in rows:
+            inspector = row.User
+            assessment = InspectorWorkloadService.assessment(row.assignments, row.hours, row.worked_days)
+            if assessment['fatigue_score'] >= REPORT_THRESHOLD:  # Only report those with significant fatigue risk
+                metrics = assessment['metrics']
                 results.append({
                     'inspector_id': inspector.id,
                     'inspector_name': inspector.full_name,
                     'role_id': inspector.role_id,
                     'shift': inspector.shift,
-                    'fatigue_score': round(fatigue_score, 1),
-                    'risk_level': 'critical' if fatigue_score >= 80 else (
-                        'high' if fatigue_score >= 65 else 'medium'
-                    ),
-                    'metrics': {
-                        'assignments_7d': total_assignments,
-                        'estimated_hours_7d': estimated_hours,
-                        'consecutive_work_days': consecutive_days
-                    },
-                    'recommendations': self._generate_fatigue_recommendations(fatigue_score, consecutive_days, estimated_hours)
+                    **assessment,
+                    'recommendations': self._generate_fatigue_recommendations(
+                        assessment['fatigue_score'], metrics['consecutive_work_days'], metrics['estimated_hours_7d'])
                 })
 
         # Sort by fatigue score
@@ -802,9 +587,15 @@ class ScheduleAIService(AIServiceWrapper):
             List of SLA warnings
         """
         from app.models import InspectionAssignment
+        from sqlalchemy.orm import joinedload
 
         now = datetime.utcnow()
         twelve_hours_later = now + timedelta(hours=12)
+        related = (
+            joinedload(InspectionAssignment.equipment),
+            joinedload(InspectionAssignment.mechanical_inspector),
+            joinedload(InspectionAssignment.electrical_inspector),
+        )
 
         # Get in-progress assignments with upcoming deadlines
         assignments = InspectionAssignment.query.filter(
@@ -812,7 +603,7 @@ class ScheduleAIService(AIServiceWrapper):
             InspectionAssignment.deadline.isnot(None),
             InspectionAssignment.deadline <= twelve_hours_later,
             InspectionAssignment.deadline > now
-        ).order_by(InspectionAssignment.deadline.asc()).all()
+        ).options(*related).order_by(InspectionAssignment.deadline.asc()).all()
 
         warnings = []
 
@@ -861,7 +652,7 @@ class ScheduleAIService(AIServiceWrapper):
             InspectionAssignment.status.in_(['assigned', 'in_progress', 'mech_complete', 'elec_complete']),
             InspectionAssignment.deadline.isnot(None),
             InspectionAssignment.deadline <= now
-        ).order_by(InspectionAssignment.deadline.asc()).all()
+        ).options(*related).order_by(InspectionAssignment.deadline.asc()).all()
 
         for a in breached:
             hours_overdue = (now - a.deadline).total_seconds() / 3600
@@ -1221,19 +1012,21 @@ class ScheduleAIService(AIServiceWrapper):
     def get_dashboard_summary(self) -> Dict[str, Any]:
         """Get comprehensive AI summary for scheduling dashboard."""
         try:
-            risk_equipment = self.calculate_equipment_risk_scores()[:5]
-            coverage_gaps = self.get_coverage_gaps()[:5]
-            sla_warnings = self.get_sla_warnings()[:5]
+            from app.services.equipment_risk_service import EquipmentRiskService
+            EquipmentRiskService.ensure_snapshots()
+            risk_equipment = EquipmentRiskService.risk_scores(limit=5)
+            coverage_gaps = EquipmentRiskService.coverage_gaps(limit=5)
+            sla_warnings = self.get_sla_warnings()
             anomalies = self.detect_anomalies()[:3]
             capacity = self.get_capacity_forecast(3)
 
             return {
                 'status': 'success',
                 'high_risk_equipment': risk_equipment,
-                'coverage_gaps': len(self.get_coverage_gaps()),
+                'coverage_gaps': EquipmentRiskService.count_coverage_gaps(),
                 'top_coverage_gaps': coverage_gaps,
-                'sla_warnings': sla_warnings,
-                'sla_warning_count': len(self.get_sla_warnings()),
+                'sla_warnings': sla_warnings[:5],
+                'sla_warning_count': len(sla_warnings),
                 'anomalies': anomalies,
                 'capacity_forecast': capacity,
                 'generated_at': datetime.utcnow().isoformat()
@@ -0,0 +1,221 @@
+"""
+Database leases that keep scheduled jobs to a single process.
+
+Every process that boots the app starts APScheduler, so without
+coordination each gunicorn worker (or each instance when the web tier is
+scaled out) would run every penalty, streak and snapshot job itself.
+
+- Leader lease: each scheduler heartbeats the 'leader' lease; only the
+  current holder runs jobs. If the leader dies its lease expires and the
+  next heartbeat elsewhere takes over.
+- Job lease: the leader also takes 'job:<id>' for the duration of a run,
+  so a run that outlasts its interval is skipped, not overlapped. A
+  leadership change mid-run is covered by the same lease. The lease is
+  short and renewed every ttl/3 seconds while the job runs, so a process
+  that dies mid-run blocks the job for minutes, not hours.
+
+Leases are taken with one conditional UPDATE (INSERT for a new name)
+on their own connection, so they work on SQLite and Postgres and are
+independent of whatever the job does with db.session.
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import case, insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models.scheduler_lease import SchedulerLease, SchedulerJobRun
+
+logger = logging.getLogger(__name__)
+
+LEADER_LEASE = 'leader'
+# Job leases are renewed while the job runs; this only bounds how long a job
+# stays blocked after its process dies mid-run
+DEFAULT_JOB_LEASE_SECONDS = 120
+
+_owner = None
+_owner_pid = None
+
+
+def lease_owner():
+    """Identity of this process (re-derived after fork)."""
+    global _owner, _owner_pid
+    if _owner_pid != os.getpid():
+        _owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        _owner_pid = os.getpid()
+    return _owner
+
+
+def try_acquire(name, ttl_seconds, owner=None):
+    """
+    Take or renew a lease.
+
+    Succeeds when the lease is free, expired, or already held by `owner`.
+
+    Returns:
+        bool: True if `owner` now holds the lease
+    """
+    owner = owner or lease_owner()
+    table = SchedulerLease.__table__
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+
+    with db.engine.begin() as conn:
+        taken = conn.execute(
+            update(table)
+            .where(
+                table.c.name == name,
+                or_(table.c.owner == owner, table.c.expires_at.is_(None), table.c.expires_at < now),
+            )
+            .values(
+                owner=owner,
+                expires_at=expires_at,
+                acquired_at=case((table.c.owner == owner, table.c.acquired_at), else_=now),
+            )
+        ).rowcount
+    if taken:
+        return True
+
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(table).values(name=name, owner=owner, expires_at=expires_at, acquired_at=now))
+        return True
+    except IntegrityError:
+        # Row exists and someone else holds it
+        return False
+
+
+def release(name, owner=None):
+    """Give a lease back early (only if `owner` still holds it)."""
+    owner = owner or lease_owner()
+    table = SchedulerLease.__table__
+    with db.engine.begin() as conn:
+        conn.execute(
+            update(table)
+            .where(table.c.name == name, table.c.owner == owner)
+            .values(owner=None, expires_at=None)
+        )
+
+
+class SchedulerLeader:
+    """Tracks whether this process currently holds the leader lease."""
+
+    def __init__(self, ttl_seconds=90, owner=None):
+        self.ttl_seconds = ttl_seconds
+        self.owner = owner
+        self._valid_until = None
+
+    def heartbeat(self):
+        """Take or renew leadership; call at least every ttl/3 seconds."""
+        attempted_at = datetime.utcnow()
+        was_leader = self.is_leader()
+        try:
+            acquired = try_acquire(LEADER_LEASE, self.ttl_seconds, owner=self.owner)
+        except Exception as e:
+            logger.error(f"Scheduler leader heartbeat failed: {e}")
+            acquired = False
+
+        # Measured from before the UPDATE so we never believe in a lease
+        # longer than the database does
+        self._valid_until = attempted_at + timedelta(seconds=self.ttl_seconds) if acquired else None
+        if acquired and not was_leader:
+            logger.info(f"Scheduler leadership acquired by {self.owner or lease_owner()}")
+        elif was_leader and not acquired:
+            logger.warning("Scheduler leadership lost")
+        return acquired
+
+    def is_leader(self):
+        return self._valid_until is not None and datetime.utcnow() < self._valid_until
+
+
+def run_job(job_id, fn, lease_seconds=DEFAULT_JOB_LEASE_SECONDS, owner=None):
+    """
+    Run `fn` under the job's lease and record the run.
+
+    `fn` may return an int, recorded as the number of rows it touched.
+
+    Returns:
+        str: 'success', 'failed' or 'skipped'
+    """
+    owner = owner or lease_owner()
+    lease_name = f"job:{job_id}"
+    started_at = datetime.utcnow()
+
+    if not try_acquire(lease_name, lease_seconds, owner=owner):
+        logger.warning(f"Scheduled task {job_id} skipped: previous run still in progress")
+        _record_run(job_id, owner, 'skipped', started_at)
+        return 'skipped'
+
+    stop_renewing = threading.Event()
+    renewer = _renew_while_running(lease_name, lease_seconds, owner, stop_renewing)
+    status, error, row_count = 'success', None, None
+    t0 = time.perf_counter()
+    try:
+        result = fn()
+        if isinstance(result, int) and not isinstance(result, bool):
+            row_count = result
+    except Exception as e:
+        status, error = 'failed', str(e)
+        logger.error(f"Scheduled task {job_id} failed: {e}")
+        db.session.rollback()
+    finally:
+        duration_ms = int((time.perf_counter() - t0) * 1000)
+        stop_renewing.set()
+        renewer.join()
+        try:
+            _record_run(job_id, owner, status, started_at, duration_ms=duration_ms,
+                        row_count=row_count, error=error)
+        finally:
+            release(lease_name, owner=owner)
+    return status
+
+
+def _renew_while_running(lease_name, ttl_seconds, owner, stop):
+    """Renew a job lease every ttl/3 seconds until `stop` is set."""
+    app = current_app._get_current_object()
+
+    def renew():
+        with app.app_context():
+            while not stop.wait(ttl_seconds / 3):
+                try:
+                    if not try_acquire(lease_name, ttl_seconds, owner=owner):
+                        logger.warning(f"Lease {lease_name} was taken over while its job was running")
+                except Exception as e:
+                    logger.error(f"Could not renew lease {lease_name}: {e}")
+
+    thread = threading.Thread(target=renew, name=f"lease-{lease_name}", daemon=True)
+    thread.start()
+    return thread
+
+
+def prune_runs(keep_days=30):
+    """Delete run history older than keep_days. Returns rows deleted."""
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+    table = SchedulerJobRun.__table__
+    with db.engine.begin() as conn:
+        return conn.execute(table.delete().where(table.c.started_at < cutoff)).rowcount
+
+
+def _record_run(job_id, owner, status, started_at, duration_ms=None, row_count=None, error=None):
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(insert(SchedulerJobRun.__table__).values(
+                job_id=job_id,
+                owner=owner,
+                status=status,
+                started_at=started_at,
+                finished_at=datetime.utcnow() if status != 'skipped' else None,
+                duration_ms=duration_ms,
+                row_count=row_count,
+                error=error,
+            ))
+    except Exception as e:
+        logger.error(f"Could not record run of {job_id}: {e}")
@@ -7,6 +7,7 @@ expired leaves, QE SLA monitoring.
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
+from datetime import datetime
 import atexit
 import logging
 
@@ -15,18 +16,30 @@ scheduler = BackgroundScheduler()
 
 
 def init_scheduler(app):
-    """Initialize and start the background scheduler."""
+    """
+    Initialize and start the background scheduler.
+
+    Every process starts a scheduler, but only the holder of the database
+    'leader' lease runs jobs (see scheduler_lease_service), so gunicorn can
+    run several workers without duplicating them.
+    """
+    from app.services.scheduler_lease_service import SchedulerLeader, run_job
+
+    leader = SchedulerLeader(ttl_seconds=app.config.get('SCHEDULER_LEADER_LEASE_SECONDS', 90))
 
     def run_with_context(fn):
-        """Wrapper to run jobs within Flask app context."""
+        """Wrapper to run jobs within Flask app context, on the leader only."""
         def wrapper():
             with app.app_context():
-                try:
-                    fn()
-                except Exception as e:
-                    logger.error(f"Scheduled task {fn.__name__} failed: {e}")
+                if not leader.is_leader():
+                    return
+                run_job(fn.__name__, fn)
         return wrapper
 
+    def scheduler_heartbeat():
+        with app.app_context():
+            leader.heartbeat()
+
     # 1. Generate daily inspection lists at 1:00 PM
     @run_with_context
     def generate_daily_lists():
@@ -50,32 +63,14 @@ def init_scheduler(app):
         overdue = InspectionListService.check_backlog()
         if overdue:
             logger.warning(f"Found {len(overdue)} overdue assignments")
+        return len(overdue or [])
 
     # 3. Detect stalled jobs (paused 3+ days) and notify
     @run_with_context
     def detect_stalled_jobs():
-        from app.services.takeover_service import TakeoverService
-        from app.services.notification_service import NotificationService
-        from app.models import User
+        from app.services.sweep_service import SweepService
         logger.info("Running: detect_stalled_jobs")
-
-        stalled = TakeoverService.get_stalled_jobs()
-        if stalled:
-            # Notify all same-role users
-            users = User.query.filter_by(is_active=True, is_on_leave=False).all()
-            for job_info in stalled:
-                for u in users:
-                    if u.has_role('specialist') and job_info['job_type'] == 'specialist':
-                        NotificationService.create_notification(
-                            user_id=u.id,
-                            type='stalled_job_available',
-                            title='Stalled Job Available for Takeover',
-                            message=f'{job_info["job_type"]} job #{job_info["job_id"]} is available for takeover',
-                            related_type='job_takeover',
-                            related_id=job_info['job_id'],
-                            priority='warning'
-                        )
-            logger.info(f"Found {len(stalled)} stalled jobs, notifications sent")
+        return SweepService.notify_stalled_jobs()
 
     # 4. End expired leaves
     @run_with_context
@@ -85,6 +80,7 @@ def init_scheduler(app):
         expired = LeaveService.check_expired_leaves()
         if expired:
             logger.info(f"Ended {len(expired)} expired leaves")
+        return len(expired or [])
 
     # 5. Activate leaves that start today
     @run_with_context
@@ -105,6 +101,7 @@ def init_scheduler(app):
                 user.is_on_leave = True
                 logger.info(f"Activated leave for {user.full_name}")
         db.session.commit()
+        return len(starting)
 
     # 6. Monitor QE SLA deadlines
     @run_with_context
@@ -126,6 +123,7 @@ def init_scheduler(app):
             )
         if overdue:
             logger.warning(f"Found {len(overdue)} overdue QE reviews")
+        return len(overdue)
 
     # 7. Auto-flag work plan jobs at end of day shift (7 PM)
     @run_with_context
@@ -136,6 +134,7 @@ def init_scheduler(app):
         flagged = _auto_flag_jobs(date.today(), 'day')
         if flagged:
             logger.info(f"Auto-flagged {flagged} day shift jobs")
+        return flagged
 
     # 8. Auto-flag work plan jobs at end of night shift (7 AM)
     @run_with_context
@@ -147,6 +146,7 @@ def init_scheduler(app):
         flagged = _auto_flag_jobs(date.today() - timedelta(days=1), 'night')
         if flagged:
             logger.info(f"Auto-flagged {flagged} night shift jobs")
+        return flagged
 
     # 9. Send daily review reminders (hourly check)
     @run_with_context
@@ -205,152 +205,27 @@ def init_scheduler(app):
     # 10. Compute daily performance at midnight
     @run_with_context
     def compute_daily_performance():
-        from app.api.work_plan_tracking import _compute_daily_performance
+        from app.services.performance_rollup_service import PerformanceRollupService
         from datetime import date, timedelta
         logger.info("Running: compute_daily_performance")
         yesterday = date.today() - timedelta(days=1)
-        computed = _compute_daily_performance(yesterday)
+        computed = PerformanceRollupService.compute_daily(yesterday)
         logger.info(f"Computed performance for {computed} workers")
+        return computed
 
     # 11. Send morning job notifications (7 AM)
     @run_with_context
     def send_morning_notifications():
-        from app.extensions import db
-        from app.models import WorkPlanAssignment, WorkPlanJob, WorkPlanDay
-        from app.models.work_plan_job_tracking import WorkPlanJobTracking
-        from app.models.work_plan_performance import WorkPlanPerformance
-        from app.services.notification_service import NotificationService
-        from datetime import date, timedelta
+        from app.services.sweep_service import SweepService
         logger.info("Running: send_morning_notifications")
-
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-
-        # Get all users with assignments today
-        assignments = db.session.query(
-            WorkPlanAssignment.user_id
-        ).join(
-            WorkPlanJob, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
-        ).join(
-            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
-        ).filter(
-            WorkPlanDay.date == today
-        ).distinct().all()
-
-        for (user_id,) in assignments:
-            # Count today's jobs
-            today_count = db.session.query(WorkPlanAssignment).join(
-                WorkPlanJob, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
-            ).join(
-                WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
-            ).filter(
-                WorkPlanAssignment.user_id == user_id,
-                WorkPlanDay.date == today
-            ).count()
-
-            # Count carry-overs
-            carry_over_count = db.session.query(WorkPlanJobTracking).join(
-                WorkPlanJob, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
-            ).join(
-                WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
-            ).filter(
-                WorkPlanDay.date == today,
-                WorkPlanJobTracking.is_carry_over == True
-            ).count()
-
-            # Yesterday's stats
-            yesterday_perf = WorkPlanPerformance.query.filter_by(
-                user_id=user_id,
-                period_type='daily',
-                period_start=yesterday
-            ).first()
-
-            msg = f"Today: {today_count} jobs assigned"
-            if carry_over_count:
-                msg += f" ({carry_over_count} carry-over)"
-            if yesterday_perf:
-                msg += f". Yesterday: {yesterday_perf.completion_rate}% completion"
-
-            NotificationService.create_notification(
-                user_id=user_id,
-                type='morning_briefing',
-                title='Good Morning - Daily Briefing',
-                message=msg,
-                priority='info'
-            )
-
-        logger.info(f"Sent morning notifications to {len(assignments)} workers")
+        return SweepService.send_morning_notifications()
 
     # 12. Red zone alert - check jobs exceeding 80% estimated time
     @run_with_context
     def check_red_zone():
-        from app.extensions import db
-        from app.models import WorkPlanJob, WorkPlanDay, WorkPlan
-        from app.models.work_plan_job_tracking import WorkPlanJobTracking
-        from app.services.notification_service import NotificationService
-        from datetime import date, datetime
+        from app.services.sweep_service import SweepService
         logger.info("Running: check_red_zone")
-
-        today = date.today()
-        now = datetime.utcnow()
-
-        # Get all in-progress jobs
-        in_progress = db.session.query(WorkPlanJobTracking).join(
-            WorkPlanJob, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
-        ).join(
-            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
-        ).filter(
-            WorkPlanDay.date == today,
-            WorkPlanJobTracking.status == 'in_progress'
-        ).all()
-
-        for tracking in in_progress:
-            job = tracking.work_plan_job
-            if not job.estimated_hours or not tracking.started_at:
-                continue
-
-            elapsed_seconds = (now - tracking.started_at).total_seconds()
-            paused_seconds = (tracking.total_paused_minutes or 0) * 60
-            working_seconds = elapsed_seconds - paused_seconds
-            working_hours = working_seconds / 3600
-
-            threshold = float(job.estimated_hours) * 0.8
-            if working_hours >= threshold:
-                # Already sent alert? Check logs
-                from app.models.work_plan_job_log import WorkPlanJobLog
-                already_alerted = WorkPlanJobLog.query.filter_by(
-                    work_plan_job_id=job.id,
-                    event_type='auto_flagged'
-                ).filter(
-                    WorkPlanJobLog.event_data.contains({'type': 'red_zone'})
-                ).first()
-
-                if not already_alerted:
-                    day = db.session.get(WorkPlanDay, job.work_plan_day_id)
-                    plan = db.session.get(WorkPlan, day.work_plan_id) if day else None
-
-                    if plan and plan.created_by_id:
-                        NotificationService.create_notification(
-                            user_id=plan.created_by_id,
-                            type='red_zone_alert',
-                            title='Red Zone Alert',
-                            message=f'Job on {job.equipment.name if job.equipment else "unknown"} has exceeded 80% of estimated time ({round(working_hours, 1)}h / {job.estimated_hours}h)',
-                            related_type='work_plan_job',
-                            related_id=job.id,
-                            priority='urgent'
-                        )
-
-                        # Log the alert
-                        log = WorkPlanJobLog(
-                            work_plan_job_id=job.id,
-                            user_id=plan.created_by_id,
-                            event_type='auto_flagged',
-                            event_data={'type': 'red_zone', 'working_hours': round(working_hours, 1)}
-                        )
-                        db.session.add(log)
-
-        db.session.commit()
-        logger.info(f"Red zone check completed for {len(in_progress)} in-progress jobs")
+        return SweepService.check_red_zone()
 
     # 13. Generate daily leaderboard snapshot (midnight)
     @run_with_context
@@ -360,6 +235,7 @@ def init_scheduler(app):
         service = LeaderboardAIService()
         count = service.generate_daily_snapshot()
         logger.info(f"Generated leaderboard snapshots for {count} users")
+        return count
 
     # 14. Create weekly challenges (Sunday night at 11 PM)
     @run_with_context
@@ -372,6 +248,7 @@ def init_scheduler(app):
             logger.info(f"Created {count} weekly challenges")
         else:
             logger.info("Weekly challenges already exist or none created")
+        return count
 
     # 15. Check for broken streaks and send reminders
     @run_with_context
@@ -382,15 +259,17 @@ def init_scheduler(app):
         at_risk = service.check_broken_streaks()
         if at_risk:
             logger.info(f"Sent {at_risk} streak reminder notifications")
+        return at_risk
 
-    # 16. Update achievement progress periodically
+    # 16. Reconcile achievement counters (events keep them current in between)
     @run_with_context
     def update_achievement_progress():
         from app.services.gamification_service import GamificationService
         logger.info("Running: update_achievement_progress")
         service = GamificationService()
-        updated = service.update_achievement_progress()
-        logger.info(f"Updated progress for {updated} achievements")
+        repaired = service.update_achievement_progress()
+        logger.info(f"Reconciled {repaired} achievement counters")
+        return repaired
 
     # Schedule jobs
     scheduler.add_job(
@@ -534,6 +413,7 @@ def init_scheduler(app):
         logger.info("Running: check_daily_low_stock")
         alerts = StockAlertService.send_stock_alerts()
         logger.info(f"Sent {alerts} stock alerts")
+        return alerts
 
     # 18. Weekly expiry check (Monday 7 AM)
     @run_with_context
@@ -709,89 +589,8 @@ def init_scheduler(app):
         inspection (up to verdict) within 48 hours of the assignment's target date.
         Runs every 6 hours. Applied once per assignment per inspector.
         """
-        from datetime import datetime, timedelta
-        from app.models import InspectionAssignment, Notification
-        from app.models.inspection_list import InspectionList
-        from app.models.user_level import UserLevel
-        from app.extensions import db
-
-        PENALTY = 0.25
-        now = datetime.utcnow()
-        # target_date is a date — treat it as midnight UTC, add 48h
-        cutoff_date = (now - timedelta(hours=48)).date()
-
-        # Assignments past the 48h window that still have unfinished inspectors
-        assignments = (
-            InspectionAssignment.query
-            .join(InspectionList, InspectionAssignment.inspection_list_id == InspectionList.id)
-            .filter(
-                InspectionList.target_date <= cutoff_date,
-                InspectionAssignment.status.in_([
-                    'assigned', 'in_progress', 'mech_complete', 'elec_complete'
-                ]),
-            )
-            .all()
-        )
-
-        penalized = 0
-        for a in assignments:
-            # Mechanical inspector — not done and penalty not yet applied
-            if (a.mechanical_inspector_id
-                    and not a.mech_penalty_applied
-                    and a.mech_completed_at is None):
-                level = UserLevel.query.filter_by(user_id=a.mechanical_inspector_id).first()
-                if level:
-                    level.avg_rating = round((level.avg_rating or 0.0) - PENALTY, 2)
-                db.session.add(Notification(
-                    user_id=a.mechanical_inspector_id,
-                    type='inspection_penalty',
-                    title='Inspection Penalty Applied',
-                    title_ar='تم تطبيق خصم الفحص',
-                    message=(
-                        f'0.25 stars deducted from your rating because inspection '
-                        f'assignment #{a.id} was not completed within 48 hours.'
-                    ),
-                    message_ar=(
-                        f'تم خصم 0.25 نجمة من تقييمك لأن مهمة الفحص #{a.id} '
-                        f'لم تُكتمل خلال 48 ساعة.'
-                    ),
-                    priority='warning',
-                    related_type='inspection_assignment',
-                    related_id=a.id,
-                ))
-                a.mech_penalty_applied = True
-                penalized += 1
-
-            # Electrical inspector — not done and penalty not yet applied
-            if (a.electrical_inspector_id
-                    and not a.elec_penalty_applied
-                    and a.elec_completed_at is None):
-                level = UserLevel.query.filter_by(user_id=a.electrical_inspector_id).first()
-                if level:
-                    level.avg_rating = round((level.avg_rating or 0.0) - PENALTY, 2)
-                db.session.add(Notification(
-                    user_id=a.electrical_inspector_id,
-                    type='inspection_penalty',
-                    title='Inspection Penalty Applied',
-                    title_ar='تم تطبيق خصم الفحص',
-                    message=(
-                        f'0.25 stars deducted from your rating because inspection '
-                        f'assignment #{a.id} was not completed within 48 hours.'
-                    ),
-                    message_ar=(
-                        f'تم خصم 0.25 نجمة من تقييمك لأن مهمة الفحص #{a.id} '
-                        f'لم تُكتمل خلال 48 ساعة.'
-                    ),
-                    priority='warning',
-                    related_type='inspection_assignment',
-                    related_id=a.id,
-                ))
-                a.elec_penalty_applied = True
-                penalized += 1
-
-        if penalized:
-            db.session.commit()
-            logger.info("Inspection overdue penalties applied: %d inspector(s) penalized", penalized)
+        from app.services.sweep_service import SweepService
+        return SweepService.apply_inspection_overdue_penalties()
 
     scheduler.add_job(
         apply_inspection_overdue_penalties,
@@ -880,6 +679,7 @@ def init_scheduler(app):
                         logger.warning(f"Daily completion award failed for {role} {uid}: {e}")
 
         logger.info(f"Daily completion bonuses awarded to {awarded} users")
+        return awarded
 
     # 25. Calculate daily stars at 11 PM (before midnight snapshot)
     @run_with_context
@@ -896,6 +696,7 @@ def init_scheduler(app):
             f"{results.get('specialist_count', 0)} specialists, "
             f"{results.get('engineer_count', 0)} engineers"
         )
+        return sum(results.get(k, 0) for k in ('inspector_count', 'specialist_count', 'engineer_count'))
 
     # 26. Weekly EPI snapshot (Sunday at 11:30 PM)
     @run_with_context
@@ -905,6 +706,19 @@ def init_scheduler(app):
         service = EPIService()
         count = service.generate_weekly_snapshots()
         logger.info(f"Generated EPI snapshots for {count} users")
+        return count
+
+    # 27. Replay offline sync queue
+    @run_with_context
+    def process_sync_queue():
+        from app.services.sync_replay_service import SyncReplayService
+        summary = SyncReplayService.process_pending()
+        if summary['item_ids']:
+            logger.info(
+                f"Sync replay: {summary['applied']} applied, {summary['conflict']} conflicts, "
+                f"{summary['failed']} failed"
+            )
+        return len(summary['item_ids'])
 
     scheduler.add_job(
         check_daily_completion,
@@ -930,8 +744,122 @@ def init_scheduler(app):
         replace_existing=True
     )
 
+    # 28. Trim scheduler run history (daily at 3:15 AM)
+    @run_with_context
+    def prune_scheduler_runs():
+        from app.services.scheduler_lease_service import prune_runs
+        return prune_runs(keep_days=30)
+
+    scheduler.add_job(
+        process_sync_queue,
+        IntervalTrigger(seconds=30),
+        id='process_sync_queue',
+        name='Replay offline sync queue every 30 seconds',
+        replace_existing=True
+    )
+
+    scheduler.add_job(
+        prune_scheduler_runs,
+        CronTrigger(hour=3, minute=15),
+        id='prune_scheduler_runs',
+        name='Trim scheduler run history daily at 3:15 AM',
+        replace_existing=True
+    )
+
+    # 29. Rebuild running hours snapshots (daily at 2:45 AM); writes keep them
+    # current, this picks up re-classified checklist items and manual data fixes
+    @run_with_context
+    def refresh_running_hours_snapshots():
+        from app.extensions import db
+        from app.services.running_hours_snapshot_service import RunningHoursSnapshotService
+        count = RunningHoursSnapshotService.refresh()
+        db.session.commit()
+        return count
+
+    scheduler.add_job(
+        refresh_running_hours_snapshots,
+        CronTrigger(hour=2, minute=45),
+        id='refresh_running_hours_snapshots',
+        name='Rebuild running hours snapshots daily at 2:45 AM',
+        replace_existing=True
+    )
+
+    # 30. Fail exports interrupted by a worker restart and delete bulk report
+    # exports older than a week (hourly at :30)
+    @run_with_context
+    def prune_report_exports():
+        from app.services.report_export_service import ReportExportService
+        return ReportExportService.prune(keep_days=7)
+
+    scheduler.add_job(
+        prune_report_exports,
+        CronTrigger(minute=30),
+        id='prune_report_exports',
+        name='Fail interrupted and delete week-old bulk report exports hourly',
+        replace_existing=True
+    )
+
+    # 31. Refresh equipment risk snapshots (hourly); inspection submit and
+    # review keep them current, this advances day counts and weekly scheduling
+    @run_with_context
+    def refresh_equipment_risk():
+        from app.extensions import db
+        from app.services.equipment_risk_service import EquipmentRiskService
+        count = EquipmentRiskService.refresh()
+        db.session.commit()
+        return count
+
+    scheduler.add_job(
+        refresh_equipment_risk,
+        CronTrigger(minute=10),
+        id='refresh_equipment_risk',
+        name='Refresh equipment risk snapshots hourly at :10',
+        replace_existing=True
+    )
+
+    # 32. Reconcile the inspector workload ledger (daily at 3:45 AM); assignment
+    # changes keep it current, this catches edits made outside those paths
+    @run_with_context
+    def reconcile_inspector_workloads():
+        from app.extensions import db
+        from app.services.inspector_workload_service import InspectorWorkloadService
+        count = InspectorWorkloadService.refresh()
+        InspectorWorkloadService.prune()
+        db.session.commit()
+        return count
+
+    scheduler.add_job(
+        reconcile_inspector_workloads,
+        CronTrigger(hour=3, minute=45),
+        id='reconcile_inspector_workloads',
+        name='Reconcile inspector workload ledger daily at 3:45 AM',
+        replace_existing=True
+    )
+
+    # Leadership heartbeat; runs in every process, first beat right away
+    heartbeat_seconds = max(5, leader.ttl_seconds // 3)
+    scheduler.add_job(
+        scheduler_heartbeat,
+        IntervalTrigger(seconds=heartbeat_seconds),
+        id='scheduler_heartbeat',
+        name=f'Renew scheduler leader lease every {heartbeat_seconds} seconds',
+        replace_existing=True,
+        next_run_time=datetime.now()
+    )
+
+    def shutdown():
+        scheduler.shutdown(wait=False)
+        # Hand leadership over now instead of after the lease expires
+        if leader.is_leader():
+            try:
+                with app.app_context():
+                    from app.services.scheduler_lease_service import release, LEADER_LEASE
+                    release(LEADER_LEASE)
+            except Exception as e:
+                logger.warning(f"Could not release scheduler leadership: {e}")
+
     scheduler.start()
-    atexit.register(lambda: scheduler.shutdown(wait=False))
-    logger.info("Background scheduler started with 26 scheduled jobs")
+    atexit.register(shutdown)
+    logger.info(f"Background scheduler started with {len(scheduler.get_jobs()) - 1} scheduled jobs")
 
     return scheduler
@@ -0,0 +1,348 @@
+"""
+Set-based scheduler sweeps.
+
+The hourly/daily sweeps used to walk rows one by one (a log lookup per
+in-progress job, count queries per worker, a UserLevel load per overdue
+assignment, users x jobs for stalled work). Each sweep here reads what it
+needs with a few grouped queries, writes with bulk UPDATE/INSERT and
+sends its notifications through NotificationService.create_notifications,
+so the number of queries per run does not grow with the data.
+
+Every sweep returns the number of rows it acted on, which run_job records.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Numeric, and_, case, cast, func, insert, or_, update
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Fraction of a job's estimated hours after which it is in the red zone
+RED_ZONE_RATIO = 0.8
+INSPECTION_PENALTY = 0.25
+INSPECTION_PENALTY_HOURS = 48
+STALLED_AFTER = timedelta(days=3)
+
+
+class SweepService:
+    """Bulk implementations of the scheduled notification/penalty sweeps."""
+
+    @staticmethod
+    def check_red_zone(now=None):
+        """
+        Alert plan owners about today's in-progress jobs that have used more
+        than 80% of their estimated hours. Each job is alerted once (an
+        'auto_flagged' red_zone log marks it).
+
+        Returns:
+            int: number of jobs alerted
+        """
+        from app.models import WorkPlan, WorkPlanDay, WorkPlanJob, Equipment
+        from app.models.work_plan_job_log import WorkPlanJobLog
+        from app.models.work_plan_job_tracking import WorkPlanJobTracking
+        from app.services.notification_service import NotificationService
+
+        now = now or datetime.utcnow()
+        rows = db.session.query(
+            WorkPlanJob.id,
+            WorkPlanJob.estimated_hours,
+            WorkPlanJobTracking.started_at,
+            WorkPlanJobTracking.total_paused_minutes,
+            WorkPlan.created_by_id,
+            Equipment.name,
+        ).join(
+            WorkPlanJob, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
+        ).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).join(
+            WorkPlan, WorkPlanDay.work_plan_id == WorkPlan.id
+        ).outerjoin(
+            Equipment, WorkPlanJob.equipment_id == Equipment.id
+        ).filter(
+            WorkPlanDay.date == now.date(),
+            WorkPlanJobTracking.status == 'in_progress',
+            WorkPlanJobTracking.started_at.isnot(None),
+            WorkPlanJob.estimated_hours > 0,
+        ).all()
+
+        candidates = []
+        for job_id, estimated_hours, started_at, paused_minutes, owner_id, equipment_name in rows:
+            working_hours = ((now - started_at).total_seconds() - (paused_minutes or 0) * 60) / 3600
+            if owner_id and working_hours >= float(estimated_hours) * RED_ZONE_RATIO:
+                candidates.append((job_id, estimated_hours, owner_id, equipment_name, working_hours))
+        if not candidates:
+            return 0
+
+        # One lookup for every candidate; the JSON type is checked here so
+        # the filter works the same on SQLite and Postgres
+        flagged = {
+            job_id
+            for job_id, event_data in db.session.query(
+                WorkPlanJobLog.work_plan_job_id, WorkPlanJobLog.event_data
+            ).filter(
+                WorkPlanJobLog.work_plan_job_id.in_([c[0] for c in candidates]),
+                WorkPlanJobLog.event_type == 'auto_flagged',
+            )
+            if (event_data or {}).get('type') == 'red_zone'
+        }
+
+        logs, notifications = [], []
+        for job_id, estimated_hours, owner_id, equipment_name, working_hours in candidates:
+            if job_id in flagged:
+                continue
+            logs.append({
+                'work_plan_job_id': job_id,
+                'user_id': owner_id,
+                'event_type': 'auto_flagged',
+                'event_data': {'type': 'red_zone', 'working_hours': round(working_hours, 1)},
+                'created_at': now,
+            })
+            notifications.append({
+                'user_id': owner_id,
+                'type': 'red_zone_alert',
+                'title': 'Red Zone Alert',
+                'message': f'Job on {equipment_name or "unknown"} has exceeded 80% of estimated time '
+                           f'({round(working_hours, 1)}h / {estimated_hours}h)',
+                'related_type': 'work_plan_job',
+                'related_id': job_id,
+                'priority': 'urgent',
+            })
+
+        if logs:
+            db.session.execute(insert(WorkPlanJobLog), logs)
+            db.session.commit()
+            NotificationService.create_notifications(notifications)
+        logger.info("Red zone check: %d of %d in-progress jobs alerted", len(logs), len(rows))
+        return len(logs)
+
+    @staticmethod
+    def send_morning_notifications(today=None):
+        """
+        Send each worker with jobs today a briefing: today's job count, how
+        many of those are carry-overs, and yesterday's completion rate.
+
+        Returns:
+            int: number of workers notified
+        """
+        from app.models import WorkPlanAssignment, WorkPlanDay, WorkPlanJob
+        from app.models.work_plan_job_tracking import WorkPlanJobTracking
+        from app.models.work_plan_performance import WorkPlanPerformance
+        from app.services.notification_service import NotificationService
+
+        today = today or date.today()
+        yesterday = today - timedelta(days=1)
+
+        counts = db.session.query(
+            WorkPlanAssignment.user_id,
+            func.count(WorkPlanAssignment.id),
+            func.sum(case((WorkPlanJobTracking.is_carry_over.is_(True), 1), else_=0)),
+        ).join(
+            WorkPlanJob, WorkPlanAssignment.work_plan_job_id == WorkPlanJob.id
+        ).join(
+            WorkPlanDay, WorkPlanJob.work_plan_day_id == WorkPlanDay.id
+        ).outerjoin(
+            WorkPlanJobTracking, WorkPlanJobTracking.work_plan_job_id == WorkPlanJob.id
+        ).filter(
+            WorkPlanDay.date == today
+        ).group_by(WorkPlanAssignment.user_id).all()
+        if not counts:
+            return 0
+
+        completion = dict(db.session.query(
+            WorkPlanPerformance.user_id, WorkPlanPerformance.completion_rate
+        ).filter(
+            WorkPlanPerformance.user_id.in_([user_id for user_id, _, _ in counts]),
+            WorkPlanPerformance.period_type == 'daily',
+            WorkPlanPerformance.period_start == yesterday,
+        ))
+
+        entries = []
+        for user_id, today_count, carry_over_count in counts:
+            msg = f"Today: {today_count} jobs assigned"
+            if carry_over_count:
+                msg += f" ({carry_over_count} carry-over)"
+            if user_id in completion:
+                msg += f". Yesterday: {completion[user_id]}% completion"
+            entries.append({
+                'user_id': user_id,
+                'type': 'morning_briefing',
+                'title': 'Good Morning - Daily Briefing',
+                'message': msg,
+                'priority': 'info',
+            })
+
+        NotificationService.create_notifications(entries)
+        logger.info("Sent morning notifications to %d workers", len(entries))
+        return len(entries)
+
+    @staticmethod
+    def apply_inspection_overdue_penalties(now=None):
+        """
+        Deduct 0.25 stars from inspectors who haven't completed their
+        inspection (up to verdict) within 48 hours of the assignment's target
+        date. Applied once per assignment per inspector.
+
+        Returns:
+            int: number of penalties applied
+        """
+        from app.models import InspectionAssignment, Notification
+        from app.models.inspection_list import InspectionList
+
+        now = now or datetime.utcnow()
+        # target_date is a date — treat it as midnight UTC, add 48h
+        cutoff_date = (now - timedelta(hours=INSPECTION_PENALTY_HOURS)).date()
+        open_statuses = ['assigned', 'in_progress', 'mech_complete', 'elec_complete']
+
+        rows = db.session.query(
+            InspectionAssignment.id,
+            case((and_(
+                InspectionAssignment.mechanical_inspector_id.isnot(None),
+                or_(InspectionAssignment.mech_penalty_applied.is_(None),
+                    InspectionAssignment.mech_penalty_applied.is_(False)),
+                InspectionAssignment.mech_completed_at.is_(None),
+            ), InspectionAssignment.mechanical_inspector_id), else_=None),
+            case((and_(
+                InspectionAssignment.electrical_inspector_id.isnot(None),
+                or_(InspectionAssignment.elec_penalty_applied.is_(None),
+                    InspectionAssignment.elec_penalty_applied.is_(False)),
+                InspectionAssignment.elec_completed_at.is_(None),
+            ), InspectionAssignment.electrical_inspector_id), else_=None),
+        ).join(
+            InspectionList, InspectionAssignment.inspection_list_id == InspectionList.id
+        ).filter(
+            InspectionList.target_date <= cutoff_date,
+            InspectionAssignment.status.in_(open_statuses),
+        ).all()
+
+        mech_ids = [a_id for a_id, mech, _ in rows if mech]
+        elec_ids = [a_id for a_id, _, elec in rows if elec]
+        penalties = [(a_id, mech) for a_id, mech, _ in rows if mech] + \
+                    [(a_id, elec) for a_id, _, elec in rows if elec]
+        if not penalties:
+            return 0
+
+        if mech_ids:
+            db.session.execute(
+                update(InspectionAssignment)
+                .where(InspectionAssignment.id.in_(mech_ids))
+                .values(mech_penalty_applied=True)
+                .execution_options(synchronize_session=False)
+            )
+        if elec_ids:
+            db.session.execute(
+                update(InspectionAssignment)
+                .where(InspectionAssignment.id.in_(elec_ids))
+                .values(elec_penalty_applied=True)
+                .execution_options(synchronize_session=False)
+            )
+
+        # One UPDATE per distinct penalty count (almost always just 1)
+        per_user = {}
+        for _, user_id in penalties:
+            per_user[user_id] = per_user.get(user_id, 0) + 1
+        by_count = {}
+        for user_id, count in per_user.items():
+            by_count.setdefault(count, []).append(user_id)
+        for count, user_ids in by_count.items():
+            db.session.execute(SweepService._penalty_update(user_ids, count))
+
+        db.session.execute(insert(Notification), [{
+            'user_id': user_id,
+            'type': 'inspection_penalty',
+            'title': 'Inspection Penalty Applied',
+            'title_ar': 'تم تطبيق خصم الفحص',
+            'message': (
+                f'0.25 stars deducted from your rating because inspection '
+                f'assignment #{assignment_id} was not completed within 48 hours.'
+            ),
+            'message_ar': (
+                f'تم خصم 0.25 نجمة من تقييمك لأن مهمة الفحص #{assignment_id} '
+                f'لم تُكتمل خلال 48 ساعة.'
+            ),
+            'priority': 'warning',
+            'related_type': 'inspection_assignment',
+            'related_id': assignment_id,
+            'created_at': now,
+        } for assignment_id, user_id in penalties])
+
+        db.session.commit()
+        logger.info("Inspection overdue penalties applied: %d inspector(s) penalized", len(penalties))
+        return len(penalties)
+
+    @staticmethod
+    def _penalty_update(user_ids, count):
+        """
+        UPDATE taking count penalties off each user's rating. avg_rating is
+        double precision on PostgreSQL, which has no two-argument round()
+        for it, so the new value is cast to NUMERIC before rounding.
+        """
+        from app.models.user_level import UserLevel
+
+        rating = func.coalesce(UserLevel.avg_rating, 0.0) - INSPECTION_PENALTY * count
+        return (
+            update(UserLevel)
+            .where(UserLevel.user_id.in_(user_ids))
+            .values(avg_rating=func.round(cast(rating, Numeric(10, 2)), 2))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def notify_stalled_jobs(now=None):
+        """
+        Tell active specialists about specialist jobs paused for 3+ days,
+        which are open for takeover. A specialist is told about a given
+        pause once, not on every run.
+
+        Returns:
+            int: number of notifications sent
+        """
+        from app.models import Notification, SpecialistJob, User
+        from app.services.notification_service import NotificationService
+
+        now = now or datetime.utcnow()
+        stalled = db.session.query(SpecialistJob.id, SpecialistJob.paused_at).filter(
+            SpecialistJob.status == 'paused',
+            SpecialistJob.paused_at <= now - STALLED_AFTER,
+        ).all()
+        if not stalled:
+            return 0
+
+        specialists = [user_id for (user_id,) in db.session.query(User.id).filter(
+            User.is_active.is_(True),
+            User.is_on_leave.is_(False),
+            or_(User.role == 'specialist', User.minor_role == 'specialist'),
+        )]
+        if not specialists:
+            return 0
+
+        paused_at = dict(stalled)
+        already_told = {
+            (user_id, job_id)
+            for user_id, job_id, created_at in db.session.query(
+                Notification.user_id, Notification.related_id, Notification.created_at
+            ).filter(
+                Notification.type == 'stalled_job_available',
+                Notification.related_type == 'job_takeover',
+                Notification.related_id.in_(paused_at),
+                Notification.created_at >= min(paused_at.values()),
+            )
+            if created_at >= paused_at[job_id]
+        }
+
+        entries = [{
+            'user_id': user_id,
+            'type': 'stalled_job_available',
+            'title': 'Stalled Job Available for Takeover',
+            'message': f'specialist job #{job_id} is available for takeover',
+            'related_type': 'job_takeover',
+            'related_id': job_id,
+            'priority': 'warning',
+        } for job_id, _ in stalled for user_id in specialists if (user_id, job_id) not in already_told]
+
+        if entries:
+            NotificationService.create_notifications(entries)
+        logger.info("Found %d stalled jobs, %d notifications sent", len(stalled), len(entries))
+        return len(entries)
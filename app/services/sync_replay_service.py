@@ -0,0 +1,352 @@
+"""
+Replay engine for the offline sync queue.
+
+Mobile clients post actions recorded while offline to /api/sync; they land in
+SyncQueue as 'pending'. SyncReplayService drains them in batches:
+
+1. claim   one UPDATE moves up to `limit` pending rows to 'processing' under
+           a claim token, so concurrent workers never replay the same item;
+2. apply   items are grouped by entity_type and handed to that type's
+           handler in one call, which loads what it needs with IN queries
+           and writes in bulk (each group runs in its own savepoint);
+3. record  every item gets its own outcome (applied / conflict / failed)
+           with details in `result`, and the batch commits once.
+
+Handlers are registered with @sync_handler('<entity_type>') and return
+{item_id: outcome} built with applied(), conflict() and failed().
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.extensions import db
+from app.exceptions.api_exceptions import ValidationError
+from app.models import SyncQueue
+
+logger = logging.getLogger(__name__)
+
+# Claims older than this are assumed to belong to a crashed worker
+CLAIM_TIMEOUT = timedelta(minutes=10)
+# Items whose handler keeps crashing stop being retried after this many claims
+MAX_ATTEMPTS = 5
+DEFAULT_BATCH_SIZE = 200
+
+_handlers = {}
+
+
+def sync_handler(entity_type):
+    """Register a bulk replay handler for an entity type."""
+    def register(fn):
+        _handlers[entity_type] = fn
+        return fn
+    return register
+
+
+def applied(result=None):
+    return ('applied', result or {}, None)
+
+
+def conflict(reason, **details):
+    return ('conflict', {'reason': reason, **details}, reason)
+
+
+def failed(message):
+    return ('failed', None, message)
+
+
+class SyncReplayService:
+    """Claims, replays and records outcomes for queued offline actions."""
+
+    @staticmethod
+    def process_pending(limit=DEFAULT_BATCH_SIZE, max_batches=10, user_id=None):
+        """
+        Drain pending items batch by batch.
+
+        Args:
+            limit: Items claimed per batch
+            max_batches: Stop after this many batches (the scheduler runs again)
+            user_id: Only replay this user's items
+
+        Returns:
+            dict: counts per outcome plus the processed item ids
+        """
+        totals = {'applied': 0, 'conflict': 0, 'failed': 0, 'item_ids': []}
+        for _ in range(max_batches):
+            items = SyncReplayService.claim_batch(limit=limit, user_id=user_id)
+            if not items:
+                break
+            totals['item_ids'].extend(item.id for item in items)
+            summary = SyncReplayService.process_batch(items)
+            for status in ('applied', 'conflict', 'failed'):
+                totals[status] += summary[status]
+            if len(items) < limit:
+                break
+        return totals
+
+    @staticmethod
+    def claim_batch(limit=DEFAULT_BATCH_SIZE, user_id=None):
+        """
+        Atomically claim up to `limit` pending items, oldest first.
+
+        Returns:
+            list: claimed SyncQueue items
+        """
+        now = datetime.utcnow()
+
+        # Release claims abandoned by a crashed worker
+        db.session.execute(
+            update(SyncQueue)
+            .where(SyncQueue.status == 'processing', SyncQueue.claimed_at < now - CLAIM_TIMEOUT)
+            .values(status='pending', claim_token=None)
+            .execution_options(synchronize_session=False)
+        )
+
+        candidates = db.session.query(SyncQueue.id).filter(
+            SyncQueue.status == 'pending',
+            SyncQueue.attempts < MAX_ATTEMPTS,
+        )
+        if user_id is not None:
+            candidates = candidates.filter(SyncQueue.user_id == user_id)
+        candidates = candidates.order_by(SyncQueue.id).limit(limit)
+
+        token = uuid.uuid4().hex
+        db.session.execute(
+            update(SyncQueue)
+            .where(SyncQueue.id.in_(candidates.scalar_subquery()), SyncQueue.status == 'pending')
+            .values(status='processing', claim_token=token, claimed_at=now,
+                    attempts=SyncQueue.attempts + 1)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        return SyncQueue.query.filter_by(claim_token=token).order_by(SyncQueue.id).all()
+
+    @staticmethod
+    def process_batch(items):
+        """
+        Replay claimed items and record one outcome per item.
+
+        Returns:
+            dict: counts per outcome
+        """
+        groups = {}
+        for item in items:
+            groups.setdefault(item.entity_type, []).append(item)
+
+        outcomes = {}
+        for entity_type, group in groups.items():
+            handler = _handlers.get(entity_type)
+            if handler is None:
+                for item in group:
+                    outcomes[item.id] = failed(f"Unsupported entity type '{entity_type}'")
+                continue
+
+            savepoint = db.session.begin_nested()
+            try:
+                group_outcomes = handler(group)
+                savepoint.commit()
+            except Exception as e:
+                savepoint.rollback()
+                logger.error("Sync replay of %s failed: %s", entity_type, e)
+                # Leave the group pending so a later run can retry it
+                for item in group:
+                    if item.attempts < MAX_ATTEMPTS:
+                        item.status = 'pending'
+                        item.claim_token = None
+                        item.sync_error = str(e)
+                    else:
+                        outcomes[item.id] = failed(str(e))
+                continue
+
+            for item in group:
+                outcomes[item.id] = group_outcomes.get(item.id) or failed('No outcome recorded')
+
+        now = datetime.utcnow()
+        summary = {'applied': 0, 'conflict': 0, 'failed': 0}
+        for item in items:
+            if item.id not in outcomes:
+                continue
+            status, result, error = outcomes[item.id]
+            item.status = status
+            item.result = result
+            item.sync_error = error
+            item.claim_token = None
+            item.synced_at = now if status == 'applied' else None
+            summary[status] += 1
+
+        db.session.commit()
+        logger.info("Sync replay batch: %d items, %s", len(items), summary)
+        return summary
+
+
+def _parse_client_time(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None) - (parsed.utcoffset() or timedelta(0))
+    return parsed
+
+
+@sync_handler('inspection_answer')
+def _replay_inspection_answers(items):
+    """
+    Upsert checklist answers recorded offline.
+
+    entity_data: {inspection_id, checklist_item_id, answer_value,
+                  comment?, urgency_level?, answered_at?}
+
+    Conflicts: the inspection was submitted meanwhile, or the server copy of
+    the answer is newer than the client's answered_at.
+    """
+    from app.models import Inspection, InspectionAnswer, ChecklistItem, User
+    from app.services.inspection_service import InspectionService
+
+    outcomes = {}
+    valid = []
+    for item in items:
+        data = item.entity_data or {}
+        if not data.get('inspection_id') or not data.get('checklist_item_id'):
+            outcomes[item.id] = failed('inspection_id and checklist_item_id are required')
+            continue
+        try:
+            inspection_id = int(data['inspection_id'])
+            checklist_item_id = int(data['checklist_item_id'])
+            if data.get('urgency_level') is not None:
+                int(data['urgency_level'])
+        except (TypeError, ValueError):
+            outcomes[item.id] = failed('inspection_id, checklist_item_id and urgency_level must be integers')
+            continue
+        valid.append((item, inspection_id, checklist_item_id))
+    if not valid:
+        return outcomes
+
+    inspection_ids = {inspection_id for _, inspection_id, _ in valid}
+    checklist_item_ids = {checklist_item_id for _, _, checklist_item_id in valid}
+    inspections = {i.id: i for i in Inspection.query.filter(Inspection.id.in_(inspection_ids))}
+    checklist_items = {c.id: c for c in ChecklistItem.query.filter(ChecklistItem.id.in_(checklist_item_ids))}
+    roles = dict(db.session.query(User.id, User.role).filter(
+        User.id.in_({item.user_id for item, _, _ in valid})
+    ))
+    answers = {
+        (a.inspection_id, a.checklist_item_id): a
+        for a in InspectionAnswer.query.filter(
+            InspectionAnswer.inspection_id.in_(inspection_ids),
+            InspectionAnswer.checklist_item_id.in_(checklist_item_ids),
+        )
+    }
+
+    written = []
+    for item, inspection_id, checklist_item_id in valid:
+        data = item.entity_data
+        inspection = inspections.get(inspection_id)
+        if inspection is None:
+            outcomes[item.id] = failed(f"Inspection with ID {inspection_id} not found")
+            continue
+        if roles.get(item.user_id) != 'admin' and inspection.technician_id != item.user_id:
+            outcomes[item.id] = failed("You can only answer your own inspections")
+            continue
+        if inspection.status != 'draft':
+            outcomes[item.id] = conflict('inspection_not_draft', server_status=inspection.status)
+            continue
+
+        checklist_item = checklist_items.get(checklist_item_id)
+        if checklist_item is None:
+            outcomes[item.id] = failed(f"Checklist item with ID {checklist_item_id} not found")
+            continue
+        if checklist_item.template_id != inspection.template_id:
+            outcomes[item.id] = failed("Checklist item does not belong to inspection template")
+            continue
+
+        answer_value = data.get('answer_value')
+        if answer_value:
+            try:
+                InspectionService._validate_answer_value(checklist_item.answer_type, str(answer_value))
+            except ValidationError as e:
+                outcomes[item.id] = failed(e.message)
+                continue
+
+        client_time = _parse_client_time(data.get('answered_at'))
+        answer = answers.get((inspection_id, checklist_item_id))
+        if answer is not None and client_time and answer.answered_at and answer.answered_at > client_time:
+            outcomes[item.id] = conflict(
+                'answer_changed_on_server',
+                server_answered_at=answer.answered_at.isoformat(),
+                server_value=answer.answer_value,
+            )
+            continue
+
+        if answer is None:
+            answer = InspectionAnswer(
+                inspection_id=inspection_id,
+                checklist_item_id=checklist_item_id,
+                answer_value=str(answer_value or ''),
+                urgency_level=0,
+            )
+            db.session.add(answer)
+            answers[(inspection_id, checklist_item_id)] = answer
+        elif answer_value:
+            answer.answer_value = str(answer_value)
+        if data.get('comment') is not None:
+            answer.comment = data['comment']
+        if data.get('urgency_level') is not None:
+            answer.urgency_level = int(data['urgency_level'])
+        answer.answered_at = client_time or datetime.utcnow()
+        written.append((item, answer))
+
+    db.session.flush()
+    for item, answer in written:
+        outcomes[item.id] = applied({'answer_id': answer.id})
+    return outcomes
+
+
+@sync_handler('notification_read')
+def _replay_notification_reads(items):
+    """
+    Mark notifications read offline as read.
+
+    entity_data: {notification_id} or {notification_ids: [...]}
+    """
+    from app.models import Notification
+
+    outcomes = {}
+    requested = {}
+    for item in items:
+        data = item.entity_data or {}
+        ids = data.get('notification_ids') or [data.get('notification_id')]
+        try:
+            requested[item.id] = [int(i) for i in ids if i]
+        except (TypeError, ValueError):
+            outcomes[item.id] = failed('Notification ids must be integers')
+
+    all_ids = {i for ids in requested.values() for i in ids}
+    owners = dict(db.session.query(Notification.id, Notification.user_id).filter(
+        Notification.id.in_(all_ids)
+    )) if all_ids else {}
+
+    to_mark = set()
+    for item in items:
+        if item.id in outcomes:
+            continue
+        mine = [i for i in requested[item.id] if owners.get(i) == item.user_id]
+        if not mine:
+            outcomes[item.id] = failed('Notification not found')
+            continue
+        to_mark.update(mine)
+        missing = sorted(set(requested[item.id]) - set(mine))
+        outcomes[item.id] = applied({'notification_ids': mine, 'missing': missing})
+
+    if to_mark:
+        db.session.execute(
+            update(Notification)
+            .where(Notification.id.in_(to_mark), Notification.is_read.is_(False))
+            .values(is_read=True, read_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    return outcomes
@@ -181,6 +181,9 @@ class TakeoverService:
                 )
                 db.session.add(new_assignment)
 
+                from app.services.inspector_workload_service import InspectorWorkloadService
+                InspectorWorkloadService.refresh({takeover.requested_by, takeover.partner_id})
+
         # Deny all other pending requests for the same job
         other_requests = JobTakeover.query.filter(
             JobTakeover.job_type == takeover.job_type,
@@ -12,7 +12,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from collections import defaultdict
 from functools import lru_cache
 
-from sqlalchemy import func, and_, or_, desc
+from sqlalchemy import func, and_, or_
 
 from app.extensions import db
 from app.models import (
@@ -27,6 +27,9 @@ from app.models.work_plan_performance import WorkPlanPerformance
 from app.models.work_plan_job_rating import WorkPlanJobRating
 from app.models.work_plan_carry_over import WorkPlanCarryOver
 from app.services.openai_service import ReportService, VisionService
+from app.services.work_plan_scheduler import PlanState, AutoScheduler
+from app.services.work_plan_graph import get_plan_graph, HOURS_PER_DAY
+from app.services.job_duration_service import JobDurationService
 
 logger = logging.getLogger(__name__)
 
@@ -90,20 +93,8 @@ class WorkPlanAIService:
             return {'error': 'Work plan not found', 'scheduled': [], 'conflicts': [], 'optimization_score': 0}
 
         options = options or {}
-        priority_weight = options.get('priority_weight', 0.5)
-        balance_berths = options.get('balance_berths', True)
-        consider_skills = options.get('consider_skills', True)
-        minimize_travel = options.get('minimize_travel', True)
-
-        scheduled = []
-        conflicts = []
-
-        # Get all jobs that need scheduling
-        unassigned_jobs = []
-        for day in plan.days:
-            for job in day.jobs:
-                if not job.assignments:
-                    unassigned_jobs.append(job)
+        state = PlanState.load(plan)
+        unassigned_jobs = [job for job in state.jobs if not job.assigned]
 
         if not unassigned_jobs:
             return {
@@ -113,14 +104,7 @@ class WorkPlanAIService:
                 'message': 'All jobs are already assigned'
             }
 
-        # Get available workers
-        available_workers = User.query.filter(
-            User.is_active == True,
-            User.is_on_leave == False,
-            User.role.in_(['specialist', 'engineer'])
-        ).all()
-
-        if not available_workers:
+        if not state.workers:
             return {
                 'error': 'No available workers',
                 'scheduled': [],
@@ -128,118 +112,36 @@ class WorkPlanAIService:
                 'optimization_score': 0
             }
 
-        # Build worker availability by day
-        worker_hours_per_day = defaultdict(lambda: defaultdict(float))  # {day_id: {user_id: hours_assigned}}
-        daily_capacity = 8.0  # 8 hours per day per worker
-
-        # Track existing assignments
-        for day in plan.days:
-            for job in day.jobs:
-                for assignment in job.assignments:
-                    worker_hours_per_day[day.id][assignment.user_id] += job.estimated_hours or 0
-
-        # Score and sort jobs by priority
-        def job_priority_score(job: WorkPlanJob) -> float:
-            score = 0.0
-            # Priority weight
-            priority_map = {'urgent': 4, 'high': 3, 'normal': 2, 'low': 1}
-            score += priority_map.get(job.priority, 2) * priority_weight * 25
-
-            # Overdue weight
-            if job.overdue_value and job.overdue_value > 0:
-                if job.computed_priority == 'critical':
-                    score += 50
-                elif job.computed_priority == 'high':
-                    score += 30
-
-            # Defect jobs are prioritized
-            if job.job_type == 'defect':
-                score += 20
-
-            return score
-
-        unassigned_jobs.sort(key=job_priority_score, reverse=True)
-
-        # Schedule each job
-        for job in unassigned_jobs:
-            best_worker = None
-            best_score = -1
-
-            for worker in available_workers:
-                day_id = job.work_plan_day_id
-                current_hours = worker_hours_per_day[day_id][worker.id]
-
-                # Check capacity
-                if current_hours + (job.estimated_hours or 0) > daily_capacity:
-                    continue
-
-                score = 100.0
-
-                # Skill matching
-                if consider_skills and job.equipment:
-                    # Match specialization
-                    if worker.specialization:
-                        # Check if equipment type matches specialization
-                        eq_type = job.equipment.equipment_type or ''
-                        if 'electrical' in eq_type.lower() and worker.specialization == 'electrical':
-                            score += 20
-                        elif 'mechanical' in eq_type.lower() and worker.specialization == 'mechanical':
-                            score += 20
-                        elif 'hvac' in eq_type.lower() and worker.specialization == 'hvac':
-                            score += 20
-
-                # Berth preference
-                if balance_berths and job.berth:
-                    # Check if worker is already assigned to same berth jobs today
-                    same_berth_count = 0
-                    day_jobs = WorkPlanJob.query.filter_by(work_plan_day_id=day_id).all()
-                    for dj in day_jobs:
-                        for a in dj.assignments:
-                            if a.user_id == worker.id and dj.berth == job.berth:
-                                same_berth_count += 1
-                    if same_berth_count > 0:
-                        score += 10 * min(same_berth_count, 3)  # Reward same berth continuity
-
-                # Travel minimization
-                if minimize_travel and job.equipment:
-                    # Check if worker has other jobs on same equipment
-                    same_equipment_count = 0
-                    for dj in day_jobs:
-                        for a in dj.assignments:
-                            if a.user_id == worker.id and dj.equipment_id == job.equipment_id:
-                                same_equipment_count += 1
-                    if same_equipment_count > 0:
-                        score += 15
-
-                # Prefer workers with less load
-                load_factor = 1 - (current_hours / daily_capacity)
-                score += load_factor * 20
-
-                if score > best_score:
-                    best_score = score
-                    best_worker = worker
-
-            if best_worker:
-                # Create assignment
-                scheduled.append({
-                    'job_id': job.id,
-                    'user_id': best_worker.id,
-                    'user_name': best_worker.full_name,
-                    'day_date': job.day.date.isoformat() if job.day else None,
-                    'equipment_name': job.equipment.name if job.equipment else None,
-                    'estimated_hours': job.estimated_hours,
-                    'score': round(best_score, 2)
-                })
+        scheduler = AutoScheduler(
+            state,
+            priority_weight=options.get('priority_weight', 0.5),
+            balance_berths=options.get('balance_berths', True),
+            consider_skills=options.get('consider_skills', True),
+            minimize_travel=options.get('minimize_travel', True),
+        )
+        placed, unplaced = scheduler.solve()
 
-                # Update tracking
-                worker_hours_per_day[job.work_plan_day_id][best_worker.id] += job.estimated_hours or 0
-            else:
-                conflicts.append({
-                    'type': 'no_available_worker',
-                    'job_id': job.id,
-                    'description': f'No worker available for job {job.id} on day {job.day.date if job.day else "unknown"}',
-                    'estimated_hours': job.estimated_hours
-                })
+        scheduled = [
+            {
+                'job_id': job.id,
+                'user_id': worker.id,
+                'user_name': worker.name,
+                'day_date': job.day_date.isoformat() if job.day_date else None,
+                'equipment_name': job.equipment_name,
+                'estimated_hours': job.hours,
+                'score': round(score, 2)
+            }
+            for job, worker, score in placed
+        ]
+        conflicts = [
+            {
+                'type': 'no_available_worker',
+                'job_id': job.id,
+                'description': f'No worker available for job {job.id} on day {job.day_date or "unknown"}',
+                'estimated_hours': job.hours
+            }
+            for job in unplaced
+        ]
 
         # Calculate optimization score
         total_jobs = len(unassigned_jobs)
@@ -638,66 +540,28 @@ class WorkPlanAIService:
 
         factors = []
 
-        # Get historical data for similar jobs
-        query = db.session.query(
-            WorkPlanJobTracking.actual_hours,
-            WorkPlanJob.estimated_hours
-        ).join(
-            WorkPlanJob
-        ).filter(
-            WorkPlanJobTracking.status == 'completed',
-            WorkPlanJobTracking.actual_hours.isnot(None),
-            WorkPlanJob.job_type == job_type
-        )
-
-        if equipment_id:
-            query = query.filter(WorkPlanJob.equipment_id == equipment_id)
-            factors.append('Equipment-specific history')
-
-        historical = query.order_by(desc(WorkPlanJobTracking.completed_at)).limit(50).all()
-
-        if not historical:
-            # Fallback: get any historical data for this job type
-            historical = db.session.query(
-                WorkPlanJobTracking.actual_hours,
-                WorkPlanJob.estimated_hours
-            ).join(
-                WorkPlanJob
-            ).filter(
-                WorkPlanJobTracking.status == 'completed',
-                WorkPlanJobTracking.actual_hours.isnot(None),
-                WorkPlanJob.job_type == job_type
-            ).limit(100).all()
-            factors.append('Job type historical average')
-
-        if not historical:
-            return {
-                'estimated_hours': 2.0,
-                'confidence': 0.3,
-                'range': {'min': 1.0, 'max': 4.0},
-                'factors': ['No historical data - using default estimate']
-            }
-
-        actual_hours = [float(h[0]) for h in historical if h[0]]
-        estimated_hours = [float(h[1]) for h in historical if h[1]]
-
-        if not actual_hours:
+        # Running statistics of completed jobs: this equipment, else the job type
+        stat, scope = JobDurationService.lookup(job_type, equipment_id=equipment_id)
+        if stat is None:
             return {
                 'estimated_hours': 2.0,
                 'confidence': 0.3,
                 'range': {'min': 1.0, 'max': 4.0},
                 'factors': ['No historical data - using default estimate']
             }
+        if scope == 'equipment':
+            factors.append('Equipment-specific history')
+        elif scope == 'equipment_type':
+            factors.append('Equipment type history')
+        else:
+            factors.append('Job type historical average')
 
-        # Calculate statistics
-        avg_actual = statistics.mean(actual_hours)
-        std_dev = statistics.stdev(actual_hours) if len(actual_hours) > 1 else avg_actual * 0.2
+        avg_actual = stat.mean_hours
+        std_dev = stat.std_dev if stat.count > 1 else avg_actual * 0.2
 
         # Calculate accuracy of estimates
-        if estimated_hours:
-            estimate_errors = [abs(a - e) / e for a, e in zip(actual_hours, estimated_hours) if e > 0]
-            avg_error = statistics.mean(estimate_errors) if estimate_errors else 0.2
-            factors.append(f'Historical estimate accuracy: {(1 - avg_error) * 100:.0f}%')
+        if stat.estimate_error is not None:
+            factors.append(f'Historical estimate accuracy: {(1 - stat.estimate_error) * 100:.0f}%')
 
         # Adjust for team size
         if team_size > 1:
@@ -727,7 +591,7 @@ class WorkPlanAIService:
                     factors.append(f'Less experienced workers (avg rating: {rating:.1f})')
 
         # Confidence based on data quality
-        confidence = min(0.95, 0.5 + len(historical) * 0.01)
+        confidence = min(0.95, 0.5 + stat.count * 0.01)
 
         return {
             'estimated_hours': round(avg_actual, 2),
@@ -737,7 +601,7 @@ class WorkPlanAIService:
                 'max': round(avg_actual + std_dev, 2)
             },
             'factors': factors,
-            'sample_size': len(historical)
+            'sample_size': stat.count
         }
 
     def predict_delay_risk(self, job_id: int) -> dict:
@@ -1155,6 +1019,9 @@ class WorkPlanAIService:
         """
         Detect unusual worker performance patterns.
 
+        Metrics for the whole workforce come from one grouped query and are
+        scored against the team distribution; see WorkforceAnalyticsService.
+
         Args:
             user_id: Optional specific user to analyze
             period: 'daily', 'weekly', or 'monthly'
@@ -1162,115 +1029,9 @@ class WorkPlanAIService:
         Returns:
             List of performance anomalies
         """
-        anomalies = []
-
-        # Determine date range
-        today = date.today()
-        if period == 'daily':
-            period_start = today - timedelta(days=1)
-        elif period == 'weekly':
-            period_start = today - timedelta(days=7)
-        else:  # monthly
-            period_start = today - timedelta(days=30)
-
-        # Build user query
-        if user_id:
-            users = [db.session.get(User, user_id)]
-        else:
-            users = User.query.filter(
-                User.is_active == True,
-                User.role.in_(['specialist', 'engineer', 'inspector'])
-            ).all()
-
-        for user in users:
-            if not user:
-                continue
-
-            # Get recent performance data
-            completed_jobs = db.session.query(WorkPlanJobTracking).join(
-                WorkPlanJob
-            ).join(
-                WorkPlanAssignment
-            ).join(
-                WorkPlanDay
-            ).filter(
-                WorkPlanAssignment.user_id == user.id,
-                WorkPlanJobTracking.status == 'completed',
-                WorkPlanDay.date >= period_start
-            ).all()
-
-            if len(completed_jobs) < 3:
-                continue
-
-            # Check time efficiency
-            time_ratios = []
-            for tracking in completed_jobs:
-                job = tracking.work_plan_job
-                if job.estimated_hours and tracking.actual_hours:
-                    ratio = float(tracking.actual_hours) / float(job.estimated_hours)
-                    time_ratios.append(ratio)
-
-            if time_ratios:
-                avg_ratio = statistics.mean(time_ratios)
-
-                # Anomaly: Consistently taking much longer
-                if avg_ratio > 1.5:
-                    anomalies.append({
-                        'user_id': user.id,
-                        'user_name': user.full_name,
-                        'anomaly_type': 'slow_completion',
-                        'description': f'Taking {(avg_ratio - 1) * 100:.0f}% longer than estimated on average',
-                        'deviation': round(avg_ratio, 2),
-                        'investigation_needed': avg_ratio > 2.0
-                    })
-
-                # Anomaly: Consistently much faster (possible quality issue)
-                if avg_ratio < 0.6:
-                    anomalies.append({
-                        'user_id': user.id,
-                        'user_name': user.full_name,
-                        'anomaly_type': 'unusually_fast',
-                        'description': f'Completing jobs {(1 - avg_ratio) * 100:.0f}% faster than estimated',
-                        'deviation': round(avg_ratio, 2),
-                        'investigation_needed': True
-                    })
-
-            # Check completion rate
-            total_assigned = db.session.query(WorkPlanAssignment).join(
-                WorkPlanJob
-            ).join(
-                WorkPlanDay
-            ).filter(
-                WorkPlanAssignment.user_id == user.id,
-                WorkPlanDay.date >= period_start
-            ).count()
-
-            if total_assigned > 5:
-                completion_rate = len(completed_jobs) / total_assigned
-
-                if completion_rate < 0.6:
-                    anomalies.append({
-                        'user_id': user.id,
-                        'user_name': user.full_name,
-                        'anomaly_type': 'low_completion_rate',
-                        'description': f'Only {completion_rate * 100:.0f}% of assigned jobs completed',
-                        'deviation': round(completion_rate, 2),
-                        'investigation_needed': completion_rate < 0.5
-                    })
-
-            # Check pause patterns
-            total_pauses = sum(1 for t in completed_jobs if t.total_paused_minutes and t.total_paused_minutes > 30)
-            if total_pauses > len(completed_jobs) * 0.5:
-                anomalies.append({
-                    'user_id': user.id,
-                    'user_name': user.full_name,
-                    'anomaly_type': 'frequent_pauses',
-                    'description': f'{total_pauses} of {len(completed_jobs)} jobs had significant pauses',
-                    'deviation': round(total_pauses / len(completed_jobs), 2),
-                    'investigation_needed': False
-                })
-
-        return anomalies
+        # Loads NumPy, so imported on first use rather than at app startup
+        from app.services.workforce_analytics_service import WorkforceAnalyticsService
+        return WorkforceAnalyticsService.detect_anomalies(user_id=user_id, period=period)
 
     def detect_time_estimation_issues(self) -> list:
         """
@@ -1378,20 +1139,20 @@ class WorkPlanAIService:
         if not plan:
             return []
 
+        graph = get_plan_graph(plan_id)
         bottlenecks = []
 
         # Bottleneck 1: Skill shortages
         skill_needs = defaultdict(int)
-        for day in plan.days:
-            for job in day.jobs:
-                if job.equipment:
-                    eq_type = (job.equipment.equipment_type or '').lower()
-                    if 'electrical' in eq_type:
-                        skill_needs['electrical'] += 1
-                    elif 'mechanical' in eq_type:
-                        skill_needs['mechanical'] += 1
-                    elif 'hvac' in eq_type:
-                        skill_needs['hvac'] += 1
+        for job in graph.order:
+            if job.equipment_id:
+                eq_type = (job.equipment_type or '').lower()
+                if 'electrical' in eq_type:
+                    skill_needs['electrical'] += 1
+                elif 'mechanical' in eq_type:
+                    skill_needs['mechanical'] += 1
+                elif 'hvac' in eq_type:
+                    skill_needs['hvac'] += 1
 
         for skill, count in skill_needs.items():
             available = User.query.filter(
@@ -1410,26 +1171,22 @@ class WorkPlanAIService:
                 })
 
         # Bottleneck 2: Equipment access conflicts
-        for day in plan.days:
-            equipment_times = defaultdict(list)
-            for job in day.jobs:
-                if job.equipment_id:
-                    equipment_times[job.equipment_id].append({
-                        'job_id': job.id,
-                        'hours': job.estimated_hours or 0
-                    })
-
-            for eq_id, jobs in equipment_times.items():
-                total_hours = sum(j['hours'] for j in jobs)
-                if total_hours > 8:  # More than 8 hours on same equipment
-                    eq = db.session.get(Equipment, eq_id)
-                    bottlenecks.append({
-                        'type': 'equipment_conflict',
-                        'description': f'{eq.name if eq else "Equipment"} has {total_hours:.1f}h of work scheduled on {day.date}',
-                        'impact': 'high' if total_hours > 12 else 'medium',
-                        'affected_jobs': [j['job_id'] for j in jobs],
-                        'solution': 'Spread jobs across multiple days or parallelize with multiple teams'
-                    })
+        equipment_times = defaultdict(list)
+        for job in graph.order:
+            if job.equipment_id:
+                equipment_times[(job.day_date, job.equipment_id)].append(job)
+
+        for (day_date, eq_id), jobs in equipment_times.items():
+            total_hours = sum(j.hours for j in jobs)
+            if total_hours > 8:  # More than 8 hours on same equipment
+                name = jobs[0].equipment_name
+                bottlenecks.append({
+                    'type': 'equipment_conflict',
+                    'description': f'{name or "Equipment"} has {total_hours:.1f}h of work scheduled on {day_date}',
+                    'impact': 'high' if total_hours > 12 else 'medium',
+                    'affected_jobs': [j.id for j in jobs],
+                    'solution': 'Spread jobs across multiple days or parallelize with multiple teams'
+                })
 
         # Bottleneck 3: Worker capacity
         worker_weekly_hours = defaultdict(float)
@@ -1577,12 +1334,19 @@ class WorkPlanAIService:
         """
         Find critical path considering job dependencies.
 
+        Reads the plan's cached dependency graph (see work_plan_graph):
+        same-equipment jobs run in plan order and explicit job dependencies
+        apply, so a job's slack is how many work hours it can slip without
+        lengthening the plan. Overdue, urgent and severe-defect jobs are
+        listed as critical whatever their slack.
+
         Args:
             plan_id: Work plan ID
 
         Returns:
             {
                 critical_jobs: list of jobs on critical path,
+                critical_path: job IDs along the longest path,
                 total_duration: total critical path duration,
                 slack_jobs: jobs with scheduling slack
             }
@@ -1591,69 +1355,51 @@ class WorkPlanAIService:
         if not plan:
             return {'error': 'Work plan not found'}
 
+        graph = get_plan_graph(plan_id)
         critical_jobs = []
         slack_jobs = []
 
-        # For work planning, critical path is based on:
-        # 1. Overdue/urgent jobs
-        # 2. Jobs with dependencies (same equipment must be sequential)
-        # 3. Jobs with specific timing requirements
-
-        # Identify critical jobs
-        for day in plan.days:
-            for job in day.jobs:
-                is_critical = False
-                reasons = []
-
-                # Critical if overdue
-                if job.overdue_value and job.overdue_value > 0:
-                    is_critical = True
-                    reasons.append('Overdue')
+        for job in graph.order:
+            reasons = []
+            if graph.is_critical(job.id):
+                reasons.append('On critical path')
 
-                # Critical if urgent priority
-                if job.priority == 'urgent':
-                    is_critical = True
-                    reasons.append('Urgent priority')
+            # Critical if overdue
+            if job.overdue_value and job.overdue_value > 0:
+                reasons.append('Overdue')
 
-                # Critical if defect with high severity
-                if job.job_type == 'defect' and job.defect:
-                    if job.defect.severity in ('critical', 'high'):
-                        is_critical = True
-                        reasons.append(f'{job.defect.severity} severity defect')
+            # Critical if urgent priority
+            if job.priority == 'urgent':
+                reasons.append('Urgent priority')
 
-                # Critical if blocking other work
-                if job.equipment_id:
-                    same_equipment_jobs = [
-                        j for d in plan.days for j in d.jobs
-                        if j.equipment_id == job.equipment_id and j.id != job.id
-                    ]
-                    if len(same_equipment_jobs) > 2:
-                        is_critical = True
-                        reasons.append('Multiple jobs depend on this equipment')
+            # Critical if defect with high severity
+            if job.job_type == 'defect' and job.defect_severity in ('critical', 'high'):
+                reasons.append(f'{job.defect_severity} severity defect')
 
-                if is_critical:
-                    critical_jobs.append({
-                        'job_id': job.id,
-                        'equipment': job.equipment.name if job.equipment else None,
-                        'estimated_hours': job.estimated_hours,
-                        'day': day.date.isoformat(),
-                        'reasons': reasons
-                    })
-                else:
-                    slack_jobs.append({
-                        'job_id': job.id,
-                        'equipment': job.equipment.name if job.equipment else None,
-                        'estimated_hours': job.estimated_hours,
-                        'day': day.date.isoformat(),
-                        'slack_days': 1  # Could be rescheduled by 1 day
-                    })
+            # Critical if blocking other work
+            if job.equipment_id and len(graph.equipment_jobs[job.equipment_id]) > 3:
+                reasons.append('Multiple jobs depend on this equipment')
 
-        # Calculate total critical duration
-        total_duration = sum(j['estimated_hours'] or 0 for j in critical_jobs)
+            entry = {
+                'job_id': job.id,
+                'equipment': job.equipment_name,
+                'estimated_hours': job.hours,
+                'day': job.day_date.isoformat(),
+            }
+            if reasons:
+                critical_jobs.append({**entry, 'reasons': reasons})
+            else:
+                slack = graph.slack(job.id)
+                slack_jobs.append({
+                    **entry,
+                    'slack_hours': round(slack, 1),
+                    'slack_days': round(slack / HOURS_PER_DAY, 1),
+                })
 
         return {
             'critical_jobs': critical_jobs,
-            'total_duration': round(total_duration, 1),
+            'critical_path': graph.critical_path,
+            'total_duration': round(graph.duration, 1),
             'critical_count': len(critical_jobs),
             'slack_jobs': slack_jobs,
             'slack_count': len(slack_jobs)
@@ -1697,33 +1443,41 @@ class WorkPlanAIService:
         if event_type == 'delay' and affected_job_id:
             job = db.session.get(WorkPlanJob, affected_job_id)
             if job:
-                # Find subsequent jobs that may be affected
+                # Subsequent jobs that may be affected: later the same day, and
+                # everything waiting on the job in the plan's dependency graph
                 day = job.day
                 if day:
-                    subsequent_jobs = [
-                        j for j in day.jobs
-                        if j.position > job.position
-                    ]
+                    graph = get_plan_graph(day.work_plan_id)
+                    affected = set(graph.descendants(job.id))
+                    affected.update(
+                        n.id for n in graph.order if n.day_id == day.id and n.position > (job.position or 0))
+                    subsequent_jobs = [n for n in graph.order if n.id in affected]
 
                     for subsequent in subsequent_jobs:
                         adjustments.append({
                             'type': 'delay_propagation',
                             'job_id': subsequent.id,
                             'action': 'Delay start time',
-                            'reason': f'Delayed by job {job.id}'
+                            'reason': f'Delayed by job {job.id}',
+                            'slack_hours': round(graph.slack(subsequent.id), 1),
                         })
                         impact_summary['jobs_affected'] += 1
-                        impact_summary['hours_impacted'] += subsequent.estimated_hours or 0
+                        impact_summary['hours_impacted'] += subsequent.hours
 
                     # Notify affected workers
-                    for subsequent in subsequent_jobs:
-                        for assignment in subsequent.assignments:
-                            notifications.append({
-                                'user_id': assignment.user_id,
-                                'message': f'Job {subsequent.id} may be delayed due to earlier delay',
-                                'priority': 'warning'
-                            })
-                            impact_summary['workers_affected'] += 1
+                    rank = {n.id: i for i, n in enumerate(subsequent_jobs)}
+                    assignees = db.session.query(
+                        WorkPlanAssignment.work_plan_job_id, WorkPlanAssignment.user_id
+                    ).filter(
+                        WorkPlanAssignment.work_plan_job_id.in_(affected)
+                    ).order_by(WorkPlanAssignment.id).all() if affected else []
+                    for job_id, user_id in sorted(assignees, key=lambda a: rank[a[0]]):
+                        notifications.append({
+                            'user_id': user_id,
+                            'message': f'Job {job_id} may be delayed due to earlier delay',
+                            'priority': 'warning'
+                        })
+                        impact_summary['workers_affected'] += 1
 
         elif event_type == 'absence' and affected_user_id:
             # Find all jobs assigned to absent worker
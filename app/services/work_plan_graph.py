@@ -0,0 +1,227 @@
+"""
+Work plan dependency graph and critical path.
+
+A plan's jobs are loaded once (with their day, equipment and defect
+severity) into a PlanGraph whose edges are
+- same-equipment sequencing: each equipment's jobs in plan order (day,
+  position) form a chain, one edge per consecutive pair, and
+- explicit JobDependency rows between jobs of the plan, finish-to-start
+  or start-to-start, with their lag.
+
+Earliest and latest starts are one forward and one backward pass over a
+topological order, so the longest path and every job's slack (in work
+hours) cost O(jobs + edges). Graphs are cached per plan and rebuilt when
+the plan's version changes: its job count, dependency count and latest
+job, day or dependency change, or the latest change to the equipment and
+defects its jobs point at (nodes carry their names, types and severity).
+A plan nobody has viewed for GRAPH_CACHE_SECONDS drops out of the cache.
+"""
+
+import logging
+from collections import defaultdict, deque
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Equipment, Defect, JobDependency
+from app.models.work_plan_day import WorkPlanDay
+from app.models.work_plan_job import WorkPlanJob
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Slack below this many hours counts as none (float noise)
+EPSILON = 1e-6
+HOURS_PER_DAY = 8.0
+
+GRAPH_CACHE_SECONDS = 600
+
+_graphs = TTLCache(default_ttl=GRAPH_CACHE_SECONDS)
+
+
+class PlanNode:
+    """A plan job as the graph sees it."""
+
+    __slots__ = ('id', 'day_id', 'day_date', 'position', 'hours', 'priority', 'job_type', 'overdue_value',
+                 'equipment_id', 'equipment_name', 'equipment_type', 'defect_severity')
+
+    def __init__(self, id, day_id, day_date, position=0, hours=0, priority='normal', job_type='pm',
+                 overdue_value=None, equipment_id=None, equipment_name=None, equipment_type=None,
+                 defect_severity=None):
+        self.id = id
+        self.day_id = day_id
+        self.day_date = day_date
+        self.position = position or 0
+        self.hours = hours or 0
+        self.priority = priority
+        self.job_type = job_type
+        self.overdue_value = overdue_value
+        self.equipment_id = equipment_id
+        self.equipment_name = equipment_name
+        self.equipment_type = equipment_type
+        self.defect_severity = defect_severity
+
+
+class PlanGraph:
+    """Jobs, sequencing edges and the critical path of one plan version."""
+
+    def __init__(self, nodes, dependencies=(), plan_id=None, version=None):
+        """
+        Args:
+            nodes: PlanNode list, in any order
+            dependencies: (job_id, depends_on_job_id, dependency_type, lag_minutes)
+                tuples; those reaching outside the plan are ignored
+        """
+        self.plan_id = plan_id
+        self.version = version
+        self.order = sorted(nodes, key=lambda n: (n.day_date, n.position, n.id))
+        self.nodes = {n.id: n for n in self.order}
+        # successors[u] = [(v, kind, lag_hours)]: v may start lag hours after u finishes
+        # (kind 'finish') or starts (kind 'start')
+        self.successors = defaultdict(list)
+        self.predecessors = defaultdict(list)
+
+        self.equipment_jobs = defaultdict(list)
+        for node in self.order:
+            if node.equipment_id:
+                self.equipment_jobs[node.equipment_id].append(node.id)
+        for chain in self.equipment_jobs.values():
+            for before, after in zip(chain, chain[1:]):
+                self._edge(before, after, 'finish', 0)
+        for job_id, depends_on, dependency_type, lag_minutes in dependencies:
+            if job_id in self.nodes and depends_on in self.nodes:
+                kind = 'start' if dependency_type == 'start_to_start' else 'finish'
+                self._edge(depends_on, job_id, kind, (lag_minutes or 0) / 60)
+
+        self._schedule()
+
+    def _edge(self, u, v, kind, lag):
+        self.successors[u].append((v, kind, lag))
+        self.predecessors[v].append((u, kind, lag))
+
+    def _topological_order(self):
+        """Kahn's algorithm, ties in plan order; jobs caught in a cycle follow in plan order."""
+        indegree = {job_id: len(self.predecessors[job_id]) for job_id in self.nodes}
+        ready = deque(n.id for n in self.order if not indegree[n.id])
+        order = []
+        while ready:
+            u = ready.popleft()
+            order.append(u)
+            for v, _, _ in self.successors[u]:
+                indegree[v] -= 1
+                if not indegree[v]:
+                    ready.append(v)
+        self.cyclic = [n.id for n in self.order if indegree[n.id] > 0]
+        if self.cyclic:
+            logger.warning("Work plan %s has a dependency cycle through jobs %s", self.plan_id, self.cyclic)
+        return order + self.cyclic
+
+    def _schedule(self):
+        order = self._topological_order()
+        position = {job_id: n for n, job_id in enumerate(order)}
+        hours = {job_id: node.hours for job_id, node in self.nodes.items()}
+
+        # Forward pass; edges from later in the order only occur inside a cycle and are skipped
+        es = {}
+        for v in order:
+            start = 0.0
+            for u, kind, lag in self.predecessors[v]:
+                if position[u] < position[v]:
+                    start = max(start, es[u] + (hours[u] if kind == 'finish' else 0) + lag)
+            es[v] = start
+        self.duration = max((es[v] + hours[v] for v in order), default=0.0)
+
+        # Backward pass
+        lf = {}
+        for u in reversed(order):
+            finish = self.duration
+            for v, kind, lag in self.successors[u]:
+                if position[v] > position[u]:
+                    latest_start = lf[v] - hours[v]
+                    finish = min(finish, latest_start - lag if kind == 'finish' else latest_start - lag + hours[u])
+            lf[u] = finish
+        self.earliest_start = es
+        self.latest_start = {v: lf[v] - hours[v] for v in order}
+
+        # Longest path: from a zero-slack start, follow zero-slack successors that start on time
+        self.critical_path = []
+        current = next((v for v in order if es[v] < EPSILON and self.slack(v) < EPSILON), None)
+        while current is not None:
+            self.critical_path.append(current)
+            current = next((
+                v for v, kind, lag in self.successors[current]
+                if position[v] > position[current] and self.slack(v) < EPSILON
+                and abs(es[v] - (es[current] + (hours[current] if kind == 'finish' else 0) + lag)) < EPSILON
+            ), None)
+
+    def slack(self, job_id):
+        """Hours the job can slip without delaying the plan."""
+        return max(0.0, self.latest_start[job_id] - self.earliest_start[job_id])
+
+    def is_critical(self, job_id):
+        return self.slack(job_id) < EPSILON
+
+    def descendants(self, job_id):
+        """Jobs that (transitively) wait on job_id, in plan order."""
+        seen = set()
+        stack = [job_id]
+        while stack:
+            for v, _, _ in self.successors[stack.pop()]:
+                if v not in seen and v != job_id:
+                    seen.add(v)
+                    stack.append(v)
+        return [n.id for n in self.order if n.id in seen]
+
+
+def plan_version(plan_id):
+    """Fingerprint of the plan's jobs, days, dependencies, equipment and defects, in one query."""
+    in_plan = WorkPlanJob.work_plan_day_id.in_(
+        select(WorkPlanDay.id).where(WorkPlanDay.work_plan_id == plan_id))
+    plan_jobs = select(WorkPlanJob.id).where(in_plan)
+    plan_equipment = select(WorkPlanJob.equipment_id).where(in_plan)
+    plan_defects = select(WorkPlanJob.defect_id).where(in_plan)
+    row = db.session.query(
+        select(func.count(WorkPlanJob.id)).where(in_plan).scalar_subquery(),
+        select(func.max(WorkPlanJob.updated_at)).where(in_plan).scalar_subquery(),
+        select(func.max(WorkPlanDay.updated_at)).where(WorkPlanDay.work_plan_id == plan_id).scalar_subquery(),
+        select(func.count(JobDependency.id)).where(JobDependency.job_id.in_(plan_jobs)).scalar_subquery(),
+        select(func.max(JobDependency.id)).where(JobDependency.job_id.in_(plan_jobs)).scalar_subquery(),
+        select(func.max(Equipment.updated_at)).where(Equipment.id.in_(plan_equipment)).scalar_subquery(),
+        select(func.max(Defect.updated_at)).where(Defect.id.in_(plan_defects)).scalar_subquery(),
+    ).one()
+    return tuple(row)
+
+
+def load_plan_graph(plan_id, version=None):
+    """Build a plan's graph with two queries."""
+    rows = db.session.query(
+        WorkPlanJob.id, WorkPlanJob.work_plan_day_id, WorkPlanDay.date, WorkPlanJob.position,
+        WorkPlanJob.estimated_hours, WorkPlanJob.priority, WorkPlanJob.job_type, WorkPlanJob.overdue_value,
+        WorkPlanJob.equipment_id, Equipment.name, Equipment.equipment_type, Defect.severity,
+    ).join(
+        WorkPlanDay, WorkPlanDay.id == WorkPlanJob.work_plan_day_id
+    ).outerjoin(
+        Equipment, Equipment.id == WorkPlanJob.equipment_id
+    ).outerjoin(
+        Defect, Defect.id == WorkPlanJob.defect_id
+    ).filter(WorkPlanDay.work_plan_id == plan_id)
+    nodes = [PlanNode(*row) for row in rows]
+
+    dependencies = db.session.query(
+        JobDependency.job_id, JobDependency.depends_on_job_id,
+        JobDependency.dependency_type, JobDependency.lag_minutes,
+    ).filter(JobDependency.job_id.in_([n.id for n in nodes])).all() if nodes else []
+    return PlanGraph(nodes, dependencies, plan_id=plan_id, version=version)
+
+
+def get_plan_graph(plan_id):
+    """The plan's graph, rebuilt only when plan_version() has changed."""
+    version = plan_version(plan_id)
+    cached = _graphs.get(plan_id)
+    if cached is not None and cached.version == version:
+        # Reading resets the expiry, so a plan in use stays cached
+        _graphs.set(plan_id, cached)
+        return cached
+    graph = load_plan_graph(plan_id, version)
+    _graphs.set(plan_id, graph)
+    return graph
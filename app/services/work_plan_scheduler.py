@@ -0,0 +1,306 @@
+"""
+Work plan auto-scheduler.
+
+The plan is loaded once (days, jobs with their equipment, existing
+assignments, candidate workers and their approved leave) into a PlanState
+that keeps, per (day, worker), the hours booked and how many jobs of each
+berth and equipment the worker already has. Scoring a worker for a job is
+then a handful of dict lookups, so a run costs O(jobs x workers) in memory
+and a fixed number of queries however large the plan is.
+
+Jobs are placed greedily, highest priority first, on the best-scoring
+worker with capacity left that day. A repair pass then retries jobs that
+did not fit: if moving one of a worker's jobs to a colleague with spare
+capacity frees enough hours, the job is placed there instead of being
+reported as a conflict.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from app.extensions import db
+from app.models import User, Equipment, Leave
+from app.models.work_plan_day import WorkPlanDay
+from app.models.work_plan_job import WorkPlanJob
+from app.models.work_plan_assignment import WorkPlanAssignment
+
+logger = logging.getLogger(__name__)
+
+DAILY_CAPACITY = 8.0
+WORKER_ROLES = ('specialist', 'engineer')
+PRIORITY_POINTS = {'urgent': 4, 'high': 3, 'normal': 2, 'low': 1}
+SKILL_KEYWORDS = ('electrical', 'mechanical', 'hvac')
+
+
+class ScheduledJob:
+    """A plan job as the scheduler sees it."""
+
+    __slots__ = ('id', 'day_id', 'day_date', 'hours', 'priority', 'job_type', 'urgency', 'berth',
+                 'equipment_id', 'equipment_name', 'skills', 'assigned')
+
+    def __init__(self, id, day_id, day_date, hours, priority='normal', job_type='pm', urgency='normal',
+                 berth=None, equipment_id=None, equipment_name=None, equipment_type=None):
+        self.id = id
+        self.day_id = day_id
+        self.day_date = day_date
+        self.hours = hours or 0
+        self.priority = priority
+        self.job_type = job_type
+        self.urgency = urgency
+        self.berth = berth
+        self.equipment_id = equipment_id
+        self.equipment_name = equipment_name
+        eq_type = (equipment_type or '').lower()
+        self.skills = frozenset(k for k in SKILL_KEYWORDS if k in eq_type) if equipment_id else frozenset()
+        self.assigned = []
+
+
+class Worker:
+    __slots__ = ('id', 'name', 'specialization')
+
+    def __init__(self, id, name, specialization=None):
+        self.id = id
+        self.name = name
+        self.specialization = specialization
+
+
+class PlanState:
+    """Jobs, workers and per-(day, worker) bookings of one plan."""
+
+    def __init__(self, jobs, workers, capacity=DAILY_CAPACITY, unavailable=None):
+        """
+        Args:
+            jobs: ScheduledJob list in plan order; job.assigned holds the
+                user ids already assigned
+            workers: Worker list
+            capacity: Hours per worker per day
+            unavailable: {(day_id, user_id): hours lost to leave}
+        """
+        self.jobs = jobs
+        self.workers = workers
+        self.daily_capacity = capacity
+        self.unavailable = unavailable or {}
+        self.hours = defaultdict(float)
+        self.berths = defaultdict(int)
+        self.equipment = defaultdict(int)
+        self.booked = defaultdict(list)
+        self.placed = {}
+        for job in jobs:
+            for user_id in job.assigned:
+                self._book(job, user_id)
+
+    @classmethod
+    def load(cls, plan, capacity=DAILY_CAPACITY):
+        """Load a plan with a fixed number of queries."""
+        days = {d.id: d.date for d in db.session.query(WorkPlanDay.id, WorkPlanDay.date).filter(
+            WorkPlanDay.work_plan_id == plan.id)}
+        if not days:
+            return cls([], [], capacity)
+
+        rows = db.session.query(
+            WorkPlanJob.id, WorkPlanJob.work_plan_day_id, WorkPlanJob.estimated_hours,
+            WorkPlanJob.priority, WorkPlanJob.job_type, WorkPlanJob.overdue_value,
+            WorkPlanJob.overdue_unit, WorkPlanJob.berth, WorkPlanJob.equipment_id,
+            Equipment.name.label('equipment_name'), Equipment.equipment_type,
+        ).outerjoin(
+            Equipment, Equipment.id == WorkPlanJob.equipment_id
+        ).filter(
+            WorkPlanJob.work_plan_day_id.in_(days)
+        ).order_by(WorkPlanJob.work_plan_day_id, WorkPlanJob.position, WorkPlanJob.id).all()
+        jobs = [
+            ScheduledJob(
+                r.id, r.work_plan_day_id, days[r.work_plan_day_id], r.estimated_hours,
+                priority=r.priority, job_type=r.job_type,
+                # Same rule as the model property, on the loaded columns
+                urgency=WorkPlanJob.computed_priority.fget(r),
+                berth=r.berth, equipment_id=r.equipment_id, equipment_name=r.equipment_name,
+                equipment_type=r.equipment_type,
+            )
+            for r in rows
+        ]
+        jobs.sort(key=lambda j: days[j.day_id])
+        by_id = {j.id: j for j in jobs}
+        for job_id, user_id in db.session.query(
+            WorkPlanAssignment.work_plan_job_id, WorkPlanAssignment.user_id
+        ).join(WorkPlanJob, WorkPlanJob.id == WorkPlanAssignment.work_plan_job_id).filter(
+            WorkPlanJob.work_plan_day_id.in_(days)
+        ):
+            by_id[job_id].assigned.append(user_id)
+
+        workers = [
+            Worker(u.id, u.full_name, u.specialization)
+            for u in db.session.query(User.id, User.full_name, User.specialization).filter(
+                User.is_active.is_(True),
+                User.is_on_leave.is_(False),
+                User.role.in_(WORKER_ROLES),
+            ).order_by(User.id)
+        ]
+
+        # Approved leave: whole days off, half days take half the capacity
+        unavailable = {}
+        first, last = min(days.values()), max(days.values())
+        day_ids = defaultdict(list)
+        for day_id, day_date in days.items():
+            day_ids[day_date].append(day_id)
+        leaves = db.session.query(
+            Leave.user_id, Leave.date_from, Leave.date_to, Leave.is_half_day
+        ).filter(
+            Leave.status == 'approved', Leave.date_from <= last, Leave.date_to >= first,
+            Leave.user_id.in_([w.id for w in workers]),
+        )
+        for user_id, date_from, date_to, is_half_day in leaves:
+            lost = capacity / 2 if is_half_day else capacity
+            d = max(date_from, first)
+            while d <= min(date_to, last):
+                for day_id in day_ids.get(d, ()):
+                    unavailable[(day_id, user_id)] = max(unavailable.get((day_id, user_id), 0), lost)
+                d += timedelta(days=1)
+
+        return cls(jobs, workers, capacity, unavailable)
+
+    def capacity(self, day_id, user_id):
+        return self.daily_capacity - self.unavailable.get((day_id, user_id), 0)
+
+    def free(self, day_id, user_id):
+        return self.capacity(day_id, user_id) - self.hours[(day_id, user_id)]
+
+    def fits(self, job, user_id):
+        return self.hours[(job.day_id, user_id)] + job.hours <= self.capacity(job.day_id, user_id)
+
+    def place(self, job, user_id):
+        self._book(job, user_id)
+        self.placed[job.id] = user_id
+
+    def unplace(self, job):
+        user_id = self.placed.pop(job.id)
+        key = (job.day_id, user_id)
+        self.hours[key] -= job.hours
+        self.booked[key].remove(job)
+        if job.berth:
+            self.berths[(job.day_id, user_id, job.berth)] -= 1
+        if job.equipment_id:
+            self.equipment[(job.day_id, user_id, job.equipment_id)] -= 1
+        return user_id
+
+    def _book(self, job, user_id):
+        key = (job.day_id, user_id)
+        self.hours[key] += job.hours
+        self.booked[key].append(job)
+        if job.berth:
+            self.berths[(job.day_id, user_id, job.berth)] += 1
+        if job.equipment_id:
+            self.equipment[(job.day_id, user_id, job.equipment_id)] += 1
+
+
+class AutoScheduler:
+    """Greedy placement plus a repair pass over a PlanState."""
+
+    def __init__(self, state, priority_weight=0.5, balance_berths=True, consider_skills=True,
+                 minimize_travel=True):
+        self.state = state
+        self.priority_weight = priority_weight
+        self.balance_berths = balance_berths
+        self.consider_skills = consider_skills
+        self.minimize_travel = minimize_travel
+
+    def job_priority(self, job):
+        score = PRIORITY_POINTS.get(job.priority, 2) * self.priority_weight * 25
+        if job.urgency == 'critical':
+            score += 50
+        elif job.urgency == 'high':
+            score += 30
+        if job.job_type == 'defect':
+            score += 20
+        return score
+
+    def score(self, job, worker):
+        """How well worker suits job given what they already have that day."""
+        state, day_id = self.state, job.day_id
+        score = 100.0
+        if self.consider_skills and worker.specialization in job.skills:
+            score += 20
+        if self.balance_berths and job.berth:
+            same_berth = state.berths[(day_id, worker.id, job.berth)]
+            if same_berth > 0:
+                score += 10 * min(same_berth, 3)
+        if self.minimize_travel and job.equipment_id and state.equipment[(day_id, worker.id, job.equipment_id)] > 0:
+            score += 15
+        score += (1 - state.hours[(day_id, worker.id)] / state.daily_capacity) * 20
+        return score
+
+    def best_worker(self, job, exclude=None):
+        best, best_score = None, -1
+        for worker in self.state.workers:
+            if worker.id == exclude or not self.state.fits(job, worker.id):
+                continue
+            score = self.score(job, worker)
+            if score > best_score:
+                best, best_score = worker, score
+        return best, best_score
+
+    def solve(self):
+        """
+        Place every unassigned job.
+
+        Returns:
+            (scheduled, conflicts): [(job, worker, score)] in placement
+            order, and the jobs no worker could take
+        """
+        state = self.state
+        workers = {w.id: w for w in state.workers}
+        pending = sorted((j for j in state.jobs if not j.assigned), key=self.job_priority, reverse=True)
+        scores, unplaced = {}, []
+
+        for job in pending:
+            worker, score = self.best_worker(job)
+            if worker is None:
+                unplaced.append(job)
+                continue
+            state.place(job, worker.id)
+            scores[job.id] = score
+
+        conflicts = []
+        for job in unplaced:
+            if self._repair(job, workers, scores):
+                continue
+            conflicts.append(job)
+
+        scheduled = [(j, workers[state.placed[j.id]], scores[j.id]) for j in pending if j.id in state.placed]
+        return scheduled, conflicts
+
+    def _repair(self, job, workers, scores):
+        """Make room for job by moving one scheduled job to another worker."""
+        state = self.state
+        # Earlier repairs may have left room
+        worker, score = self.best_worker(job)
+        if worker is not None:
+            state.place(job, worker.id)
+            scores[job.id] = score
+            return True
+
+        # A moved job needs a colleague with at least its hours free
+        most_free = max((state.free(job.day_id, w.id) for w in state.workers), default=0)
+        best = None
+        for worker in state.workers:
+            shortfall = job.hours - state.free(job.day_id, worker.id)
+            for other in state.booked[(job.day_id, worker.id)]:
+                # Only jobs this run placed may move, and only if that frees enough
+                if other.id not in scores or not shortfall <= other.hours <= most_free:
+                    continue
+                target, target_score = self.best_worker(other, exclude=worker.id)
+                if target is None:
+                    continue
+                gain = target_score - scores[other.id] + self.score(job, worker)
+                if best is None or gain > best[0]:
+                    best = (gain, worker, other, target, target_score)
+        if best is None:
+            return False
+
+        _, worker, other, target, target_score = best
+        state.unplace(other)
+        state.place(other, target.id)
+        scores[other.id] = target_score
+        scores[job.id] = self.score(job, worker)
+        state.place(job, worker.id)
+        return True
@@ -0,0 +1,211 @@
+"""
+Workforce cohort analytics.
+
+Per-worker time ratios (actual / estimated hours on completed jobs),
+completion rates and pause frequencies are computed for the whole
+workforce with one grouped query over the period's assignments. Anomalies
+are then flagged on NumPy arrays: a worker is flagged when a metric
+crosses its fixed threshold or sits Z_THRESHOLD standard deviations from
+the team on the adverse side, so scanning the organisation costs the same
+single query however many workers there are.
+"""
+
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import Float, and_, case, cast, func, or_
+
+from app.extensions import db
+from app.models import User
+from app.models.work_plan_assignment import WorkPlanAssignment
+from app.models.work_plan_day import WorkPlanDay
+from app.models.work_plan_job import WorkPlanJob
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+
+logger = logging.getLogger(__name__)
+
+ANALYZED_ROLES = ('specialist', 'engineer', 'inspector')
+PERIOD_DAYS = {'daily': 1, 'weekly': 7, 'monthly': 30}
+
+# Workers need this many completed jobs (assignments for completion rate) to be analysed
+MIN_COMPLETED = 3
+MIN_ASSIGNED = 6
+# Pauses longer than this make a job count as significantly paused
+SIGNIFICANT_PAUSE_MINUTES = 30
+Z_THRESHOLD = 2.0
+Z_INVESTIGATE = 3.0
+# Below this many analysed workers the team spread means little; only thresholds apply
+MIN_COHORT = 5
+# Smallest spread scored against, so a tightly bunched team does not turn
+# trivial differences into outliers: 0.1x on time ratios, 5 points on rates
+MIN_SPREAD = {'time_ratio': 0.1, 'completion_rate': 0.05, 'pause_frequency': 0.05}
+
+
+def z_scores(values, min_std=0.0):
+    """
+    Standard scores of values against their own mean and (population)
+    standard deviation, floored at min_std. NaN entries are ignored and
+    stay NaN; a cohort smaller than MIN_COHORT or without spread scores 0.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(x)
+    z = np.where(present, 0.0, np.nan)
+    if present.sum() < MIN_COHORT:
+        return z
+    std = max(x[present].std(), min_std)
+    if std > 0:
+        z[present] = (x[present] - x[present].mean()) / std
+    return z
+
+
+def relative_change(value, baseline, above, below):
+    """'40% longer'-style wording for value against baseline, on whichever side it falls."""
+    change = value / baseline - 1
+    return f'{abs(change) * 100:.0f}% {above if change >= 0 else below}'
+
+
+class WorkforceAnalyticsService:
+    """Cohort metrics and performance anomalies for all workers at once."""
+
+    @staticmethod
+    def cohort_metrics(period_start, user_id=None):
+        """
+        Per-worker metrics over assignments on plan days from period_start,
+        for every active worker in ANALYZED_ROLES (plus user_id, whatever
+        its role).
+
+        Returns:
+            list of dicts: user_id, user_name, assigned, completed,
+            time_ratio (None without timed completed jobs), completion_rate,
+            paused (completed jobs with significant pauses), pause_frequency
+        """
+        T = WorkPlanJobTracking
+        completed = T.status == 'completed'
+        timed = and_(completed, WorkPlanJob.estimated_hours > 0, T.actual_hours > 0)
+        ratio = cast(T.actual_hours, Float) / cast(WorkPlanJob.estimated_hours, Float)
+
+        workers = and_(User.is_active.is_(True), User.role.in_(ANALYZED_ROLES))
+        if user_id:
+            workers = or_(workers, User.id == user_id)
+
+        rows = db.session.query(
+            User.id, User.full_name,
+            func.count(WorkPlanAssignment.id).label('assigned'),
+            func.coalesce(func.sum(case((completed, 1), else_=0)), 0).label('completed'),
+            func.avg(case((timed, ratio))).label('time_ratio'),
+            func.coalesce(func.sum(case(
+                (and_(completed, T.total_paused_minutes > SIGNIFICANT_PAUSE_MINUTES), 1), else_=0
+            )), 0).label('paused'),
+        ).select_from(WorkPlanAssignment).join(
+            User, User.id == WorkPlanAssignment.user_id
+        ).join(
+            WorkPlanJob, WorkPlanJob.id == WorkPlanAssignment.work_plan_job_id
+        ).join(
+            WorkPlanDay, WorkPlanDay.id == WorkPlanJob.work_plan_day_id
+        ).outerjoin(
+            T, T.work_plan_job_id == WorkPlanJob.id
+        ).filter(
+            workers, WorkPlanDay.date >= period_start
+        ).group_by(User.id, User.full_name).order_by(User.id).all()
+
+        return [{
+            'user_id': r.id,
+            'user_name': r.full_name,
+            'assigned': r.assigned,
+            'completed': r.completed,
+            'time_ratio': float(r.time_ratio) if r.time_ratio is not None else None,
+            'completion_rate': r.completed / r.assigned if r.assigned else 0.0,
+            'paused': r.paused,
+            'pause_frequency': r.paused / r.completed if r.completed else 0.0,
+        } for r in rows]
+
+    @staticmethod
+    def detect_anomalies(user_id=None, period='weekly', today=None):
+        """
+        Flag slow or unusually fast completion, low completion rates and
+        frequent pauses across the workforce.
+
+        Each metric is scored against the team's distribution; a worker is
+        flagged when the metric crosses its fixed threshold or lies
+        Z_THRESHOLD deviations from the team on the adverse side. With
+        user_id, the team is still the reference but only that worker's
+        anomalies are returned.
+
+        Returns:
+            list of anomaly dicts (user_id, user_name, anomaly_type,
+            description, deviation, z_score, team_average,
+            investigation_needed)
+        """
+        period_start = (today or date.today()) - timedelta(days=PERIOD_DAYS.get(period, 30))
+        metrics = [m for m in WorkforceAnalyticsService.cohort_metrics(period_start, user_id)
+                   if m['completed'] >= MIN_COMPLETED]
+        if not metrics:
+            return []
+
+        def column(name, eligible=lambda m: True):
+            return np.array([m[name] if m[name] is not None and eligible(m) else np.nan
+                             for m in metrics], dtype=np.float64)
+
+        ratio = column('time_ratio')
+        rate = column('completion_rate', lambda m: m['assigned'] >= MIN_ASSIGNED)
+        pauses = column('pause_frequency')
+        ratio_z = z_scores(ratio, MIN_SPREAD['time_ratio'])
+        rate_z = z_scores(rate, MIN_SPREAD['completion_rate'])
+        pause_z = z_scores(pauses, MIN_SPREAD['pause_frequency'])
+
+        # Boolean masks over the cohort, adverse side only (NaN compares False)
+        slow = (ratio > 1.5) | (ratio_z >= Z_THRESHOLD)
+        fast = (ratio < 0.6) | (ratio_z <= -Z_THRESHOLD)
+        low_rate = (rate < 0.6) | (rate_z <= -Z_THRESHOLD)
+        paused = (pauses > 0.5) | ((pause_z >= Z_THRESHOLD) & (pauses > 0))
+
+        def team_average(values):
+            present = values[~np.isnan(values)]
+            return round(float(present.mean()), 2) if present.size else None
+
+        def against(i, threshold_hit, above, below):
+            # Flagged by the fixed threshold: compare with the estimate;
+            # by z-score alone: compare with the team, which may itself run slow or fast
+            if threshold_hit:
+                return f'{relative_change(ratio[i], 1.0, above, below)} than estimated on average'
+            return f'{relative_change(ratio[i], np.nanmean(ratio), above, below)} than the team average'
+
+        anomalies = []
+
+        def flag(i, anomaly_type, description, value, z, average, investigate):
+            if user_id and metrics[i]['user_id'] != user_id:
+                return
+            anomalies.append({
+                'user_id': metrics[i]['user_id'],
+                'user_name': metrics[i]['user_name'],
+                'anomaly_type': anomaly_type,
+                'description': description,
+                'deviation': round(float(value), 2),
+                'z_score': round(float(z), 2),
+                'team_average': average,
+                'investigation_needed': bool(investigate),
+            })
+
+        ratio_avg, rate_avg, pause_avg = team_average(ratio), team_average(rate), team_average(pauses)
+        for i in np.flatnonzero(slow):
+            flag(i, 'slow_completion',
+                 f"Taking {against(i, ratio[i] > 1.5, 'longer', 'shorter')}",
+                 ratio[i], ratio_z[i], ratio_avg, ratio[i] > 2.0 or ratio_z[i] >= Z_INVESTIGATE)
+        for i in np.flatnonzero(fast):
+            flag(i, 'unusually_fast',
+                 f"Completing jobs {against(i, ratio[i] < 0.6, 'slower', 'faster')}",
+                 ratio[i], ratio_z[i], ratio_avg, True)
+        for i in np.flatnonzero(low_rate):
+            flag(i, 'low_completion_rate',
+                 f'Only {rate[i] * 100:.0f}% of assigned jobs completed',
+                 rate[i], rate_z[i], rate_avg, rate[i] < 0.5 or rate_z[i] <= -Z_INVESTIGATE)
+        for i in np.flatnonzero(paused):
+            m = metrics[i]
+            flag(i, 'frequent_pauses',
+                 f"{m['paused']} of {m['completed']} jobs had significant pauses",
+                 pauses[i], pause_z[i], pause_avg, False)
+
+        logger.info("Performance anomaly scan from %s: %d workers, %d anomalies",
+                    period_start, len(metrics), len(anomalies))
+        return anomalies
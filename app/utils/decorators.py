@@ -4,21 +4,39 @@ Supports multi-role system with Major + Minor roles.
 """
 
 from functools import wraps
-from flask import jsonify, request
+from flask import g, jsonify, request
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request, get_jwt
 from app.exceptions.api_exceptions import UnauthorizedError, ForbiddenError
 from app.extensions import db
 
 
+def _load_current_user():
+    """
+    The authenticated user, loaded once per request.
+
+    jwt_required() and the role decorators below both verify the token and
+    views call get_current_user() again; the first call verifies and loads,
+    later ones reuse the JWT already verified for this request and the same
+    User row (reloaded only if the session was removed meanwhile).
+    """
+    if not g.get('_jwt_extended_jwt'):
+        verify_jwt_in_request()
+    user_id = int(get_jwt_identity())
+    cached = g.get('_current_user')
+    if cached is not None and cached[0] == user_id and (cached[1] is None or cached[1] in db.session):
+        return cached[1]
+    from app.models import User
+    user = db.session.get(User, user_id)
+    g._current_user = (user_id, user)
+    return user
+
+
 def admin_required():
     """Decorator to require admin role."""
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if user.role != 'admin':
@@ -33,10 +51,7 @@ def inspector_required():
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if not user.has_role('inspector'):
@@ -51,10 +66,7 @@ def specialist_required():
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if not user.has_role('specialist'):
@@ -69,10 +81,7 @@ def engineer_required():
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if not user.has_role('engineer'):
@@ -87,10 +96,7 @@ def quality_engineer_required():
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if not user.has_role('quality_engineer'):
@@ -105,10 +111,7 @@ def role_required(*roles):
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if not any(user.has_role(r) for r in roles):
@@ -123,10 +126,7 @@ def technician_or_admin_required():
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            from app.models import User
-            user = db.session.get(User, int(current_user_id))
+            user = _load_current_user()
             if not user:
                 raise UnauthorizedError("User not found")
             if user.role not in ['admin', 'technician']:
@@ -138,11 +138,7 @@ def technician_or_admin_required():
 
 def get_current_user():
     """Helper function to get the current authenticated user."""
-    verify_jwt_in_request()
-    current_user_id = get_jwt_identity()
-    from app.models import User
-    user = db.session.get(User, int(current_user_id))
-    return user
+    return _load_current_user()
 
 
 def get_language(user=None):
@@ -0,0 +1,181 @@
+"""
+Opt-in per-request SQL profiler.
+
+With QUERY_PROFILER enabled every request counts the statements it runs and
+their total time, and keeps the slowest few. Results are returned to the
+caller as response headers
+
+    X-Query-Count: 7
+    X-Query-Time-Ms: 12.4
+    Server-Timing: db;dur=12.4;desc="7 queries"
+
+(browser dev tools show Server-Timing next to the request), logged to
+'app.query_profiler' when a request crosses QUERY_PROFILER_WARN_COUNT
+statements or QUERY_PROFILER_WARN_MS of SQL time, and aggregated per
+endpoint for report(). Statements run outside a request (scheduler jobs,
+background threads) are not counted; QueryProfiler.capture() profiles an
+arbitrary block instead, which is how the tests count statements.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app.extensions import db
+
+logger = logging.getLogger('app.query_profiler')
+
+# Statements kept per request (slowest first) and length they are cut to
+SLOWEST_KEPT = 3
+STATEMENT_CHARS = 300
+
+
+class RequestProfile:
+    """SQL statements issued while handling one request."""
+
+    def __init__(self, keep_statements=False):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slowest = []
+        self.statements = [] if keep_statements else None
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if self.statements is not None:
+            self.statements.append(statement)
+        if len(self.slowest) < SLOWEST_KEPT or elapsed_ms > self.slowest[-1][0]:
+            self.slowest.append((elapsed_ms, ' '.join(statement.split())[:STATEMENT_CHARS]))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_KEPT:]
+
+
+class QueryProfiler:
+    """Hooks the engine and request cycle; keeps per-endpoint totals."""
+
+    def __init__(self, app):
+        self.warn_count = app.config.get('QUERY_PROFILER_WARN_COUNT', 50)
+        self.warn_ms = app.config.get('QUERY_PROFILER_WARN_MS', 500)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+        with app.app_context():
+            event.listen(db.engine, 'before_cursor_execute', self._before_execute)
+            event.listen(db.engine, 'after_cursor_execute', self._after_execute)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.extensions['query_profiler'] = self
+
+    @staticmethod
+    @contextmanager
+    def capture():
+        """
+        Profile every statement run inside the block, in or outside a request.
+
+            with QueryProfiler.capture() as profile:
+                ...
+            profile.count, profile.statements
+
+        Needs an app context; the profiler does not have to be installed.
+        """
+        profile = RequestProfile(keep_statements=True)
+        engine = db.engine
+
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_capture_start', []).append(time.perf_counter())
+
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get('query_capture_start')
+            if starts:
+                profile.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+        event.listen(engine, 'before_cursor_execute', _before)
+        event.listen(engine, 'after_cursor_execute', _after)
+        try:
+            yield profile
+        finally:
+            event.remove(engine, 'before_cursor_execute', _before)
+            event.remove(engine, 'after_cursor_execute', _after)
+
+    @staticmethod
+    def current():
+        """The profile of the request being handled, if any."""
+        if not has_request_context():
+            return None
+        return g.get('_query_profile')
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.current() is not None:
+            conn.info.setdefault('query_profiler_start', []).append(time.perf_counter())
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = self.current()
+        starts = conn.info.get('query_profiler_start')
+        if profile is None or not starts:
+            return
+        profile.record(statement, (time.perf_counter() - starts.pop()) * 1000)
+
+    def _start(self):
+        g._query_profile = RequestProfile()
+        g._query_profile_started = time.perf_counter()
+
+    def _finish(self, response):
+        profile = g.pop('_query_profile', None)
+        if profile is None:
+            return response
+        request_ms = (time.perf_counter() - g.pop('_query_profile_started')) * 1000
+        db_ms = round(profile.total_ms, 1)
+
+        response.headers['X-Query-Count'] = str(profile.count)
+        response.headers['X-Query-Time-Ms'] = str(db_ms)
+        response.headers.add('Server-Timing', f'db;dur={db_ms};desc="{profile.count} queries"')
+
+        endpoint = request.endpoint or request.path
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {
+                'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'request_ms': 0.0,
+            })
+            stats['requests'] += 1
+            stats['queries'] += profile.count
+            stats['max_queries'] = max(stats['max_queries'], profile.count)
+            stats['db_ms'] += profile.total_ms
+            stats['request_ms'] += request_ms
+
+        if profile.count >= self.warn_count or profile.total_ms >= self.warn_ms:
+            logger.warning(
+                '%s %s: %d queries, %.1f ms SQL, %.1f ms total; slowest: %s',
+                request.method, request.path, profile.count, profile.total_ms, request_ms,
+                ' | '.join(f'{ms:.1f} ms {sql}' for ms, sql in profile.slowest),
+            )
+        return response
+
+    def report(self):
+        """Per-endpoint totals since start-up, most queries per request first."""
+        with self._lock:
+            rows = [
+                {
+                    'endpoint': endpoint,
+                    'requests': s['requests'],
+                    'avg_queries': round(s['queries'] / s['requests'], 1),
+                    'max_queries': s['max_queries'],
+                    'avg_db_ms': round(s['db_ms'] / s['requests'], 1),
+                    'avg_request_ms': round(s['request_ms'] / s['requests'], 1),
+                }
+                for endpoint, s in self._endpoints.items()
+            ]
+        return sorted(rows, key=lambda r: (r['avg_queries'], r['avg_db_ms']), reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+
+def init_query_profiler(app):
+    """Install the profiler when QUERY_PROFILER is on; returns it or None."""
+    if not app.config.get('QUERY_PROFILER'):
+        return None
+    return QueryProfiler(app)
@@ -0,0 +1,293 @@
+"""
+Seeded synthetic dataset for profiling and benchmarks.
+
+generate() fills the database with a realistic mix of users, equipment,
+checklists, inspections with answers, defects, specialist and engineer
+jobs, readings and notifications. Rows are written with bulk inserts and
+explicit ids (after the current maximum of each table), so a run is fast,
+does not fire model events, and the same seed always produces the same
+data. Everything it creates is tagged 'SYN' (role ids, serials, emails
+@synthetic.local) so it is easy to tell apart from real data.
+
+    flask generate-synthetic-data --scale 1 --seed 42
+"""
+
+import logging
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, text
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import (
+    User, Equipment, ChecklistTemplate, ChecklistItem, Inspection, InspectionAnswer,
+    Defect, SpecialistJob, EngineerJob, EquipmentReading, Notification,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rows per unit of scale
+SIZES = {
+    'users': 200,
+    'equipment': 2000,
+    'inspections': 5000,
+    'defects': 1500,
+    'specialist_jobs': 1000,
+    'engineer_jobs': 200,
+    'readings': 10000,
+    'notifications': 5000,
+}
+ANSWERS_PER_INSPECTION = 4
+ITEMS_PER_TEMPLATE = 12
+PASSWORD = 'synthetic123'
+
+USER_ROLES = (('inspector', 0.4), ('specialist', 0.3), ('engineer', 0.15),
+              ('quality_engineer', 0.1), ('admin', 0.05))
+EQUIPMENT_KINDS = ('Pump', 'Crane', 'Reach Stacker', 'Generator', 'Compressor',
+                   'Conveyor', 'Forklift', 'Transformer')
+
+
+def _pick(rng, weighted):
+    return rng.choices([v for v, _ in weighted], [w for _, w in weighted])[0]
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _insert(model, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(model), rows[start:start + batch_size])
+    if rows and db.engine.dialect.name == 'postgresql':
+        # Explicit ids do not advance the serial sequence
+        table = model.__tablename__
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"
+        ))
+
+
+def generate(scale=1.0, seed=42, batch_size=1000):
+    """
+    Insert a synthetic dataset and commit it.
+
+    Args:
+        scale: Multiplier on SIZES (1.0 = 2000 equipment, 5000 inspections)
+        seed: Random seed; same seed and scale give the same data
+        batch_size: Rows per INSERT statement
+
+    Returns:
+        dict of table name -> rows inserted
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    n = {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+    counts = {}
+
+    # Users (one password hash for all; hashing is the slow part)
+    password_hash = generate_password_hash(PASSWORD)
+    first = _next_id(User)
+    users = []
+    for i in range(n['users']):
+        uid = first + i
+        role = 'admin' if i == 0 else _pick(rng, USER_ROLES)
+        users.append({
+            'id': uid, 'email': f'syn{uid}@synthetic.local', 'password_hash': password_hash,
+            'full_name': f'Synthetic {role.replace("_", " ").title()} {uid}', 'role': role,
+            'role_id': f'SYN{uid:05d}', 'shift': rng.choice(('day', 'night')),
+            'specialization': rng.choice(('mechanical', 'electrical')) if role in ('inspector', 'specialist') else None,
+            'language': rng.choice(('en', 'en', 'ar')), 'is_active': rng.random() > 0.03,
+            'annual_leave_balance': 24, 'must_change_password': False,
+            'created_at': now - timedelta(days=rng.randint(30, 900)), 'updated_at': now,
+        })
+    _insert(User, users, batch_size)
+    by_role = {}
+    for u in users:
+        by_role.setdefault(u['role'], []).append(u['id'])
+    inspectors = by_role.get('inspector') or [users[0]['id']]
+    specialists = by_role.get('specialist') or [users[0]['id']]
+    engineers = by_role.get('engineer') or [users[0]['id']]
+    admins = by_role['admin']
+    counts['users'] = len(users)
+
+    # Checklist templates, one per equipment kind
+    first_template, first_item = _next_id(ChecklistTemplate), _next_id(ChecklistItem)
+    templates, items, items_by_template = [], [], {}
+    for k, kind in enumerate(EQUIPMENT_KINDS):
+        tid = first_template + k
+        templates.append({
+            'id': tid, 'name': f'SYN {kind} routine', 'equipment_type': kind.upper().replace(' ', '_'),
+            'version': f'syn-{seed}-{tid}', 'is_active': True, 'created_at': now, 'updated_at': now,
+        })
+        for q in range(ITEMS_PER_TEMPLATE):
+            iid = first_item + len(items)
+            answer_type = 'numeric' if q == 0 else rng.choice(('pass_fail', 'pass_fail', 'yes_no', 'text'))
+            items.append({
+                'id': iid, 'template_id': tid, 'item_code': f'SYN-{k}-{q}',
+                'question_text': 'Running hours meter reading' if q == 0 else f'{kind} check {q}',
+                'answer_type': answer_type, 'category': rng.choice(('mechanical', 'electrical')),
+                'is_required': True, 'order_index': q + 1, 'critical_failure': rng.random() < 0.1,
+            })
+            items_by_template.setdefault(tid, []).append((iid, answer_type))
+    _insert(ChecklistTemplate, templates, batch_size)
+    _insert(ChecklistItem, items, batch_size)
+    counts['checklist_templates'], counts['checklist_items'] = len(templates), len(items)
+
+    # Equipment
+    first = _next_id(Equipment)
+    equipment = []
+    for i in range(n['equipment']):
+        eid = first + i
+        k = rng.randrange(len(EQUIPMENT_KINDS))
+        equipment.append({
+            'id': eid, 'name': f'{EQUIPMENT_KINDS[k]} {eid}',
+            'equipment_type': templates[k]['equipment_type'], 'serial_number': f'SYN-EQ-{eid:06d}',
+            'location': f'Area {rng.choice("ABCDEF")}', 'berth': rng.choice(('east', 'west')),
+            'status': _pick(rng, (('active', 0.8), ('under_maintenance', 0.08), ('stopped', 0.06),
+                                  ('out_of_service', 0.04), ('paused', 0.02))),
+            'is_scrapped': rng.random() < 0.01,
+            'assigned_technician_id': rng.choice(engineers + inspectors),
+            'criticality_level': rng.choice(('low', 'medium', 'high', 'critical')),
+            'created_at': now - timedelta(days=rng.randint(60, 1500)), 'updated_at': now,
+        })
+    _insert(Equipment, equipment, batch_size)
+    counts['equipment'] = len(equipment)
+
+    # Inspections with answers
+    first, first_answer = _next_id(Inspection), _next_id(InspectionAnswer)
+    inspections, answers = [], []
+    for i in range(n['inspections']):
+        iid = first + i
+        eq = rng.choice(equipment)
+        tid = first_template + EQUIPMENT_KINDS.index(eq['name'].rsplit(' ', 1)[0])
+        started = now - timedelta(days=rng.uniform(0, 180))
+        status = _pick(rng, (('draft', 0.1), ('submitted', 0.3), ('reviewed', 0.6)))
+        submitted = started + timedelta(minutes=rng.randint(10, 120)) if status != 'draft' else None
+        reviewed = submitted + timedelta(hours=rng.randint(1, 48)) if status == 'reviewed' else None
+        inspections.append({
+            'id': iid, 'inspection_code': f'SYN-INS-{iid:07d}', 'equipment_id': eq['id'],
+            'template_id': tid, 'technician_id': rng.choice(inspectors), 'status': status,
+            'result': rng.choice(('pass', 'pass', 'pass', 'fail')) if submitted else None,
+            'started_at': started, 'submitted_at': submitted, 'reviewed_at': reviewed,
+            'reviewed_by_id': rng.choice(admins) if reviewed else None,
+            'created_at': started, 'updated_at': reviewed or submitted or started,
+        })
+        for item_id, answer_type in rng.sample(items_by_template[tid], ANSWERS_PER_INSPECTION):
+            value = {
+                'numeric': lambda: f'{rng.uniform(100, 20000):.0f}',
+                'pass_fail': lambda: rng.choice(('pass', 'pass', 'pass', 'fail')),
+                'yes_no': lambda: rng.choice(('yes', 'no')),
+                'text': lambda: 'Looks fine',
+            }[answer_type]()
+            answers.append({
+                'id': first_answer + len(answers), 'inspection_id': iid, 'checklist_item_id': item_id,
+                'answer_value': value, 'urgency_level': rng.choice((0, 0, 0, 1, 2, 3)),
+                'answered_at': started + timedelta(minutes=rng.randint(1, 9)),
+            })
+    _insert(Inspection, inspections, batch_size)
+    _insert(InspectionAnswer, answers, batch_size)
+    counts['inspections'], counts['inspection_answers'] = len(inspections), len(answers)
+
+    # Defects raised by failed/submitted inspections
+    sources = [ins for ins in inspections if ins['submitted_at']] or inspections
+    first = _next_id(Defect)
+    defects = []
+    for i in range(n['defects']):
+        ins = rng.choice(sources)
+        created = (ins['submitted_at'] or ins['started_at']) + timedelta(minutes=5)
+        status = _pick(rng, (('open', 0.35), ('in_progress', 0.25), ('resolved', 0.25),
+                             ('closed', 0.1), ('false_alarm', 0.05)))
+        defects.append({
+            'id': first + i, 'inspection_id': ins['id'], 'severity': rng.choice(('low', 'medium', 'high', 'critical')),
+            'priority': rng.choice(('low', 'medium', 'high', 'urgent')),
+            'description': f'Synthetic defect {first + i}', 'status': status,
+            'category': rng.choice(('mechanical', 'electrical')),
+            'due_date': (created + timedelta(days=rng.randint(1, 21))).date(),
+            'resolved_at': created + timedelta(days=rng.randint(1, 20)) if status in ('resolved', 'closed') else None,
+            'occurrence_count': 1, 'report_source': 'inspection', 'created_at': created, 'updated_at': created,
+        })
+    _insert(Defect, defects, batch_size)
+    counts['defects'] = len(defects)
+
+    # Specialist jobs on defects
+    first_sj = _next_id(SpecialistJob)
+    first_universal = max(
+        db.session.query(func.max(SpecialistJob.universal_id)).scalar() or 0,
+        db.session.query(func.max(EngineerJob.universal_id)).scalar() or 0,
+    ) + 1
+    jobs = []
+    for i in range(n['specialist_jobs']):
+        defect = rng.choice(defects)
+        status = _pick(rng, (('assigned', 0.2), ('in_progress', 0.2), ('paused', 0.1),
+                             ('completed', 0.45), ('cancelled', 0.05)))
+        assigned = defect['created_at'] + timedelta(hours=rng.randint(1, 24))
+        started = assigned + timedelta(hours=rng.randint(1, 48)) if status != 'assigned' else None
+        planned = round(rng.uniform(1, 8), 1)
+        jobs.append({
+            'id': first_sj + i, 'universal_id': first_universal + i, 'job_id': f'SYN-SPE-{first_sj + i:06d}',
+            'defect_id': defect['id'], 'specialist_id': rng.choice(specialists), 'assigned_by': rng.choice(admins),
+            'assigned_at': assigned, 'category': rng.choice(('major', 'minor')), 'planned_time_hours': planned,
+            'started_at': started, 'status': status,
+            'completed_at': started + timedelta(hours=planned * rng.uniform(0.6, 1.6)) if status == 'completed' else None,
+            'actual_time_hours': round(planned * rng.uniform(0.6, 1.6), 2) if status == 'completed' else None,
+            'paused_at': started + timedelta(hours=1) if status == 'paused' else None,
+            'paused_duration_minutes': 0, 'admin_bonus': 0, 'created_at': assigned, 'updated_at': assigned,
+        })
+    _insert(SpecialistJob, jobs, batch_size)
+    counts['specialist_jobs'] = len(jobs)
+
+    first = _next_id(EngineerJob)
+    first_universal += len(jobs)
+    eng_jobs = []
+    for i in range(n['engineer_jobs']):
+        assigned = now - timedelta(days=rng.uniform(0, 120))
+        status = rng.choice(('assigned', 'in_progress', 'completed', 'completed'))
+        eng_jobs.append({
+            'id': first + i, 'universal_id': first_universal + i, 'job_id': f'SYN-ENG-{first + i:06d}',
+            'engineer_id': rng.choice(engineers), 'assigned_by': rng.choice(admins), 'assigned_at': assigned,
+            'job_type': rng.choice(('custom_project', 'system_review', 'special_task')),
+            'equipment_id': rng.choice(equipment)['id'], 'title': f'Synthetic engineering task {first + i}',
+            'description': 'Generated for benchmarks', 'status': status,
+            'started_at': assigned + timedelta(hours=2) if status != 'assigned' else None,
+            'completed_at': assigned + timedelta(days=2) if status == 'completed' else None,
+            'paused_duration_minutes': 0, 'admin_bonus': 0, 'created_at': assigned, 'updated_at': assigned,
+        })
+    _insert(EngineerJob, eng_jobs, batch_size)
+    counts['engineer_jobs'] = len(eng_jobs)
+
+    # Running hours readings: increasing per equipment, one per few days
+    first = _next_id(EquipmentReading)
+    readings, hours = [], {}
+    per_equipment = max(1, n['readings'] // len(equipment))
+    for eq in equipment:
+        value = hours.setdefault(eq['id'], rng.uniform(500, 15000))
+        for r in range(per_equipment):
+            value += rng.uniform(10, 60)
+            day = now - timedelta(days=(per_equipment - r) * 3)
+            readings.append({
+                'id': first + len(readings), 'equipment_id': eq['id'], 'reading_type': 'rnr',
+                'reading_value': round(value, 1), 'is_faulty': False, 'reading_date': day.date(),
+                'recorded_at': day, 'recorded_by_id': rng.choice(inspectors), 'edit_count': 0,
+            })
+    _insert(EquipmentReading, readings, batch_size)
+    counts['equipment_readings'] = len(readings)
+
+    first = _next_id(Notification)
+    notifications = []
+    active_users = [u['id'] for u in users if u['is_active']] or [users[0]['id']]
+    for i in range(n['notifications']):
+        created = now - timedelta(hours=rng.uniform(0, 24 * 60))
+        notifications.append({
+            'id': first + i, 'user_id': rng.choice(active_users),
+            'type': rng.choice(('inspection_assigned', 'defect_created', 'job_assigned', 'work_plan_published')),
+            'title': 'Synthetic notification', 'message': f'Synthetic notification {first + i}',
+            'priority': rng.choice(('info', 'info', 'warning', 'urgent')), 'is_read': rng.random() < 0.6,
+            'is_persistent': False, 'requires_acknowledgment': False, 'source_type': 'system',
+            'delivery_status': 'delivered', 'channel': 'in_app', 'created_at': created,
+        })
+    _insert(Notification, notifications, batch_size)
+    counts['notifications'] = len(notifications)
+
+    db.session.commit()
+    logger.info("Synthetic data (scale=%s, seed=%s): %s", scale, seed, counts)
+    return counts
@@ -0,0 +1,90 @@
+"""
+In-process set of revoked JWT identifiers.
+
+Every authenticated request asks whether its token was revoked. Instead of
+querying token_blocklist each time, each process keeps the jti of every
+revoked, not yet expired token in memory:
+
+- the first check loads all unexpired blocklist rows
+- afterwards, at most every refresh_seconds, only rows revoked since the
+  last sync are fetched (with an overlap for commit/clock skew between
+  workers), and entries whose tokens have expired anyway are dropped
+- logout adds its jti locally right away, so the logging-out process never
+  accepts the token again; other processes pick it up on their next sync
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Rows revoked this long before the newest one already seen are re-read on
+# each sync, so late commits and clock differences between workers are caught
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _naive_utc(value):
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class RevocationList:
+    """Thread-safe jti -> expiry map mirrored from TokenBlocklist."""
+
+    def __init__(self):
+        self._expiry = {}
+        self._watermark = None
+        self._next_sync = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti, refresh_seconds=5):
+        """Whether jti is revoked, syncing from the database when due."""
+        if time.monotonic() >= self._next_sync:
+            self.sync(refresh_seconds)
+        return jti in self._expiry
+
+    def add(self, jti, expires_at):
+        """Record a revocation made by this process (after it is committed)."""
+        with self._lock:
+            self._expiry[jti] = _naive_utc(expires_at)
+
+    def sync(self, refresh_seconds=5, force=False):
+        """Fetch revocations newer than the last sync and prune expired ones."""
+        from app.extensions import db
+        from app.models import TokenBlocklist
+
+        with self._lock:
+            # Another thread may have synced while we waited
+            if not force and time.monotonic() < self._next_sync:
+                return
+            now = datetime.utcnow()
+            query = db.session.query(
+                TokenBlocklist.jti, TokenBlocklist.expires_at, TokenBlocklist.revoked_at
+            ).filter(TokenBlocklist.expires_at > now)
+            if self._watermark is not None:
+                query = query.filter(TokenBlocklist.revoked_at >= self._watermark - SYNC_OVERLAP)
+            for jti, expires_at, revoked_at in query:
+                self._expiry[jti] = _naive_utc(expires_at)
+                revoked_at = _naive_utc(revoked_at)
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            if self._watermark is None:
+                self._watermark = now
+
+            # Expired tokens are rejected by their exp claim anyway
+            for jti in [j for j, exp in self._expiry.items() if exp is not None and exp <= now]:
+                del self._expiry[jti]
+            self._next_sync = time.monotonic() + refresh_seconds
+
+    def reset(self):
+        """Forget everything; the next check reloads from the database."""
+        with self._lock:
+            self._expiry.clear()
+            self._watermark = None
+            self._next_sync = 0.0
+
+    def __len__(self):
+        return len(self._expiry)
+
+
+revoked_tokens = RevocationList()
@@ -0,0 +1,87 @@
+"""
+Short-lived in-process result cache for expensive read endpoints.
+
+Dashboards are polled by many viewers at once. Wrapping the aggregate in a
+TTLCache lets concurrent requests for the same key share one computation:
+the first caller computes, the others wait on the key's lock and reuse the
+result until it expires.
+
+Keys often embed the date, so the cache must not keep anything per key
+forever: locks come from a fixed set of stripes picked by key hash, and
+expired entries are swept out as new ones are stored.
+"""
+
+import threading
+import time
+
+# Keys sharing a stripe fill one at a time; plenty for a handful of dashboards
+LOCK_STRIPES = 64
+
+
+class TTLCache:
+    """Thread-safe key -> value cache with per-entry expiry and single-flight fill."""
+
+    def __init__(self, default_ttl: float = 15):
+        self.default_ttl = default_ttl
+        self._entries = {}
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._next_sweep = 0.0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing/expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        self._entries[key] = (value, now + ttl)
+        if now >= self._next_sweep:
+            self._next_sweep = now + max(self.default_ttl, 1)
+            self._sweep(now)
+
+    def _sweep(self, now):
+        """Drop expired entries (keys that are never read again would otherwise stay)."""
+        for key, (_, expires_at) in list(self._entries.items()):
+            if now >= expires_at:
+                self._entries.pop(key, None)
+
+    def get_or_compute(self, key, compute, ttl: float = None):
+        """
+        Return the cached value for key, computing it at most once per expiry.
+
+        Args:
+            key: hashable cache key (include anything the result depends on)
+            compute: zero-arg callable producing the value
+            ttl: seconds to keep the value; 0 disables caching for this call
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return compute()
+
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._locks[hash(key) % LOCK_STRIPES]:
+            # Another thread may have filled it while we waited
+            value = self.get(key)
+            if value is None:
+                value = compute()
+                self.set(key, value, ttl)
+            return value
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything when key is None."""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
@@ -11,8 +11,15 @@ bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
 backlog = 2048
 
 # Worker processes
-# Render starter (512MB) can only handle 1 worker due to heavy AI service imports.
+# Render starter (512MB) runs 1 worker. AI provider SDKs and the report/data
+# libraries load on first use, so an idle worker stays near its boot RSS
+# (python scripts/benchmark_startup.py).
 # Override via GUNICORN_WORKERS env var if you upgrade to a bigger plan.
+# More than one worker needs SOCKETIO_MESSAGE_QUEUE (e.g. the REDIS_URL) so
+# WebSocket emits reach clients held by other workers. Socket.IO long-polling
+# also needs sticky sessions at the load balancer; websocket transport does not.
+# Scheduled jobs are safe with any worker count: only the process holding the
+# database leader lease runs them (app/services/scheduler_lease_service.py).
 workers = int(os.getenv('GUNICORN_WORKERS', '1'))
 worker_class = 'gthread'
 # More threads compensate for fewer workers — async I/O bound work scales well with threads
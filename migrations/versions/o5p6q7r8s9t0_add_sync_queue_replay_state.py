@@ -0,0 +1,53 @@
+"""add sync_queue replay state — status, idempotency key, claim and outcome columns
+
+Revision ID: o5p6q7r8s9t0
+Revises: n4o5p6q7r8s9
+Create Date: 2026-10-18
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The columns
+are therefore ALSO added idempotently at startup.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'o5p6q7r8s9t0'
+down_revision = 'n4o5p6q7r8s9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    existing = {c['name'] for c in inspector.get_columns('sync_queue')}
+    if 'status' in existing:
+        return
+
+    with op.batch_alter_table('sync_queue', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('idempotency_key', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.String(length=20), nullable=False,
+                                      server_default='pending'))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('claim_token', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('claimed_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('result', sa.JSON(), nullable=True))
+        batch_op.create_index('ix_sync_queue_status', ['status'])
+        batch_op.create_index('ix_sync_queue_claim_token', ['claim_token'])
+        batch_op.create_unique_constraint('uq_sync_queue_user_idempotency_key',
+                                          ['user_id', 'idempotency_key'])
+
+    op.execute("UPDATE sync_queue SET status = 'applied' WHERE synced_at IS NOT NULL")
+
+
+def downgrade():
+    with op.batch_alter_table('sync_queue', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_sync_queue_user_idempotency_key', type_='unique')
+        batch_op.drop_index('ix_sync_queue_claim_token')
+        batch_op.drop_index('ix_sync_queue_status')
+        batch_op.drop_column('result')
+        batch_op.drop_column('claimed_at')
+        batch_op.drop_column('claim_token')
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('status')
+        batch_op.drop_column('idempotency_key')
@@ -0,0 +1,54 @@
+"""add scheduler_leases and scheduler_job_runs — single-leader scheduling and run metrics
+
+Revision ID: p6q7r8s9t0u1
+Revises: o5p6q7r8s9t0
+Create Date: 2026-10-18
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The tables
+are therefore ALSO created idempotently at startup.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'p6q7r8s9t0u1'
+down_revision = 'o5p6q7r8s9t0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    tables = sa.inspect(bind).get_table_names()
+
+    if 'scheduler_leases' not in tables:
+        op.create_table(
+            'scheduler_leases',
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('owner', sa.String(length=100), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=True),
+            sa.Column('acquired_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('name'),
+        )
+
+    if 'scheduler_job_runs' not in tables:
+        op.create_table(
+            'scheduler_job_runs',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('job_id', sa.String(length=100), nullable=False),
+            sa.Column('owner', sa.String(length=100), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('started_at', sa.DateTime(), nullable=False),
+            sa.Column('finished_at', sa.DateTime(), nullable=True),
+            sa.Column('duration_ms', sa.Integer(), nullable=True),
+            sa.Column('row_count', sa.Integer(), nullable=True),
+            sa.Column('error', sa.Text(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_scheduler_job_runs_job_id', 'scheduler_job_runs', ['job_id'])
+        op.create_index('ix_scheduler_job_runs_started_at', 'scheduler_job_runs', ['started_at'])
+
+
+def downgrade():
+    op.drop_table('scheduler_job_runs')
+    op.drop_table('scheduler_leases')
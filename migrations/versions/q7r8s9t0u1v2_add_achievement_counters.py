@@ -0,0 +1,42 @@
+"""add achievement_counters — event-driven progress counters for count achievements
+
+Revision ID: q7r8s9t0u1v2
+Revises: p6q7r8s9t0u1
+Create Date: 2026-10-18
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The table
+is therefore ALSO created idempotently at startup. Rows are seeded lazily and by
+the update_achievement_progress reconciliation job.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'q7r8s9t0u1v2'
+down_revision = 'p6q7r8s9t0u1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'achievement_counters' in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        'achievement_counters',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('inspections', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('jobs', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('defects', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id'),
+    )
+
+
+def downgrade():
+    op.drop_table('achievement_counters')
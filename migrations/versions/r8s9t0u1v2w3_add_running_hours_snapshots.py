@@ -0,0 +1,52 @@
+"""add running_hours_snapshots — per-equipment latest reading and service status
+
+Revision ID: r8s9t0u1v2w3
+Revises: q7r8s9t0u1v2
+Create Date: 2026-10-18
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The table
+is therefore ALSO created idempotently at startup. Rows are backfilled lazily by
+the running hours dashboard and by the refresh_running_hours_snapshots job.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'r8s9t0u1v2w3'
+down_revision = 'q7r8s9t0u1v2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'running_hours_snapshots' in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        'running_hours_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('equipment_id', sa.Integer(), nullable=False),
+        sa.Column('current_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('reading_source', sa.String(length=30), nullable=True),
+        sa.Column('reading_at', sa.DateTime(), nullable=True),
+        sa.Column('last_reading', sa.JSON(), nullable=True),
+        sa.Column('next_service_hours', sa.Float(), nullable=True),
+        sa.Column('hours_until_service', sa.Float(), nullable=True),
+        sa.Column('hours_overdue', sa.Float(), nullable=True),
+        sa.Column('service_status', sa.String(length=20), nullable=False, server_default='ok'),
+        sa.Column('progress_percent', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_running_hours_snapshots_equipment_id', 'running_hours_snapshots',
+                    ['equipment_id'], unique=True)
+    op.create_index('ix_rh_snapshots_status_due', 'running_hours_snapshots',
+                    ['service_status', 'hours_until_service'])
+
+
+def downgrade():
+    op.drop_index('ix_rh_snapshots_status_due', table_name='running_hours_snapshots')
+    op.drop_index('ix_running_hours_snapshots_equipment_id', table_name='running_hours_snapshots')
+    op.drop_table('running_hours_snapshots')
@@ -0,0 +1,49 @@
+"""add report_exports — background bulk inspection report exports
+
+Revision ID: s9t0u1v2w3x4
+Revises: r8s9t0u1v2w3
+Create Date: 2026-10-18
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The table
+is therefore ALSO created idempotently at startup.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 's9t0u1v2w3x4'
+down_revision = 'r8s9t0u1v2w3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'report_exports' in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        'report_exports',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('language', sa.String(length=5), nullable=False, server_default='en'),
+        sa.Column('inspection_ids', sa.JSON(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('file_path', sa.String(length=500), nullable=True),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_report_exports_user_id', 'report_exports', ['user_id'])
+
+
+def downgrade():
+    op.drop_index('ix_report_exports_user_id', table_name='report_exports')
+    op.drop_table('report_exports')
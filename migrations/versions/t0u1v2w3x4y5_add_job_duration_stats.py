@@ -0,0 +1,50 @@
+"""add job_duration_stats — running duration statistics per job scope
+
+Revision ID: t0u1v2w3x4y5
+Revises: s9t0u1v2w3x4
+Create Date: 2026-10-18
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The table
+is therefore ALSO created idempotently at startup. Fill it from existing history
+with `flask rebuild-job-duration-stats`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 't0u1v2w3x4y5'
+down_revision = 's9t0u1v2w3x4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'job_duration_stats' in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        'job_duration_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_type', sa.String(length=20), nullable=False),
+        sa.Column('equipment_type', sa.String(length=50), nullable=False, server_default=''),
+        sa.Column('equipment_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('mean_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('m2', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('min_hours', sa.Float(), nullable=True),
+        sa.Column('max_hours', sa.Float(), nullable=True),
+        sa.Column('estimate_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('estimate_error_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('histogram', sa.JSON(), nullable=False),
+        sa.Column('p10_hours', sa.Float(), nullable=True),
+        sa.Column('p50_hours', sa.Float(), nullable=True),
+        sa.Column('p90_hours', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('job_type', 'equipment_type', 'equipment_id', name='uq_job_duration_stat_scope'),
+    )
+
+
+def downgrade():
+    op.drop_table('job_duration_stats')
@@ -0,0 +1,55 @@
+"""add equipment_risk_snapshots — precomputed inspection risk and coverage
+
+Revision ID: u1v2w3x4y5z6
+Revises: t0u1v2w3x4y5
+Create Date: 2026-10-19
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The table
+is therefore ALSO created idempotently at startup. Rows are created on first read
+and refreshed hourly by the scheduler.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'u1v2w3x4y5z6'
+down_revision = 't0u1v2w3x4y5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'equipment_risk_snapshots' in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        'equipment_risk_snapshots',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('equipment_id', sa.Integer(), nullable=False),
+        sa.Column('last_inspection_at', sa.DateTime(), nullable=True),
+        sa.Column('days_since_inspection', sa.Integer(), nullable=True),
+        sa.Column('defects_90d', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('inspections_90d', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('failed_inspections_90d', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('criticality', sa.String(length=20), nullable=False, server_default='medium'),
+        sa.Column('risk_score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('risk_level', sa.String(length=20), nullable=False, server_default='low'),
+        sa.Column('factors', sa.JSON(), nullable=True),
+        sa.Column('recommended_days', sa.Integer(), nullable=False, server_default='14'),
+        sa.Column('scheduled_this_week', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('coverage_priority', sa.String(length=20), nullable=True),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_equipment_risk_snapshots_equipment_id', 'equipment_risk_snapshots', ['equipment_id'], unique=True)
+    op.create_index('ix_equipment_risk_snapshots_score', 'equipment_risk_snapshots', ['risk_score'])
+    op.create_index('ix_equipment_risk_snapshots_coverage', 'equipment_risk_snapshots', ['coverage_priority'])
+
+
+def downgrade():
+    op.drop_index('ix_equipment_risk_snapshots_coverage', table_name='equipment_risk_snapshots')
+    op.drop_index('ix_equipment_risk_snapshots_score', table_name='equipment_risk_snapshots')
+    op.drop_index('ix_equipment_risk_snapshots_equipment_id', table_name='equipment_risk_snapshots')
+    op.drop_table('equipment_risk_snapshots')
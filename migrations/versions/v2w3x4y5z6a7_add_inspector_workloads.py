@@ -0,0 +1,44 @@
+"""add inspector_workloads — per-inspector daily workload ledger
+
+Revision ID: v2w3x4y5z6a7
+Revises: u1v2w3x4y5z6
+Create Date: 2026-10-19
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The table
+is therefore ALSO created idempotently at startup. The nightly reconcile job fills
+it from recent assignments.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'v2w3x4y5z6a7'
+down_revision = 'u1v2w3x4y5z6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'inspector_workloads' in sa.inspect(bind).get_table_names():
+        return
+
+    op.create_table(
+        'inspector_workloads',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('assignments', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('estimated_hours', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'day', name='uq_inspector_workload_user_day'),
+    )
+    op.create_index('ix_inspector_workloads_day', 'inspector_workloads', ['day'])
+
+
+def downgrade():
+    op.drop_index('ix_inspector_workloads_day', table_name='inspector_workloads')
+    op.drop_table('inspector_workloads')
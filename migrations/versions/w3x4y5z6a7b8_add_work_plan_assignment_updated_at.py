@@ -0,0 +1,33 @@
+"""add work_plan_assignments.updated_at — lets the my-plan ETag see lead changes
+
+Revision ID: w3x4y5z6a7b8
+Revises: v2w3x4y5z6a7
+Create Date: 2026-10-19
+
+NOTE: this repository's migration history has multiple heads, so `flask db upgrade`
+may not reach this revision (start.sh already tolerates that failure). The column
+is therefore ALSO added idempotently at startup.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'w3x4y5z6a7b8'
+down_revision = 'v2w3x4y5z6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {c['name'] for c in sa.inspect(bind).get_columns('work_plan_assignments')}
+    if 'updated_at' in columns:
+        return
+
+    with op.batch_alter_table('work_plan_assignments', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute('UPDATE work_plan_assignments SET updated_at = created_at')
+
+
+def downgrade():
+    with op.batch_alter_table('work_plan_assignments', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,85 @@
+"""Microbenchmark: serialization cost of notification socket emits.
+
+Compares the previous emission path (to_dict() + one emit per room, every
+emit encoding its own packet) with the current one (compact payload built
+once, one emit per room set, bursts coalesced per room). Packets are encoded
+the way python-socketio does for each emit call; nothing is sent.
+
+Usage:
+    python scripts/bench_notification_emit.py              # 300 recipients
+    python scripts/bench_notification_emit.py --recipients 1000 --rounds 20
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from socketio import packet  # noqa: E402
+
+from app.api.notifications_ws import emit_bulk_notification  # noqa: E402
+from app.models.notification import Notification  # noqa: E402
+
+
+class EncodingSocketIO:
+    """Encodes every emitted packet once, as the Socket.IO server does."""
+
+    def __init__(self):
+        self.events = 0
+        self.bytes = 0
+
+    def emit(self, event, payload, to=None, room=None, namespace='/'):
+        encoded = packet.Packet(packet.EVENT, namespace=namespace, data=[event, payload]).encode()
+        self.events += 1
+        self.bytes += len(encoded)
+
+
+def legacy_emit(socketio, notification):
+    """The per-room emit loop this change replaced."""
+    data = notification.to_dict()
+    payload = {'notification': data, 'timestamp': datetime.utcnow().isoformat()}
+    for room in (f"user_{notification.user_id}", f"type_{notification.type}",
+                 f"priority_{notification.priority}"):
+        socketio.emit('notification', payload, room=room, namespace='/notifications')
+
+
+def make_notifications(count):
+    now = datetime.utcnow()
+    return [
+        Notification(id=i, user_id=1000 + i, type='work_plan_published', priority='info',
+                     title='Work plan published', message='Your plan for next week is ready',
+                     is_persistent=False, is_read=False, created_at=now,
+                     requires_acknowledgment=False, delivery_status='sent', channel='in_app')
+        for i in range(count)
+    ]
+
+
+def run(label, emit_all, notifications, rounds):
+    sio = EncodingSocketIO()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        emit_all(sio, notifications)
+    elapsed = time.perf_counter() - start
+    per_round_events = sio.events // rounds
+    per_round_bytes = sio.bytes // rounds
+    print(f"{label:8} {elapsed / rounds * 1000:8.2f} ms/fan-out  "
+          f"{per_round_events:5} events  {per_round_bytes / 1024:8.1f} KiB  "
+          f"{elapsed / sio.events * 1e6:7.1f} us/event")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recipients', type=int, default=300)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    notifications = make_notifications(args.recipients)
+    print(f"{args.recipients} recipients, {args.rounds} rounds")
+    run('legacy', lambda sio, ns: [legacy_emit(sio, n) for n in ns], notifications, args.rounds)
+    run('batched', emit_bulk_notification, notifications, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark: app factory startup time, memory, and heavy modules loaded.
+
+Builds the app in a fresh interpreter (so earlier imports cannot hide the
+cost) and reports the wall time of importing app + create_app(), the peak
+RSS of that process, and which heavy optional modules were imported along
+the way. AI provider SDKs, pandas, NumPy and the PDF/Excel libraries should
+only load when a request first needs them.
+
+Usage:
+    python scripts/benchmark_startup.py                  # testing config, 3 runs
+    python scripts/benchmark_startup.py --config development --runs 5
+    python scripts/benchmark_startup.py --json           # one JSON line per run
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must not be imported just by building the app
+HEAVY_MODULES = (
+    'openai', 'anthropic', 'google.generativeai', 'groq',
+    'pandas', 'numpy', 'fpdf', 'openpyxl', 'PIL',
+)
+
+_CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+started = time.perf_counter()
+from app import create_app
+create_app({config!r})
+elapsed = time.perf_counter() - started
+# ru_maxrss survives exec (it would report pytest's peak when run from the
+# test suite); VmHWM belongs to this process image only
+peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+try:
+    with open('/proc/self/status') as status:
+        peak_kb = next(int(line.split()[1]) for line in status if line.startswith('VmHWM:'))
+except (OSError, StopIteration):
+    pass
+print(json.dumps({{
+    'seconds': round(elapsed, 3),
+    'max_rss_mb': round(peak_kb / 1024, 1),
+    'heavy_modules': sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def measure(config='testing'):
+    """Boot the app once in a child interpreter and return its measurements."""
+    code = _CHILD.format(root=ROOT, config=config, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+                         text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--config', default='testing')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    results = [measure(args.config) for _ in range(args.runs)]
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+        return
+
+    seconds = sorted(r['seconds'] for r in results)
+    print(f"create_app({args.config!r}) over {args.runs} fresh interpreters")
+    print(f"  boot time  min {seconds[0]:.2f}s  median {seconds[len(seconds) // 2]:.2f}s")
+    print(f"  peak RSS   {max(r['max_rss_mb'] for r in results):.1f} MB")
+    heavy = sorted({m for r in results for m in r['heavy_modules']})
+    print(f"  heavy modules loaded: {', '.join(heavy) or 'none'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -28,6 +28,92 @@ with app.app_context():
         print('sap_sync_files table ensured')
     except Exception as e:
         print(f'sap_sync_files ensure failed: {e}')
+
+    # Scheduler leader/job leases and run history (see migration p6q7r8s9t0u1)
+    try:
+        from app.models import SchedulerLease, SchedulerJobRun
+        SchedulerLease.__table__.create(db.engine, checkfirst=True)
+        SchedulerJobRun.__table__.create(db.engine, checkfirst=True)
+        print('scheduler lease tables ensured')
+    except Exception as e:
+        print(f'scheduler lease tables ensure failed: {e}')
+
+    # Achievement progress counters (see migration q7r8s9t0u1v2)
+    try:
+        from app.models import AchievementCounter
+        AchievementCounter.__table__.create(db.engine, checkfirst=True)
+        print('achievement_counters table ensured')
+    except Exception as e:
+        print(f'achievement_counters ensure failed: {e}')
+
+    # Running hours snapshots (see migration r8s9t0u1v2w3)
+    try:
+        from app.models import RunningHoursSnapshot
+        RunningHoursSnapshot.__table__.create(db.engine, checkfirst=True)
+        print('running_hours_snapshots table ensured')
+    except Exception as e:
+        print(f'running_hours_snapshots ensure failed: {e}')
+
+    # Bulk report exports (see migration s9t0u1v2w3x4)
+    try:
+        from app.models import ReportExport
+        ReportExport.__table__.create(db.engine, checkfirst=True)
+        print('report_exports table ensured')
+    except Exception as e:
+        print(f'report_exports ensure failed: {e}')
+
+    # Job duration statistics (see migration t0u1v2w3x4y5)
+    try:
+        from app.models import JobDurationStat
+        JobDurationStat.__table__.create(db.engine, checkfirst=True)
+        print('job_duration_stats table ensured')
+    except Exception as e:
+        print(f'job_duration_stats ensure failed: {e}')
+
+    try:
+        from app.models import EquipmentRiskSnapshot
+        EquipmentRiskSnapshot.__table__.create(db.engine, checkfirst=True)
+        print('equipment_risk_snapshots table ensured')
+    except Exception as e:
+        print(f'equipment_risk_snapshots ensure failed: {e}')
+
+    try:
+        from app.models import InspectorWorkload
+        InspectorWorkload.__table__.create(db.engine, checkfirst=True)
+        print('inspector_workloads table ensured')
+    except Exception as e:
+        print(f'inspector_workloads ensure failed: {e}')
+
+    # Offline sync replay state (see migration o5p6q7r8s9t0)
+    sync_queue_cols = [
+        ('idempotency_key', 'VARCHAR(100)'),
+        ('status', \"VARCHAR(20) DEFAULT 'pending' NOT NULL\"),
+        ('attempts', 'INTEGER DEFAULT 0 NOT NULL'),
+        ('claim_token', 'VARCHAR(32)'),
+        ('claimed_at', 'TIMESTAMP'),
+        ('result', 'JSON'),
+    ]
+    for col_name, col_type in sync_queue_cols:
+        try:
+            db.session.execute(text(f'ALTER TABLE sync_queue ADD COLUMN {col_name} {col_type}'))
+            db.session.commit()
+            print(f'Added {col_name} column to sync_queue')
+            if col_name == 'status':
+                db.session.execute(text(\"UPDATE sync_queue SET status = 'applied' WHERE synced_at IS NOT NULL\"))
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            print(f'sync_queue.{col_name} already exists')
+    for ddl in [
+        'CREATE INDEX IF NOT EXISTS ix_sync_queue_status ON sync_queue (status)',
+        'CREATE INDEX IF NOT EXISTS ix_sync_queue_claim_token ON sync_queue (claim_token)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_sync_queue_user_idempotency_key ON sync_queue (user_id, idempotency_key)',
+    ]:
+        try:
+            db.session.execute(text(ddl))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
     cols = [
         ('description', 'TEXT'),
         ('function', 'VARCHAR(200)'),
@@ -104,6 +190,16 @@ with app.app_context():
         db.session.rollback()
         print('elec_penalty_applied already exists')
 
+    # my-plan ETag input (see migration w3x4y5z6a7b8)
+    try:
+        db.session.execute(text('ALTER TABLE work_plan_assignments ADD COLUMN updated_at TIMESTAMP'))
+        db.session.execute(text('UPDATE work_plan_assignments SET updated_at = created_at'))
+        db.session.commit()
+        print('Added work_plan_assignments.updated_at column')
+    except Exception:
+        db.session.rollback()
+        print('work_plan_assignments.updated_at already exists')
+
     # Create roster_entries table
     try:
         db.session.execute(text('''
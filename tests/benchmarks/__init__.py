@@ -0,0 +1 @@
+# Query-count and latency budgets for key endpoints on a synthetic dataset.
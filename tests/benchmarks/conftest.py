@@ -0,0 +1,59 @@
+"""
+Fixtures for the endpoint benchmark suite.
+
+The suite runs against its own app (in-memory SQLite, query profiler on)
+filled once per session with the seeded synthetic dataset, instead of the
+empty per-test database the rest of the suite uses.
+
+    BENCH_SCALE   dataset scale (default 0.1 = 200 equipment, 500 inspections)
+    BENCH_SEED    dataset seed (default 42)
+"""
+
+import os
+
+import pytest
+from app import create_app
+from app.extensions import db as _db
+from app.models import User
+from app.utils.query_profiler import QueryProfiler
+from app.utils.synthetic_data import generate, PASSWORD
+
+BENCH_SCALE = float(os.environ.get('BENCH_SCALE', '0.1'))
+BENCH_SEED = int(os.environ.get('BENCH_SEED', '42'))
+
+
+@pytest.fixture(scope='session')
+def app():
+    """Testing app with the profiler installed and the synthetic dataset loaded."""
+    application = create_app('testing')
+    QueryProfiler(application)
+    with application.app_context():
+        _db.create_all()
+        generate(scale=BENCH_SCALE, seed=BENCH_SEED)
+    yield application
+    with application.app_context():
+        _db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def db_session(app):
+    """
+    The shared dataset; benchmarks only read, so nothing is reset. No app
+    context is held open, so every request starts with an empty session
+    as it does in production.
+    """
+    yield _db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def admin_headers(app):
+    with app.app_context():
+        admin = User.query.filter_by(role='admin', is_active=True).order_by(User.id).first()
+        email = admin.email
+    resp = app.test_client().post('/api/auth/login', json={'email': email, 'password': PASSWORD})
+    return {'Authorization': f"Bearer {resp.get_json()['access_token']}"}
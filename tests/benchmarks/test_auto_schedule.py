@@ -0,0 +1,41 @@
+"""
+Auto-scheduler solve time on a large in-memory plan: 1,000 jobs over a
+five-day week and 100 workers must be placed within SOLVE_BUDGET_MS (times
+BENCH_LATENCY_FACTOR).
+"""
+
+import random
+import time
+
+from app.services.work_plan_scheduler import PlanState, AutoScheduler, ScheduledJob, Worker
+
+from tests.benchmarks.test_endpoint_budgets import LATENCY_FACTOR
+
+SOLVE_BUDGET_MS = 1000
+
+
+def _plan(jobs=1000, workers=100, days=5, seed=42):
+    rng = random.Random(seed)
+    specs = (None, 'mechanical', 'electrical', 'hvac')
+    types = ('mechanical_pump', 'electrical_panel', 'hvac_unit', 'crane')
+    return PlanState(
+        [
+            ScheduledJob(n, n % days, None, rng.choice((1, 1.5, 2, 3, 4)),
+                         priority=rng.choice(('urgent', 'high', 'normal', 'low')),
+                         berth=rng.choice(('east', 'west', None)), equipment_id=rng.randint(1, 200),
+                         equipment_type=rng.choice(types))
+            for n in range(jobs)
+        ],
+        [Worker(n, f'Worker {n}', rng.choice(specs)) for n in range(workers)],
+    )
+
+
+def test_auto_schedule_solve_time():
+    state = _plan()
+    started = time.perf_counter()
+    scheduled, conflicts = AutoScheduler(state).solve()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    assert len(scheduled) + len(conflicts) == 1000
+    assert all(state.free(day, w.id) >= 0 for day in range(5) for w in state.workers)
+    assert elapsed_ms <= SOLVE_BUDGET_MS * LATENCY_FACTOR, f'{elapsed_ms:.0f} ms (budget {SOLVE_BUDGET_MS} ms)'
@@ -0,0 +1,117 @@
+"""
+Query-count and latency budgets for key endpoints.
+
+Each endpoint is requested once to warm up, then three times; the query
+count (from the X-Query-Count header) must stay within its budget and the
+median latency within its budget times BENCH_LATENCY_FACTOR (default 1;
+raise it on slow machines). Budgets are calibrated on the default dataset
+(BENCH_SCALE=0.1); endpoints with per-row queries, including the
+leaderboard (one pass per user), need more at larger scales.
+
+List endpoints are also requested with 5 and with 20 rows per page: any
+difference in query count is a query per row (N+1). Endpoints that still
+have one are listed in KNOWN_N_PLUS_ONE; the test for them is a strict
+xfail, so fixing one fails the suite until it is moved off the list and
+its budget tightened.
+"""
+
+import logging
+import os
+import statistics
+import time
+
+import pytest
+
+LATENCY_FACTOR = float(os.environ.get('BENCH_LATENCY_FACTOR', '1'))
+
+# url -> (max queries, max median ms)
+BUDGETS = {
+    '/api/auth/me': (1, 100),
+    '/api/users?per_page=20': (4, 300),
+    '/api/notifications?per_page=20': (3, 300),
+    '/api/notifications/unread-count': (5, 200),
+    '/api/equipment?per_page=20': (14, 400),
+    '/api/equipment/dashboard': (1, 300),
+    '/api/equipment/dashboard/kpis': (2, 300),
+    '/api/equipment/running-hours?per_page=20': (3, 300),
+    '/api/equipment/running-hours/summary': (2, 300),
+    '/api/equipment/service-due': (2, 300),
+    '/api/inspections?per_page=20': (36, 600),
+    '/api/defects?per_page=20': (61, 800),
+    '/api/jobs?per_page=20': (65, 800),
+    '/api/engineer-jobs?per_page=20': (49, 800),
+    '/api/reports/dashboard': (8, 400),
+    '/api/reports/admin-dashboard': (6, 400),
+    '/api/overdue/summary': (4, 400),
+    '/api/leaderboards': (81, 800),
+}
+
+# List endpoint -> query count must not depend on page size
+LISTS = (
+    '/api/users',
+    '/api/notifications',
+    '/api/equipment',
+    '/api/equipment/running-hours',
+    '/api/inspections',
+    '/api/defects',
+    '/api/jobs',
+    '/api/engineer-jobs',
+)
+KNOWN_N_PLUS_ONE = {
+    '/api/equipment': 'serializes related rows per equipment',
+    '/api/inspections': 'serializes technician/equipment per inspection',
+    '/api/defects': 'serializes inspection, assessment and jobs per defect',
+    '/api/jobs': 'serializes defect and users per job',
+    '/api/engineer-jobs': 'serializes users and equipment per job',
+}
+
+
+def _get(client, url, headers):
+    started = time.perf_counter()
+    resp = client.get(url, headers=headers)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert resp.status_code == 200, (url, resp.status_code, resp.get_data(as_text=True)[:200])
+    return int(resp.headers['X-Query-Count']), elapsed_ms
+
+
+@pytest.mark.parametrize('url', list(BUDGETS))
+def test_endpoint_budget(client, admin_headers, url):
+    max_queries, max_ms = BUDGETS[url]
+    _get(client, url, admin_headers)
+    runs = [_get(client, url, admin_headers) for _ in range(3)]
+
+    queries = max(q for q, _ in runs)
+    median_ms = statistics.median(ms for _, ms in runs)
+    assert queries <= max_queries, f'{url}: {queries} queries (budget {max_queries})'
+    assert median_ms <= max_ms * LATENCY_FACTOR, f'{url}: {median_ms:.0f} ms (budget {max_ms} ms)'
+
+
+@pytest.mark.parametrize('url', [
+    pytest.param(url, marks=pytest.mark.xfail(reason=KNOWN_N_PLUS_ONE[url], strict=True))
+    if url in KNOWN_N_PLUS_ONE else url
+    for url in LISTS
+])
+def test_list_has_no_per_row_queries(client, admin_headers, url):
+    small, _ = _get(client, f'{url}?per_page=5', admin_headers)
+    large, _ = _get(client, f'{url}?per_page=20', admin_headers)
+    assert large == small, f'{url}: {small} queries for 5 rows, {large} for 20'
+
+
+def test_profiler_headers_report_and_warning(app, client, admin_headers, caplog):
+    profiler = app.extensions['query_profiler']
+    profiler.reset()
+    resp = client.get('/api/defects?per_page=20', headers=admin_headers)
+    assert float(resp.headers['X-Query-Time-Ms']) > 0
+    assert resp.headers['Server-Timing'].startswith('db;dur=')
+
+    row, = profiler.report()
+    assert (row['endpoint'], row['requests'], row['max_queries']) == (
+        'defects.list_defects', 1, int(resp.headers['X-Query-Count']))
+
+    profiler.warn_count = 10
+    try:
+        with caplog.at_level(logging.WARNING, logger='app.query_profiler'):
+            client.get('/api/defects?per_page=20', headers=admin_headers)
+    finally:
+        profiler.warn_count = app.config['QUERY_PROFILER_WARN_COUNT']
+    assert 'GET /api/defects' in caplog.text and 'slowest:' in caplog.text
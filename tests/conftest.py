@@ -6,6 +6,7 @@ import pytest
 from app import create_app
 from app.extensions import db as _db
 from app.models import User, Equipment
+from app.utils.query_profiler import QueryProfiler
 
 
 @pytest.fixture(scope='session')
@@ -29,6 +30,24 @@ def db_session(app):
         _db.drop_all()
 
 
+@pytest.fixture
+def count_queries(db_session):
+    """
+    Run fn under QueryProfiler.capture() and count the statements it issues.
+
+    count_queries(fn) returns (count, fn's result); pass a list as
+    statements to collect the statement text as well.
+    """
+    def count(fn, statements=None):
+        with QueryProfiler.capture() as profile:
+            result = fn()
+        if statements is not None:
+            statements.extend(profile.statements)
+        return profile.count, result
+
+    return count
+
+
 @pytest.fixture
 def client(app):
     """Flask test client."""
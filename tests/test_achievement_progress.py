@@ -0,0 +1,151 @@
+"""
+Tests for event-driven achievement progress.
+
+Events bump per-user AchievementCounter rows and unlocking compares the
+counter with the target; the scheduled reconciliation repairs drift.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from tests.conftest import make_equipment
+from app.models import (
+    Achievement, AchievementCounter, UserAchievement, UserStreak, Inspection, ChecklistTemplate, Notification,
+)
+from app.services.achievement_progress_service import AchievementProgressService
+from app.services.gamification_service import GamificationService
+
+
+def _inspections(db_session, user, count, status='submitted'):
+    eq = make_equipment(db_session, f'Achv Pump {Inspection.query.count()}', f'ACH-{Inspection.query.count()}')
+    template = ChecklistTemplate(name='Achv', equipment_type='centrifugal_pump',
+                                 version=f'1.{ChecklistTemplate.query.count()}')
+    db_session.session.add(template)
+    db_session.session.flush()
+    db_session.session.add_all([
+        Inspection(equipment_id=eq.id, template_id=template.id, technician_id=user.id, status=status)
+        for _ in range(count)
+    ])
+    db_session.session.commit()
+
+
+def _achievement(db_session, code, field, target, points=0, criteria_type='count'):
+    achievement = Achievement(code=code, name=code.replace('_', ' ').title(), category='milestone',
+                              criteria_type=criteria_type, criteria_field=field,
+                              criteria_target=target, points_reward=points)
+    db_session.session.add(achievement)
+    db_session.session.commit()
+    return achievement
+
+
+class TestRecord:
+    def test_counter_is_seeded_from_history_then_incremented(self, db_session, mech_inspector):
+        _inspections(db_session, mech_inspector, 2)
+        _inspections(db_session, mech_inspector, 1, status='draft')
+
+        assert AchievementProgressService.get_counts(mech_inspector.id)['inspections'] == 2
+        AchievementProgressService.record(mech_inspector.id, inspections=1, defects=2)
+
+        counter = AchievementCounter.query.filter_by(user_id=mech_inspector.id).one()
+        assert (counter.inspections, counter.jobs, counter.defects) == (3, 0, 2)
+
+    def test_unknown_counter_is_rejected(self, db_session, mech_inspector):
+        with pytest.raises(ValueError, match='points'):
+            AchievementProgressService.record(mech_inspector.id, points=1)
+
+    def test_reaching_target_earns_once(self, db_session, mech_inspector):
+        achievement = _achievement(db_session, 'inspection_3', 'inspections', 3, points=10)
+        _achievement(db_session, 'first_job', 'jobs', 1)
+
+        # Events are recorded after the inspection is committed
+        _inspections(db_session, mech_inspector, 2)
+        assert AchievementProgressService.record(mech_inspector.id, inspections=2) == []
+        _inspections(db_session, mech_inspector, 1)
+        earned = AchievementProgressService.record(mech_inspector.id, inspections=1)
+        assert [a.code for a in earned] == ['inspection_3']
+        assert AchievementProgressService.record(mech_inspector.id, inspections=1) == []
+
+        ua = UserAchievement.query.filter_by(user_id=mech_inspector.id).one()
+        assert (ua.achievement_id, ua.progress) == (achievement.id, 3)
+        assert ua.earned_at is not None
+        assert mech_inspector.total_points == 10
+        assert Notification.query.filter_by(user_id=mech_inspector.id, type='achievement_earned').count() == 1
+
+    def test_unlock_check_does_not_scan_history(self, db_session, mech_inspector, elec_inspector, count_queries):
+        _achievement(db_session, 'inspection_500', 'inspections', 500)
+        _inspections(db_session, mech_inspector, 2)
+        _inspections(db_session, elec_inspector, 25)
+        for user in (mech_inspector, elec_inspector):
+            AchievementProgressService.get_counts(user.id)
+
+        small, large = [], []
+        count_queries(lambda: AchievementProgressService.record(mech_inspector.id, inspections=1), small)
+        count_queries(lambda: AchievementProgressService.record(elec_inspector.id, inspections=1), large)
+        selects = [[s for s in run if s.lstrip().upper().startswith('SELECT')] for run in (small, large)]
+        assert len(selects[0]) == len(selects[1])
+
+
+    def test_extending_a_streak_checks_streak_achievements(self, db_session, mech_inspector):
+        _achievement(db_session, 'streak_3', None, 3, criteria_type='streak')
+
+        start = date(2026, 3, 2)
+        for offset in (0, 1, 1):
+            assert AchievementProgressService.record_activity(mech_inspector.id, start + timedelta(days=offset)) == []
+        earned = AchievementProgressService.record_activity(mech_inspector.id, start + timedelta(days=2))
+        assert [a.code for a in earned] == ['streak_3']
+
+        streak = UserStreak.query.filter_by(user_id=mech_inspector.id).one()
+        assert (streak.current_streak, streak.total_active_days) == (3, 3)
+
+    def test_events_count_as_daily_activity(self, db_session, mech_inspector):
+        _achievement(db_session, 'streak_1', None, 1, criteria_type='streak')
+        _inspections(db_session, mech_inspector, 2)
+
+        earned = AchievementProgressService.record(mech_inspector.id, inspections=1)
+        assert [a.code for a in earned] == ['streak_1']
+        AchievementProgressService.record(mech_inspector.id, inspections=1)
+
+        streak = UserStreak.query.filter_by(user_id=mech_inspector.id).one()
+        assert (streak.current_streak, streak.last_activity_date) == (1, date.today())
+
+
+class TestReconcile:
+    def test_repairs_drift_and_creates_missing_counters(self, db_session, mech_inspector, elec_inspector):
+        _achievement(db_session, 'inspection_5', 'inspections', 5)
+        _inspections(db_session, mech_inspector, 5)
+        _inspections(db_session, elec_inspector, 1)
+        db_session.session.add(AchievementCounter(user_id=mech_inspector.id, inspections=1))
+        db_session.session.commit()
+
+        assert GamificationService().update_achievement_progress() == 2
+        assert AchievementProgressService.reconcile() == 0, 'nothing left to repair'
+
+        db_session.session.expire_all()
+        counters = {c.user_id: c.inspections for c in AchievementCounter.query}
+        assert counters == {mech_inspector.id: 5, elec_inspector.id: 1}
+        assert all(c.reconciled_at is not None for c in AchievementCounter.query)
+        earned = UserAchievement.query.filter_by(user_id=mech_inspector.id).one()
+        assert earned.earned_at is not None
+
+    def test_earns_streak_achievements_already_reached(self, db_session, mech_inspector, elec_inspector):
+        _achievement(db_session, 'streak_5', None, 5, criteria_type='streak')
+        db_session.session.add_all([
+            UserStreak(user_id=mech_inspector.id, current_streak=1, longest_streak=6, total_active_days=9),
+            UserStreak(user_id=elec_inspector.id, current_streak=4, longest_streak=4, total_active_days=4),
+        ])
+        db_session.session.commit()
+
+        assert AchievementProgressService.reconcile() == 1
+        assert AchievementProgressService.reconcile() == 0
+        earned = UserAchievement.query.filter(UserAchievement.earned_at.isnot(None)).all()
+        assert [ua.user_id for ua in earned] == [mech_inspector.id]
+
+    def test_user_achievements_read_counters(self, db_session, mech_inspector):
+        _achievement(db_session, 'inspection_4', 'inspections', 4)
+        db_session.session.add(AchievementCounter(user_id=mech_inspector.id, inspections=2))
+        db_session.session.commit()
+
+        progress = GamificationService().get_user_achievements(mech_inspector.id)
+        assert [(a['code'], a['progress'], a['current']) for a in progress['in_progress']] == [
+            ('inspection_4', 50, 2)]
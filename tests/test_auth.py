@@ -72,3 +72,49 @@ class TestRefresh:
         })
         assert resp.status_code == 200
         assert 'access_token' in resp.get_json()
+
+
+class TestRevocation:
+    def test_logout_revokes_token(self, client, admin_user):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        assert client.post('/api/auth/logout', headers=headers).status_code == 200
+        resp = client.get('/api/auth/me', headers=headers)
+        assert resp.status_code == 401
+        assert resp.get_json()['message'] == 'Token has been revoked'
+
+    def test_revocations_by_other_workers_are_synced(self, client, db_session, admin_user):
+        from datetime import datetime, timedelta
+        from flask_jwt_extended import decode_token
+        from app.models import TokenBlocklist
+        from app.utils.token_revocation import revoked_tokens
+
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        jti = decode_token(headers['Authorization'].split()[1])['jti']
+        db_session.session.add(TokenBlocklist(jti=jti, token_type='access', user_id=admin_user.id,
+                                              expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db_session.session.commit()
+
+        revoked_tokens.sync(force=True)
+        assert client.get('/api/auth/me', headers=headers).status_code == 401
+
+    def test_authenticated_request_loads_only_the_user(self, app, client, db_session, admin_user, count_queries):
+        from app.utils.decorators import admin_required, get_current_user
+
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        client.get('/api/auth/me', headers=headers)
+
+        db_session.session.expunge_all()
+        statements = []
+        count_queries(lambda: client.get('/api/auth/me', headers=headers), statements)
+        assert len(statements) == 1 and 'token_blocklist' not in statements[0]
+
+        @admin_required()
+        def view():
+            return get_current_user()
+
+        db_session.session.expunge_all()
+        with app.test_request_context(headers=headers):
+            users = []
+            queries, _ = count_queries(lambda: users.extend([view(), get_current_user()]))
+            assert queries == 1
+            assert users[0] is users[1]
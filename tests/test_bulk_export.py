@@ -0,0 +1,140 @@
+"""
+Tests for bulk inspection report export.
+
+Reports render on a bounded worker pool; small exports stream a ZIP back,
+large ones run as a background ReportExport with progress and download.
+"""
+
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+
+from tests.conftest import make_equipment, get_auth_header
+from app.models import ChecklistTemplate, Inspection, ReportExport
+from app.services.report_export_service import ReportExportService
+
+
+@pytest.fixture
+def exports_folder(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    return tmp_path
+
+
+def _inspections(db_session, technician, count, status='submitted'):
+    eq = make_equipment(db_session, f'Export Pump {Inspection.query.count()}', f'EXP-{Inspection.query.count()}')
+    template = ChecklistTemplate(name='Export', equipment_type='centrifugal_pump',
+                                 version=f'1.{ChecklistTemplate.query.count()}')
+    db_session.session.add(template)
+    db_session.session.flush()
+    inspections = [
+        Inspection(equipment_id=eq.id, template_id=template.id, technician_id=technician.id, status=status)
+        for _ in range(count)
+    ]
+    db_session.session.add_all(inspections)
+    db_session.session.commit()
+    return [i.id for i in inspections]
+
+
+def _names(zip_bytes):
+    return sorted(zipfile.ZipFile(io.BytesIO(zip_bytes)).namelist())
+
+
+class TestStreamingExport:
+    def test_streams_zip_of_submitted_reports(self, client, db_session, admin_user, mech_inspector):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        ids = _inspections(db_session, mech_inspector, 3) + _inspections(db_session, mech_inspector, 1, 'draft')
+
+        resp = client.post('/api/inspections/bulk-export', json={'inspection_ids': ids + [999]}, headers=headers)
+        assert resp.status_code == 200
+        assert resp.mimetype == 'application/zip'
+        names = _names(resp.data)
+        assert len(names) == 3
+        assert all(name.endswith('.pdf') for name in names)
+
+    def test_in_flight_reports_are_bounded(self, app, db_session):
+        consumed = []
+
+        def payloads():
+            for n in range(10):
+                consumed.append(n)
+                yield f'report_{n}.pdf', {'id': n}
+
+        with app.app_context():
+            yielded = 0
+            for filename, pdf_bytes, error in ReportExportService.render_reports(payloads(), 'en', workers=1):
+                yielded += 1
+                assert len(consumed) - yielded <= 2
+        assert yielded == 10
+
+    def test_exports_share_one_pool_per_process(self, app, db_session):
+        with app.app_context():
+            first = ReportExportService._executor(2)
+            for _ in ReportExportService.render_reports([('a.pdf', {'id': 1})], 'en', workers=2):
+                pass
+            assert ReportExportService._executor(2) is first
+            assert ReportExportService._executor(3) is not first
+
+
+class TestBackgroundExport:
+    def test_progress_and_download(self, client, db_session, admin_user, mech_inspector, exports_folder, monkeypatch):
+        started = []
+        monkeypatch.setattr(ReportExportService, 'start', staticmethod(lambda export: started.append(export.id)))
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        ids = _inspections(db_session, mech_inspector, 4)
+
+        resp = client.post('/api/inspections/bulk-export', json={'inspection_ids': ids + [999], 'background': True},
+                           headers=headers)
+        assert resp.status_code == 202
+        export_id = resp.get_json()['data']['id']
+        assert started == [export_id]
+
+        assert client.get(f'/api/inspections/bulk-export/{export_id}/download', headers=headers).status_code == 409
+
+        ReportExportService.run(export_id)
+        progress = client.get(f'/api/inspections/bulk-export/{export_id}', headers=headers).get_json()['data']
+        assert (progress['status'], progress['completed'], progress['failed'], progress['progress_percent']) == (
+            'completed', 4, 1, 100.0)
+
+        resp = client.get(f'/api/inspections/bulk-export/{export_id}/download', headers=headers)
+        assert resp.status_code == 200
+        assert len(_names(resp.data)) == 4
+        resp.close()
+
+    def test_large_requests_go_to_background(self, app, client, db_session, admin_user, mech_inspector,
+                                             exports_folder, monkeypatch):
+        monkeypatch.setattr(ReportExportService, 'start', staticmethod(lambda export: None))
+        monkeypatch.setitem(app.config, 'REPORT_EXPORT_SYNC_LIMIT', 2)
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        ids = _inspections(db_session, mech_inspector, 3)
+
+        resp = client.post('/api/inspections/bulk-export', json={'inspection_ids': ids}, headers=headers)
+        assert resp.status_code == 202
+        assert ReportExport.query.one().total == 3
+
+    def test_exports_are_private(self, client, db_session, admin_user, engineer, mech_inspector):
+        export = ReportExportService.create(admin_user.id, [1], 'en')
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        assert client.get(f'/api/inspections/bulk-export/{export.id}', headers=headers).status_code == 403
+
+    def test_prune_fails_exports_interrupted_by_a_restart(self, app, db_session, admin_user, exports_folder):
+        now = datetime.utcnow()
+        five_hours_ago, hour_ago = now - timedelta(hours=5), now - timedelta(hours=1)
+        stuck = ReportExport(user_id=admin_user.id, inspection_ids=[1], status='running',
+                             created_at=five_hours_ago, started_at=five_hours_ago)
+        never_started = ReportExport(user_id=admin_user.id, inspection_ids=[1], created_at=five_hours_ago)
+        active = ReportExport(user_id=admin_user.id, inspection_ids=[1], status='running',
+                              created_at=five_hours_ago, started_at=hour_ago)
+        db_session.session.add_all([stuck, never_started, active])
+        db_session.session.commit()
+
+        ReportExportService.prune(keep_days=7)
+        assert [stuck.status, never_started.status, active.status] == ['failed', 'failed', 'running']
+        assert 'interrupted' in stuck.error and stuck.finished_at is not None
+
+        # Once failed they age out like any other finished export
+        stuck.finished_at = now - timedelta(days=8)
+        db_session.session.commit()
+        ReportExportService.prune(keep_days=7)
+        assert db_session.session.get(ReportExport, stuck.id) is None
@@ -0,0 +1,121 @@
+"""
+Tests for the engineer daily review.
+
+Opening the review reads the day's jobs with batched queries and writes
+nothing once the review exists; its counters are kept current by the
+endpoints that change job tracking and pause requests.
+"""
+
+from datetime import date, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.extensions import db
+from app.models import User, WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, WorkPlanMaterial, Material
+from app.models.work_plan_daily_review import WorkPlanDailyReview
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+from app.models.work_plan_job_rating import WorkPlanJobRating
+from app.models.work_plan_pause_request import WorkPlanPauseRequest
+
+TODAY = date.today()
+REVIEW_URL = f'/api/work-plan-tracking/daily-review?date={TODAY.isoformat()}'
+
+
+def _plan_day(db_session, owner):
+    plan = WorkPlan(week_start=TODAY, week_end=TODAY + timedelta(days=6),
+                    status='published', created_by_id=owner.id)
+    db_session.session.add(plan)
+    db_session.session.flush()
+    day = WorkPlanDay(work_plan_id=plan.id, date=TODAY)
+    db_session.session.add(day)
+    db_session.session.flush()
+    return day
+
+
+def _jobs(db_session, day, count, start=0, status='in_progress'):
+    """Jobs with equipment, a worker, tracking, a rating, a pause request and a material."""
+    material = Material.query.first() or Material(code='MAT-1', name='Grease', category='lubricant', unit='kg')
+    db_session.session.add(material)
+    jobs = []
+    for n in range(start, start + count):
+        worker = User(email=f'review{n}@test.com', full_name=f'Review Worker {n}', role='specialist',
+                      role_id=f'REV{n:03d}', shift='day')
+        worker.set_password('test123')
+        eq = make_equipment(db_session, f'Review Pump {n}', f'RP-{n}')
+        job = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', equipment_id=eq.id, estimated_hours=2)
+        db_session.session.add_all([worker, job])
+        db_session.session.flush()
+        db_session.session.add_all([
+            WorkPlanAssignment(work_plan_job_id=job.id, user_id=worker.id),
+            WorkPlanJobTracking(work_plan_job_id=job.id, status=status),
+            WorkPlanJobRating(work_plan_job_id=job.id, user_id=worker.id, time_rating=5),
+            WorkPlanPauseRequest(work_plan_job_id=job.id, requested_by_id=worker.id, reason_category='break'),
+            WorkPlanMaterial(work_plan_job_id=job.id, material_id=material.id, quantity=2),
+        ])
+        jobs.append(job)
+    db_session.session.commit()
+    return jobs
+
+
+class TestDailyReview:
+    def test_open_is_read_only_and_constant_in_queries(self, client, db_session, engineer, count_queries):
+        day = _plan_day(db_session, engineer)
+        _jobs(db_session, day, 2)
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        client.get(REVIEW_URL, headers=headers)
+        db_session.session.expunge_all()
+
+        small = []
+        _, resp = count_queries(lambda: client.get(REVIEW_URL, headers=headers), small)
+        assert resp.status_code == 200
+        _jobs(db_session, WorkPlanDay.query.one(), 6, start=2)
+        db_session.session.expunge_all()
+        large = []
+        _, resp = count_queries(lambda: client.get(REVIEW_URL, headers=headers), large)
+
+        assert len(large) == len(small)
+        assert not [s for s in large if s.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+        data = resp.get_json()
+        assert len(data['jobs']) == 8
+        job = data['jobs'][0]
+        assert job['tracking']['status'] == 'in_progress'
+        assert (len(job['ratings']), len(job['pause_requests']), len(job['materials'])) == (1, 1, 1)
+        assert job['assignments'][0]['user_id']
+        assert (data['review']['total_jobs'], data['review']['total_pause_requests']) == (8, 8)
+        assert data['review']['can_submit'] is False
+
+    def test_counters_follow_tracking_and_pause_changes(self, client, db_session, engineer):
+        day = _plan_day(db_session, engineer)
+        first, second = _jobs(db_session, day, 2)
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        review_id = client.get(REVIEW_URL, headers=headers).get_json()['review']['id']
+
+        resp = client.post(f'/api/work-plan-tracking/jobs/{first.id}/complete', json={}, headers=headers)
+        assert resp.status_code == 200, resp.get_json()
+        for pause in WorkPlanPauseRequest.query.all():
+            client.post(f'/api/work-plan-tracking/pause-requests/{pause.id}/approve', json={}, headers=headers)
+
+        review = db.session.get(WorkPlanDailyReview, review_id)
+        db_session.session.refresh(review)
+        assert (review.total_jobs, review.approved_jobs, review.not_started_jobs) == (2, 1, 0)
+        assert (review.total_pause_requests, review.resolved_pause_requests) == (2, 2)
+
+        # Jobs added after the last update are counted at submit
+        _jobs(db_session, day, 1, start=2)
+        resp = client.post(f'/api/work-plan-tracking/daily-review/{review_id}/submit', headers=headers)
+        assert resp.status_code == 422
+        db_session.session.refresh(review)
+        assert (review.total_jobs, review.status) == (3, 'open')
+
+    def test_review_covers_own_plans_or_all_for_admin(self, client, db_session, engineer, admin_user):
+        _jobs(db_session, _plan_day(db_session, engineer), 2, status='completed')
+        other = User(email='other-eng@test.com', full_name='Other Engineer', role='engineer', role_id='ENG900')
+        other.set_password('test123')
+        db_session.session.add(other)
+        db_session.session.commit()
+
+        admin = get_auth_header(client, 'admin@test.com', 'admin123')
+        review = client.get(REVIEW_URL, headers=admin).get_json()['review']
+        assert (review['total_jobs'], review['approved_jobs']) == (2, 2)
+        resp = client.get(REVIEW_URL,
+                          headers=get_auth_header(client, 'other-eng@test.com', 'test123'))
+        assert (resp.get_json()['review']['total_jobs'], resp.get_json()['jobs']) == (0, [])
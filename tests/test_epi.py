@@ -0,0 +1,182 @@
+"""
+Tests for the set-based EPI engine.
+
+EPI used to be computed one user at a time (one FinalAssessment / QualityReview
+query per assignment or job). It is now computed per role in a few grouped
+queries; single-user reads and the weekly snapshot share that path.
+"""
+
+from datetime import date, datetime, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.models import (
+    User, Inspection, InspectionAssignment, ChecklistTemplate, Defect,
+    SpecialistJob, QualityReview, FinalAssessment,
+)
+from app.models.epi_snapshot import EPISnapshot
+from app.models.inspection_list import InspectionList
+from app.models.star_history import StarHistory
+from app.services.epi_service import EPIService
+
+
+def _make_user(db_session, n, role):
+    user = User(
+        email=f'{role}{n}@test.com',
+        full_name=f'{role.title()} {n}',
+        role=role,
+        role_id=f'{role[:3].upper()}{n:03d}',
+        shift='day',
+    )
+    user.set_password('test123')
+    db_session.session.add(user)
+    db_session.session.flush()
+    return user
+
+
+def _inspector_fixture(db_session, mech, elec):
+    """Two assignments (one completed), one timely inspection, one defect, one missed stop."""
+    eq = make_equipment(db_session, 'EPI Pump', 'EPI-001')
+    template = ChecklistTemplate(name='EPI', equipment_type='centrifugal_pump', version='1.0')
+    db_session.session.add(template)
+    db_session.session.flush()
+
+    il = InspectionList(shift='day', target_date=date.today())
+    db_session.session.add(il)
+    db_session.session.flush()
+
+    done = InspectionAssignment(
+        inspection_list_id=il.id, equipment_id=eq.id, template_id=template.id,
+        mechanical_inspector_id=mech.id, electrical_inspector_id=elec.id,
+        shift='day', status='both_complete',
+    )
+    pending = InspectionAssignment(
+        inspection_list_id=il.id, equipment_id=eq.id, template_id=template.id,
+        mechanical_inspector_id=mech.id, electrical_inspector_id=elec.id,
+        shift='day', status='assigned',
+    )
+    db_session.session.add_all([done, pending])
+    db_session.session.flush()
+
+    now = datetime.utcnow()
+    insp = Inspection(
+        equipment_id=eq.id, template_id=template.id, technician_id=mech.id,
+        status='submitted', started_at=now - timedelta(minutes=17), submitted_at=now,
+    )
+    db_session.session.add(insp)
+    db_session.session.flush()
+    db_session.session.add(Defect(
+        inspection_id=insp.id, description='Leak', severity='high',
+        status='open', due_date=date.today() + timedelta(days=7),
+    ))
+    db_session.session.add(FinalAssessment(
+        equipment_id=eq.id, inspection_assignment_id=done.id,
+        mechanical_inspector_id=mech.id, electrical_inspector_id=elec.id,
+        mech_verdict='operational', elec_verdict='stop', system_verdict='stop',
+    ))
+    db_session.session.add(StarHistory(
+        user_id=mech.id, role='inspector', target_type='inspection', total_stars=4,
+    ))
+    db_session.session.commit()
+
+
+class TestEPIEngine:
+    def test_inspector_components(self, db_session):
+        mech = _make_user(db_session, 1, 'inspector')
+        elec = _make_user(db_session, 2, 'inspector')
+        _inspector_fixture(db_session, mech, elec)
+
+        scores = EPIService().calculate_role_epi('inspector', [mech.id, elec.id])
+
+        assert scores[mech.id] == {
+            'completion': 10.0,      # 1 of 2 assignments done
+            'quality': 16.0,         # 4 stars of 5
+            'timeliness': 20.0,      # 17 minute inspection
+            'contribution': 2.0,     # one defect
+            'safety': 15.0,          # softer than system on a stop
+            'total_epi': 63.0,
+        }
+        assert scores[elec.id]['completion'] == 10.0
+        assert scores[elec.id]['safety'] == 20.0, 'electrical verdict matched the system'
+
+    def test_single_user_matches_batch(self, db_session):
+        mech = _make_user(db_session, 1, 'inspector')
+        elec = _make_user(db_session, 2, 'inspector')
+        _inspector_fixture(db_session, mech, elec)
+
+        service = EPIService()
+        batch = service.calculate_role_epi('inspector', [mech.id, elec.id])
+        assert service.calculate_epi(mech.id, 'inspector') == batch[mech.id]
+        assert service.calculate_epi(elec.id, 'inspector') == batch[elec.id]
+
+    def test_specialist_components(self, db_session, admin_user):
+        spec = _make_user(db_session, 1, 'specialist')
+        eq = make_equipment(db_session, 'Spec Pump', 'SP-001')
+        template = ChecklistTemplate(name='EPI', equipment_type='centrifugal_pump', version='1.0')
+        db_session.session.add(template)
+        db_session.session.flush()
+        insp = Inspection(equipment_id=eq.id, template_id=template.id,
+                          technician_id=admin_user.id, status='submitted')
+        db_session.session.add(insp)
+        db_session.session.flush()
+        defect = Defect(inspection_id=insp.id, description='Worn', severity='high',
+                        status='open', due_date=date.today(), found_during_repair_by=spec.id)
+        db_session.session.add(defect)
+        db_session.session.flush()
+
+        jobs = []
+        for i, (status, planned, actual) in enumerate([
+            ('completed', 2, 1.5), ('qc_approved', 2, 3), ('assigned', None, None),
+        ]):
+            job = SpecialistJob(
+                universal_id=500 + i, job_id=f'SPE-EPI-{i}', specialist_id=spec.id,
+                assigned_by=admin_user.id, defect_id=defect.id, status=status,
+                planned_time_hours=planned, actual_time_hours=actual,
+            )
+            db_session.session.add(job)
+            jobs.append(job)
+        db_session.session.flush()
+
+        # Two rejections on the same job count once; a rejection an admin
+        # validated as wrong does not count at all.
+        for job, validation in [(jobs[0], None), (jobs[0], None), (jobs[1], 'wrong')]:
+            db_session.session.add(QualityReview(
+                job_type='specialist', job_id=job.id, qe_id=admin_user.id,
+                status='rejected', admin_validation=validation,
+            ))
+        db_session.session.commit()
+
+        epi = EPIService().calculate_epi(spec.id, 'specialist')
+        assert epi['completion'] == 13.3
+        assert epi['timeliness'] == 10.0
+        assert epi['contribution'] == 4.0
+        assert epi['safety'] == 17.0
+
+    def test_engineer_epi_endpoint(self, client, engineer, db_session):
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        resp = client.get('/api/leaderboards/epi', headers=headers)
+        assert resp.status_code == 200
+        assert resp.get_json()['data']['safety'] == 20.0
+
+    def test_query_count_independent_of_user_count(self, db_session, count_queries):
+        few = [_make_user(db_session, n, 'specialist').id for n in range(2)]
+        many = few + [_make_user(db_session, n, 'specialist').id for n in range(2, 40)]
+        db_session.session.commit()
+
+        service = EPIService()
+        few_count, _ = count_queries(lambda: service.calculate_role_epi('specialist', few))
+        many_count, _ = count_queries(lambda: service.calculate_role_epi('specialist', many))
+        assert many_count == few_count
+
+
+class TestEPISnapshots:
+    def test_bulk_snapshot_is_idempotent_per_week(self, db_session, mech_inspector, specialist, engineer, admin_user):
+        service = EPIService()
+        assert service.generate_weekly_snapshots() == 3, 'admins are not scored'
+        assert EPISnapshot.query.count() == 3
+        assert service.generate_weekly_snapshots() == 0
+        assert EPISnapshot.query.count() == 3
+
+    def test_inactive_users_are_skipped(self, db_session, mech_inspector, specialist):
+        specialist.is_active = False
+        db_session.session.commit()
+        assert EPIService().generate_weekly_snapshots() == 1
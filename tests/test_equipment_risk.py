@@ -0,0 +1,126 @@
+"""
+Tests for equipment risk snapshots.
+
+Risk and coverage are computed for the fleet with grouped queries, kept
+current by inspection submission and review, and the scheduling AI views
+read, sort and count the snapshot rows in the database.
+"""
+
+from datetime import date, datetime, timedelta
+
+from tests.conftest import make_equipment, get_auth_header
+from app.extensions import db
+from app.models import (
+    ChecklistTemplate, Inspection, InspectionList, InspectionAssignment, Defect, EquipmentRiskSnapshot,
+)
+from app.services.equipment_risk_service import EquipmentRiskService
+from app.services.inspection_service import InspectionService
+from app.services.schedule_ai_service import ScheduleAIService
+
+
+def _template(db_session):
+    template = ChecklistTemplate(name='Risk', equipment_type='centrifugal_pump', version='1.0')
+    db_session.session.add(template)
+    db_session.session.flush()
+    return template
+
+
+def _inspection(db_session, eq, template, user, days_ago, result='pass', status='reviewed'):
+    submitted_at = datetime.utcnow() - timedelta(days=days_ago)
+    inspection = Inspection(equipment_id=eq.id, template_id=template.id, technician_id=user.id,
+                            status=status, result=result, started_at=submitted_at - timedelta(hours=1),
+                            submitted_at=submitted_at)
+    db_session.session.add(inspection)
+    db_session.session.flush()
+    return inspection
+
+
+def _snapshot(eq):
+    db.session.expire_all()
+    return EquipmentRiskSnapshot.query.filter_by(equipment_id=eq.id).one()
+
+
+class TestRiskSnapshots:
+    def test_scores_risk_and_coverage(self, db_session, admin_user):
+        template = _template(db_session)
+        risky = make_equipment(db_session, 'Risky Crane', 'RK-01')
+        risky.criticality_level = 'critical'
+        steady = make_equipment(db_session, 'Steady Pump', 'RK-02')
+        steady.criticality_level = 'low'
+        never = make_equipment(db_session, 'New Pump', 'RK-03')
+
+        failed = _inspection(db_session, risky, template, admin_user, 10, result='fail')
+        for _ in range(2):
+            db_session.session.add(Defect(inspection_id=failed.id, description='Leak', severity='high',
+                                          status='open', due_date=date.today()))
+        _inspection(db_session, steady, template, admin_user, 2)
+        il = InspectionList(shift='day', target_date=date.today())
+        db_session.session.add(il)
+        db_session.session.flush()
+        db_session.session.add(InspectionAssignment(inspection_list_id=il.id, equipment_id=steady.id, shift='day',
+                                                    template_id=template.id))
+        db_session.session.commit()
+
+        service = ScheduleAIService()
+        scores = service.calculate_equipment_risk_scores()
+        assert [(s['equipment_id'], s['risk_score'], s['risk_level']) for s in scores] == [
+            (risky.id, 61.7, 'high'), (never.id, 55.0, 'high'), (steady.id, 8.6, 'low')]
+        assert (scores[0]['days_since_inspection'], scores[0]['defect_count_90d']) == (10, 2)
+        assert scores[1]['days_since_inspection'] == 365
+        assert [f['name'] for f in scores[0]['factors']] == [
+            'days_since_inspection', 'defect_history', 'criticality', 'fail_rate']
+        assert [s['equipment_id'] for s in service.calculate_equipment_risk_scores(limit=1)] == [risky.id]
+
+        gaps = service.get_coverage_gaps()
+        assert [(g['equipment_id'], g['priority'], g['days_uncovered']) for g in gaps] == [
+            (never.id, 'critical', 999), (risky.id, 'critical', 10)]
+        assert gaps[0]['reason'] == 'Never inspected'
+        assert EquipmentRiskService.count_coverage_gaps() == 2
+        assert service.get_coverage_gaps(priority='medium') == []
+
+    def test_review_refreshes_snapshot(self, db_session, admin_user):
+        template = _template(db_session)
+        eq = make_equipment(db_session)
+        inspection = _inspection(db_session, eq, template, admin_user, 0, status='submitted')
+        db_session.session.commit()
+        EquipmentRiskService.ensure_snapshots()
+        assert _snapshot(eq).days_since_inspection is None
+
+        InspectionService.review_inspection(inspection.id, admin_user.id)
+        snapshot = _snapshot(eq)
+        assert (snapshot.days_since_inspection, snapshot.inspections_90d) == (0, 1)
+        assert snapshot.coverage_priority is None
+
+
+class TestRiskDashboard:
+    def test_reads_do_not_grow_with_fleet(self, db_session, admin_user, count_queries):
+        service = ScheduleAIService()
+        for n in range(3):
+            make_equipment(db_session, f'Fleet {n}', f'FL-{n:02d}')
+        db_session.session.commit()
+        EquipmentRiskService.ensure_snapshots()
+
+        def read():
+            service.calculate_equipment_risk_scores(limit=5)
+            service.get_coverage_gaps(limit=5)
+            EquipmentRiskService.count_coverage_gaps()
+
+        small = count_queries(read)[0]
+        for n in range(3, 40):
+            make_equipment(db_session, f'Fleet {n}', f'FL-{n:02d}')
+        db_session.session.commit()
+        EquipmentRiskService.refresh()
+        db_session.session.commit()
+        assert count_queries(read)[0] == small
+
+    def test_insights_endpoint(self, client, db_session, admin_user):
+        for n in range(7):
+            make_equipment(db_session, f'Gap {n}', f'GP-{n:02d}')
+        db_session.session.commit()
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+
+        resp = client.get('/api/schedule-ai/insights', headers=headers)
+        assert resp.status_code == 200
+        data = resp.get_json()['data']
+        assert data['coverage_gaps'] == 7
+        assert len(data['top_coverage_gaps']) == len(data['high_risk_equipment']) == 5
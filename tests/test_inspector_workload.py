@@ -0,0 +1,113 @@
+"""
+Tests for the inspector workload ledger.
+
+Assigning, unassigning and completing inspections recount the touched
+inspectors' daily ledger rows; fatigue is read from a sliding-window
+aggregate over the ledger.
+"""
+
+from datetime import date, datetime, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.extensions import db
+from app.models import InspectionList, InspectionAssignment, InspectorWorkload, JobTakeover
+from app.services.inspection_list_service import InspectionListService
+from app.services.inspector_workload_service import InspectorWorkloadService
+from app.services.schedule_ai_service import ScheduleAIService
+from app.services.takeover_service import TakeoverService
+
+
+def _assignments(db_session, count, **fields):
+    il = InspectionList(shift='day', target_date=date.today(), status='generated', total_assets=count)
+    db_session.session.add(il)
+    db_session.session.flush()
+    status = fields.pop('status', 'unassigned')
+    created = []
+    for n in range(count):
+        eq = make_equipment(db_session, f'Load Pump {il.id}-{n}', f'LP-{il.id}-{n}')
+        assignment = InspectionAssignment(inspection_list_id=il.id, equipment_id=eq.id, shift='day',
+                                          status=status, **fields)
+        db_session.session.add(assignment)
+        created.append(assignment)
+    db_session.session.flush()
+    return created
+
+
+def _ledger(user):
+    db.session.expire_all()
+    return [(row.day, row.assignments, row.completed, row.estimated_hours)
+            for row in InspectorWorkload.query.filter_by(user_id=user.id).order_by(InspectorWorkload.day)]
+
+
+class TestWorkloadLedger:
+    def test_assignment_events_recount_ledger(self, client, db_session, engineer, mech_inspector, elec_inspector):
+        first, second = _assignments(db_session, 2)
+        db_session.session.commit()
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        team = {'mechanical_inspector_id': mech_inspector.id, 'electrical_inspector_id': elec_inspector.id}
+        today = datetime.utcnow().date()
+
+        resp = client.post(f'/api/inspection-assignments/{first.id}/assign', json=team, headers=headers)
+        assert resp.status_code == 200
+        assert resp.get_json()['fatigue_warnings'] == []
+        assert _ledger(mech_inspector) == _ledger(elec_inspector) == [(today, 1, 0, 2.0)]
+
+        InspectionListService.mark_inspector_complete(first.id, mech_inspector.id)
+        assert _ledger(mech_inspector) == [(today, 1, 1, 2.0)]
+        assert _ledger(elec_inspector) == [(today, 1, 0, 2.0)]
+
+        client.post(f'/api/inspection-assignments/{second.id}/assign', json=team, headers=headers)
+        assert _ledger(elec_inspector) == [(today, 2, 0, 4.0)]
+
+        InspectionListService.unassign_team(second.id)
+        assert _ledger(elec_inspector) == [(today, 1, 0, 2.0)]
+
+    def test_reassignment_moves_workload(self, db_session, engineer, mech_inspector, elec_inspector, specialist):
+        assignment, = _assignments(db_session, 1)
+        db_session.session.commit()
+        InspectionListService.assign_team(assignment.id, mech_inspector.id, elec_inspector.id, engineer.id)
+        InspectionListService.assign_team(assignment.id, specialist.id, elec_inspector.id, engineer.id)
+
+        assert _ledger(mech_inspector) == []
+        assert [n for _, n, _, _ in _ledger(specialist)] == [1]
+
+    def test_approved_takeover_counts_for_the_new_team(self, db_session, admin_user, engineer, mech_inspector,
+                                                        elec_inspector, specialist):
+        assignment, = _assignments(db_session, 1)
+        db_session.session.commit()
+        InspectionListService.assign_team(assignment.id, mech_inspector.id, elec_inspector.id, engineer.id)
+        takeover = JobTakeover(job_type='inspection', job_id=assignment.id, requested_by=specialist.id,
+                               partner_id=engineer.id, status='pending')
+        db_session.session.add(takeover)
+        db_session.session.commit()
+
+        TakeoverService.approve_takeover(takeover.id, admin_user.id)
+
+        assert [n for _, n, _, _ in _ledger(specialist)] == [1]
+        assert [n for _, n, _, _ in _ledger(engineer)] == [1]
+
+
+class TestFatigue:
+    def test_sliding_window_scores(self, db_session, mech_inspector, elec_inspector, count_queries):
+        now = datetime.utcnow()
+        for days_ago in range(6):
+            _assignments(db_session, 2, mechanical_inspector_id=mech_inspector.id,
+                         electrical_inspector_id=elec_inspector.id if days_ago == 0 else None,
+                         status='assigned', assigned_at=now - timedelta(days=days_ago))
+        # Outside the 7-day window
+        _assignments(db_session, 3, mechanical_inspector_id=mech_inspector.id, status='assigned',
+                     assigned_at=now - timedelta(days=10))
+        InspectorWorkloadService.refresh()
+        db_session.session.commit()
+
+        fatigue = InspectorWorkloadService.fatigue([mech_inspector.id, elec_inspector.id])
+        assert fatigue[mech_inspector.id]['metrics'] == {
+            'assignments_7d': 12, 'estimated_hours_7d': 24.0, 'consecutive_work_days': 6}
+        assert (fatigue[mech_inspector.id]['fatigue_score'], fatigue[mech_inspector.id]['risk_level']) == (75.7, 'high')
+        assert fatigue[elec_inspector.id]['risk_level'] == 'low'
+
+        queries, risks = count_queries(ScheduleAIService().detect_fatigue_risk)
+        assert queries == 1
+        assert [r['inspector_id'] for r in risks] == [mech_inspector.id]
+        assert risks[0]['recommendations'] == [
+            'Working 6 consecutive days - schedule day off', 'Review workload distribution']
@@ -0,0 +1,146 @@
+"""
+Tests for the job duration statistics.
+
+Completed jobs update running (Welford) statistics per equipment, equipment
+type and job type; estimates read one row instead of scanning history.
+"""
+
+import statistics
+from datetime import date, datetime, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.models import WorkPlan, WorkPlanDay, WorkPlanJob, JobDurationStat
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+from app.services.job_duration_service import JobDurationService
+from app.services.work_plan_ai_service import WorkPlanAIService
+
+
+def _day(db_session, owner):
+    start = date.today()
+    plan = WorkPlan(week_start=start, week_end=start + timedelta(days=6), status='published', created_by_id=owner.id)
+    db_session.session.add(plan)
+    db_session.session.flush()
+    day = WorkPlanDay(work_plan_id=plan.id, date=start)
+    db_session.session.add(day)
+    db_session.session.flush()
+    return day
+
+
+def _completed(db_session, day, equipment, hours_list, estimated=2.0, record=True):
+    """Completed jobs with the given durations, recorded as the complete endpoint does."""
+    now = datetime.utcnow()
+    for hours in hours_list:
+        job = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', estimated_hours=estimated,
+                          equipment_id=equipment.id if equipment else None)
+        db_session.session.add(job)
+        db_session.session.flush()
+        db_session.session.add(WorkPlanJobTracking(
+            work_plan_job_id=job.id, status='completed', actual_hours=hours,
+            started_at=now - timedelta(hours=hours), completed_at=now,
+        ))
+        if record:
+            JobDurationService.record(job, hours)
+    db_session.session.commit()
+
+
+class TestJobDurationStat:
+    def test_running_statistics_match_the_samples(self):
+        samples = [1.5, 2.0, 2.25, 3.0, 4.5, 2.0, 1.0, 8.0, 2.5, 3.5]
+        stat = JobDurationStat(job_type='pm', equipment_type='', equipment_id=0)
+        for hours in samples:
+            stat.add(hours, estimated_hours=2.0)
+
+        assert stat.count == len(samples)
+        assert abs(stat.mean_hours - statistics.mean(samples)) < 1e-9
+        assert abs(stat.variance - statistics.variance(samples)) < 1e-9
+        assert (stat.min_hours, stat.max_hours) == (1.0, 8.0)
+        assert abs(stat.estimate_error - statistics.mean(abs(h - 2) / 2 for h in samples)) < 1e-9
+        # Quantiles are read from half-hour buckets
+        assert abs(stat.p50_hours - statistics.median(samples)) <= 0.5
+        assert stat.p10_hours <= stat.p50_hours <= stat.p90_hours <= 8.0
+
+
+class TestJobDurationService:
+    def test_completion_updates_every_scope_and_rebuild_agrees(self, client, db_session, admin_user, engineer):
+        day = _day(db_session, admin_user)
+        pump = make_equipment(db_session)
+        _completed(db_session, day, pump, [2.0, 3.0], record=False)
+        job = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', estimated_hours=2, equipment_id=pump.id)
+        db_session.session.add(job)
+        db_session.session.flush()
+        db_session.session.add(WorkPlanJobTracking(work_plan_job_id=job.id, status='in_progress',
+                                                   started_at=datetime.utcnow() - timedelta(hours=4)))
+        db_session.session.commit()
+
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        assert client.post(f'/api/work-plan-tracking/jobs/{job.id}/complete', json={},
+                           headers=headers).status_code == 200
+        scopes = {(s.job_type, s.equipment_type, s.equipment_id): s.count for s in JobDurationStat.query}
+        assert scopes == {('pm', pump.equipment_type, pump.id): 1, ('pm', pump.equipment_type, 0): 1, ('pm', '', 0): 1}
+
+        # Backfill folds in the two jobs completed before the stats existed
+        assert JobDurationService.rebuild() == 3
+        stat, scope = JobDurationService.lookup('pm', pump.id)
+        assert (scope, stat.count, round(stat.mean_hours, 1)) == ('equipment', 3, 3.0)
+
+    def test_lookup_falls_back_to_wider_scopes(self, db_session, admin_user):
+        day = _day(db_session, admin_user)
+        pump = make_equipment(db_session)
+        other = make_equipment(db_session, 'Other Pump', 'OP-1')
+        _completed(db_session, day, pump, [2.0, 4.0])
+        _completed(db_session, day, None, [9.0])
+
+        assert JobDurationService.lookup('pm', pump.id)[1] == 'equipment'
+        stat, scope = JobDurationService.lookup('pm', other.id)
+        assert (scope, stat.count) == ('equipment_type', 2)
+        stat, scope = JobDurationService.lookup('pm')
+        assert (scope, stat.count) == ('job_type', 3)
+        assert JobDurationService.lookup('defect') == (None, None)
+
+    def test_concurrent_first_completion_reuses_the_winners_row(self, db_session, monkeypatch, admin_user):
+        day = _day(db_session, admin_user)
+        pump = make_equipment(db_session)
+        _completed(db_session, day, pump, [2.0])
+
+        # Another completion inserted the scopes after this one looked for them
+        locked_rows = JobDurationService._locked_rows
+        calls = []
+
+        def stale_first_read(scopes):
+            calls.append(scopes)
+            return {} if len(calls) == 1 else locked_rows(scopes)
+
+        monkeypatch.setattr(JobDurationService, '_locked_rows', staticmethod(stale_first_read))
+        _completed(db_session, day, pump, [4.0])
+
+        assert len(calls) == 2
+        assert {s.count for s in JobDurationStat.query} == {2}
+        assert JobDurationStat.query.count() == 3
+
+    def test_estimates_do_not_scan_history(self, client, db_session, admin_user, engineer, count_queries):
+        day = _day(db_session, admin_user)
+        pump = make_equipment(db_session)
+        _completed(db_session, day, pump, [2.0, 3.0])
+        target = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', estimated_hours=2, equipment_id=pump.id)
+        db_session.session.add(target)
+        db_session.session.commit()
+        service = WorkPlanAIService()
+
+        small, prediction = count_queries(lambda: service.predict_job_duration(
+            {'job_type': 'pm', 'equipment_id': pump.id}))
+        assert (prediction['sample_size'], prediction['estimated_hours']) == (2, 2.5)
+        assert prediction['factors'][0] == 'Equipment-specific history'
+
+        _completed(db_session, day, pump, [2.5] * 40)
+        large, prediction = count_queries(lambda: service.predict_job_duration(
+            {'job_type': 'pm', 'equipment_id': pump.id}))
+        assert large == small
+        assert prediction['sample_size'] == 42
+
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        data = client.post('/api/work-plan-tracking/ai-estimate-time', json={'job_id': target.id},
+                           headers=headers).get_json()['data']
+        assert (data['estimated_hours'], data['confidence']) == (2.5, 'high')
+        assert data['based_on'] == {'sample_size': 42, 'match_key': 'type+equipment',
+                                    'equipment_type': pump.equipment_type}
+        assert data['range']['min'] <= 2.5 <= data['range']['max']
@@ -0,0 +1,141 @@
+"""
+Tests for GET /work-plans/my-plan.
+
+The endpoint used to load the whole published plan and filter to the caller's
+jobs in Python. It now starts from the caller's assignments and answers
+If-None-Match with 304 while nothing the caller can see has changed.
+"""
+
+from datetime import date, datetime, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.models import (
+    WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, WorkPlanJobTracking, User,
+)
+
+
+def _published_plan(db_session, admin_user, worker, teammate):
+    """Two days; the worker is on one job per day, the teammate shares one."""
+    eq = make_equipment(db_session, 'Plan Pump', 'PLAN-1')
+    start = date.today()
+    plan = WorkPlan(
+        week_start=start, week_end=start + timedelta(days=6),
+        status='published', created_by_id=admin_user.id,
+    )
+    db_session.session.add(plan)
+    db_session.session.flush()
+
+    jobs = []
+    for offset in (1, 0):
+        day = WorkPlanDay(work_plan_id=plan.id, date=start + timedelta(days=offset))
+        db_session.session.add(day)
+        db_session.session.flush()
+        for position in (1, 2):
+            job = WorkPlanJob(
+                work_plan_day_id=day.id, job_type='pm', equipment_id=eq.id,
+                estimated_hours=2.0, description=f'Day {offset} job {position}',
+                position=position, berth='east',
+            )
+            db_session.session.add(job)
+            db_session.session.flush()
+            jobs.append(job)
+
+    mine = [jobs[0], jobs[3]]
+    db_session.session.add(WorkPlanAssignment(work_plan_job_id=mine[0].id, user_id=worker.id, is_lead=True))
+    db_session.session.add(WorkPlanAssignment(work_plan_job_id=mine[0].id, user_id=teammate.id))
+    db_session.session.add(WorkPlanAssignment(work_plan_job_id=mine[1].id, user_id=worker.id))
+    db_session.session.add(WorkPlanAssignment(work_plan_job_id=jobs[1].id, user_id=teammate.id))
+    db_session.session.commit()
+    return plan, mine
+
+
+def _teammate(db_session):
+    user = User(email='mate@test.com', full_name='Team Mate', role='specialist',
+                role_id='MATE01', shift='day')
+    user.set_password('test123')
+    db_session.session.add(user)
+    db_session.session.commit()
+    return user
+
+
+class TestMyPlan:
+    def test_returns_only_callers_jobs_grouped_by_day(self, client, admin_user, specialist, db_session):
+        plan, mine = _published_plan(db_session, admin_user, specialist, _teammate(db_session))
+        headers = get_auth_header(client, 'spec@test.com', 'test123')
+
+        resp = client.get('/api/work-plans/my-plan', headers=headers)
+        body = resp.get_json()
+
+        assert resp.status_code == 200
+        assert body['work_plan']['id'] == plan.id
+        assert body['total_jobs'] == 2
+        assert [d['date'] for d in body['my_jobs']] == sorted(d['date'] for d in body['my_jobs'])
+        job_ids = [j['id'] for d in body['my_jobs'] for j in d['jobs']]
+        assert sorted(job_ids) == sorted(j.id for j in mine)
+
+        shared = next(j for d in body['my_jobs'] for j in d['jobs'] if j['id'] == mine[0].id)
+        assert shared['is_lead'] is True
+        assert {a['user_name'] for a in shared['assignments']} == {'Test Specialist', 'Team Mate'}
+
+    def test_no_published_plan(self, client, specialist, db_session):
+        headers = get_auth_header(client, 'spec@test.com', 'test123')
+        body = client.get('/api/work-plans/my-plan', headers=headers).get_json()
+        assert body['work_plan'] is None
+        assert body['total_jobs'] == 0
+
+    def test_unchanged_plan_returns_304(self, client, admin_user, specialist, db_session):
+        _published_plan(db_session, admin_user, specialist, _teammate(db_session))
+        headers = get_auth_header(client, 'spec@test.com', 'test123')
+
+        first = client.get('/api/work-plans/my-plan', headers=headers)
+        etag = first.headers['ETag']
+        assert etag
+
+        again = client.get('/api/work-plans/my-plan', headers={**headers, 'If-None-Match': etag})
+        assert again.status_code == 304
+        assert again.data == b''
+
+    def test_tracking_change_invalidates_etag(self, client, admin_user, specialist, db_session):
+        _, mine = _published_plan(db_session, admin_user, specialist, _teammate(db_session))
+        headers = get_auth_header(client, 'spec@test.com', 'test123')
+        etag = client.get('/api/work-plans/my-plan', headers=headers).headers['ETag']
+
+        db_session.session.add(WorkPlanJobTracking(
+            work_plan_job_id=mine[0].id, status='in_progress', started_at=datetime.utcnow(),
+        ))
+        db_session.session.commit()
+
+        resp = client.get('/api/work-plans/my-plan', headers={**headers, 'If-None-Match': etag})
+        assert resp.status_code == 200
+        assert resp.headers['ETag'] != etag
+
+    def test_etag_is_per_user(self, client, admin_user, specialist, db_session):
+        _published_plan(db_session, admin_user, specialist, _teammate(db_session))
+        mine = client.get('/api/work-plans/my-plan',
+                          headers=get_auth_header(client, 'spec@test.com', 'test123'))
+        theirs = client.get('/api/work-plans/my-plan',
+                            headers=get_auth_header(client, 'mate@test.com', 'test123'))
+        assert mine.headers['ETag'] != theirs.headers['ETag']
+        assert theirs.get_json()['total_jobs'] == 2
+
+    def test_lead_equipment_and_teammate_changes_invalidate_etag(self, client, admin_user, specialist, db_session):
+        _, mine = _published_plan(db_session, admin_user, specialist, _teammate(db_session))
+        headers = get_auth_header(client, 'spec@test.com', 'test123')
+        etag = client.get('/api/work-plans/my-plan', headers=headers).headers['ETag']
+
+        changes = [
+            lambda: setattr(WorkPlanAssignment.query.filter_by(
+                work_plan_job_id=mine[0].id, user_id=specialist.id).one(), 'is_lead', False),
+            lambda: setattr(db_session.session.get(WorkPlanJob, mine[0].id).equipment, 'name', 'Renamed Pump'),
+            lambda: setattr(User.query.filter_by(email='mate@test.com').one(), 'full_name', 'Renamed Mate'),
+        ]
+        for change in changes:
+            change()
+            db_session.session.commit()
+            resp = client.get('/api/work-plans/my-plan', headers={**headers, 'If-None-Match': etag})
+            assert resp.status_code == 200
+            assert resp.headers['ETag'] != etag
+            etag = resp.headers['ETag']
+
+        shared = next(j for d in resp.get_json()['my_jobs'] for j in d['jobs'] if j['id'] == mine[0].id)
+        assert shared['is_lead'] is False
@@ -0,0 +1,327 @@
+"""
+Tests for multi-worker WebSocket delivery.
+
+Emits go through a pluggable message queue (in-process bus under testing) and
+connection state lives in an indexed registry instead of a per-process dict.
+Notifications are serialized once per emit and bursts are coalesced per room.
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import socketio
+from flask_jwt_extended import create_access_token
+
+from app.api.notifications_ws import (
+    NotificationBatcher, emit_bulk_notification, emit_notification, notification_wire_payload,
+)
+from app.services import realtime_service
+from app.services.realtime_service import ConnectionRegistry, RedisConnectionRegistry, local_pubsub_manager
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestConnectionRegistry:
+    def test_indexes_by_user(self):
+        registry = ConnectionRegistry()
+        registry.add('a', 1)
+        registry.add('b', 1)
+        registry.add('c', 2)
+
+        assert registry.connection_count() == 3
+        assert sorted(registry.connected_user_ids()) == [1, 2]
+        assert registry.is_user_connected(1)
+
+        registry.remove('a')
+        assert registry.is_user_connected(1), 'user still has socket b'
+        registry.remove('b')
+        assert not registry.is_user_connected(1)
+        assert registry.remove('missing') is None
+
+    def test_subscriptions(self):
+        registry = ConnectionRegistry()
+        registry.add('a', 1)
+        assert registry.add_subscriptions('a', {'type_x', 'priority_urgent'}) == {'type_x', 'priority_urgent'}
+        assert registry.remove_subscriptions('a', {'type_x'}) == {'priority_urgent'}
+        assert registry.get('a')['subscriptions'] == {'priority_urgent'}
+        assert registry.add_subscriptions('unknown', {'type_x'}) == set()
+
+
+class _FakeRedis:
+    """The slice of redis-py the connection registry uses, with key expiry on a fake clock."""
+
+    def __init__(self, clock):
+        self._clock = clock
+        self._data = {}
+        self._expires = {}
+
+    def _get(self, key, default=None):
+        if key in self._expires and self._expires[key] <= self._clock():
+            self._data.pop(key, None)
+            del self._expires[key]
+        if key not in self._data and default is not None:
+            self._data[key] = default
+        return self._data.get(key)
+
+    def _drop_if_empty(self, key):
+        if not self._data.get(key):
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def pipeline(self):
+        redis = self
+
+        class Pipeline:
+            def __init__(self):
+                self._calls = []
+
+            def __getattr__(self, name):
+                return lambda *args, **kwargs: self._calls.append((name, args, kwargs))
+
+            def execute(self):
+                return [getattr(redis, name)(*args, **kwargs) for name, args, kwargs in self._calls]
+
+        return Pipeline()
+
+    def type(self, key):
+        value = self._get(key)
+        return {set: 'set', dict: 'hash'}.get(type(value), 'none')
+
+    def delete(self, *keys):
+        for key in keys:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def exists(self, key):
+        return int(self._get(key) is not None)
+
+    def expire(self, key, seconds):
+        if self._get(key) is not None:
+            self._expires[key] = self._clock() + seconds
+
+    def hset(self, key, mapping):
+        self._get(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    def hget(self, key, field):
+        return (self._get(key) or {}).get(field)
+
+    def hgetall(self, key):
+        return dict(self._get(key) or {})
+
+    def sadd(self, key, *members):
+        self._get(key, set()).update(str(m) for m in members)
+
+    def srem(self, key, *members):
+        (self._get(key) or set()).difference_update(str(m) for m in members)
+        self._drop_if_empty(key)
+
+    def smembers(self, key):
+        return set(self._get(key) or ())
+
+    def scard(self, key):
+        return len(self._get(key) or ())
+
+    def zadd(self, key, mapping):
+        self._get(key, {}).update({str(m): score for m, score in mapping.items()})
+
+    def zrem(self, key, *members):
+        for member in members:
+            (self._get(key) or {}).pop(str(member), None)
+        self._drop_if_empty(key)
+
+    def _zrange(self, key, low, high):
+        return [m for m, score in (self._get(key) or {}).items() if float(low) <= score <= float(high)]
+
+    def zrangebyscore(self, key, low, high):
+        return self._zrange(key, low, high)
+
+    def zcount(self, key, low, high):
+        return len(self._zrange(key, low, high))
+
+    def zremrangebyscore(self, key, low, high):
+        for member in self._zrange(key, low, high):
+            del self._data[key][member]
+        self._drop_if_empty(key)
+
+
+class TestRedisConnectionRegistry:
+    def test_sockets_expire_unless_their_worker_refreshes_them(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(realtime_service, 'time', SimpleNamespace(time=lambda: now[0]))
+        redis = _FakeRedis(lambda: now[0])
+        worker, crashed = (RedisConnectionRegistry(client=redis, ttl=300, heartbeat=False) for _ in range(2))
+        worker.add('a', 1)
+        crashed.add('b', 2)
+        assert worker.add_subscriptions('a', {'type_x'}) == {'type_x'}
+        assert sorted(worker.connected_user_ids()) == [1, 2]
+
+        # The healthy worker keeps beating for longer than a day
+        for _ in range(30 * 24):
+            now[0] += 120
+            assert worker.refresh() == 1
+
+        assert worker.is_user_connected(1) and not worker.is_user_connected(2)
+        assert (worker.connected_user_ids(), worker.connection_count()) == ([1], 1)
+        assert worker.get('a')['subscriptions'] == {'type_x'}
+        assert crashed.touch('b') is False and worker.touch('a') is True
+
+        worker.remove('a')
+        assert not worker.is_user_connected(1)
+        assert (worker.connection_count(), worker.refresh()) == (0, 0)
+
+
+def _worker(channel):
+    """A Socket.IO server attached to the in-process bus, listening like a live worker."""
+    server = socketio.Server(async_mode='threading', client_manager=local_pubsub_manager(channel=channel))
+    server.manager_initialized = True
+    server.manager.initialize()
+    sent = []
+    server._send_eio_packet = lambda eio_sid, pkt: sent.append((eio_sid, pkt.data))
+    return server, sent
+
+
+class TestMessageQueueFanOut:
+    def test_emit_on_one_worker_reaches_socket_on_another(self):
+        """Two servers on one bus stand in for two gunicorn workers."""
+        worker_a, delivered_a = _worker('fanout-test')
+        worker_b, delivered_b = _worker('fanout-test')
+
+        sid = worker_a.manager.connect('eio-a', '/notifications')
+        worker_a.manager.enter_room(sid, '/notifications', 'user_7')
+
+        worker_b.emit('notification', {'id': 7}, room='user_7', namespace='/notifications')
+
+        assert _wait_for(lambda: delivered_a)
+        eio_sid, frame = delivered_a[0]
+        assert eio_sid == 'eio-a'
+        assert '"notification"' in frame and '"id":7' in frame
+        assert delivered_b == [], 'worker_b holds no socket in that room'
+
+    def test_channels_are_isolated(self):
+        worker_a, delivered_a = _worker('fanout-one')
+        worker_b, _ = _worker('fanout-two')
+        sid = worker_a.manager.connect('eio-a', '/')
+        worker_a.manager.enter_room(sid, '/', 'user_1')
+
+        worker_b.emit('notification', {'id': 1}, room='user_1')
+
+        assert not _wait_for(lambda: delivered_a, timeout=0.2)
+
+
+class TestNotificationsNamespace:
+    def test_connect_registers_user(self, app, mech_inspector):
+        from app.api.notifications_ws import is_user_connected, get_connected_users
+
+        socketio = app.extensions['socketio']
+        with app.app_context():
+            token = create_access_token(identity=str(mech_inspector.id))
+
+        client = socketio.test_client(app, namespace='/notifications', query_string=f'token={token}')
+        assert client.is_connected('/notifications')
+        assert is_user_connected(mech_inspector.id)
+        assert mech_inspector.id in get_connected_users()
+
+        client.emit('subscribe', {'types': ['defect_reported']}, namespace='/notifications')
+        events = client.get_received('/notifications')
+        subscribed = [e for e in events if e['name'] == 'subscribed'][0]
+        assert subscribed['args'][0]['subscriptions'] == ['type_defect_reported']
+
+        client.disconnect(namespace='/notifications')
+        assert not is_user_connected(mech_inspector.id)
+
+    def test_connect_without_token_is_rejected(self, app):
+        socketio = app.extensions['socketio']
+        client = socketio.test_client(app, namespace='/notifications')
+        assert not client.is_connected('/notifications')
+
+
+class _RecordingSocketIO:
+    """Stand-in for Flask-SocketIO that records emits and runs tasks inline."""
+
+    def __init__(self):
+        self.emits = []
+
+    def emit(self, event, payload, to=None, namespace=None):
+        self.emits.append((event, payload, sorted(to)))
+
+    def start_background_task(self, target):
+        thread = threading.Thread(target=target)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def _notification(id, user_id, type='defect_reported', priority='urgent', **extra):
+    return {'id': id, 'user_id': user_id, 'type': type, 'priority': priority,
+            'title': 'Leak', 'read_at': None, 'group_id': None, **extra}
+
+
+class TestNotificationEmission:
+    def test_wire_payload_drops_nulls(self):
+        data, rooms = notification_wire_payload(
+            _notification(1, 5, related_type='equipment', related_id=9))
+        assert 'read_at' not in data and 'group_id' not in data
+        assert rooms == ['user_5', 'type_defect_reported', 'priority_urgent', 'equipment_9']
+
+    def test_single_notification_is_one_emit(self):
+        sio = _RecordingSocketIO()
+        emit_notification(sio, _notification(1, 5))
+        assert len(sio.emits) == 1
+        event, payload, rooms = sio.emits[0]
+        assert event == 'notification'
+        assert payload['notification']['id'] == 1
+        assert rooms == ['priority_urgent', 'type_defect_reported', 'user_5']
+
+    def test_bulk_coalesces_shared_rooms(self):
+        sio = _RecordingSocketIO()
+        emit_bulk_notification(sio, [_notification(i, 100 + i) for i in range(3)])
+
+        singles = [e for e in sio.emits if e[0] == 'notification']
+        batches = [e for e in sio.emits if e[0] == 'notifications']
+        assert sorted(rooms for _, _, rooms in singles) == [['user_100'], ['user_101'], ['user_102']]
+        assert len(batches) == 1, 'type and priority rooms hold the same three notifications'
+        _, payload, rooms = batches[0]
+        assert rooms == ['priority_urgent', 'type_defect_reported']
+        assert [n['id'] for n in payload['notifications']] == [0, 1, 2]
+        assert payload['count'] == 3
+
+    def test_batcher_flushes_burst_once(self):
+        sio = _RecordingSocketIO()
+        batcher = NotificationBatcher(sio, window=0.05)
+        for i in range(4):
+            batcher.add(_notification(i, 7))
+
+        assert _wait_for(lambda: sio.emits)
+        assert sio.emits == [('notifications', sio.emits[0][1],
+                              ['priority_urgent', 'type_defect_reported', 'user_7'])]
+        assert sio.emits[0][1]['count'] == 4
+
+    def test_created_notification_reaches_socket(self, app, mech_inspector):
+        from app.services.notification_service import NotificationService
+
+        socketio = app.extensions['socketio']
+        with app.app_context():
+            token = create_access_token(identity=str(mech_inspector.id))
+        client = socketio.test_client(app, namespace='/notifications', query_string=f'token={token}')
+        client.get_received('/notifications')
+
+        with app.app_context():
+            NotificationService.create_notification(
+                user_id=mech_inspector.id, type='defect_reported', title='Leak',
+                message='Pump leaking', title_ar='Leak', message_ar='Leak',
+            )
+
+        events = [e for e in client.get_received('/notifications') if e['name'] == 'notification']
+        assert len(events) == 1
+        assert events[0]['args'][0]['notification']['title'] == 'Leak'
+        client.disconnect(namespace='/notifications')
@@ -0,0 +1,180 @@
+"""
+Tests for the overdue service's set-based queries.
+
+Overdue lists join names and inspector workload in one query per category,
+aging buckets are grouped in SQL, and the overdue page's views share a
+short-lived cache. Bulk rescheduling updates in chunked UPDATE statements,
+batches its audit rows and notifications, and clears that cache.
+"""
+
+from datetime import date, datetime, timedelta
+
+from tests.conftest import make_equipment
+from app.extensions import db
+from app.models import (
+    InspectionList, InspectionAssignment, Defect, QualityReview, AdminActivityLog, Notification,
+)
+from app.services import overdue_ai_service
+from app.services.overdue_ai_service import OverdueAIService, _overdue_cache
+
+
+def _assignment(db_session, il, n, **fields):
+    eq = make_equipment(db_session, f'Late Pump {n}', f'LT-{n:03d}')
+    fields.setdefault('status', 'assigned')
+    assignment = InspectionAssignment(inspection_list_id=il.id, equipment_id=eq.id, shift='day', **fields)
+    db_session.session.add(assignment)
+    return assignment
+
+
+def _inspection_list(db_session):
+    il = InspectionList(shift='day', target_date=date.today(), status='generated')
+    db_session.session.add(il)
+    db_session.session.flush()
+    return il
+
+
+class TestOverdueLists:
+    def test_inspections_in_one_query(self, db_session, mech_inspector, elec_inspector, count_queries):
+        now = datetime.utcnow()
+        il = _inspection_list(db_session)
+        _assignment(db_session, il, 0, mechanical_inspector_id=mech_inspector.id,
+                    electrical_inspector_id=elec_inspector.id, deadline=now - timedelta(days=5, hours=1))
+        # Same person on both sides counts once towards their workload
+        _assignment(db_session, il, 1, mechanical_inspector_id=mech_inspector.id,
+                    electrical_inspector_id=mech_inspector.id, deadline=now + timedelta(days=2))
+        _assignment(db_session, il, 2, electrical_inspector_id=elec_inspector.id,
+                    created_at=now - timedelta(days=3, hours=1))
+        _assignment(db_session, il, 3, mechanical_inspector_id=mech_inspector.id, status='completed',
+                    deadline=now - timedelta(days=9))
+        db_session.session.commit()
+
+        queries, items = count_queries(OverdueAIService().get_overdue_inspections)
+        assert queries == 1
+        assert [(i['equipment_name'], i['days_overdue']) for i in items] == [('Late Pump 0', 5), ('Late Pump 2', 2)]
+        assert (items[0]['mechanical_inspector'], items[0]['electrical_inspector']) == (
+            mech_inspector.full_name, elec_inspector.full_name)
+        assert items[1]['mechanical_inspector'] is None
+
+        for n in range(4, 30):
+            _assignment(db_session, il, n, mechanical_inspector_id=mech_inspector.id,
+                        deadline=now - timedelta(days=1))
+        db_session.session.commit()
+        queries, items = count_queries(OverdueAIService().get_overdue_inspections)
+        assert (queries, len(items)) == (1, 28)
+
+    def test_breached_defects_and_reviews(self, db_session, admin_user, specialist):
+        now = datetime.utcnow()
+        for severity, hours, status in [('critical', 5, 'open'), ('high', 20, 'open'),
+                                        ('low', 24 * 9, 'in_progress'), ('critical', 50, 'resolved')]:
+            db_session.session.add(Defect(description=f'{severity} leak', severity=severity, status=status,
+                                          assigned_to_id=specialist.id, due_date=date.today(),
+                                          created_at=now - timedelta(hours=hours)))
+        for hours in (30, 10):
+            db_session.session.add(QualityReview(job_type='specialist', job_id=1, qe_id=admin_user.id,
+                                                 created_at=now - timedelta(hours=hours)))
+        db_session.session.commit()
+
+        service = OverdueAIService()
+        defects = service.get_overdue_defects()
+        assert [(d['description'], d['days_overdue']) for d in defects] == [('low leak', 9), ('critical leak', 0)]
+        assert defects[0]['assigned_to'] == specialist.full_name
+        reviews = service.get_overdue_reviews()
+        assert [(r['quality_engineer'], r['days_overdue']) for r in reviews] == [(admin_user.full_name, 1)]
+
+        summary = service.get_summary()
+        assert (summary['total'], summary['defects']['oldest_days']) == (3, 9)
+
+
+class TestAgingBuckets:
+    def test_buckets_grouped_in_sql(self, db_session, admin_user, count_queries):
+        now = datetime.utcnow()
+        il = _inspection_list(db_session)
+        for n, days in enumerate([0, 2, 5, 5, 20]):
+            _assignment(db_session, il, n, deadline=now - timedelta(days=days, hours=1))
+        db_session.session.add(Defect(description='Old crack', severity='medium', status='open',
+                                      due_date=date.today(), created_at=now - timedelta(days=10, hours=1)))
+        db_session.session.commit()
+
+        queries, aging = count_queries(lambda: OverdueAIService().get_aging_buckets('all'))
+        assert queries == 3
+        assert [b.count for b in aging.buckets] == [1, 2, 1, 1]
+        assert (aging.total_overdue, aging.oldest_item_days, aging.average_days_overdue) == (6, 20, 7.0)
+        assert aging.to_dict()['buckets'][1]['percentage'] == 33.3
+
+        defects_only = OverdueAIService().get_aging_buckets('defects')
+        assert [b.count for b in defects_only.buckets] == [0, 0, 1, 0]
+
+
+class TestOverdueCache:
+    def test_views_share_cache_until_reschedule(self, app, db_session, count_queries):
+        now = datetime.utcnow()
+        il = _inspection_list(db_session)
+        late = _assignment(db_session, il, 0, deadline=now - timedelta(days=3))
+        db_session.session.commit()
+        service = OverdueAIService()
+        app.config['DASHBOARD_CACHE_SECONDS'] = 60
+        try:
+            service.get_summary()
+            start = (date.today() - timedelta(days=7)).isoformat()
+            assert len(service.get_calendar_data(start, None)) == 1
+
+            queries, _ = count_queries(lambda: (service.get_overdue_inspections(), service.get_summary(),
+                                                service.get_calendar_data(start, None)))
+            assert queries == 0
+
+            result = service.bulk_reschedule('inspection', [late.id], (date.today() + timedelta(days=2)).isoformat())
+            assert result['updated'] == 1
+            assert service.get_overdue_inspections() == []
+            assert service.get_calendar_data(start, None) == []
+        finally:
+            app.config['DASHBOARD_CACHE_SECONDS'] = 0
+            _overdue_cache.invalidate()
+
+
+class TestBulkReschedule:
+    def test_chunked_update_with_batched_fan_out(self, db_session, monkeypatch, admin_user,
+                                                 mech_inspector, elec_inspector, count_queries):
+        now = datetime.utcnow()
+        il = _inspection_list(db_session)
+        late = [_assignment(db_session, il, n, mechanical_inspector_id=mech_inspector.id,
+                            electrical_inspector_id=elec_inspector.id if n == 0 else None,
+                            deadline=now - timedelta(days=2), backlog_triggered=True) for n in range(3)]
+        db_session.session.commit()
+        ids = [a.id for a in late]
+        monkeypatch.setattr(overdue_ai_service, 'BULK_RESCHEDULE_CHUNK', 2)
+        new_date = (date.today() + timedelta(days=3)).isoformat()
+
+        statements = []
+        _, result = count_queries(lambda: OverdueAIService().bulk_reschedule(
+            'inspection', ids + [9999, ids[0]], new_date, user_id=admin_user.id), statements)
+        assert (result['updated'], result['updated_ids']) == (3, ids)
+        assert result['failed_items'] == [{'id': 9999, 'reason': 'Not found'}]
+        assert [s.split()[0] for s in statements if 'inspection_assignments' in s.split('WHERE')[0]] == [
+            'UPDATE', 'UPDATE']
+
+        db.session.expire_all()
+        assert {(a.deadline.date(), a.backlog_triggered) for a in InspectionAssignment.query} == {
+            (date.today() + timedelta(days=3), False)}
+        audit = AdminActivityLog.query.filter_by(action='reschedule').all()
+        assert sorted(a.entity_id for a in audit) == ids
+        messages = {n.user_id: n.message for n in Notification.query.filter_by(type='overdue_rescheduled')}
+        assert messages == {
+            mech_inspector.id: f'3 overdue inspections rescheduled to {new_date}',
+            elec_inspector.id: f'1 overdue inspection rescheduled to {new_date}',
+        }
+
+    def test_defects_and_unknown_type(self, db_session, specialist):
+        defect = Defect(description='Loose bolt', severity='high', status='open', assigned_to_id=specialist.id,
+                        due_date=date.today() - timedelta(days=4))
+        db_session.session.add(defect)
+        db_session.session.commit()
+        service = OverdueAIService()
+
+        result = service.bulk_reschedule('defect', [defect.id], '2030-01-15T08:00:00Z')
+        assert result['updated_ids'] == [defect.id]
+        db.session.expire_all()
+        assert db.session.get(Defect, defect.id).due_date == date(2030, 1, 15)
+        assert AdminActivityLog.query.count() == 0
+
+        result = service.bulk_reschedule('widget', [defect.id], '2030-01-15')
+        assert result['failed_items'] == [{'id': defect.id, 'reason': 'Unknown entity type: widget'}]
@@ -0,0 +1,181 @@
+"""
+Tests for the work plan performance rollups.
+
+Daily rows are computed for every worker with grouped queries and written
+in bulk; weekly and monthly rows are rebuilt from the daily rows.
+"""
+
+from datetime import date, timedelta
+
+from tests.conftest import get_auth_header
+from app.models import User, WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, Notification
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+from app.models.work_plan_job_rating import WorkPlanJobRating
+from app.models.work_plan_pause_request import WorkPlanPauseRequest
+from app.models.work_plan_performance import WorkPlanPerformance
+from app.services.performance_rollup_service import PerformanceRollupService, period_bounds
+
+# A Wednesday, so the day before is in the same week
+DAY = date(2026, 3, 11)
+
+
+def _workers(db_session, count, start=0):
+    users = []
+    for n in range(start, start + count):
+        user = User(email=f'perf{n}@test.com', full_name=f'Perf Worker {n}', role='specialist',
+                    role_id=f'PRF{n:03d}', shift='day')
+        user.set_password('test123')
+        users.append(user)
+    db_session.session.add_all(users)
+    db_session.session.flush()
+    return users
+
+
+def _day(db_session, owner, day=DAY):
+    plan = WorkPlan.query.filter_by(week_start=period_bounds('weekly', day)[0]).first()
+    if plan is None:
+        start = period_bounds('weekly', day)[0]
+        plan = WorkPlan(week_start=start, week_end=start + timedelta(days=6),
+                        status='published', created_by_id=owner.id)
+        db_session.session.add(plan)
+        db_session.session.flush()
+    plan_day = WorkPlanDay(work_plan_id=plan.id, date=day)
+    db_session.session.add(plan_day)
+    db_session.session.flush()
+    return plan_day
+
+
+def _job(db_session, day, users, status=None, hours=2.0, **tracking):
+    job = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', estimated_hours=hours)
+    db_session.session.add(job)
+    db_session.session.flush()
+    for user in users:
+        db_session.session.add(WorkPlanAssignment(work_plan_job_id=job.id, user_id=user.id))
+    if status:
+        db_session.session.add(WorkPlanJobTracking(work_plan_job_id=job.id, status=status, **tracking))
+    db_session.session.flush()
+    return job
+
+
+def _perf(user, period_type='daily', start=DAY):
+    return WorkPlanPerformance.query.filter_by(
+        user_id=user.id, period_type=period_type, period_start=start).one()
+
+
+class TestDailyPerformance:
+    def test_aggregates_tracking_ratings_and_pauses(self, db_session, admin_user):
+        a, b = _workers(db_session, 2)
+        day = _day(db_session, admin_user)
+        shared = _job(db_session, day, [a, b], 'completed', hours=3.0, actual_hours=2.5, is_carry_over=True)
+        paused = _job(db_session, day, [a], 'incomplete', total_paused_minutes=15)
+        _job(db_session, day, [a])
+        db_session.session.add_all([
+            WorkPlanJobRating(work_plan_job_id=shared.id, user_id=a.id, time_rating=4, time_rating_override=5,
+                              time_rating_override_approved=True, qc_rating=4, cleaning_rating=2, points_earned=10),
+            WorkPlanJobRating(work_plan_job_id=paused.id, user_id=a.id, time_rating=2, cleaning_rating=0,
+                              points_earned=3),
+            WorkPlanJobRating(work_plan_job_id=shared.id, user_id=b.id, time_rating=3, points_earned=6),
+            WorkPlanPauseRequest(work_plan_job_id=paused.id, requested_by_id=a.id, reason_category='break'),
+            WorkPlanPauseRequest(work_plan_job_id=paused.id, requested_by_id=a.id, reason_category='break'),
+            WorkPlanPerformance(user_id=b.id, period_type='daily', period_start=DAY - timedelta(days=3),
+                                period_end=DAY - timedelta(days=3), current_streak_days=4, max_streak_days=7),
+        ])
+        db_session.session.commit()
+
+        assert PerformanceRollupService.compute_daily(DAY) == 2
+
+        perf_a, perf_b = _perf(a), _perf(b)
+        assert (perf_a.total_jobs_assigned, perf_a.total_jobs_completed, perf_a.total_jobs_incomplete,
+                perf_a.total_jobs_not_started, perf_a.total_jobs_carried_over) == (3, 1, 1, 0, 1)
+        assert (float(perf_a.total_estimated_hours), float(perf_a.total_actual_hours)) == (7.0, 2.5)
+        assert (float(perf_a.avg_time_rating), float(perf_a.avg_qc_rating), float(perf_a.avg_cleaning_rating)) == (
+            3.5, 4.0, 1.0)
+        assert (perf_a.total_points_earned, perf_a.total_pauses, perf_a.total_pause_minutes) == (13, 2, 15)
+        assert (float(perf_a.completion_rate), perf_a.current_streak_days) == (33.33, 0)
+
+        assert (perf_b.total_jobs_assigned, float(perf_b.completion_rate), perf_b.avg_qc_rating) == (1, 100, None)
+        assert (perf_b.current_streak_days, perf_b.max_streak_days, perf_b.total_pauses) == (5, 7, 0)
+        assert Notification.query.filter_by(user_id=b.id, type='streak_milestone').count() == 1
+
+        # Recomputing updates in place
+        WorkPlanJobTracking.query.filter_by(work_plan_job_id=paused.id).one().status = 'completed'
+        db_session.session.commit()
+        PerformanceRollupService.compute_daily(DAY)
+        assert WorkPlanPerformance.query.filter_by(period_type='daily', period_start=DAY).count() == 2
+        assert _perf(a).total_jobs_completed == 2
+
+    def test_query_count_does_not_grow_with_workers(self, db_session, admin_user, count_queries):
+        day = _day(db_session, admin_user)
+        for user in _workers(db_session, 2):
+            _job(db_session, day, [user], 'completed')
+        db_session.session.commit()
+        # Counted on recomputes, so both runs update rather than insert
+        PerformanceRollupService.compute_daily(DAY)
+        small = count_queries(lambda: PerformanceRollupService.compute_daily(DAY))[0]
+
+        for user in _workers(db_session, 8, start=2):
+            _job(db_session, day, [user], 'completed')
+            _job(db_session, day, [user], 'incomplete')
+        db_session.session.commit()
+        PerformanceRollupService.compute_daily(DAY)
+        large = count_queries(lambda: PerformanceRollupService.compute_daily(DAY))[0]
+        assert large == small
+        assert WorkPlanPerformance.query.filter_by(period_type='daily').count() == 10
+
+
+class TestPeriodRollups:
+    def test_week_and_month_follow_the_daily_rows(self, db_session, admin_user):
+        worker, = _workers(db_session, 1)
+        for offset, statuses in ((1, ('completed', 'completed')), (0, ('completed', 'incomplete'))):
+            day = _day(db_session, admin_user, DAY - timedelta(days=offset))
+            for status in statuses:
+                _job(db_session, day, [worker], status, actual_hours=1.5)
+            db_session.session.commit()
+            PerformanceRollupService.compute_daily(day.date)
+
+        week = _perf(worker, 'weekly', date(2026, 3, 9))
+        assert (week.period_end, week.total_jobs_assigned, week.total_jobs_completed) == (date(2026, 3, 15), 4, 3)
+        assert (float(week.total_actual_hours), float(week.completion_rate)) == (6.0, 75.0)
+        assert (week.current_streak_days, week.max_streak_days) == (0, 1)
+        month = _perf(worker, 'monthly', date(2026, 3, 1))
+        assert (month.period_end, month.total_jobs_assigned) == (date(2026, 3, 31), 4)
+
+        # Recomputing a day rebuilds its periods without double counting
+        PerformanceRollupService.compute_daily(DAY)
+        assert _perf(worker, 'weekly', date(2026, 3, 9)).total_jobs_assigned == 4
+
+    def test_heat_map_reads_weekly_cells_over_a_quarter(self, client, db_session, admin_user, engineer):
+        worker, = _workers(db_session, 1)
+        for day_date in (date(2026, 1, 14), date(2026, 2, 18), DAY):
+            _job(db_session, _day(db_session, admin_user, day_date), [worker], 'completed')
+            db_session.session.commit()
+            PerformanceRollupService.compute_daily(day_date)
+
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        resp = client.get('/api/work-plan-tracking/performance/heat-map?period=weekly'
+                          '&start_date=2026-01-01&end_date=2026-03-31', headers=headers)
+        assert resp.status_code == 200
+        row, = resp.get_json()['heat_map']
+        assert list(row['days']) == ['2026-01-12', '2026-02-16', '2026-03-09']
+        assert {cell['color'] for cell in row['days'].values()} == {'green'}
+
+        resp = client.get(f'/api/work-plan-tracking/performance/heat-map?week_start={period_bounds("weekly", DAY)[0]}',
+                          headers=headers)
+        assert list(resp.get_json()['heat_map'][0]['days']) == [DAY.isoformat()]
+
+        resp = client.get('/api/work-plan-tracking/performance/heat-map?period=yearly', headers=headers)
+        assert resp.status_code == 400
+
+    def test_compute_endpoint_rebuilds_a_period(self, client, db_session, admin_user, engineer):
+        worker, = _workers(db_session, 1)
+        _job(db_session, _day(db_session, admin_user), [worker], 'completed')
+        db_session.session.commit()
+        PerformanceRollupService.compute_daily(DAY, rollup=False)
+        assert WorkPlanPerformance.query.filter_by(period_type='monthly').count() == 0
+
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        resp = client.post('/api/work-plan-tracking/performance/compute',
+                           json={'date': DAY.isoformat(), 'period': 'monthly'}, headers=headers)
+        assert resp.status_code == 200
+        assert resp.get_json()['records_computed'] == 1
+        assert _perf(worker, 'monthly', date(2026, 3, 1)).total_jobs_completed == 1
@@ -0,0 +1,107 @@
+"""
+Tests for the equipment reading time series.
+
+Readings load into NumPy arrays for stats and downsampling, and the
+readings history resolves users and photos in batches.
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from tests.conftest import make_equipment, get_auth_header
+from app.models import EquipmentReading
+from app.services.reading_series_service import (
+    ReadingSeriesService, summarize, rolling, lttb, bucket_average,
+)
+
+
+def _readings(db_session, eq, values, users=(None,), start=None):
+    """One rnr reading per day, recorded by the given users in turn."""
+    start = start or date.today() - timedelta(days=len(values))
+    for n, value in enumerate(values):
+        day = start + timedelta(days=n)
+        db_session.session.add(EquipmentReading(
+            equipment_id=eq.id, reading_type='rnr', reading_value=value, reading_date=day,
+            recorded_at=datetime.combine(day, datetime.min.time()) + timedelta(hours=8),
+            recorded_by_id=users[n % len(users)].id if users[0] else None,
+        ))
+    db_session.session.commit()
+
+
+class TestSeriesMath:
+    def test_summarize(self):
+        stats = summarize([10, 10, 10, 20, 20, 20])
+        assert (stats['count'], stats['avg'], stats['min'], stats['max'], stats['latest']) == (6, 15, 10, 20, 20)
+        assert (stats['stddev'], stats['p50'], stats['trend']) == (5, 15, 'increasing')
+        assert summarize([])['count'] == 0
+
+    def test_rolling(self):
+        mean, std = rolling([1, 2, 3, 4], 2)
+        assert mean.tolist() == [1, 1.5, 2.5, 3.5]
+        assert std.tolist() == [0, 0.5, 0.5, 0.5]
+
+    def test_lttb_is_bounded_and_keeps_extremes(self):
+        x = np.arange(1000, dtype=float)
+        y = np.zeros(1000)
+        y[437] = 50
+        kept = lttb(x, y, 20)
+        assert len(kept) == 20
+        assert (kept[0], kept[-1]) == (0, 999)
+        assert 437 in kept
+        assert lttb(x[:10], y[:10], 20).tolist() == list(range(10))
+
+    def test_bucket_average(self):
+        x, y = bucket_average(np.arange(10), np.arange(10) * 2, 5)
+        assert x.tolist() == [0.5, 2.5, 4.5, 6.5, 8.5]
+        assert y.tolist() == [1, 5, 9, 13, 17]
+
+
+class TestReadingSeriesService:
+    def test_series_downsamples_but_stats_cover_range(self, db_session):
+        eq = make_equipment(db_session)
+        _readings(db_session, eq, [float(n) for n in range(300)])
+
+        data = ReadingSeriesService.get_series(eq.id, 'rnr', max_points=50, window=7)
+        assert (data['count'], data['downsampled'], len(data['points'])) == (300, True, 50)
+        assert (data['stats']['min'], data['stats']['max']) == (0, 299)
+        assert data['points'][0]['value'] == 0 and data['points'][-1]['value'] == 299
+        assert data['points'][-1]['rolling_mean'] == 296
+
+        data = ReadingSeriesService.get_series(eq.id, 'rnr', max_points=30, method='bucket')
+        assert len(data['points']) == 30 and 'id' not in data['points'][0]
+
+
+class TestReadingEndpoints:
+    def test_history_resolves_users_in_one_query(self, client, db_session, admin_user, mech_inspector, count_queries):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        small, large = make_equipment(db_session, 'Small', 'S-1'), make_equipment(db_session, 'Large', 'L-1')
+        _readings(db_session, small, [1, 2], users=[admin_user])
+        _readings(db_session, large, [float(n) for n in range(12)], users=[admin_user, mech_inspector])
+
+        def fetch(eq):
+            return client.get(f'/api/equipment/{eq.id}/readings-history', headers=headers)
+
+        assert count_queries(lambda: fetch(small))[0] == count_queries(lambda: fetch(large))[0]
+        group, = fetch(large).get_json()['data']['reading_groups']
+        assert [p['recorded_by'] for p in group['readings'][:2]] == ['Test Admin', mech_inspector.full_name]
+        assert group['stats']['p90'] == 9.9
+
+        group, = client.get(f'/api/equipment/{large.id}/readings-history?max_points=5',
+                            headers=headers).get_json()['data']['reading_groups']
+        assert (len(group['readings']), group['total_count'], group['downsampled']) == (5, 12, True)
+
+    def test_series_and_stats_endpoints(self, client, db_session, admin_user):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        eq = make_equipment(db_session)
+        _readings(db_session, eq, [float(n) for n in range(40)], start=date.today() - timedelta(days=400))
+
+        resp = client.get(f'/api/equipment/{eq.id}/readings/rnr/series?days=730&max_points=10', headers=headers)
+        data = resp.get_json()['data']
+        assert (data['count'], len(data['points'])) == (40, 10)
+
+        resp = client.get(f'/api/equipment/{eq.id}/readings/rnr/series?start=nope', headers=headers)
+        assert resp.status_code == 400
+
+        stats = client.get(f'/api/equipment/{eq.id}/reading-stats/rnr?days=500', headers=headers).get_json()['data']
+        assert (stats['count'], stats['avg'], stats['last_value']) == (40, 19.5, 39)
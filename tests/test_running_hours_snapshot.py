@@ -0,0 +1,139 @@
+"""
+Tests for running hours snapshots.
+
+Reading and service writes refresh the equipment's RunningHoursSnapshot in
+the same transaction, and the dashboard endpoints read snapshots with one
+scan whose statement count does not grow with the fleet.
+"""
+
+from datetime import date, datetime, timedelta
+
+from tests.conftest import make_equipment, get_auth_header
+from app.extensions import db
+from app.models import (
+    RunningHoursReading, RunningHoursSnapshot, ServiceInterval, EquipmentReading,
+    ChecklistTemplate, ChecklistItem, Inspection, InspectionAnswer,
+)
+from app.services.running_hours_snapshot_service import RunningHoursSnapshotService
+
+
+def _fleet(db_session, count, start=0, interval=None):
+    """Equipment with one manual reading each (100, 200, ... hours)."""
+    fleet = [make_equipment(db_session, f'RH Pump {n:02d}', f'RH-{n:02d}') for n in range(start, start + count)]
+    for n, eq in enumerate(fleet, start=1):
+        db_session.session.add(RunningHoursReading(
+            equipment_id=eq.id, hours=100.0 * n, recorded_by_id=1,
+            recorded_at=datetime.utcnow() - timedelta(days=1),
+        ))
+        if interval:
+            db_session.session.add(ServiceInterval(
+                equipment_id=eq.id, service_interval_hours=interval,
+                alert_threshold_hours=100, next_service_hours=interval,
+            ))
+    db_session.session.commit()
+    return fleet
+
+
+def _snapshot(eq):
+    db.session.expire_all()
+    return RunningHoursSnapshot.query.filter_by(equipment_id=eq.id).one()
+
+
+class TestSnapshotMaintenance:
+    def test_writes_refresh_snapshot(self, client, db_session, admin_user):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        eq = make_equipment(db_session)
+        db_session.session.commit()
+
+        resp = client.post(f'/api/equipment/{eq.id}/running-hours', json={'hours': 480}, headers=headers)
+        assert resp.status_code == 201
+        snapshot = _snapshot(eq)
+        assert (snapshot.current_hours, snapshot.reading_source, snapshot.service_status) == (
+            480, 'running_hours_reading', 'ok')
+        assert snapshot.last_reading['recorded_by']['full_name'] == 'Test Admin'
+
+        client.patch(f'/api/equipment/{eq.id}/service-interval',
+                     json={'service_interval_hours': 500, 'last_service_hours': 0}, headers=headers)
+        snapshot = _snapshot(eq)
+        assert (snapshot.service_status, snapshot.hours_until_service, snapshot.progress_percent) == (
+            'approaching', 20, 96.0)
+
+        client.post(f'/api/equipment/{eq.id}/running-hours', json={'hours': 510}, headers=headers)
+        snapshot = _snapshot(eq)
+        assert (snapshot.service_status, snapshot.hours_overdue) == ('overdue', 10)
+        assert snapshot.last_reading['hours_since_last'] == 30
+
+        client.post(f'/api/equipment/{eq.id}/service-interval/reset',
+                    json={'hours_at_service': 510}, headers=headers)
+        snapshot = _snapshot(eq)
+        assert (snapshot.service_status, snapshot.next_service_hours) == ('ok', 1010)
+
+    def test_latest_source_wins(self, db_session, admin_user):
+        eq, = _fleet(db_session, 1)
+        template = ChecklistTemplate(name='RH', equipment_type='centrifugal_pump', version='1.0')
+        db_session.session.add(template)
+        db_session.session.flush()
+        item = ChecklistItem(template_id=template.id, question_text='Running hours meter',
+                             answer_type='numeric', order_index=1)
+        inspection = Inspection(equipment_id=eq.id, template_id=template.id,
+                                technician_id=admin_user.id, status='submitted')
+        db_session.session.add_all([item, inspection])
+        db_session.session.flush()
+        db_session.session.add(EquipmentReading(
+            equipment_id=eq.id, reading_type='rnr', reading_value=150, reading_date=date.today(),
+            recorded_at=datetime.utcnow() - timedelta(hours=2),
+        ))
+        RunningHoursSnapshotService.refresh([eq.id])
+        db_session.session.commit()
+        assert (_snapshot(eq).reading_source, _snapshot(eq).current_hours) == ('equipment_reading', 150)
+
+        db_session.session.add(InspectionAnswer(inspection_id=inspection.id, checklist_item_id=item.id,
+                                                answer_value='1,175', answered_at=datetime.utcnow()))
+        RunningHoursSnapshotService.refresh([eq.id])
+        db_session.session.commit()
+        snapshot = _snapshot(eq)
+        assert (snapshot.reading_source, snapshot.current_hours) == ('inspection_answer', 1175)
+        assert snapshot.last_reading['inspection_id'] == inspection.id
+
+
+class TestDashboard:
+    def test_list_filters_sorts_and_pages_in_sql(self, client, db_session, admin_user):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        _fleet(db_session, 5, interval=480)  # 100..500 hours → ok, ok, ok, approaching, overdue
+
+        resp = client.get('/api/equipment/running-hours?sort_by=due&per_page=2', headers=headers)
+        body = resp.get_json()
+        assert body['pagination'] == {'page': 1, 'per_page': 2, 'total': 5, 'pages': 3}
+        assert [d['current_hours'] for d in body['data']] == [500, 400]
+        assert body['data'][0]['service_interval']['next_service_hours'] == 480
+
+        resp = client.get('/api/equipment/running-hours?status=ok&sort_by=hours&search=RH Pump', headers=headers)
+        assert [d['current_hours'] for d in resp.get_json()['data']] == [300, 200, 100]
+
+        resp = client.get('/api/equipment/running-hours?sort_by=urgency', headers=headers)
+        assert [d['service_status'] for d in resp.get_json()['data']] == [
+            'overdue', 'approaching', 'ok', 'ok', 'ok']
+
+    def test_summary_and_service_due(self, client, db_session, admin_user):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+        _fleet(db_session, 5, interval=480)
+        make_equipment(db_session, 'RH Idle', 'RH-IDLE')
+        db_session.session.commit()
+
+        summary = client.get('/api/equipment/running-hours/summary', headers=headers).get_json()['data']
+        assert (summary['total_equipment'], summary['with_running_hours'], summary['avg_hours']) == (6, 5, 300)
+        assert (summary['ok_count'], summary['approaching_count'], summary['overdue_count']) == (4, 1, 1)
+
+        due = client.get('/api/equipment/service-due', headers=headers).get_json()['data']
+        assert [(d['service_status'], d['urgency_score']) for d in due] == [
+            ('approaching', 80), ('overdue', 20)]
+
+    def test_list_query_count_is_constant(self, client, db_session, admin_user, count_queries):
+        headers = get_auth_header(client, 'admin@test.com', 'admin123')
+
+        def run(start, count):
+            _fleet(db_session, count, start=start)
+            client.get('/api/equipment/running-hours', headers=headers)  # backfills new snapshots
+            return count_queries(lambda: client.get('/api/equipment/running-hours', headers=headers))[0]
+
+        assert run(0, 2) == run(10, 6)
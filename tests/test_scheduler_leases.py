@@ -0,0 +1,98 @@
+"""
+Tests for scheduler coordination.
+
+Only the holder of the 'leader' lease runs scheduled jobs, and a job lease
+turns an overlapping run into a recorded skip.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import SchedulerLease, SchedulerJobRun
+from app.services.scheduler_lease_service import (
+    SchedulerLeader, try_acquire, release, run_job, prune_runs, LEADER_LEASE,
+)
+
+
+class TestLeases:
+    def test_lease_is_exclusive_until_expiry(self, db_session):
+        assert try_acquire('job:x', 60, owner='a')
+        assert not try_acquire('job:x', 60, owner='b')
+        assert try_acquire('job:x', 60, owner='a'), 'holder can renew'
+
+        lease = db.session.get(SchedulerLease, 'job:x')
+        lease.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        db.session.commit()
+
+        assert try_acquire('job:x', 60, owner='b')
+        db.session.expire_all()
+        assert db.session.get(SchedulerLease, 'job:x').owner == 'b'
+
+    def test_release_only_by_holder(self, db_session):
+        try_acquire('job:y', 60, owner='a')
+        release('job:y', owner='b')
+        assert not try_acquire('job:y', 60, owner='b')
+        release('job:y', owner='a')
+        assert try_acquire('job:y', 60, owner='b')
+
+    def test_single_leader(self, db_session):
+        first = SchedulerLeader(ttl_seconds=90, owner='worker-1')
+        second = SchedulerLeader(ttl_seconds=90, owner='worker-2')
+
+        assert first.heartbeat()
+        assert not second.heartbeat()
+        assert first.is_leader() and not second.is_leader()
+
+        release(LEADER_LEASE, owner='worker-1')
+        assert second.heartbeat()
+        assert not first.heartbeat()
+        assert second.is_leader() and not first.is_leader()
+
+
+class TestRunJob:
+    def test_success_records_duration_and_rows(self, db_session):
+        assert run_job('count_things', lambda: 42, owner='w') == 'success'
+
+        run = SchedulerJobRun.query.one()
+        assert (run.job_id, run.status, run.row_count) == ('count_things', 'success', 42)
+        assert run.duration_ms >= 0 and run.finished_at is not None
+        assert try_acquire('job:count_things', 60, owner='other'), 'lease released after the run'
+
+    def test_failure_is_recorded(self, db_session):
+        def broken():
+            raise RuntimeError('no table')
+
+        assert run_job('broken', broken, owner='w') == 'failed'
+        run = SchedulerJobRun.query.one()
+        assert (run.status, run.error, run.row_count) == ('failed', 'no table', None)
+
+    def test_overlapping_run_is_skipped(self, db_session):
+        calls = []
+        try_acquire('job:slow', 3600, owner='still-running')
+
+        assert run_job('slow', lambda: calls.append(1), owner='w') == 'skipped'
+        assert calls == []
+        assert SchedulerJobRun.query.one().status == 'skipped'
+
+    def test_lease_is_renewed_while_the_job_runs(self, db_session):
+        taken_mid_run = []
+
+        def long_job():
+            # Outlives the 0.6s lease; renewals every 0.2s keep it held
+            time.sleep(0.9)
+            taken_mid_run.append(try_acquire('job:long', 60, owner='other'))
+
+        assert run_job('long', long_job, lease_seconds=0.6, owner='w') == 'success'
+        assert taken_mid_run == [False]
+        assert try_acquire('job:long', 60, owner='other')
+
+    def test_prune_keeps_recent_runs(self, db_session):
+        db.session.add_all([
+            SchedulerJobRun(job_id='old', owner='w', status='success',
+                            started_at=datetime.utcnow() - timedelta(days=40)),
+            SchedulerJobRun(job_id='new', owner='w', status='success'),
+        ])
+        db.session.commit()
+        assert prune_runs(keep_days=30) == 1
+        assert [r.job_id for r in SchedulerJobRun.query.all()] == ['new']
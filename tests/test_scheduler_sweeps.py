@@ -0,0 +1,227 @@
+"""
+Tests for the set-based scheduler sweeps.
+
+Red zone alerts, morning briefings, inspection overdue penalties and stalled
+job notices are computed with grouped queries and written in bulk; the
+number of statements a run issues must not grow with the data.
+"""
+
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.dialects import postgresql
+
+from tests.conftest import make_equipment
+from app.models import (
+    User, WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, WorkPlanJobTracking,
+    Notification, InspectionAssignment, ChecklistTemplate, Inspection, Defect, SpecialistJob,
+)
+from app.models.inspection_list import InspectionList
+from app.models.user_level import UserLevel
+from app.models.work_plan_job_log import WorkPlanJobLog
+from app.models.work_plan_performance import WorkPlanPerformance
+from app.services.sweep_service import SweepService
+
+
+def _workers(db_session, count, role='specialist', start=0):
+    users = []
+    for n in range(start, start + count):
+        user = User(email=f'sweep{n}@test.com', full_name=f'Sweep Worker {n}', role=role,
+                    role_id=f'SWP{n:03d}', shift='day')
+        user.set_password('test123')
+        users.append(user)
+    db_session.session.add_all(users)
+    db_session.session.flush()
+    return users
+
+
+def _today_jobs(db_session, owner, workers, started_hours_ago=3.0, carry_over=False):
+    """One in-progress 2h job per worker on today's plan."""
+    today = date.today()
+    plan = WorkPlan.query.first()
+    if plan is None:
+        plan = WorkPlan(week_start=today, week_end=today + timedelta(days=6),
+                        status='published', created_by_id=owner.id)
+        db_session.session.add(plan)
+        db_session.session.flush()
+        db_session.session.add(WorkPlanDay(work_plan_id=plan.id, date=today))
+        db_session.session.flush()
+    day = WorkPlanDay.query.filter_by(work_plan_id=plan.id, date=today).one()
+    eq = make_equipment(db_session, f'Sweep Pump {len(workers)}-{WorkPlanJob.query.count()}',
+                        f'SWP-{WorkPlanJob.query.count()}')
+
+    jobs = []
+    for worker in workers:
+        job = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', equipment_id=eq.id,
+                          estimated_hours=2.0, description=f'Job for {worker.full_name}')
+        db_session.session.add(job)
+        db_session.session.flush()
+        db_session.session.add(WorkPlanAssignment(work_plan_job_id=job.id, user_id=worker.id))
+        db_session.session.add(WorkPlanJobTracking(
+            work_plan_job_id=job.id, status='in_progress', is_carry_over=carry_over,
+            started_at=datetime.utcnow() - timedelta(hours=started_hours_ago),
+        ))
+        jobs.append(job)
+    db_session.session.commit()
+    return jobs
+
+
+def _overdue_assignments(db_session, mech, elec, count, days_ago=3):
+    eq = make_equipment(db_session, f'Overdue Pump {count}', f'OVD-{count}')
+    template = ChecklistTemplate(name='Sweep', equipment_type='centrifugal_pump',
+                                 version=f'1.{ChecklistTemplate.query.count()}')
+    il = InspectionList(shift='day', target_date=date.today() - timedelta(days=days_ago))
+    db_session.session.add_all([template, il])
+    db_session.session.flush()
+    assignments = [
+        InspectionAssignment(inspection_list_id=il.id, equipment_id=eq.id, template_id=template.id,
+                             mechanical_inspector_id=mech.id, electrical_inspector_id=elec.id,
+                             shift='day', status='assigned')
+        for _ in range(count)
+    ]
+    db_session.session.add_all(assignments)
+    db_session.session.commit()
+    return assignments
+
+
+def _stalled_jobs(db_session, owner, specialist, count, start=0):
+    eq = make_equipment(db_session, f'Stalled Pump {start}', f'STL-{start}')
+    template = ChecklistTemplate(name='Stalled', equipment_type='centrifugal_pump',
+                                 version=f'1.{ChecklistTemplate.query.count()}')
+    db_session.session.add(template)
+    db_session.session.flush()
+    inspection = Inspection(equipment_id=eq.id, template_id=template.id,
+                            technician_id=owner.id, status='submitted')
+    db_session.session.add(inspection)
+    db_session.session.flush()
+    defect = Defect(inspection_id=inspection.id, description='Leak', severity='high',
+                    status='open', due_date=date.today())
+    db_session.session.add(defect)
+    db_session.session.flush()
+    jobs = [
+        SpecialistJob(universal_id=900 + n, job_id=f'SPE-STL-{n}', specialist_id=specialist.id,
+                      assigned_by=owner.id, defect_id=defect.id, status='paused',
+                      paused_at=datetime.utcnow() - timedelta(days=4))
+        for n in range(start, start + count)
+    ]
+    db_session.session.add_all(jobs)
+    db_session.session.commit()
+    return jobs
+
+
+class TestRedZone:
+    def test_alerts_owner_once_per_job(self, db_session, admin_user):
+        workers = _workers(db_session, 2)
+        late, = _today_jobs(db_session, admin_user, workers[:1], started_hours_ago=1.8)
+        _today_jobs(db_session, admin_user, workers[1:], started_hours_ago=0.5)
+
+        assert SweepService.check_red_zone() == 1
+        assert SweepService.check_red_zone() == 0, 'already flagged'
+
+        alert = Notification.query.filter_by(type='red_zone_alert').one()
+        assert (alert.user_id, alert.related_id, alert.priority) == (admin_user.id, late.id, 'urgent')
+        assert '(1.8h / 2.0h)' in alert.message
+        log = WorkPlanJobLog.query.filter_by(event_type='auto_flagged').one()
+        assert log.event_data == {'type': 'red_zone', 'working_hours': 1.8}
+
+
+class TestMorningNotifications:
+    def test_counts_are_per_worker(self, db_session, admin_user):
+        first, second = _workers(db_session, 2)
+        _today_jobs(db_session, admin_user, [first, second])
+        _today_jobs(db_session, admin_user, [first], carry_over=True)
+        db_session.session.add(WorkPlanPerformance(
+            user_id=first.id, period_type='daily', period_start=date.today() - timedelta(days=1),
+            period_end=date.today() - timedelta(days=1), completion_rate=75,
+        ))
+        db_session.session.commit()
+
+        assert SweepService.send_morning_notifications() == 2
+
+        messages = {n.user_id: n.message for n in Notification.query.filter_by(type='morning_briefing')}
+        assert messages[first.id] == 'Today: 2 jobs assigned (1 carry-over). Yesterday: 75.00% completion'
+        assert messages[second.id] == 'Today: 1 jobs assigned'
+
+
+class TestInspectionPenalties:
+    def test_penalty_applied_once_per_inspector(self, db_session, mech_inspector, elec_inspector):
+        db_session.session.add_all([UserLevel(user_id=mech_inspector.id, avg_rating=4.0),
+                                    UserLevel(user_id=elec_inspector.id, avg_rating=3.0)])
+        done_mech, open_both = _overdue_assignments(db_session, mech_inspector, elec_inspector, 2)
+        done_mech.mech_completed_at = datetime.utcnow()
+        db_session.session.commit()
+        _overdue_assignments(db_session, mech_inspector, elec_inspector, 1, days_ago=1)
+
+        assert SweepService.apply_inspection_overdue_penalties() == 3
+        assert SweepService.apply_inspection_overdue_penalties() == 0
+
+        db_session.session.expire_all()
+        levels = {l.user_id: l.avg_rating for l in UserLevel.query}
+        assert levels == {mech_inspector.id: 3.75, elec_inspector.id: 2.5}
+        assert (open_both.mech_penalty_applied, open_both.elec_penalty_applied) == (True, True)
+        assert not done_mech.mech_penalty_applied
+        penalties = Notification.query.filter_by(type='inspection_penalty').all()
+        assert sorted(n.user_id for n in penalties) == sorted(
+            [mech_inspector.id, elec_inspector.id, elec_inspector.id])
+        assert all(n.title_ar and n.message_ar for n in penalties)
+
+    def test_rating_update_compiles_for_postgres(self):
+        # avg_rating is double precision there and round(double precision, int) does not exist
+        sql = str(SweepService._penalty_update([1, 2], 2).compile(dialect=postgresql.dialect()))
+        assert 'round(CAST(coalesce(user_levels.avg_rating, ' in sql
+        assert 'AS NUMERIC(10, 2)), ' in sql
+
+
+class TestStalledJobs:
+    def test_specialists_told_once_per_pause(self, db_session, admin_user, specialist):
+        other, = _workers(db_session, 1)
+        job, = _stalled_jobs(db_session, admin_user, specialist, 1)
+
+        assert SweepService.notify_stalled_jobs() == 2
+        assert SweepService.notify_stalled_jobs() == 0
+
+        notices = Notification.query.filter_by(type='stalled_job_available').all()
+        assert sorted(n.user_id for n in notices) == sorted([specialist.id, other.id])
+        assert notices[0].message == f'specialist job #{job.id} is available for takeover'
+
+        # Paused again later: a new pause is announced again
+        job.paused_at = datetime.utcnow()
+        db_session.session.commit()
+        assert SweepService.notify_stalled_jobs(now=datetime.utcnow() + timedelta(days=3, minutes=1)) == 2
+
+
+class TestQueryCountIsConstant:
+    """Each sweep issues the same number of statements at 2 and 6 rows."""
+
+    def test_red_zone(self, db_session, admin_user, count_queries):
+        def run(start, count):
+            _today_jobs(db_session, admin_user, _workers(db_session, count, start=start), started_hours_ago=2)
+            return count_queries(SweepService.check_red_zone)[0]
+
+        assert run(0, 2) == run(10, 6)
+        assert Notification.query.filter_by(type='red_zone_alert').count() == 8
+
+    def test_morning_notifications(self, db_session, admin_user, count_queries):
+        def run(start, count):
+            _today_jobs(db_session, admin_user, _workers(db_session, count, start=start))
+            return count_queries(SweepService.send_morning_notifications)[0]
+
+        assert run(0, 2) == run(10, 6)
+        assert Notification.query.filter_by(type='morning_briefing').count() == 2 + 8
+
+    def test_inspection_penalties(self, db_session, mech_inspector, elec_inspector, count_queries):
+        db_session.session.add_all([UserLevel(user_id=mech_inspector.id, avg_rating=4.0),
+                                    UserLevel(user_id=elec_inspector.id, avg_rating=4.0)])
+
+        def run(count):
+            _overdue_assignments(db_session, mech_inspector, elec_inspector, count)
+            return count_queries(SweepService.apply_inspection_overdue_penalties)[0]
+
+        assert run(2) == run(6)
+
+    def test_stalled_jobs(self, db_session, admin_user, specialist, count_queries):
+        def run(start, count):
+            _workers(db_session, count, start=start)
+            _stalled_jobs(db_session, admin_user, specialist, count, start=start)
+            return count_queries(SweepService.notify_stalled_jobs)[0]
+
+        assert run(0, 2) == run(10, 6)
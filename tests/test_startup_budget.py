@@ -0,0 +1,34 @@
+"""
+Tests for app startup cost.
+
+Building the app must not import AI provider SDKs or the heavy data/report
+libraries; they load on first use. Boot time and peak RSS are measured in a
+fresh interpreter and kept under a budget (override with
+STARTUP_BUDGET_SECONDS / STARTUP_BUDGET_RSS_MB on slow machines).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from benchmark_startup import measure  # noqa: E402
+
+BUDGET_SECONDS = float(os.environ.get('STARTUP_BUDGET_SECONDS', 10))
+BUDGET_RSS_MB = float(os.environ.get('STARTUP_BUDGET_RSS_MB', 200))
+
+
+class TestStartupBudget:
+    def test_create_app_stays_lean(self):
+        result = measure('testing')
+        assert result['heavy_modules'] == []
+        assert result['seconds'] < BUDGET_SECONDS, result
+        assert result['max_rss_mb'] < BUDGET_RSS_MB, result
+
+    def test_services_resolve_on_first_use(self):
+        import app.services as services
+        from app.services import DefectAIService, SLATracker
+
+        assert DefectAIService.__module__ == 'app.services.defect_ai_service'
+        assert services.SLATracker is SLATracker
+        assert set(services.__all__) <= set(dir(services))
@@ -0,0 +1,267 @@
+"""
+Tests for the offline sync replay engine.
+
+Items queued through /api/sync are claimed in batches, replayed per entity
+type in bulk and given one outcome each (applied / conflict / failed).
+"""
+
+from datetime import datetime, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.extensions import db
+from app.models import (
+    SyncQueue, Inspection, InspectionAnswer, ChecklistTemplate, ChecklistItem, Notification,
+)
+from app.api import sync as sync_api
+from app.services import sync_replay_service
+from app.services.sync_replay_service import SyncReplayService
+
+
+def _draft_inspection(db_session, inspector, items=3):
+    eq = make_equipment(db_session, 'Sync Pump', 'SYNC-1')
+    template = ChecklistTemplate(name='Sync', equipment_type='centrifugal_pump', version='1.0')
+    db_session.session.add(template)
+    db_session.session.flush()
+    checklist_items = []
+    for n in range(items):
+        ci = ChecklistItem(template_id=template.id, question_text=f'Q{n}',
+                           answer_type='pass_fail', order_index=n)
+        db_session.session.add(ci)
+        checklist_items.append(ci)
+    inspection = Inspection(equipment_id=eq.id, template_id=template.id,
+                            technician_id=inspector.id, status='draft')
+    db_session.session.add(inspection)
+    db_session.session.commit()
+    return inspection, checklist_items
+
+
+def _queue(db_session, user, entity_type, entity_data, key=None):
+    item = SyncQueue(user_id=user.id, entity_type=entity_type,
+                     entity_data=entity_data, idempotency_key=key)
+    db_session.session.add(item)
+    db_session.session.commit()
+    return item
+
+
+class TestIdempotentSubmit:
+    def test_resend_with_same_key_is_not_queued_twice(self, client, mech_inspector, db_session):
+        headers = get_auth_header(client, 'mech@test.com', 'test123')
+        body = {'entity_type': 'notification_read', 'entity_data': {'notification_id': 1},
+                'idempotency_key': 'k-1'}
+
+        first = client.post('/api/sync', headers=headers, json=body)
+        again = client.post('/api/sync', headers=headers, json=body)
+
+        assert first.status_code == 201
+        assert again.status_code == 200
+        assert again.get_json()['data']['duplicate'] is True
+        assert again.get_json()['data']['id'] == first.get_json()['data']['id']
+        assert SyncQueue.query.count() == 1
+
+    def test_batch_skips_known_and_repeated_keys(self, client, mech_inspector, db_session):
+        headers = get_auth_header(client, 'mech@test.com', 'test123')
+        _queue(db_session, mech_inspector, 'notification_read', {'notification_id': 1}, key='old')
+
+        resp = client.post('/api/sync/batch', headers=headers, json={'items': [
+            {'entity_type': 'notification_read', 'entity_data': {'notification_id': 1}, 'idempotency_key': 'old'},
+            {'entity_type': 'notification_read', 'entity_data': {'notification_id': 2}, 'idempotency_key': 'new'},
+            {'entity_type': 'notification_read', 'entity_data': {'notification_id': 2}, 'idempotency_key': 'new'},
+            {'entity_type': 'notification_read', 'entity_data': {'notification_id': 3}},
+        ]})
+        data = resp.get_json()['data']
+
+        assert data['submitted'] == 2
+        assert [d['idempotency_key'] for d in data['duplicates']] == ['old', 'new']
+        # The repeat points at the copy queued earlier in the same batch
+        assert data['duplicates'][1]['id'] == data['ids'][0]
+        assert SyncQueue.query.count() == 3
+
+
+    def test_concurrent_resend_answers_with_first_item(self, client, mech_inspector, db_session, monkeypatch):
+        headers = get_auth_header(client, 'mech@test.com', 'test123')
+        first = _queue(db_session, mech_inspector, 'notification_read', {'notification_id': 1}, key='race')
+        batch_first = _queue(db_session, mech_inspector, 'notification_read', {'notification_id': 2}, key='race-2')
+
+        # Both requests passed the existence check before either committed
+        existing_by_key = sync_api._existing_by_key
+        calls = []
+
+        def missed_first_lookup(user_id, keys):
+            calls.append(keys)
+            return {} if len(calls) == 1 else existing_by_key(user_id, keys)
+
+        monkeypatch.setattr(sync_api, '_existing_by_key', missed_first_lookup)
+        resp = client.post('/api/sync', headers=headers, json={
+            'entity_type': 'notification_read', 'entity_data': {'notification_id': 1}, 'idempotency_key': 'race'})
+        assert resp.status_code == 200
+        assert (resp.get_json()['data']['id'], resp.get_json()['data']['duplicate']) == (first.id, True)
+
+        calls.clear()
+        resp = client.post('/api/sync/batch', headers=headers, json={'items': [
+            {'entity_type': 'notification_read', 'entity_data': {'notification_id': 2}, 'idempotency_key': 'race-2'},
+            {'entity_type': 'notification_read', 'entity_data': {'notification_id': 3}, 'idempotency_key': 'fresh'},
+        ]})
+        data = resp.get_json()['data']
+        assert (resp.status_code, data['submitted']) == (201, 1)
+        assert [d['id'] for d in data['duplicates']] == [batch_first.id]
+        assert SyncQueue.query.count() == 3
+
+
+class TestReplay:
+    def test_answers_replayed_with_per_item_outcomes(self, client, mech_inspector, db_session):
+        inspection, (q1, q2, q3) = _draft_inspection(db_session, mech_inspector)
+        now = datetime.utcnow()
+        # Server copy of q3 was answered after the client's offline edit
+        db_session.session.add(InspectionAnswer(inspection_id=inspection.id, checklist_item_id=q3.id,
+                                                answer_value='pass', answered_at=now))
+        db_session.session.commit()
+
+        ok = _queue(db_session, mech_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q1.id, 'answer_value': 'fail',
+            'comment': 'Seal leaking', 'answered_at': (now - timedelta(minutes=5)).isoformat(),
+        })
+        bad = _queue(db_session, mech_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q2.id, 'answer_value': 'maybe',
+        })
+        stale = _queue(db_session, mech_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q3.id, 'answer_value': 'fail',
+            'answered_at': (now - timedelta(hours=1)).isoformat() + 'Z',
+        })
+        unknown = _queue(db_session, mech_inspector, 'job_timer', {'job_id': 1, 'event': 'start'})
+
+        headers = get_auth_header(client, 'mech@test.com', 'test123')
+        resp = client.post('/api/sync/process', headers=headers)
+        data = resp.get_json()['data']
+
+        assert resp.status_code == 200
+        assert (data['applied'], data['conflict'], data['failed']) == (1, 1, 2)
+        outcomes = {i['id']: i for i in data['items']}
+        assert outcomes[ok.id]['status'] == 'applied'
+        assert outcomes[ok.id]['synced_at'] is not None
+        assert outcomes[bad.id]['sync_error'] == "Answer must be 'pass' or 'fail'"
+        assert outcomes[stale.id]['result']['reason'] == 'answer_changed_on_server'
+        assert outcomes[stale.id]['result']['server_value'] == 'pass'
+        assert 'Unsupported entity type' in outcomes[unknown.id]['sync_error']
+
+        answer = db.session.get(InspectionAnswer, outcomes[ok.id]['result']['answer_id'])
+        assert (answer.answer_value, answer.comment) == ('fail', 'Seal leaking')
+        assert InspectionAnswer.query.filter_by(checklist_item_id=q3.id).one().answer_value == 'pass'
+
+        pending = client.get('/api/sync/pending', headers=headers).get_json()['data']
+        assert pending == []
+        listed = client.get(f'/api/sync/outcomes?ids={ok.id},{stale.id}', headers=headers).get_json()['data']
+        assert [i['status'] for i in listed] == ['applied', 'conflict']
+
+    def test_submitted_inspection_is_a_conflict(self, mech_inspector, db_session):
+        inspection, (q1, _, _) = _draft_inspection(db_session, mech_inspector)
+        inspection.status = 'submitted'
+        db_session.session.commit()
+        item = _queue(db_session, mech_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q1.id, 'answer_value': 'pass',
+        })
+
+        SyncReplayService.process_pending()
+
+        assert item.status == 'conflict'
+        assert item.result == {'reason': 'inspection_not_draft', 'server_status': 'submitted'}
+        assert InspectionAnswer.query.count() == 0
+
+    def test_other_users_inspection_fails(self, mech_inspector, elec_inspector, db_session):
+        inspection, (q1, _, _) = _draft_inspection(db_session, mech_inspector)
+        item = _queue(db_session, elec_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q1.id, 'answer_value': 'pass',
+        })
+        SyncReplayService.process_pending()
+        assert item.status == 'failed'
+        assert item.sync_error == 'You can only answer your own inspections'
+
+    def test_notification_reads(self, mech_inspector, elec_inspector, db_session):
+        mine = [Notification(user_id=mech_inspector.id, type='info', title='t', message='m') for _ in range(2)]
+        theirs = Notification(user_id=elec_inspector.id, type='info', title='t', message='m')
+        db_session.session.add_all(mine + [theirs])
+        db_session.session.commit()
+
+        item = _queue(db_session, mech_inspector, 'notification_read',
+                      {'notification_ids': [mine[0].id, mine[1].id, theirs.id]})
+        SyncReplayService.process_pending()
+
+        assert item.status == 'applied'
+        assert item.result['missing'] == [theirs.id]
+        db_session.session.expire_all()
+        assert all(n.is_read for n in mine)
+        assert not theirs.is_read
+
+    def test_malformed_item_fails_alone(self, mech_inspector, db_session):
+        inspection, (q1, q2, _) = _draft_inspection(db_session, mech_inspector)
+        note = Notification(user_id=mech_inspector.id, type='info', title='t', message='m')
+        db_session.session.add(note)
+        db_session.session.commit()
+        good_read = _queue(db_session, mech_inspector, 'notification_read', {'notification_id': note.id})
+        bad_read = _queue(db_session, mech_inspector, 'notification_read', {'notification_id': 'abc'})
+        good_answer = _queue(db_session, mech_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q1.id, 'answer_value': 'pass',
+        })
+        bad_answer = _queue(db_session, mech_inspector, 'inspection_answer', {
+            'inspection_id': inspection.id, 'checklist_item_id': q2.id, 'answer_value': 'pass',
+            'urgency_level': 'high',
+        })
+
+        SyncReplayService.process_pending()
+
+        assert [good_read.status, bad_read.status] == ['applied', 'failed']
+        assert [good_answer.status, bad_answer.status] == ['applied', 'failed']
+        assert 'integers' in bad_read.sync_error and 'integers' in bad_answer.sync_error
+        db_session.session.expire_all()
+        assert note.is_read
+        assert InspectionAnswer.query.count() == 1
+
+    def test_query_count_independent_of_batch_size(self, mech_inspector, db_session, count_queries):
+        inspection, checklist_items = _draft_inspection(db_session, mech_inspector, items=30)
+
+        def replay(items):
+            for ci in items:
+                _queue(db_session, mech_inspector, 'inspection_answer', {
+                    'inspection_id': inspection.id, 'checklist_item_id': ci.id, 'answer_value': 'pass',
+                })
+            statements = []
+            count_queries(SyncReplayService.process_pending, statements)
+            return len([s for s in statements if s.lstrip().upper().startswith('SELECT')])
+
+        assert replay(checklist_items[:3]) == replay(checklist_items[3:])
+        assert InspectionAnswer.query.count() == 30
+
+
+class TestClaiming:
+    def test_claimed_items_are_not_claimed_again(self, mech_inspector, db_session):
+        for n in range(3):
+            _queue(db_session, mech_inspector, 'notification_read', {'notification_id': n + 1})
+
+        first = SyncReplayService.claim_batch(limit=2)
+        second = SyncReplayService.claim_batch(limit=2)
+
+        assert len(first) == 2 and len(second) == 1
+        assert not {i.id for i in first} & {i.id for i in second}
+        assert all(i.status == 'processing' and i.attempts == 1 for i in first + second)
+
+    def test_abandoned_claims_are_released(self, mech_inspector, db_session):
+        item = _queue(db_session, mech_inspector, 'notification_read', {'notification_id': 1})
+        SyncReplayService.claim_batch()
+        item.claimed_at = datetime.utcnow() - timedelta(hours=1)
+        db_session.session.commit()
+
+        reclaimed = SyncReplayService.claim_batch()
+        assert [i.id for i in reclaimed] == [item.id]
+        assert reclaimed[0].attempts == 2
+
+    def test_handler_crash_leaves_items_pending(self, mech_inspector, db_session, monkeypatch):
+        def explode(items):
+            raise RuntimeError('boom')
+
+        monkeypatch.setitem(sync_replay_service._handlers, 'notification_read', explode)
+        item = _queue(db_session, mech_inspector, 'notification_read', {'notification_id': 1})
+
+        SyncReplayService.process_pending(max_batches=1)
+
+        assert item.status == 'pending'
+        assert item.sync_error == 'boom'
+        assert item.claim_token is None
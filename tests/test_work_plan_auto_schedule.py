@@ -0,0 +1,131 @@
+"""
+Tests for the work plan auto-scheduler.
+
+The plan is loaded into memory with a fixed number of queries; jobs are
+placed greedily by priority within each worker's daily capacity, and a
+repair pass moves an already placed job to make room for one that did not
+fit.
+"""
+
+from datetime import date, timedelta
+
+from tests.conftest import get_auth_header, make_equipment
+from app.models import WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, User, Leave
+from app.services.work_plan_ai_service import WorkPlanAIService
+from app.services.work_plan_scheduler import PlanState, AutoScheduler, ScheduledJob, Worker
+
+
+def _plan(db_session, admin_user, days=1):
+    start = date.today() + timedelta(days=1)
+    plan = WorkPlan(week_start=start, week_end=start + timedelta(days=6),
+                    status='draft', created_by_id=admin_user.id)
+    db_session.session.add(plan)
+    db_session.session.flush()
+    plan_days = [WorkPlanDay(work_plan_id=plan.id, date=start + timedelta(days=n)) for n in range(days)]
+    db_session.session.add_all(plan_days)
+    db_session.session.flush()
+    return plan, plan_days
+
+
+def _jobs(db_session, day, hours, **kwargs):
+    eq = kwargs.pop('equipment', None)
+    jobs = [
+        WorkPlanJob(work_plan_day_id=day.id, job_type='pm', estimated_hours=h, position=n,
+                    equipment_id=eq.id if eq else None, **kwargs)
+        for n, h in enumerate(hours)
+    ]
+    db_session.session.add_all(jobs)
+    db_session.session.commit()
+    return jobs
+
+
+def _workers(db_session, count, start=0, specialization=None):
+    users = [User(email=f'sched{n}@test.com', full_name=f'Sched Worker {n}', role='specialist',
+                  role_id=f'SCH{n:03d}', shift='day', specialization=specialization)
+             for n in range(start, start + count)]
+    for user in users:
+        user.set_password('test123')
+    db_session.session.add_all(users)
+    db_session.session.commit()
+    return users
+
+
+class TestSolver:
+    def test_repair_moves_a_job_to_fit_another(self):
+        a, b = Worker(1, 'A'), Worker(2, 'B')
+        jobs = [
+            ScheduledJob(10, 1, None, 4, priority='urgent'),
+            ScheduledJob(11, 1, None, 3, priority='high'),
+            ScheduledJob(12, 1, None, 3, priority='normal'),
+            ScheduledJob(13, 1, None, 5, priority='low'),
+        ]
+        placed, conflicts = AutoScheduler(PlanState(jobs, [a, b])).solve()
+
+        # Greedy alone leaves A with 4h and B with 6h, so the 5h job fits nowhere
+        assert conflicts == []
+        hours = {}
+        for job, worker, _ in placed:
+            hours[worker.id] = hours.get(worker.id, 0) + job.hours
+        assert sorted(hours.values()) == [7, 8]
+
+    def test_continuity_and_skills_win_ties(self):
+        mech, elec = Worker(1, 'Mech', 'mechanical'), Worker(2, 'Elec', 'electrical')
+        jobs = [
+            ScheduledJob(10, 1, None, 1, equipment_id=5, equipment_type='electrical_panel', berth='east'),
+            ScheduledJob(11, 1, None, 1, equipment_id=5, equipment_type='electrical_panel', berth='east'),
+            ScheduledJob(12, 1, None, 1, equipment_id=6, equipment_type='mechanical_pump', berth='west'),
+        ]
+        placed, _ = AutoScheduler(PlanState(jobs, [mech, elec])).solve()
+        assert [(job.id, worker.name) for job, worker, _ in placed] == [
+            (10, 'Elec'), (11, 'Elec'), (12, 'Mech')]
+
+        placed, _ = AutoScheduler(PlanState([ScheduledJob(20, 1, None, 1, equipment_id=5)], [mech]),
+                                  balance_berths=False).solve()
+        assert len(placed) == 1
+
+
+class TestAutoSchedule:
+    def test_schedules_within_capacity_and_leave(self, db_session, admin_user):
+        plan, (day1, day2) = _plan(db_session, admin_user, days=2)
+        w1, w2 = _workers(db_session, 2)
+        eq = make_equipment(db_session)
+        _jobs(db_session, day1, [4, 4, 4, 4, 4], equipment=eq, berth='east')
+        _jobs(db_session, day2, [3, 3])
+        db_session.session.add(WorkPlanAssignment(work_plan_job_id=WorkPlanJob.query.first().id,
+                                                  user_id=w1.id, is_lead=True))
+        db_session.session.add(Leave(user_id=w2.id, leave_type='annual', date_from=day2.date,
+                                     date_to=day2.date, total_days=1, status='approved'))
+        db_session.session.commit()
+
+        result = WorkPlanAIService.auto_schedule_jobs(None, plan.id)
+        assert (result['total_jobs'], result['jobs_scheduled'], result['jobs_with_conflicts']) == (6, 5, 1)
+        assert {s['user_id'] for s in result['scheduled'] if s['day_date'] == day2.date.isoformat()} == {w1.id}
+        assert result['conflicts'][0]['estimated_hours'] == 4
+
+    def test_query_count_does_not_grow_with_plan(self, db_session, admin_user, count_queries):
+        plan, (day,) = _plan(db_session, admin_user)
+        _workers(db_session, 2)
+        _jobs(db_session, day, [1, 1])
+        small, _ = count_queries(lambda: WorkPlanAIService.auto_schedule_jobs(None, plan.id))
+
+        _workers(db_session, 8, start=2)
+        _jobs(db_session, day, [1] * 30, equipment=make_equipment(db_session), berth='west')
+        large, result = count_queries(lambda: WorkPlanAIService.auto_schedule_jobs(None, plan.id))
+        assert result['jobs_scheduled'] == 32
+        assert large == small
+
+    def test_endpoint_applies_assignments(self, client, db_session, admin_user, engineer):
+        plan, (day,) = _plan(db_session, admin_user)
+        worker, = _workers(db_session, 1)
+        jobs = _jobs(db_session, day, [2, 2])
+
+        headers = get_auth_header(client, 'eng@test.com', 'test123')
+        resp = client.post(f'/api/work-plans/ai/auto-schedule/{plan.id}',
+                           json={'options': {'balance_berths': False}}, headers=headers)
+        assert resp.status_code == 200
+        assert resp.get_json()['jobs_scheduled'] == 2
+        # The engineer is a candidate too: one job each to balance the load
+        assignments = WorkPlanAssignment.query.order_by(WorkPlanAssignment.work_plan_job_id).all()
+        assert [a.work_plan_job_id for a in assignments] == [j.id for j in jobs]
+        assert {a.user_id for a in assignments} == {worker.id, engineer.id}
+        assert all(a.is_lead for a in assignments)
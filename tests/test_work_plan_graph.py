@@ -0,0 +1,138 @@
+"""
+Tests for the work plan dependency graph.
+
+Same-equipment jobs run in plan order and explicit dependencies add edges
+with their lag; one forward and one backward pass give each job's slack and
+the longest path. Graphs are cached per plan until the plan changes.
+"""
+
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from tests.conftest import make_equipment
+from app.models import WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment, JobDependency, Defect, Equipment
+from app.services.work_plan_ai_service import WorkPlanAIService
+from app.services import work_plan_graph
+from app.services.work_plan_graph import PlanGraph, PlanNode, get_plan_graph
+from app.utils import ttl_cache
+
+
+def _node(job_id, hours, equipment_id=None, day=date(2026, 1, 5), position=0):
+    return PlanNode(job_id, 1, day, position=position, hours=hours, equipment_id=equipment_id)
+
+
+class TestPlanGraph:
+    def test_longest_path_and_slack(self):
+        graph = PlanGraph(
+            [_node(1, 4, equipment_id=7), _node(2, 2, equipment_id=7, position=1), _node(3, 3, position=2),
+             _node(4, 5, day=date(2026, 1, 6))],
+            [(4, 2, 'finish_to_start', 60), (4, 99, 'finish_to_start', 0)],
+        )
+        assert graph.duration == 12
+        assert graph.critical_path == [1, 2, 4]
+        assert [graph.slack(j) for j in (1, 2, 3, 4)] == [0, 0, 9, 0]
+        assert graph.descendants(1) == [2, 4]
+
+    def test_start_to_start_and_cycles(self):
+        graph = PlanGraph([_node(1, 4), _node(2, 2, position=1)], [(2, 1, 'start_to_start', 30)])
+        assert (graph.duration, graph.earliest_start[2], graph.slack(2)) == (4, 0.5, 1.5)
+
+        # The equipment chain runs 1 -> 2; a dependency of 1 on 2 closes a cycle
+        graph = PlanGraph([_node(1, 4, equipment_id=7), _node(2, 2, equipment_id=7, position=1)],
+                          [(1, 2, 'finish_to_start', 0)])
+        assert graph.cyclic == [1, 2]
+        assert graph.duration == 6
+
+
+class TestCriticalPath:
+    def _plan(self, db_session, admin_user):
+        start = date.today() + timedelta(days=1)
+        plan = WorkPlan(week_start=start, week_end=start + timedelta(days=6), status='draft',
+                        created_by_id=admin_user.id)
+        db_session.session.add(plan)
+        db_session.session.flush()
+        first, second = (WorkPlanDay(work_plan_id=plan.id, date=start + timedelta(days=n)) for n in range(2))
+        db_session.session.add_all([first, second])
+        db_session.session.flush()
+        crane = make_equipment(db_session, 'Path Crane', 'PC-01')
+        jobs = [
+            WorkPlanJob(work_plan_day_id=first.id, job_type='pm', estimated_hours=4, position=0, equipment_id=crane.id),
+            WorkPlanJob(work_plan_day_id=first.id, job_type='pm', estimated_hours=2, position=1, equipment_id=crane.id),
+            WorkPlanJob(work_plan_day_id=first.id, job_type='pm', estimated_hours=3, position=2),
+            WorkPlanJob(work_plan_day_id=second.id, job_type='pm', estimated_hours=5, position=0),
+            WorkPlanJob(work_plan_day_id=second.id, job_type='pm', estimated_hours=1, position=1, priority='urgent'),
+        ]
+        db_session.session.add_all(jobs)
+        db_session.session.flush()
+        db_session.session.add(JobDependency(job_id=jobs[3].id, depends_on_job_id=jobs[1].id, lag_minutes=60))
+        db_session.session.add(WorkPlanAssignment(work_plan_job_id=jobs[3].id, user_id=admin_user.id))
+        db_session.session.commit()
+        return plan, second, jobs
+
+    def test_critical_path_from_graph(self, db_session, admin_user):
+        plan, _, jobs = self._plan(db_session, admin_user)
+        a, b, c, d, e = (j.id for j in jobs)
+
+        result = WorkPlanAIService().calculate_critical_path(plan.id)
+        assert (result['critical_path'], result['total_duration']) == ([a, b, d], 12)
+        assert [(j['job_id'], j['reasons']) for j in result['critical_jobs']] == [
+            (a, ['On critical path']), (b, ['On critical path']), (d, ['On critical path']),
+            (e, ['Urgent priority'])]
+        assert result['critical_jobs'][0]['equipment'] == 'Path Crane'
+        assert [(j['job_id'], j['slack_hours'], j['slack_days']) for j in result['slack_jobs']] == [(c, 9, 1.1)]
+
+        reschedule = WorkPlanAIService().real_time_reschedule({'event_type': 'delay', 'affected_job_id': b})
+        assert [(adj['job_id'], adj['slack_hours']) for adj in reschedule['adjustments']] == [(c, 9), (d, 0)]
+        assert [n['user_id'] for n in reschedule['notifications']] == [admin_user.id]
+
+    def test_graph_cached_per_plan_version(self, db_session, admin_user, count_queries):
+        plan, second, _ = self._plan(db_session, admin_user)
+        plan_id, second_id = plan.id, second.id
+
+        queries, graph = count_queries(lambda: get_plan_graph(plan_id))
+        assert queries == 3
+        queries, again = count_queries(lambda: get_plan_graph(plan_id))
+        assert (queries, again) == (1, graph)
+
+        db_session.session.add(WorkPlanJob(work_plan_day_id=second_id, job_type='pm', estimated_hours=9, position=2))
+        db_session.session.commit()
+        rebuilt = get_plan_graph(plan_id)
+        assert rebuilt is not graph
+        assert (len(rebuilt.nodes), rebuilt.duration) == (6, 12)
+
+    def test_idle_plans_drop_out_of_the_cache(self, db_session, admin_user, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(ttl_cache, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+        monkeypatch.setattr(work_plan_graph, '_graphs', ttl_cache.TTLCache(default_ttl=600))
+        plan, _, _ = self._plan(db_session, admin_user)
+        plan_id = plan.id
+
+        graph = get_plan_graph(plan_id)
+        now[0] += 500
+        assert get_plan_graph(plan_id) is graph, 'viewing keeps the graph cached'
+        now[0] += 500
+        assert get_plan_graph(plan_id) is graph
+
+        now[0] += 601
+        assert work_plan_graph._graphs.get(plan_id) is None
+        assert get_plan_graph(plan_id) is not graph
+
+    def test_defect_and_equipment_changes_refresh_graph(self, db_session, admin_user):
+        plan, _, jobs = self._plan(db_session, admin_user)
+        defect = Defect(description='Cracked weld', severity='low', status='open', due_date=date.today())
+        db_session.session.add(defect)
+        db_session.session.flush()
+        jobs[2].job_type, jobs[2].defect_id = 'defect', defect.id
+        db_session.session.commit()
+        plan_id, slack_job = plan.id, jobs[2].id
+
+        result = WorkPlanAIService().calculate_critical_path(plan_id)
+        assert slack_job not in [j['job_id'] for j in result['critical_jobs']]
+
+        defect.severity = 'critical'
+        db_session.session.get(Equipment, jobs[0].equipment_id).name = 'Renamed Crane'
+        db_session.session.commit()
+        result = WorkPlanAIService().calculate_critical_path(plan_id)
+        critical = {j['job_id']: j for j in result['critical_jobs']}
+        assert critical[slack_job]['reasons'] == ['critical severity defect']
+        assert critical[jobs[0].id]['equipment'] == 'Renamed Crane'
@@ -0,0 +1,122 @@
+"""
+Tests for the workforce performance anomaly scan.
+
+Metrics for every worker come from one grouped query and are scored
+against the team distribution.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from app.models import User, WorkPlan, WorkPlanDay, WorkPlanJob, WorkPlanAssignment
+from app.models.work_plan_job_tracking import WorkPlanJobTracking
+from app.services.workforce_analytics_service import WorkforceAnalyticsService, z_scores
+
+TODAY = date(2026, 3, 13)
+DAY = date(2026, 3, 11)
+
+
+def _plan_day(db_session, owner):
+    plan = WorkPlan(week_start=date(2026, 3, 9), week_end=date(2026, 3, 15),
+                    status='published', created_by_id=owner.id)
+    db_session.session.add(plan)
+    db_session.session.flush()
+    day = WorkPlanDay(work_plan_id=plan.id, date=DAY)
+    db_session.session.add(day)
+    db_session.session.flush()
+    return day
+
+
+def _worker(db_session, n):
+    user = User(email=f'anom{n}@test.com', full_name=f'Anomaly Worker {n}', role='specialist',
+                role_id=f'ANM{n:03d}', shift='day')
+    user.set_password('test123')
+    db_session.session.add(user)
+    db_session.session.flush()
+    return user
+
+
+def _jobs(db_session, day, user, actual_hours, count=4, status='completed', paused_minutes=0):
+    for _ in range(count):
+        job = WorkPlanJob(work_plan_day_id=day.id, job_type='pm', estimated_hours=2.0)
+        db_session.session.add(job)
+        db_session.session.flush()
+        db_session.session.add(WorkPlanAssignment(work_plan_job_id=job.id, user_id=user.id))
+        db_session.session.add(WorkPlanJobTracking(
+            work_plan_job_id=job.id, status=status, total_paused_minutes=paused_minutes,
+            actual_hours=actual_hours if status == 'completed' else None))
+    db_session.session.flush()
+
+
+def _team(db_session, owner, size):
+    day = _plan_day(db_session, owner)
+    workers = [_worker(db_session, n) for n in range(size)]
+    for n, worker in enumerate(workers):
+        # Ratios spread around 1.0, within the fixed thresholds
+        _jobs(db_session, day, worker, 1.8 + 0.1 * (n % 5))
+    return day, workers
+
+
+class TestZScores:
+    def test_ignores_missing_and_small_cohorts(self):
+        z = z_scores([1.0, 1.0, 1.0, 1.0, 5.0, np.nan])
+        assert z[4] == 2.0 and np.isnan(z[5])
+        assert not z_scores([1.0, 9.0]).any()
+        # A floor on the spread keeps a bunched team from producing outliers
+        assert z_scores([1.0, 1.0, 1.0, 1.0, 0.9], min_std=0.1)[4] > -1.0
+
+
+class TestPerformanceAnomalies:
+    def test_flags_outliers_against_the_team(self, db_session, admin_user):
+        day, workers = _team(db_session, admin_user, 8)
+        slow, stalled = _worker(db_session, 100), _worker(db_session, 101)
+        # 1.4x is under the fixed 1.5x threshold but far from the team
+        _jobs(db_session, day, slow, 2.8)
+        _jobs(db_session, day, stalled, 2.0, paused_minutes=45)
+        _jobs(db_session, day, stalled, None, count=4, status='incomplete')
+        db_session.session.commit()
+
+        anomalies = WorkforceAnalyticsService.detect_anomalies(period='weekly', today=TODAY)
+        found = {(a['user_id'], a['anomaly_type']): a for a in anomalies}
+
+        assert set(found) == {
+            (slow.id, 'slow_completion'),
+            (stalled.id, 'low_completion_rate'),
+            (stalled.id, 'frequent_pauses'),
+        }
+        assert found[(slow.id, 'slow_completion')]['deviation'] == 1.4
+        assert found[(slow.id, 'slow_completion')]['description'].endswith('longer than the team average')
+        assert found[(slow.id, 'slow_completion')]['z_score'] >= 2.0
+        assert found[(stalled.id, 'low_completion_rate')]['deviation'] == 0.5
+        assert found[(stalled.id, 'low_completion_rate')]['investigation_needed'] is False
+
+        only_slow = WorkforceAnalyticsService.detect_anomalies(user_id=slow.id, today=TODAY)
+        assert [a['anomaly_type'] for a in only_slow] == ['slow_completion']
+        assert WorkforceAnalyticsService.detect_anomalies(user_id=workers[0].id, today=TODAY) == []
+
+    def test_descriptions_follow_the_side_of_the_team(self, db_session, admin_user):
+        day = _plan_day(db_session, admin_user)
+        for n in range(8):
+            # A team finishing well inside its estimates
+            _jobs(db_session, day, _worker(db_session, n), 1.3 + 0.1 * (n % 3))
+        behind = _worker(db_session, 100)
+        _jobs(db_session, day, behind, 1.9)
+        db_session.session.commit()
+
+        anomalies = WorkforceAnalyticsService.detect_anomalies(user_id=behind.id, today=TODAY)
+        assert [(a['anomaly_type'], a['description']) for a in anomalies] == [
+            ('slow_completion', 'Taking 32% longer than the team average')]
+
+    def test_query_count_does_not_grow_with_workforce(self, db_session, admin_user, count_queries):
+        day, _ = _team(db_session, admin_user, 3)
+        db_session.session.commit()
+        small, _ = count_queries(lambda: WorkforceAnalyticsService.detect_anomalies(today=TODAY))
+
+        for n in range(10, 40):
+            _jobs(db_session, day, _worker(db_session, n), 2.0)
+        db_session.session.commit()
+        large, anomalies = count_queries(lambda: WorkforceAnalyticsService.detect_anomalies(today=TODAY))
+
+        assert small == large == 1
+        assert anomalies == []